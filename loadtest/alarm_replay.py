@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Replay a Contact ID backlog against the alarm receiver.
+
+Simulates central stations replaying signals after an outage: each
+connection writes its lines in pipelined windows and waits for one
+ACK/NAK byte per line. Reports throughput, NAKs and time-to-ACK.
+
+Run against a deployed receiver:
+
+    python loadtest/alarm_replay.py --host receiver.local --port 5000
+
+Or against an in-process receiver writing to a local SQLite database,
+which measures the receive/queue/bulk-insert path on its own:
+
+    python loadtest/alarm_replay.py --local
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to Python path
+backend_path = Path(__file__).parent.parent / "src" / "backend"
+sys.path.insert(0, str(backend_path))
+
+ACK = 0x06
+
+# Burglary, fire, medical, open/close, periodic test
+EVENT_CODES = ["130", "110", "100", "401", "602"]
+
+
+def contact_id_lines(count: int, accounts: int) -> list[bytes]:
+    """Contact ID lines (``ACCT 18 Q XYZ GG CCC``) spread over ``accounts``."""
+    lines = []
+    for _ in range(count):
+        account = random.randrange(1, accounts + 1)
+        qualifier = random.choice("113")  # Mostly events, some restores
+        code = random.choice(EVENT_CODES)
+        zone = random.randrange(1, 100)
+        lines.append(f"{account:04d}18{qualifier}{code}01{zone:03d}\n".encode())
+    return lines
+
+
+async def replay_connection(host: str, port: int, lines: list[bytes], window: int) -> tuple[int, list[float]]:
+    """Send ``lines`` in windows of ``window``; returns (NAK count, per-window ACK latencies)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    naks = 0
+    latencies = []
+    try:
+        for start in range(0, len(lines), window):
+            chunk = lines[start:start + window]
+            sent = time.perf_counter()
+            writer.write(b"".join(chunk))
+            await writer.drain()
+            replies = await reader.readexactly(len(chunk))
+            latencies.append(time.perf_counter() - sent)
+            naks += sum(1 for reply in replies if reply != ACK)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return naks, latencies
+
+
+async def run(args: argparse.Namespace, host: str, port: int) -> None:
+    lines = contact_id_lines(args.lines, args.accounts)
+    per_connection = [lines[i::args.connections] for i in range(args.connections)]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        replay_connection(host, port, chunk, args.window) for chunk in per_connection
+    ])
+    elapsed = time.perf_counter() - started
+
+    naks = sum(n for n, _ in results)
+    latencies = sorted(latency for _, window_latencies in results for latency in window_latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"Lines:        {len(lines)} over {args.connections} connections")
+    print(f"Elapsed:      {elapsed:.2f}s ({len(lines) / elapsed:,.0f} lines/s)")
+    print(f"NAKs:         {naks}")
+    print(f"Window ACK:   p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+
+
+async def run_local(args: argparse.Namespace) -> None:
+    """Start an in-process receiver on SQLite and replay against it."""
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from app.models import Alert
+    from app.models.base import Base
+    from app.services.alarm_receiver import (
+        AccountRateLimiter,
+        AlarmEventWriter,
+        AlarmReceiverService,
+        AlarmReceiverTCPServer,
+    )
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.sqlite_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    service = AlarmReceiverService()
+    server = AlarmReceiverTCPServer(
+        "127.0.0.1",
+        0,
+        service,
+        writer=AlarmEventWriter(service, session_factory),
+        rate_limiter=AccountRateLimiter(per_minute=0),
+    )
+    serving = asyncio.create_task(server.start())
+    while server._server is None:
+        await asyncio.sleep(0.01)
+
+    try:
+        await run(args, "127.0.0.1", server.port)
+        written_started = time.perf_counter()
+        await server.stop()
+        print(f"Final flush:  {(time.perf_counter() - written_started) * 1000:.0f} ms")
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+
+    async with session_factory() as session:
+        alerts = (await session.execute(select(func.count()).select_from(Alert))).scalar_one()
+    print(f"Alerts:       {alerts} written")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=20000, help="Total lines to replay")
+    parser.add_argument("--connections", type=int, default=4, help="Concurrent central-station connections")
+    parser.add_argument("--window", type=int, default=100, help="Lines in flight per connection")
+    parser.add_argument("--accounts", type=int, default=2000, help="Distinct alarm accounts")
+    parser.add_argument("--local", action="store_true", help="Run an in-process receiver on SQLite")
+    parser.add_argument("--sqlite-path", default="/tmp/alarm_replay.db")
+    args = parser.parse_args()
+
+    if args.local:
+        asyncio.run(run_local(args))
+    else:
+        asyncio.run(run(args, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""End-to-end load and soak test for the ingest pipeline.
+
+The Locust suite only covers REST. This drives the paths that carry the
+real load, all from one process so latencies share a clock:
+
+- MQTT devices publishing to ``agency/{agency}/device/{device}/telemetry``.
+  Each message carries a ``loadtest_sent_at`` metric (epoch seconds).
+- Socket.IO subscribers joined to the device rooms. When the
+  ``telemetry:data`` event for ``loadtest_sent_at`` arrives, its age is the
+  ingest-to-dashboard latency (MQTT -> Redis stream -> worker -> DB -> emit).
+- Contact ID senders pacing lines into the alarm receiver's TCP port.
+- A scraper reading the backend's /metrics for stream lag and rows written,
+  and the alarm receiver's metrics for alerts committed.
+
+A summary line is printed every ``--report-interval`` seconds (useful for
+soak runs) and a full report at the end. Devices must exist; seed them with
+``seed_data.py``, which creates the same device IDs used here.
+
+    python loadtest/pipeline_load.py --duration 600 --devices 500 --rate 2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import aiomqtt
+import httpx
+import socketio
+from prometheus_client.parser import text_string_to_metric_families
+
+from alarm_replay import ACK, contact_id_lines
+
+# Same IDs as seed_data.py creates
+DEVICE_NAMESPACE = uuid.UUID("5b0c7e5e-2f4a-4c38-9a57-1c7d3f0c6a10")
+SENT_AT_METRIC = "loadtest_sent_at"
+
+
+def device_id(n: int) -> str:
+    """ID of the n-th load-test device."""
+    return str(uuid.uuid5(DEVICE_NAMESPACE, f"device-{n}"))
+
+
+def percentiles(samples: list[float]) -> str:
+    """p50/p95/p99 in milliseconds."""
+    if len(samples) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49] * 1000:.0f} ms, p95 {cuts[94] * 1000:.0f} ms, p99 {cuts[98] * 1000:.0f} ms"
+
+
+@dataclass
+class Results:
+    """Counters shared by all simulated clients."""
+
+    published: int = 0
+    publish_errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    alarm_lines: int = 0
+    alarm_naks: int = 0
+    alarm_ack_latencies: list[float] = field(default_factory=list)
+    # Scraped backend metrics: (elapsed seconds, values)
+    scrapes: list[tuple[float, dict[str, float]]] = field(default_factory=list)
+
+
+# ==================== MQTT devices ====================
+
+async def run_devices(args: argparse.Namespace, results: Results, stop: asyncio.Event) -> None:
+    """Spread devices over ``--mqtt-clients`` connections, each publishing every 1/rate s."""
+    devices = [device_id(n) for n in range(args.devices)]
+    groups = [devices[i::args.mqtt_clients] for i in range(args.mqtt_clients)]
+    await asyncio.gather(*[
+        publish_group(args, group, results, stop) for group in groups if group
+    ])
+
+
+async def publish_group(args: argparse.Namespace, devices: list[str], results: Results, stop: asyncio.Event) -> None:
+    interval = 1.0 / args.rate
+    async with aiomqtt.Client(args.mqtt_host, args.mqtt_port) as client:
+        # Stagger devices so they do not all publish on the same tick
+        await asyncio.sleep(random.uniform(0, interval))
+        while not stop.is_set():
+            tick = time.monotonic()
+            for device in devices:
+                payload = {
+                    "metrics": {
+                        SENT_AT_METRIC: time.time(),
+                        "temperature": round(random.uniform(18, 26), 2),
+                        "sound_level_db": round(random.uniform(35, 90), 1),
+                    },
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "message_id": str(uuid.uuid4()),
+                }
+                try:
+                    await client.publish(
+                        f"agency/{args.agency_id}/device/{device}/telemetry", json.dumps(payload), qos=1
+                    )
+                    results.published += 1
+                except aiomqtt.MqttError:
+                    results.publish_errors += 1
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - tick)))
+
+
+# ==================== Socket.IO subscribers ====================
+
+async def run_subscriber(args: argparse.Namespace, devices: list[str], results: Results, stop: asyncio.Event) -> None:
+    """One dashboard watching ``devices``."""
+    client = socketio.AsyncClient(reconnection=True)
+
+    @client.on("telemetry:data")
+    async def on_telemetry(data):
+        if data.get("metric_name") == SENT_AT_METRIC and isinstance(data.get("value"), (int, float)):
+            results.latencies.append(time.time() - data["value"])
+
+    await client.connect(args.socketio_url, auth={"token": args.token}, transports=["websocket"])
+    try:
+        for device in devices:
+            await client.call("join_device_telemetry", {"device_id": device})
+        await stop.wait()
+    finally:
+        await client.disconnect()
+
+
+async def run_subscribers(args: argparse.Namespace, results: Results, stop: asyncio.Event) -> None:
+    """``--subscribers`` dashboards, each watching ``--watch`` random devices."""
+    devices = [device_id(n) for n in range(args.devices)]
+    watch = min(args.watch, len(devices))
+    await asyncio.gather(*[
+        run_subscriber(args, random.sample(devices, watch), results, stop) for _ in range(args.subscribers)
+    ])
+
+
+# ==================== Contact ID senders ====================
+
+async def run_alarm_sender(args: argparse.Namespace, rate: float, results: Results, stop: asyncio.Event) -> None:
+    """Send ``rate`` lines/s on one connection, one pipelined window per second."""
+    reader, writer = await asyncio.open_connection(args.alarm_host, args.alarm_port)
+    window = max(1, round(rate))
+    try:
+        while not stop.is_set():
+            tick = time.monotonic()
+            lines = contact_id_lines(window, args.alarm_accounts)
+            sent = time.perf_counter()
+            writer.write(b"".join(lines))
+            await writer.drain()
+            replies = await reader.readexactly(len(lines))
+            results.alarm_ack_latencies.append(time.perf_counter() - sent)
+            results.alarm_lines += len(lines)
+            results.alarm_naks += sum(1 for reply in replies if reply != ACK)
+            await asyncio.sleep(max(0.0, 1.0 - (time.monotonic() - tick)))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_alarm_senders(args: argparse.Namespace, results: Results, stop: asyncio.Event) -> None:
+    rate = args.alarm_rate / args.alarm_connections
+    await asyncio.gather(*[
+        run_alarm_sender(args, rate, results, stop) for _ in range(args.alarm_connections)
+    ])
+
+
+# ==================== Metrics scraping ====================
+
+SCRAPED = {
+    "eriop_telemetry_consumer_lag",
+    "eriop_telemetry_pending_entries",
+    "eriop_telemetry_rows_written_total",
+    "eriop_alarm_receiver_queue_depth",
+    "eriop_alarm_receiver_latency_seconds_count",
+    "eriop_alarm_receiver_write_failures_total",
+}
+
+
+async def scrape(client: httpx.AsyncClient, url: str, prefix: str) -> dict[str, float]:
+    """Sum the samples we care about from one /metrics endpoint.
+
+    Both processes export every eriop_ metric, so each endpoint is only
+    read for the ones it actually updates (``prefix``).
+    """
+    values: dict[str, float] = {}
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return values
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name in SCRAPED and sample.name.startswith(prefix):
+                values[sample.name] = values.get(sample.name, 0.0) + sample.value
+    return values
+
+
+async def run_scraper(args: argparse.Namespace, results: Results, stop: asyncio.Event, started: float) -> None:
+    async with httpx.AsyncClient(timeout=5) as client:
+        while not stop.is_set():
+            values = {}
+            if args.metrics_url:
+                values.update(await scrape(client, args.metrics_url, "eriop_telemetry_"))
+            if args.alarm_metrics_url:
+                values.update(await scrape(client, args.alarm_metrics_url, "eriop_alarm_receiver_"))
+            results.scrapes.append((time.monotonic() - started, values))
+            try:
+                await asyncio.wait_for(stop.wait(), args.scrape_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def rate_between(scrapes: list[tuple[float, dict[str, float]]], name: str) -> float | None:
+    """Per-second increase of a counter between the first and last scrape that have it."""
+    points = [(t, values[name]) for t, values in scrapes if name in values]
+    if len(points) < 2 or points[-1][0] == points[0][0]:
+        return None
+    return (points[-1][1] - points[0][1]) / (points[-1][0] - points[0][0])
+
+
+def peak(scrapes: list[tuple[float, dict[str, float]]], name: str) -> float | None:
+    points = [values[name] for _, values in scrapes if name in values]
+    return max(points) if points else None
+
+
+def fmt(value: float | None, suffix: str = "") -> str:
+    return "n/a" if value is None else f"{value:,.0f}{suffix}"
+
+
+# ==================== Reporting ====================
+
+async def run_reporter(args: argparse.Namespace, results: Results, stop: asyncio.Event, started: float) -> None:
+    """Print one line per interval so a soak run shows drift over time."""
+    seen_latencies = 0
+    seen_scrapes = 0
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), args.report_interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+        window = results.latencies[seen_latencies:]
+        scrapes = results.scrapes[max(0, seen_scrapes - 1):]
+        seen_latencies = len(results.latencies)
+        seen_scrapes = len(results.scrapes)
+        lag = scrapes[-1][1].get("eriop_telemetry_consumer_lag") if scrapes else None
+        print(
+            f"[{time.monotonic() - started:6.0f}s] published {results.published:,}"
+            f" | e2e {percentiles(window)}"
+            f" | lag {fmt(lag)}"
+            f" | rows/s {fmt(rate_between(scrapes, 'eriop_telemetry_rows_written_total'))}"
+            f" | alarm lines {results.alarm_lines:,} (NAK {results.alarm_naks:,})",
+            flush=True,
+        )
+
+
+def print_summary(args: argparse.Namespace, results: Results, elapsed: float) -> None:
+    scrapes = results.scrapes
+    print("\n" + "=" * 80)
+    print("Pipeline Load Test Complete")
+    print("=" * 80)
+    print(f"Duration:               {elapsed:.0f}s")
+    print(f"Telemetry published:    {results.published:,} ({results.published / elapsed:,.0f} msg/s)"
+          f", {results.publish_errors:,} errors")
+    print(f"Dashboard deliveries:   {len(results.latencies):,}")
+    print(f"Ingest-to-dashboard:    {percentiles(results.latencies)}")
+    print(f"Stream lag:             peak {fmt(peak(scrapes, 'eriop_telemetry_consumer_lag'))}"
+          f", pending peak {fmt(peak(scrapes, 'eriop_telemetry_pending_entries'))}")
+    print(f"Telemetry rows/s:       {fmt(rate_between(scrapes, 'eriop_telemetry_rows_written_total'))}")
+    if args.alarm_rate:
+        print(f"Alarm lines:            {results.alarm_lines:,} ({results.alarm_naks:,} NAKed)")
+        print(f"Alarm window ACK:       {percentiles(results.alarm_ack_latencies)}")
+        print(f"Alarm alerts/s:         {fmt(rate_between(scrapes, 'eriop_alarm_receiver_latency_seconds_count'))}"
+              f", queue peak {fmt(peak(scrapes, 'eriop_alarm_receiver_queue_depth'))}")
+    print("=" * 80 + "\n")
+
+
+async def run(args: argparse.Namespace) -> None:
+    results = Results()
+    stop = asyncio.Event()
+    started = time.monotonic()
+
+    tasks = [
+        asyncio.create_task(run_scraper(args, results, stop, started)),
+        asyncio.create_task(run_reporter(args, results, stop, started)),
+    ]
+    if args.subscribers:
+        tasks.append(asyncio.create_task(run_subscribers(args, results, stop)))
+        # Let dashboards join their rooms before devices start publishing
+        await asyncio.sleep(2)
+    if args.devices:
+        tasks.append(asyncio.create_task(run_devices(args, results, stop)))
+    if args.alarm_rate:
+        tasks.append(asyncio.create_task(run_alarm_senders(args, results, stop)))
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=args.duration, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()  # Surface a client that failed to connect
+    finally:
+        stop.set()
+        # Give in-flight telemetry time to reach the dashboards
+        await asyncio.sleep(args.drain)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print_summary(args, results, time.monotonic() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to run (soak: 3600+)")
+    parser.add_argument("--report-interval", type=float, default=10)
+    parser.add_argument("--drain", type=float, default=5, help="Seconds to wait for in-flight messages")
+    parser.add_argument("--agency-id", default="00000000-0000-0000-0000-000000000001")
+
+    telemetry = parser.add_argument_group("telemetry")
+    telemetry.add_argument("--mqtt-host", default="localhost")
+    telemetry.add_argument("--mqtt-port", type=int, default=1883)
+    telemetry.add_argument("--devices", type=int, default=200, help="Simulated devices (0 disables)")
+    telemetry.add_argument("--rate", type=float, default=1.0, help="Messages per device per second")
+    telemetry.add_argument("--mqtt-clients", type=int, default=10, help="MQTT connections the devices share")
+
+    dashboards = parser.add_argument_group("dashboards")
+    dashboards.add_argument("--socketio-url", default="http://localhost:8001")
+    dashboards.add_argument("--token", default="loadtest", help="Socket.IO auth token")
+    dashboards.add_argument("--subscribers", type=int, default=20, help="Socket.IO clients (0 disables)")
+    dashboards.add_argument("--watch", type=int, default=10, help="Devices each subscriber joins")
+
+    alarms = parser.add_argument_group("alarms")
+    alarms.add_argument("--alarm-host", default="localhost")
+    alarms.add_argument("--alarm-port", type=int, default=5000)
+    alarms.add_argument("--alarm-rate", type=float, default=50, help="Contact ID lines per second (0 disables)")
+    alarms.add_argument("--alarm-connections", type=int, default=4)
+    alarms.add_argument("--alarm-accounts", type=int, default=2000)
+
+    scraping = parser.add_argument_group("metrics")
+    scraping.add_argument("--metrics-url", default="http://localhost:8001/metrics")
+    scraping.add_argument("--alarm-metrics-url", default="http://localhost:9105/metrics")
+    scraping.add_argument("--scrape-interval", type=float, default=5)
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Creates:
 - Test users (dispatchers, responders, alert systems)
 - Test buildings
 - Test resources
+- Test IoT devices (IDs shared with pipeline_load.py)
 - Initial incidents and alerts
 
 This script should be run BEFORE load tests to populate the database
@@ -15,6 +16,7 @@ with realistic baseline data.
 import asyncio
 import sys
 import os
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -33,6 +35,7 @@ from app.models.agency import Agency
 from app.models.role import Role
 from app.models.building import Building, BuildingType, OccupancyType, ConstructionType, HazardLevel
 from app.models.resource import Resource, ResourceType, ResourceStatus
+from app.models.device import IoTDevice, DeviceStatus, DeviceType
 from app.models.incident import Incident, IncidentStatus, IncidentCategory, IncidentPriority
 from app.models.alert import Alert, AlertStatus, AlertSeverity, AlertSource
 from app.core.security import get_password_hash
@@ -213,6 +216,31 @@ async def create_test_resources(session: AsyncSession, agency: Agency) -> list[R
     return resources
 
 
+async def create_test_devices(session: AsyncSession, buildings: list[Building]) -> list[IoTDevice]:
+    """Create test IoT devices for the MQTT telemetry load test."""
+    print("Creating 1000 test IoT devices...")
+    devices = []
+
+    # Same IDs as pipeline_load.device_id(); no device profile, so any metric is accepted
+    namespace = uuid.UUID("5b0c7e5e-2f4a-4c38-9a57-1c7d3f0c6a10")
+
+    for i in range(1000):
+        device = IoTDevice(
+            id=uuid.uuid5(namespace, f"device-{i}"),
+            name=f"Load Test Sensor {i}",
+            device_type=DeviceType.SENSOR.value,
+            serial_number=f"LOADTEST-{i:05d}",
+            manufacturer="Load Test",
+            building_id=buildings[i % len(buildings)].id,
+            status=DeviceStatus.ONLINE.value,
+        )
+        session.add(device)
+        devices.append(device)
+
+    await session.flush()
+    return devices
+
+
 async def create_baseline_incidents(session: AsyncSession, agency: Agency) -> list[Incident]:
     """Create baseline incidents."""
     print("Creating 50 baseline incidents...")
@@ -310,6 +338,9 @@ async def main():
             print("Creating test resources...")
             resources = await create_test_resources(session, agency)
 
+            print("Creating test IoT devices...")
+            devices = await create_test_devices(session, buildings)
+
             print("Creating baseline incidents...")
             incidents = await create_baseline_incidents(session, agency)
 
@@ -328,6 +359,7 @@ async def main():
             print(f"  - {len(users['alert_systems'])} alert system users")
             print(f"  - {len(buildings)} buildings")
             print(f"  - {len(resources)} resources")
+            print(f"  - {len(devices)} IoT devices")
             print(f"  - {len(incidents)} incidents")
             print(f"  - {len(alerts)} alerts")
             print("="*80 + "\n")
@@ -0,0 +1,41 @@
+"""Add per-member read receipt high-water mark to channel_members.
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "018"
+down_revision = "017"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add last_read_message_id/last_read_message_at, seeded from last_read_at."""
+    op.add_column(
+        "channel_members",
+        sa.Column(
+            "last_read_message_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("messages.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "channel_members",
+        sa.Column("last_read_message_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Members had read everything that existed when they last marked the channel read
+    op.execute("UPDATE channel_members SET last_read_message_at = last_read_at")
+
+
+def downgrade() -> None:
+    """Remove the read receipt high-water mark columns."""
+    op.drop_column("channel_members", "last_read_message_at")
+    op.drop_column("channel_members", "last_read_message_id")
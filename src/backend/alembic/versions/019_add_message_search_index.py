@@ -0,0 +1,38 @@
+"""Add full-text and trigram search indexes on messages.
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "019"
+down_revision = "018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add a generated tsvector column with a GIN index, plus a trigram index.
+
+    The 'simple' configuration (no stemming or stop words) suits mixed
+    French/English operational chatter and unit identifiers. It must match
+    SEARCH_CONFIG in app/services/message_service.py.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE messages ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED"
+    )
+    op.execute("CREATE INDEX ix_messages_search_vector ON messages USING gin (search_vector)")
+    # Serves ILIKE '%...%' for partial words the full-text index cannot match
+    op.execute("CREATE INDEX ix_messages_content_trgm ON messages USING gin (content gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Drop the search indexes and column (the extension is left installed)."""
+    op.execute("DROP INDEX IF EXISTS ix_messages_content_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_messages_search_vector")
+    op.execute("ALTER TABLE messages DROP COLUMN IF EXISTS search_vector")
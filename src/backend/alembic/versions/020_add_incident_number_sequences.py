@@ -0,0 +1,44 @@
+"""Add per-prefix, per-day incident number sequences.
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "020"
+down_revision = "019"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create incident_number_sequences, seeded from existing incident numbers."""
+    op.create_table(
+        "incident_number_sequences",
+        sa.Column("prefix", sa.String(20), nullable=False),
+        sa.Column("sequence_date", sa.Date(), nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("prefix", "sequence_date"),
+    )
+    # Continue after the highest number already issued for each prefix and day
+    op.execute(
+        """
+        INSERT INTO incident_number_sequences (prefix, sequence_date, last_value)
+        SELECT parts[1], to_date(parts[2], 'YYYYMMDD'), max(parts[3]::integer)
+        FROM (
+            SELECT regexp_match(incident_number, '^(.+)-([0-9]{8})-([0-9]+)$') AS parts
+            FROM incidents
+        ) AS numbered
+        WHERE parts IS NOT NULL
+        GROUP BY parts[1], parts[2]
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop incident_number_sequences."""
+    op.drop_table("incident_number_sequences")
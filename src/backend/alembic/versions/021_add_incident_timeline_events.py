@@ -0,0 +1,101 @@
+"""Move incident timelines into an append-only incident_timeline_events table.
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "021"
+down_revision = "020"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create incident_timeline_events, copy the JSON timelines and drop the column."""
+    op.create_table(
+        "incident_timeline_events",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "incident_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("incidents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("description", sa.Text, nullable=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("user_name", sa.String(255), nullable=True),
+        sa.Column("metadata", sa.JSON, nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "ix_incident_timeline_events_incident_occurred",
+        "incident_timeline_events",
+        ["incident_id", "occurred_at"],
+    )
+
+    # Entries were written in two shapes: {type, description, metadata}
+    # by IncidentService and {event, details, notes} by the API routes.
+    op.execute(
+        """
+        INSERT INTO incident_timeline_events
+            (id, incident_id, event_type, description, user_id, user_name, metadata, occurred_at)
+        SELECT
+            CASE WHEN e.value->>'id' ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+                 THEN (e.value->>'id')::uuid ELSE gen_random_uuid() END,
+            i.id,
+            left(coalesce(e.value->>'type', e.value->>'event', 'event'), 50),
+            coalesce(e.value->>'description', e.value->>'details'),
+            u.id,
+            e.value->>'user_name',
+            coalesce(
+                e.value->'metadata',
+                CASE WHEN e.value ? 'notes' THEN jsonb_build_object('notes', e.value->'notes') END
+            )::json,
+            coalesce((e.value->>'timestamp')::timestamptz, i.created_at)
+        FROM incidents i
+        CROSS JOIN LATERAL jsonb_array_elements(coalesce(i.timeline_events::jsonb, '[]'::jsonb)) AS e(value)
+        LEFT JOIN users u ON u.id::text = e.value->>'user_id'
+        """
+    )
+    op.drop_column("incidents", "timeline_events")
+
+
+def downgrade() -> None:
+    """Restore incidents.timeline_events from the table and drop it."""
+    op.add_column("incidents", sa.Column("timeline_events", postgresql.JSONB, server_default="[]"))
+    op.execute(
+        """
+        UPDATE incidents i SET timeline_events = t.events
+        FROM (
+            SELECT incident_id, jsonb_agg(
+                jsonb_strip_nulls(jsonb_build_object(
+                    'id', id::text,
+                    'type', event_type,
+                    'description', description,
+                    'timestamp', occurred_at,
+                    'user_id', user_id::text,
+                    'user_name', user_name,
+                    'metadata', metadata::jsonb
+                ))
+                ORDER BY occurred_at, id
+            ) AS events
+            FROM incident_timeline_events
+            GROUP BY incident_id
+        ) t
+        WHERE t.incident_id = i.id
+        """
+    )
+    op.drop_index("ix_incident_timeline_events_incident_occurred", table_name="incident_timeline_events")
+    op.drop_table("incident_timeline_events")
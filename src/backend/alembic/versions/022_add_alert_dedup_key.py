@@ -0,0 +1,32 @@
+"""Add alerts.dedup_key and a partial index over open alerts.
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "022"
+down_revision = "021"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the dedup key column and the index used by the dedup fallback."""
+    op.add_column("alerts", sa.Column("dedup_key", sa.String(255), nullable=True))
+    op.create_index(
+        "ix_alerts_open_dedup",
+        "alerts",
+        ["dedup_key", "received_at"],
+        postgresql_where=sa.text("status IN ('pending', 'acknowledged')"),
+    )
+
+
+def downgrade() -> None:
+    """Remove the dedup key column and index."""
+    op.drop_index("ix_alerts_open_dedup", table_name="alerts")
+    op.drop_column("alerts", "dedup_key")
@@ -0,0 +1,49 @@
+"""Store notification_preferences.building_ids as JSONB with a GIN index.
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "023"
+down_revision = "022"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Convert building_ids to JSONB and index it for containment lookups."""
+    op.alter_column(
+        "notification_preferences",
+        "building_ids",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using="building_ids::jsonb",
+    )
+    op.create_index(
+        "ix_notification_preferences_building_ids",
+        "notification_preferences",
+        ["building_ids"],
+        postgresql_using="gin",
+        postgresql_ops={"building_ids": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Drop the index and convert building_ids back to JSON."""
+    op.drop_index(
+        "ix_notification_preferences_building_ids",
+        table_name="notification_preferences",
+    )
+    op.alter_column(
+        "notification_preferences",
+        "building_ids",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using="building_ids::json",
+    )
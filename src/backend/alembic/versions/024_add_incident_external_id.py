@@ -0,0 +1,33 @@
+"""Add incidents.external_source / external_id for CAD sync upserts.
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "024"
+down_revision = "023"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the external reference columns and their unique index."""
+    op.add_column("incidents", sa.Column("external_source", sa.String(50), nullable=True))
+    op.add_column("incidents", sa.Column("external_id", sa.String(100), nullable=True))
+    # Unique so concurrent syncs of one CAD call upsert a single incident;
+    # incidents created in Vigilia have NULLs, which never conflict
+    op.create_index(
+        "ix_incidents_external", "incidents", ["external_source", "external_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Remove the external reference columns and index."""
+    op.drop_index("ix_incidents_external", table_name="incidents")
+    op.drop_column("incidents", "external_id")
+    op.drop_column("incidents", "external_source")
@@ -0,0 +1,27 @@
+"""Record image rendition URLs on floor plans and building photos.
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "025"
+down_revision = "024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the image variant columns."""
+    op.add_column("floor_plans", sa.Column("plan_image_variants", sa.JSON(), nullable=True))
+    op.add_column("building_photos", sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove the image variant columns."""
+    op.drop_column("building_photos", "image_variants")
+    op.drop_column("floor_plans", "plan_image_variants")
@@ -0,0 +1,28 @@
+"""Add a token version counter to users.
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "026"
+down_revision = "025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the token version column."""
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Remove the token version column."""
+    op.drop_column("users", "token_version")
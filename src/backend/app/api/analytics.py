@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_active_user, require_permission, Permission
+from app.core.deps import get_analytics_db, get_current_active_user, require_permission, Permission
 from app.models.user import User
 from app.services.analytics import (
     AnalyticsService,
@@ -25,7 +25,7 @@ from app.services.analytics import (
 router = APIRouter()
 
 
-def get_analytics_service(db: AsyncSession = Depends(get_db)) -> AnalyticsService:
+def get_analytics_service(db: AsyncSession = Depends(get_analytics_db)) -> AnalyticsService:
     """Get analytics service instance."""
     return AnalyticsService(db)
 
@@ -3,12 +3,12 @@
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db, get_current_active_user
+from app.core.file_serving import file_response
 from app.models.user import User
 from app.services.audio_storage_service import AudioStorageService
 
@@ -135,37 +135,30 @@ async def get_audio_clip(
 
 @router.get("/{clip_id}/stream")
 async def stream_audio_clip(
+    request: Request,
     clip_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Stream audio clip for in-browser playback."""
+    """Stream audio clip for in-browser playback (supports Range seeking)."""
     try:
         clip_uuid = uuid.UUID(clip_id)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid clip ID")
 
     service = AudioStorageService(db)
-    result = await service.get_clip_data(clip_uuid)
+    located = await service.get_clip_file(clip_uuid)
 
-    if not result:
+    if not located:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio clip not found or file missing")
 
-    data, content_type = result
-
-    import io
-    return StreamingResponse(
-        io.BytesIO(data),
-        media_type=content_type,
-        headers={
-            "Content-Length": str(len(data)),
-            "Accept-Ranges": "bytes",
-        },
-    )
+    _, file_path, content_type = located
+    return await file_response(request, file_path, content_type)
 
 
 @router.get("/{clip_id}/download")
 async def download_audio_clip(
+    request: Request,
     clip_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -181,19 +174,13 @@ async def download_audio_clip(
     if not clip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio clip not found")
 
-    result = await service.get_clip_data(clip_uuid)
-    if not result:
+    located = await service.get_clip_file(clip_uuid)
+    if not located:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio file missing")
 
-    data, content_type = result
+    _, file_path, content_type = located
     filename = f"{clip.event_type}_{clip.event_timestamp.strftime('%Y%m%d_%H%M%S')}.{clip.format}"
 
-    import io
-    return StreamingResponse(
-        io.BytesIO(data),
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Length": str(len(data)),
-        },
+    return await file_response(
+        request, file_path, content_type, filename=filename, as_attachment=True
     )
@@ -5,7 +5,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr, Field
 
-from app.core.deps import DbSession, CurrentUser
+from app.core.deps import DbSession, CurrentUser, CurrentDbUser
 from app.services.auth_service import AuthService, AuthenticationError
 from app.services.mfa_service import MFAService
 from app.services.audit_service import AuditService
@@ -274,7 +274,7 @@ async def get_current_user(current_user: CurrentUser) -> UserResponse:
 @router.post("/change-password", response_model=MessageResponse)
 async def change_password(
     password_request: ChangePasswordRequest,
-    current_user: CurrentUser,
+    current_user: CurrentDbUser,
     db: DbSession,
     request: Request,
 ) -> MessageResponse:
@@ -329,7 +329,7 @@ async def setup_mfa(current_user: CurrentUser, db: DbSession) -> MFASetupRespons
 @router.post("/mfa/confirm", response_model=MessageResponse)
 async def confirm_mfa_setup(
     mfa_request: MFASetupRequest,
-    current_user: CurrentUser,
+    current_user: CurrentDbUser,
     db: DbSession,
     request: Request,
 ) -> MessageResponse:
@@ -416,7 +416,7 @@ async def complete_mfa_login(
 @router.post("/mfa/disable", response_model=MessageResponse)
 async def disable_mfa(
     mfa_request: MFAVerifyRequest,
-    current_user: CurrentUser,
+    current_user: CurrentDbUser,
     db: DbSession,
     request: Request,
 ) -> MessageResponse:
@@ -1,17 +1,20 @@
 """Building Information API endpoints."""
 
 from datetime import datetime, date
+from pathlib import Path
 from typing import Any, Optional
+import tempfile
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.responses import Response
 from starlette import status as http_status
 from pydantic import BaseModel, Field
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db, get_current_active_user
+from app.core.file_serving import file_response
 from app.models.user import User
 from app.models.alert import Alert as AlertModel, AlertStatus as AlertStatusModel
 from app.models.incident import Incident as IncidentModel
@@ -29,7 +32,7 @@ from app.models.document import BuildingDocument, DocumentCategory
 from app.services.building_service import BuildingService, BuildingError
 from app.services.building_analytics_service import BuildingAnalyticsService, BuildingAnalyticsError
 from app.services.file_storage import get_file_storage, FileStorageError
-from app.services.bim_parser import IFCParser, IFCParserError
+from app.services.bim_import_service import get_bim_import_queue
 from app.services.socketio import (
     emit_building_created,
     emit_building_updated,
@@ -297,6 +300,7 @@ class FloorPlanResponse(BaseModel):
     floor_name: str | None = None
     plan_file_url: str | None = None
     plan_thumbnail_url: str | None = None
+    plan_image_variants: dict[str, dict[str, str]] | None = None
     file_type: str | None = None
     floor_area_sqm: float | None = None
     ceiling_height_m: float | None = None
@@ -421,6 +425,7 @@ def floor_plan_to_response(floor_plan: FloorPlanModel) -> FloorPlanResponse:
         floor_name=floor_plan.floor_name,
         plan_file_url=floor_plan.plan_file_url,
         plan_thumbnail_url=floor_plan.plan_thumbnail_url,
+        plan_image_variants=floor_plan.plan_image_variants,
         file_type=floor_plan.file_type,
         floor_area_sqm=floor_plan.floor_area_sqm,
         ceiling_height_m=floor_plan.ceiling_height_m,
@@ -823,11 +828,9 @@ async def import_bim_data(
 MAX_IFC_FILE_SIZE = 100 * 1024 * 1024
 
 
-class BIMImportResponse(BaseModel):
-    """Response from BIM file import."""
+class BIMImportResult(BaseModel):
+    """Outcome of a completed BIM import."""
 
-    success: bool
-    message: str
     building_id: str
     bim_data: dict
     floors_created: int
@@ -836,28 +839,51 @@ class BIMImportResponse(BaseModel):
     ifc_schema: str | None = None
 
 
-@router.post("/{building_id}/import-bim", response_model=BIMImportResponse)
+class BIMImportJobResponse(BaseModel):
+    """State of a queued BIM import job."""
+
+    job_id: str
+    building_id: str
+    filename: str
+    status: str
+    stage: str
+    progress: int
+    error: str | None = None
+    cached: bool = False
+    result: BIMImportResult | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+async def _emit_bim_building_updated(building: BuildingModel) -> None:
+    """Broadcast the building after a background BIM import is applied."""
+    await emit_building_updated(building_to_response(building).model_dump(), str(building.id))
+
+
+@router.post(
+    "/{building_id}/import-bim",
+    response_model=BIMImportJobResponse,
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
 async def import_bim_file(
     building_id: str,
     file: UploadFile = File(..., description="IFC file to import (.ifc)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> BIMImportResponse:
-    """Import BIM data from an IFC file.
+) -> BIMImportJobResponse:
+    """Queue BIM data import from an IFC file.
 
-    Accepts IFC2x3 and IFC4 format files. Extracts building information,
-    floor data, and key locations (doors, stairs, elevators, fire equipment).
+    Accepts IFC2x3 and IFC4 format files. The upload is stored and parsed in
+    the background; progress is emitted as `bim:import:progress` to the
+    `building:{id}` room and can be polled from the job status endpoint.
 
-    The imported data will:
+    The completed import will:
     - Update the building's bim_data field
     - Create FloorPlan records for each floor found in the IFC file
     - Extract key locations for emergency response planning
 
     Maximum file size: 100MB
     """
-    import os
-    import tempfile
-
     # Validate building_id format
     try:
         building_uuid = uuid.UUID(building_id)
@@ -874,169 +900,68 @@ async def import_bim_file(
             detail="File must be an IFC file (.ifc)",
         )
 
-    # Read file content with size limit check
-    content = await file.read()
-    file_size = len(content)
+    service = BuildingService(db)
+    building = await service.get_building(building_uuid)
+    if not building:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Building not found",
+        )
 
-    if file_size > MAX_IFC_FILE_SIZE:
-        max_mb = MAX_IFC_FILE_SIZE / (1024 * 1024)
+    # Spool the upload to disk; the job owns and deletes it
+    spool_path = Path(tempfile.gettempdir()) / f"bim-import-{uuid.uuid4().hex}.ifc"
+    storage = get_file_storage()
+    try:
+        file_size = await storage.stream_to_file(
+            file, spool_path, max_size=MAX_IFC_FILE_SIZE, extension='ifc'
+        )
+    except FileStorageError as e:
         raise HTTPException(
             status_code=http_status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size is {max_mb:.0f}MB",
+            detail=str(e),
         )
 
     if file_size == 0:
+        spool_path.unlink(missing_ok=True)
         raise HTTPException(
             status_code=http_status.HTTP_400_BAD_REQUEST,
             detail="File is empty",
         )
 
-    # Save file temporarily for parsing
-    temp_path = None
     try:
-        # Create temp file with proper extension for ifcopenshell
-        with tempfile.NamedTemporaryFile(
-            mode='wb',
-            suffix='.ifc',
-            delete=False,
-        ) as temp_file:
-            temp_file.write(content)
-            temp_path = temp_file.name
-
-        # Parse IFC file
-        parser = IFCParser()
-        try:
-            bim_data = parser.parse_file(temp_path)
-        except IFCParserError as e:
-            raise HTTPException(
-                status_code=http_status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to parse IFC file: {str(e)}",
-            )
-
-        # Get building service
-        service = BuildingService(db)
-
-        # Verify building exists and user has access
-        building = await service.get_building(building_uuid)
-        if not building:
-            raise HTTPException(
-                status_code=http_status.HTTP_404_NOT_FOUND,
-                detail="Building not found",
-            )
+        queue = await get_bim_import_queue()
+        job = await queue.enqueue(
+            building_uuid,
+            spool_path,
+            filename=file.filename,
+            on_building_updated=_emit_bim_building_updated,
+        )
+    except Exception as e:
+        # The queue never took ownership of the spool file (job state is
+        # written to Redis first), so it is still ours to delete
+        spool_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="BIM import queue is unavailable",
+        ) from e
+    return BIMImportJobResponse(**job)
 
-        # Update building with BIM data
-        try:
-            building = await service.import_bim_data(
-                building_uuid,
-                bim_data=bim_data.to_dict(),
-                bim_file_url=None,  # File stored temporarily, not persisted
-            )
-        except BuildingError as e:
-            raise HTTPException(
-                status_code=http_status.HTTP_400_BAD_REQUEST,
-                detail=str(e),
-            )
 
-        # Create or update floor plans from BIM floor data
-        floors_created = 0
-        floors_updated = 0
-
-        # Get existing floor plans for the building
-        existing_floors = await service.get_building_floor_plans(building_uuid)
-        existing_floor_numbers = {fp.floor_number for fp in existing_floors}
-
-        for floor_info in bim_data.floors:
-            # Find key locations for this floor
-            floor_key_locations = [
-                loc.to_dict()
-                for loc in bim_data.key_locations
-                if loc.floor_number == floor_info.floor_number
-            ]
-
-            # Separate emergency exits from other locations
-            emergency_exits = [
-                loc for loc in floor_key_locations
-                if loc.get('type') == 'door' and loc.get('properties', {}).get('is_emergency_exit')
-            ]
-
-            # Separate fire equipment
-            fire_equipment = [
-                loc for loc in floor_key_locations
-                if loc.get('type') in ('fire_extinguisher', 'aed')
-            ]
-
-            # Other key locations (stairs, elevators, electrical panels)
-            other_locations = [
-                loc for loc in floor_key_locations
-                if loc.get('type') in ('stairwell', 'elevator', 'electrical_panel', 'door')
-                and not loc.get('properties', {}).get('is_emergency_exit')
-            ]
-
-            if floor_info.floor_number in existing_floor_numbers:
-                # Update existing floor plan
-                existing_fp = next(
-                    fp for fp in existing_floors
-                    if fp.floor_number == floor_info.floor_number
-                )
-                try:
-                    await service.update_floor_plan(
-                        floor_plan_id=existing_fp.id,
-                        floor_name=floor_info.floor_name or existing_fp.floor_name,
-                        floor_area_sqm=floor_info.area_sqm or existing_fp.floor_area_sqm,
-                        ceiling_height_m=floor_info.ceiling_height_m or existing_fp.ceiling_height_m,
-                        key_locations=other_locations or existing_fp.key_locations,
-                        emergency_exits=emergency_exits or existing_fp.emergency_exits,
-                        fire_equipment=fire_equipment or existing_fp.fire_equipment,
-                        bim_floor_data=floor_info.to_dict(),
-                    )
-                    floors_updated += 1
-                except BuildingError:
-                    pass  # Skip if update fails
-            else:
-                # Create new floor plan
-                try:
-                    await service.add_floor_plan(
-                        building_id=building_uuid,
-                        floor_number=floor_info.floor_number,
-                        floor_name=floor_info.floor_name,
-                        floor_area_sqm=floor_info.area_sqm,
-                        ceiling_height_m=floor_info.ceiling_height_m,
-                        key_locations=other_locations if other_locations else None,
-                        emergency_exits=emergency_exits if emergency_exits else None,
-                        fire_equipment=fire_equipment if fire_equipment else None,
-                        bim_floor_data=floor_info.to_dict(),
-                    )
-                    floors_created += 1
-                except BuildingError:
-                    pass  # Skip if floor already exists (race condition)
-
-        await db.commit()
-
-        # Emit WebSocket events for real-time updates
-        building_response = building_to_response(building)
-        try:
-            await emit_building_updated(building_response.model_dump(), str(building.id))
-        except Exception:
-            pass  # Don't let emit failures break the API
-
-        return BIMImportResponse(
-            success=True,
-            message=f"BIM data imported successfully from {file.filename}",
-            building_id=str(building_uuid),
-            bim_data=bim_data.to_dict(),
-            floors_created=floors_created,
-            floors_updated=floors_updated,
-            locations_found=len(bim_data.key_locations),
-            ifc_schema=bim_data.ifc_schema,
+@router.get("/{building_id}/import-bim/{job_id}", response_model=BIMImportJobResponse)
+async def get_bim_import_job(
+    building_id: str,
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> BIMImportJobResponse:
+    """Get the status of a BIM import job."""
+    queue = await get_bim_import_queue()
+    job = await queue.get_job(job_id)
+    if not job or job["building_id"] != building_id:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Import job not found",
         )
-
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass  # Ignore cleanup errors
+    return BIMImportJobResponse(**job)
 
 
 # ==================== Floor Plan Endpoints ====================
@@ -1173,10 +1098,61 @@ class FloorPlanUploadResponse(BaseModel):
     floor_name: str | None
     plan_file_url: str
     plan_thumbnail_url: str | None
+    plan_image_variants: dict[str, dict[str, str]] | None = None
     file_type: str
     message: str
 
 
+def image_variant_urls(file_url: str) -> dict[str, dict[str, str]]:
+    """URLs of an uploaded image's renditions, by variant then format."""
+    storage = get_file_storage()
+    return {
+        variant: {fmt: f"{file_url}?variant={variant}&format={fmt}" for fmt in storage.IMAGE_FORMATS}
+        for variant in storage.IMAGE_VARIANTS
+    }
+
+
+def resolve_image_variant(
+    request: Request,
+    filename: str,
+    variant: str | None,
+    image_format: str | None,
+) -> tuple[str, str | None]:
+    """Pick the stored file for a variant request.
+
+    Without an explicit format, WebP is served to clients that accept it.
+
+    Returns:
+        Tuple of (filename to serve, Vary header or None)
+    """
+    if variant is None:
+        if image_format is not None:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="format requires variant",
+            )
+        return filename, None
+
+    storage = get_file_storage()
+    formats = storage.image_variant_filenames(filename).get(variant)
+    if formats is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown image variant: {variant}",
+        )
+    if image_format is not None:
+        if image_format not in formats:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported image format: {image_format}",
+            )
+        return formats[image_format], None
+
+    accept = request.headers.get("accept", "")
+    negotiated = "webp" if "image/webp" in accept else storage.IMAGE_FORMATS[0]
+    return formats[negotiated], "Accept"
+
+
 @router.post(
     "/{building_id}/floor-plans/upload",
     response_model=FloorPlanUploadResponse,
@@ -1212,21 +1188,22 @@ async def upload_floor_plan(
             detail="Building not found",
         )
 
-    # Read file content
-    file_content = await file.read()
-
     # Get file storage service
     storage = get_file_storage()
 
     try:
-        # Save file
-        file_url, thumbnail_url, file_type = await storage.save_floor_plan(
+        # Stream file to disk (validated chunk by chunk, never fully buffered)
+        file_url, thumbnail_url, file_type = await storage.save_floor_plan_upload(
             building_id=building_uuid,
             floor_number=floor_number,
-            file_content=file_content,
+            upload=file,
             content_type=file.content_type or "application/octet-stream",
+            declared_size=file.size,
         )
 
+        # Renditions are rendered together with the thumbnail
+        image_variants = image_variant_urls(file_url) if thumbnail_url else None
+
         # Create or update floor plan record in database
         try:
             floor_plan = await service.add_floor_plan(
@@ -1235,6 +1212,7 @@ async def upload_floor_plan(
                 floor_name=floor_name,
                 plan_file_url=file_url,
                 plan_thumbnail_url=thumbnail_url,
+                plan_image_variants=image_variants,
                 file_type=file_type,
             )
         except BuildingError:
@@ -1249,6 +1227,7 @@ async def upload_floor_plan(
                     floor_plan_id=existing.id,
                     plan_file_url=file_url,
                     plan_thumbnail_url=thumbnail_url,
+                    plan_image_variants=image_variants,
                     file_type=file_type,
                     floor_name=floor_name or existing.floor_name,
                 )
@@ -1268,6 +1247,7 @@ async def upload_floor_plan(
             floor_name=floor_plan.floor_name,
             plan_file_url=file_url,
             plan_thumbnail_url=thumbnail_url,
+            plan_image_variants=image_variants,
             file_type=file_type,
             message="Floor plan uploaded successfully",
         )
@@ -1281,13 +1261,20 @@ async def upload_floor_plan(
 
 @router.get("/{building_id}/floor-plans/files/{filename}")
 async def get_floor_plan_file(
+    request: Request,
     building_id: str,
     filename: str,
+    variant: str | None = Query(None, description="Image rendition, e.g. thumb or preview"),
+    image_format: str | None = Query(None, alias="format", description="Rendition format (jpg, webp)"),
     current_user: User = Depends(get_current_active_user),
-) -> FileResponse:
+) -> Response:
     """Serve a floor plan file.
 
     Returns the file with appropriate content type for display/download.
+    Supports Range and If-None-Match; filenames are unique per upload, so
+    responses are cacheable as immutable. For images, ``variant`` serves a
+    rendition instead, as WebP when the client accepts it unless ``format``
+    is given.
     """
     try:
         building_uuid = uuid.UUID(building_id)
@@ -1297,6 +1284,7 @@ async def get_floor_plan_file(
             detail="Invalid building_id format",
         )
 
+    filename, vary = resolve_image_variant(request, filename, variant, image_format)
     storage = get_file_storage()
     file_path = storage.get_file_path(building_uuid, filename)
 
@@ -1308,11 +1296,7 @@ async def get_floor_plan_file(
 
     content_type = storage.get_content_type(filename)
 
-    return FileResponse(
-        path=file_path,
-        media_type=content_type,
-        filename=filename,
-    )
+    return await file_response(request, file_path, content_type, filename=filename, vary=vary)
 
 
 class FloorPlanUpdateRequest(BaseModel):
@@ -2073,31 +2057,14 @@ async def upload_document(
     # Get file storage service
     storage = get_file_storage()
 
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
-
-    # Validate file size (50MB max)
-    max_size = 50 * 1024 * 1024
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=http_status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size is {max_size / (1024*1024):.0f}MB",
-        )
-
-    # Save file
-    import uuid as uuid_module
+    # Stream file to the building documents path (50MB max, enforced while reading)
     file_ext = file.filename.split(".")[-1] if file.filename and "." in file.filename else "bin"
-    filename = f"doc_{uuid_module.uuid4().hex[:8]}.{file_ext}"
-
-    # Use building documents path
-    building_path = storage._get_building_path(building_uuid)
-    docs_path = building_path.parent / "documents"
-    docs_path.mkdir(parents=True, exist_ok=True)
-
-    file_path = docs_path / filename
-    with open(file_path, "wb") as f:
-        f.write(content)
+    try:
+        filename, file_size = await storage.save_document_upload(
+            building_uuid, file, file_ext, declared_size=file.size
+        )
+    except FileStorageError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     file_url = f"/api/v1/buildings/{building_id}/documents/files/{filename}"
 
@@ -2122,6 +2089,7 @@ async def upload_document(
 
 @router.get("/{building_id}/documents/files/{filename}")
 async def serve_document_file(
+    request: Request,
     building_id: str,
     filename: str,
     current_user: User = Depends(get_current_active_user),
@@ -2136,16 +2104,13 @@ async def serve_document_file(
         )
 
     storage = get_file_storage()
-    building_path = storage._get_building_path(building_uuid)
-    file_path = building_path.parent / "documents" / filename
+    file_path = storage.get_building_file_path(building_uuid, "documents", filename)
 
-    if not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="File not found")
 
-    return FileResponse(
-        path=str(file_path),
-        filename=filename,
-        media_type=storage.get_content_type(filename),
+    return await file_response(
+        request, file_path, storage.get_content_type(filename), filename=filename
     )
 
 
@@ -2329,39 +2294,21 @@ async def upload_photo(
 
     storage = get_file_storage()
 
-    content = await file.read()
-    file_size = len(content)
-
-    import uuid as uuid_module
+    # Stream to photos directory; thumbnail is rendered off the event loop
     file_ext = file.filename.split(".")[-1] if file.filename and "." in file.filename else "jpg"
-    filename = f"photo_{uuid_module.uuid4().hex[:8]}.{file_ext}"
-    thumb_filename = f"photo_{uuid_module.uuid4().hex[:8]}_thumb.{file_ext}"
-
-    # Save to photos directory
-    building_path = storage._get_building_path(building_uuid)
-    photos_path = building_path.parent / "photos"
-    photos_path.mkdir(parents=True, exist_ok=True)
-
-    file_path = photos_path / filename
-    with open(file_path, "wb") as f:
-        f.write(content)
+    try:
+        filename, thumb_filename, _ = await storage.save_photo_upload(
+            building_uuid, file, file_ext.lower(), declared_size=file.size
+        )
+    except FileStorageError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     file_url = f"/api/v1/buildings/{building_id}/photos/files/{filename}"
     thumbnail_url = None
-
-    # Generate thumbnail
-    try:
-        from PIL import Image
-        import io
-
-        img = Image.open(io.BytesIO(content))
-        img.thumbnail((300, 300))
-
-        thumb_path = photos_path / thumb_filename
-        img.save(thumb_path, quality=85)
+    image_variants = None
+    if thumb_filename:
         thumbnail_url = f"/api/v1/buildings/{building_id}/photos/files/{thumb_filename}"
-    except Exception:
-        pass  # Thumbnail generation failed, continue without
+        image_variants = image_variant_urls(file_url)
 
     # Parse tags
     tag_list = []
@@ -2383,6 +2330,7 @@ async def upload_photo(
         description=description,
         file_url=file_url,
         thumbnail_url=thumbnail_url,
+        image_variants=image_variants,
         latitude=latitude,
         longitude=longitude,
         uploaded_by_id=current_user.id if current_user else None,
@@ -2398,11 +2346,14 @@ async def upload_photo(
 
 @router.get("/{building_id}/photos/files/{filename}")
 async def serve_photo_file(
+    request: Request,
     building_id: str,
     filename: str,
+    variant: str | None = Query(None, description="Image rendition, e.g. thumb or preview"),
+    image_format: str | None = Query(None, alias="format", description="Rendition format (jpg, webp)"),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Serve a photo file."""
+    """Serve a photo file, or one of its renditions (see get_floor_plan_file)."""
     try:
         building_uuid = uuid.UUID(building_id)
     except ValueError:
@@ -2411,17 +2362,15 @@ async def serve_photo_file(
             detail="Invalid building_id format",
         )
 
+    filename, vary = resolve_image_variant(request, filename, variant, image_format)
     storage = get_file_storage()
-    building_path = storage._get_building_path(building_uuid)
-    file_path = building_path.parent / "photos" / filename
+    file_path = storage.get_building_file_path(building_uuid, "photos", filename)
 
-    if not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="File not found")
 
-    return FileResponse(
-        path=str(file_path),
-        filename=filename,
-        media_type=storage.get_content_type(filename),
+    return await file_response(
+        request, file_path, storage.get_content_type(filename), filename=filename, vary=vary
     )
 
 
@@ -2465,20 +2414,10 @@ async def delete_photo(
     if not photo:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Photo not found")
 
-    # Delete files
+    # Delete the photo and every rendition (thumbnail included)
     storage = get_file_storage()
-    building_path = storage._get_building_path(photo.building_id)
-
     filename = photo.file_url.split("/")[-1]
-    file_path = building_path.parent / "photos" / filename
-    if file_path.exists():
-        file_path.unlink()
-
-    if photo.thumbnail_url:
-        thumb_filename = photo.thumbnail_url.split("/")[-1]
-        thumb_path = building_path.parent / "photos" / thumb_filename
-        if thumb_path.exists():
-            thumb_path.unlink()
+    storage.delete_building_file(photo.building_id, "photos", filename)
 
     await db.delete(photo)
     await db.commit()
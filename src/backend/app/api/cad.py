@@ -5,9 +5,8 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from pydantic import BaseModel, Field
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_active_user, require_permission, Permission
+from app.core.deps import get_current_active_user, require_permission, Permission
 from app.models.user import User
 from app.services.cad_adapter import (
     CADVendor,
@@ -107,7 +106,6 @@ class SyncIncidentRequest(BaseModel):
 async def create_cad_connection(
     request: CADConnectionCreate,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
 ) -> CADConnectionResponse:
     """Create a new CAD connection."""
@@ -157,7 +155,7 @@ async def create_cad_connection(
     # Start sync if enabled
     if request.sync_enabled:
         adapter = create_adapter(vendor, config)
-        sync_service = CADSyncService(db, adapter)
+        sync_service = CADSyncService(adapter, agency_id=current_user.agency_id)
 
         async def start_sync():
             try:
@@ -390,7 +388,6 @@ async def fetch_cad_units(
 async def start_cad_sync(
     connection_id: str,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
 ) -> dict:
     """Start CAD synchronization."""
@@ -416,7 +413,7 @@ async def start_cad_sync(
         )
 
     adapter = create_adapter(vendor, conn["config"])
-    sync_service = CADSyncService(db, adapter)
+    sync_service = CADSyncService(adapter, agency_id=current_user.agency_id)
 
     async def start_sync():
         try:
@@ -16,7 +16,17 @@ from app.models.incident import Incident as IncidentModel
 from app.models.incident import IncidentStatus as IncidentStatusModel
 from app.models.incident import IncidentCategory as IncidentCategoryModel
 from app.models.incident import IncidentPriority as IncidentPriorityModel
-from app.services.socketio import emit_incident_created, emit_incident_updated
+from app.services.incident_service import (
+    IncidentError,
+    IncidentService,
+    allocate_incident_number,
+    record_timeline_event,
+)
+from app.services.socketio import (
+    emit_incident_created,
+    emit_incident_timeline_event,
+    emit_incident_updated,
+)
 
 router = APIRouter()
 
@@ -158,22 +168,6 @@ def incident_to_response(inc: IncidentModel) -> IncidentResponse:
     )
 
 
-async def generate_incident_number(db: AsyncSession) -> str:
-    """Generate a unique incident number."""
-    today = datetime.now(timezone.utc)
-    prefix = today.strftime("%Y%m%d")
-
-    # Count incidents created today
-    start_of_day = today.replace(hour=0, minute=0, second=0, microsecond=0)
-    count_query = select(func.count()).select_from(IncidentModel).where(
-        IncidentModel.created_at >= start_of_day
-    )
-    result = await db.execute(count_query)
-    count = (result.scalar() or 0) + 1
-
-    return f"INC-{prefix}-{count:04d}"
-
-
 @router.post("", response_model=IncidentResponse, status_code=status.HTTP_201_CREATED)
 async def create_incident(
     incident: IncidentCreate,
@@ -188,7 +182,7 @@ async def create_incident(
         )
 
     # Generate incident number
-    incident_number = await generate_incident_number(db)
+    incident_number = await allocate_incident_number(db)
 
     # Create new incident
     new_incident = IncidentModel(
@@ -207,15 +201,16 @@ async def create_incident(
         agency_id=current_user.agency_id,
         source_alert_id=uuid.UUID(incident.source_alert_id) if incident.source_alert_id else None,
         assigned_units=[],
-        timeline_events=[{
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "event": "created",
-            "user_id": str(current_user.id),
-            "details": f"Incident created by {current_user.full_name or current_user.email}",
-        }],
     )
 
     db.add(new_incident)
+    record_timeline_event(
+        db,
+        new_incident.id,
+        event_type="created",
+        description=f"Incident created by {current_user.full_name or current_user.email}",
+        user=current_user,
+    )
     await db.commit()
     await db.refresh(new_incident)
 
@@ -380,23 +375,25 @@ async def update_incident(
         incident.description = update.description
 
     # Add timeline event if changes were made
+    event = None
     if changes:
-        timeline = incident.timeline_events or []
-        timeline.append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "event": "updated",
-            "user_id": str(current_user.id),
-            "details": "; ".join(changes),
-        })
-        incident.timeline_events = timeline
+        event = record_timeline_event(
+            db,
+            incident.id,
+            event_type="updated",
+            description="; ".join(changes),
+            user=current_user,
+        )
 
     await db.commit()
     await db.refresh(incident)
 
     response = incident_to_response(incident)
 
-    # Emit real-time event
+    # Emit real-time events
     await emit_incident_updated(response.model_dump(mode="json"))
+    if event is not None:
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
     return response
 
@@ -576,20 +573,21 @@ async def escalate_incident(
         incident.priority = incident.priority - 1
 
     # Add timeline event
-    timeline = incident.timeline_events or []
-    timeline.append({
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "event": "escalated",
-        "user_id": str(current_user.id),
-        "details": f"Escalated from priority {old_priority} to {incident.priority}: {reason}",
-    })
-    incident.timeline_events = timeline
+    event = record_timeline_event(
+        db,
+        incident.id,
+        event_type="escalated",
+        description=f"Escalated from priority {old_priority} to {incident.priority}: {reason}",
+        user=current_user,
+        metadata={"reason": reason, "old_priority": old_priority, "new_priority": incident.priority},
+    )
 
     await db.commit()
     await db.refresh(incident)
 
     response = incident_to_response(incident)
     await emit_incident_updated(response.model_dump(mode="json"))
+    await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
     return response
 
@@ -597,10 +595,12 @@ async def escalate_incident(
 @router.get("/{incident_id}/timeline")
 async def get_incident_timeline(
     incident_id: str,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    offset: Annotated[int, Query(ge=0)] = 0,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> list[dict]:
-    """Get complete timeline of incident events."""
+    """Get a page of the incident timeline, oldest first."""
     try:
         incident_uuid = uuid.UUID(incident_id)
     except ValueError:
@@ -609,14 +609,10 @@ async def get_incident_timeline(
             detail="Invalid incident ID format",
         )
 
-    query = select(IncidentModel).where(IncidentModel.id == incident_uuid)
-    result = await db.execute(query)
-    incident = result.scalar_one_or_none()
-
-    if not incident:
+    try:
+        return await IncidentService(db).get_timeline(incident_uuid, limit=limit, offset=offset)
+    except IncidentError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Incident not found",
         )
-
-    return incident.timeline_events or []
@@ -81,6 +81,20 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+class MessageSearchResult(MessageResponse):
+    """A message search hit."""
+
+    highlight: str  # HTML-escaped snippet; matches wrapped in <mark>
+    rank: Optional[float] = None
+
+
+class MessageSearchResponse(BaseModel):
+    """A page of message search results."""
+
+    items: list[MessageSearchResult]
+    next_cursor: Optional[str] = None
+
+
 class UnreadCountResponse(BaseModel):
     """Response schema for unread counts."""
 
@@ -112,8 +126,9 @@ async def get_channel_messages(
         before=before,
         after=after,
     )
+    receipts = await message_service.get_read_receipts(messages)
 
-    return [_message_to_response(msg) for msg in messages]
+    return [_message_to_response(msg, receipts.get(msg.id)) for msg in messages]
 
 
 @router.post("/channel/{channel_id}", response_model=MessageResponse, status_code=201)
@@ -154,7 +169,7 @@ async def send_message(
         room=f"channel:{channel_id}",
     )
 
-    return _message_to_response(message)
+    return _message_to_response(message, [str(current_user.id)])
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
@@ -175,7 +190,8 @@ async def get_message(
     if not await channel_service.is_member(message.channel_id, current_user.id):
         raise HTTPException(status_code=403, detail="Not a member of this channel")
 
-    return _message_to_response(message)
+    receipts = await message_service.get_read_receipts([message])
+    return _message_to_response(message, receipts.get(message.id))
 
 
 @router.patch("/{message_id}", response_model=MessageResponse)
@@ -209,7 +225,8 @@ async def edit_message(
         room=f"channel:{message.channel_id}",
     )
 
-    return _message_to_response(message)
+    receipts = await message_service.get_read_receipts([message])
+    return _message_to_response(message, receipts.get(message.id))
 
 
 @router.delete("/{message_id}", status_code=204)
@@ -290,25 +307,41 @@ async def get_unread_count(
     return counts
 
 
-@router.get("/search", response_model=list[MessageResponse])
+@router.get("/search", response_model=MessageSearchResponse)
 async def search_messages(
     query: str = Query(..., min_length=2),
     channel_id: Optional[uuid.UUID] = Query(None),
     limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Search messages across user's channels."""
+    """Search messages across user's channels, best matches first."""
     message_service = MessageService(db)
-    messages = await message_service.search_messages(
-        user_id=current_user.id,
-        query=query,
-        channel_id=channel_id,
-        limit=limit,
+    try:
+        hits, next_cursor = await message_service.search_messages(
+            user_id=current_user.id,
+            query=query,
+            channel_id=channel_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    receipts = await message_service.get_read_receipts([hit.message for hit in hits])
+
+    return MessageSearchResponse(
+        items=[
+            MessageSearchResult(
+                **_message_to_response(hit.message, receipts.get(hit.message.id)).model_dump(),
+                highlight=hit.highlight,
+                rank=hit.rank,
+            )
+            for hit in hits
+        ],
+        next_cursor=next_cursor,
     )
 
-    return [_message_to_response(msg) for msg in messages]
-
 
 @router.post("/{message_id}/reactions", status_code=201)
 async def add_reaction(
@@ -389,7 +422,7 @@ async def remove_reaction(
 
 
 # Helper functions
-def _message_to_response(message) -> MessageResponse:
+def _message_to_response(message, read_by: Optional[list[str]] = None) -> MessageResponse:
     """Convert message model to response schema."""
     sender = None
     if message.sender:
@@ -417,7 +450,7 @@ def _message_to_response(message) -> MessageResponse:
         reply_to_id=message.reply_to_id,
         is_edited=message.is_edited,
         edited_at=message.edited_at,
-        read_by=message.read_by,
+        read_by=read_by,
         created_at=message.created_at,
     )
 
@@ -19,6 +19,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.deps import get_db
+from app.core.security import run_password_hash
 from app.models.device_credentials import DeviceCredentials
 from app.models.device import IoTDevice
 from app.models.building import Building
@@ -96,7 +97,9 @@ async def authenticate_device(
 
         if credential.credential_type == "access_token" and credential.access_token_hash:
             # Verify password against access token hash
-            if password and pwd_context.verify(password, credential.access_token_hash):
+            if password and await run_password_hash(
+                "verify", pwd_context.verify, password, credential.access_token_hash
+            ):
                 authenticated = True
                 logger.info("device authenticated via access token", device_id=device_id_str, clientid=clientid)
 
@@ -2,12 +2,15 @@
 
 import uuid
 from datetime import datetime
+from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.deps import get_db, get_current_active_user, require_permission, Permission
+from app.core.file_serving import cache_control
 from app.models.user import User
 from app.services.streaming import (
     StreamingService,
@@ -66,7 +69,12 @@ def get_hls_manager() -> HLSSegmentManager:
     """Get HLS segment manager instance."""
     global _hls_manager
     if _hls_manager is None:
-        _hls_manager = HLSSegmentManager()
+        _hls_manager = HLSSegmentManager(
+            window_size=settings.hls_window_segments,
+            memory_budget_bytes=settings.hls_memory_budget_mb * 1024 * 1024,
+            spill_dir=Path(settings.hls_spill_dir) if settings.hls_spill_dir else None,
+            part_duration=settings.hls_part_duration or None,
+        )
     return _hls_manager
 
 
@@ -426,6 +434,8 @@ async def stop_stream(
             detail="Session not found",
         )
 
+    get_hls_manager().cleanup_session(session_uuid)
+
     return {"message": "Stream stopped"}
 
 
@@ -565,6 +575,85 @@ async def get_ice_candidates(
     return {"candidates": candidates}
 
 
+# HLS Endpoints
+@router.get("/sessions/{session_id}/hls/index.m3u8")
+async def get_hls_playlist(
+    session_id: str,
+    msn: int | None = Query(None, alias="_HLS_msn", ge=0, description="LL-HLS blocking reload: media sequence"),
+    part: int | None = Query(None, alias="_HLS_part", ge=0, description="LL-HLS blocking reload: part index"),
+    hls: HLSSegmentManager = Depends(get_hls_manager),
+    current_user: User = Depends(get_current_active_user),
+) -> Response:
+    """Get the HLS media playlist for a session.
+
+    With _HLS_msn (and optionally _HLS_part) the request blocks until the
+    playlist contains that segment or part, as specified by LL-HLS.
+    """
+    try:
+        session_uuid = uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid session ID format",
+        )
+
+    if part is not None and msn is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="_HLS_part requires _HLS_msn",
+        )
+
+    if msn is not None and not await hls.wait_for_playlist(session_uuid, msn, part):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Requested media sequence not available",
+        )
+
+    playlist = hls.get_playlist(session_uuid)
+    if playlist is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Playlist not found",
+        )
+
+    return Response(
+        content=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": cache_control(immutable=False)},
+    )
+
+
+@router.get("/sessions/{session_id}/hls/{segment_name}")
+async def get_hls_segment(
+    session_id: str,
+    segment_name: str,
+    hls: HLSSegmentManager = Depends(get_hls_manager),
+    current_user: User = Depends(get_current_active_user),
+) -> Response:
+    """Get an HLS segment or LL-HLS partial segment."""
+    try:
+        session_uuid = uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid session ID format",
+        )
+
+    data = hls.get_segment(session_uuid, segment_name)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found",
+        )
+
+    # Segment names are never reused within a session
+    return Response(
+        content=data,
+        media_type="video/mp2t",
+        headers={"Cache-Control": cache_control(immutable=True)},
+    )
+
+
 # Recording Endpoints
 @router.post("/recordings", response_model=RecordingResponse)
 async def start_recording(
@@ -1,7 +1,8 @@
 """Telemetry query REST API endpoints.
 
 Provides endpoints for querying stored telemetry data with support for
-raw, hourly, and daily aggregation levels.
+raw, hourly, and daily aggregation levels, plus latest-value lookups
+served from the Redis telemetry shadow.
 """
 
 from datetime import datetime
@@ -9,11 +10,15 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_active_user, get_db
+from app.core.config import settings
+from app.core.deps import get_current_active_user, get_db, get_redis
+from app.models.device import IoTDevice
 from app.models.user import User
 from app.services.telemetry_query_service import TelemetryQueryService
+from app.services.telemetry_shadow_service import TelemetryShadowService
 
 router = APIRouter(tags=["Telemetry"])
 
@@ -54,6 +59,82 @@ class AvailableMetricsResponse(BaseModel):
     metrics: list[str]
 
 
+class LatestMetricValue(BaseModel):
+    """Latest value of a single metric from the telemetry shadow."""
+
+    value: float | int | str | bool | None
+    time: str
+    history: list[dict] | None = None
+
+
+class DeviceLatestTelemetryResponse(BaseModel):
+    """Latest value of every metric for one device."""
+
+    device_id: str
+    metrics: dict[str, LatestMetricValue]
+
+
+class BulkLatestTelemetryResponse(BaseModel):
+    """Latest metric values for a set of devices."""
+
+    count: int
+    devices: dict[str, dict[str, LatestMetricValue]]
+
+
+@router.get("/telemetry/latest", response_model=BulkLatestTelemetryResponse)
+async def get_latest_telemetry_bulk(
+    device_ids: list[UUID] | None = Query(default=None),
+    building_id: UUID | None = None,
+    floor_plan_id: UUID | None = None,
+    include_history: bool = False,
+    db: AsyncSession = Depends(get_db),
+    redis_client=Depends(get_redis),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get the latest value of every metric for many devices at once.
+
+    Devices are selected explicitly via device_ids, or by building_id /
+    floor_plan_id for floor-plan overlays. Values come from the telemetry
+    shadow, not the hypertable, so devices that have never reported are omitted.
+    """
+    if not device_ids and not building_id and not floor_plan_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="One of device_ids, building_id or floor_plan_id is required",
+        )
+
+    ids = [str(d) for d in device_ids or []]
+    if building_id or floor_plan_id:
+        query = select(IoTDevice.id).where(IoTDevice.deleted_at.is_(None))
+        if building_id:
+            query = query.where(IoTDevice.building_id == building_id)
+        if floor_plan_id:
+            query = query.where(IoTDevice.floor_plan_id == floor_plan_id)
+        result = await db.execute(query)
+        ids.extend(str(row[0]) for row in result.all())
+
+    service = TelemetryShadowService(
+        redis_client, history_size=settings.telemetry_shadow_history_size
+    )
+    shadows = await service.get_shadows(list(dict.fromkeys(ids)), include_history)
+    return BulkLatestTelemetryResponse(count=len(shadows), devices=shadows)
+
+
+@router.get("/{device_id}/telemetry/latest", response_model=DeviceLatestTelemetryResponse)
+async def get_latest_telemetry(
+    device_id: UUID,
+    include_history: bool = False,
+    redis_client=Depends(get_redis),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get the latest value of every metric for a device."""
+    service = TelemetryShadowService(
+        redis_client, history_size=settings.telemetry_shadow_history_size
+    )
+    metrics = await service.get_device_shadow(str(device_id), include_history)
+    return DeviceLatestTelemetryResponse(device_id=str(device_id), metrics=metrics)
+
+
 @router.get("/{device_id}/telemetry", response_model=TelemetryQueryResponse)
 async def query_telemetry(
     device_id: UUID,
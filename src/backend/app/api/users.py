@@ -476,8 +476,9 @@ async def update_user(
             "full_name": user.full_name,
             "role_name": user.role_name,
         }
+        role_changed = new_values["role_name"] != old_values["role_name"]
         await audit_service.log(
-            action=AuditAction.USER_UPDATED,
+            action=AuditAction.USER_ROLE_CHANGED if role_changed else AuditAction.USER_UPDATED,
             user=current_user,
             entity_type="user",
             entity_id=str(user.id),
@@ -546,6 +547,7 @@ async def deactivate_user(
             request=request,
             old_values={"is_active": True},
             new_values={"is_active": False},
+            sync=True,
         )
 
         return UserResponse.from_user(user)
@@ -599,6 +601,7 @@ async def activate_user(
             request=request,
             old_values={"is_active": False},
             new_values={"is_active": True},
+            sync=True,
         )
 
         return UserResponse.from_user(user)
@@ -772,7 +775,7 @@ async def change_user_role(
 
         # Log role change
         await audit_service.log(
-            action=AuditAction.USER_UPDATED,
+            action=AuditAction.USER_ROLE_CHANGED,
             user=current_user,
             entity_type="user",
             entity_id=str(user_id),
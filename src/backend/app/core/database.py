@@ -0,0 +1,102 @@
+"""Database engines, one connection pool per workload class.
+
+Request handlers, background ingestion (telemetry workers, alert
+evaluation, monitors, notifications) and analytics queries used to share
+one default-sized pool, so an ingestion burst or a long report could leave
+requests waiting for a connection. Each workload now gets its own engine
+with its own size, overflow and statement timeout, and analytics can be
+pointed at a read replica.
+
+Checkout wait time is recorded per pool, and the pools' in-use, overflow
+and idle counts are read at scrape time by DatabasePoolCollector.
+"""
+
+from __future__ import annotations
+
+import time
+
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import db_pool_checkout_seconds, db_pool_checkout_timeouts_total
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_checkout_timeouts_total.labels(pool=self.logging_name).inc()
+            raise
+        finally:
+            db_pool_checkout_seconds.labels(pool=self.logging_name).observe(time.perf_counter() - started)
+
+
+def create_database_engine(workload: str, url: str | None = None) -> AsyncEngine:
+    """Engine for one workload class, sized from the ``db_<workload>_*`` settings."""
+    if url is None:
+        url = settings.database_url
+        if workload == "analytics" and settings.database_read_replica_url:
+            url = settings.database_read_replica_url
+    backend = make_url(url)
+    if backend.get_backend_name() == "sqlite" and backend.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single shared connection
+        return create_async_engine(url, echo=settings.debug)
+    kwargs = {}
+    if backend.get_driver_name() == "asyncpg":
+        timeout_ms = getattr(settings, f"db_{workload}_statement_timeout_ms")
+        kwargs["connect_args"] = {"server_settings": {
+            "statement_timeout": str(timeout_ms),
+            "application_name": f"eriop-{workload}",
+        }}
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        poolclass=InstrumentedQueuePool,
+        pool_size=getattr(settings, f"db_{workload}_pool_size"),
+        max_overflow=getattr(settings, f"db_{workload}_max_overflow"),
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_logging_name=workload,
+        **kwargs,
+    )
+
+
+class DatabasePoolCollector:
+    """Reports the live state of each engine's pool when Prometheus scrapes."""
+
+    def __init__(self, engines: dict[str, AsyncEngine]):
+        self.engines = engines
+
+    def collect(self):
+        in_use = GaugeMetricFamily(
+            "eriop_db_pool_in_use", "Database connections checked out of the pool", labels=["pool"]
+        )
+        idle = GaugeMetricFamily(
+            "eriop_db_pool_idle", "Open database connections waiting in the pool", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "eriop_db_pool_overflow", "Connections open beyond pool_size", labels=["pool"]
+        )
+        size = GaugeMetricFamily("eriop_db_pool_size", "Configured pool_size", labels=["pool"])
+        for name, engine in self.engines.items():
+            pool = engine.sync_engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            in_use.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+            size.add_metric([name], pool.size())
+        yield from (in_use, idle, overflow, size)
+
+
+def register_pool_metrics(engines: dict[str, AsyncEngine]) -> None:
+    """Export pool state for ``engines`` (keyed by workload) to Prometheus."""
+    REGISTRY.register(DatabasePoolCollector(engines))
@@ -5,13 +5,18 @@ from typing import Annotated, AsyncGenerator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.database import create_database_engine, register_pool_metrics
+from app.core.profiling import instrument_engine
+from app.core.security import verify_token
+from app.models.role import Role
 from app.models.user import User, UserRole
 from app.services.auth_service import AuthService, AuthenticationError
+from app.services.principal_cache import Principal, principal_cache
 
 
 class Permission(str, Enum):
@@ -136,9 +141,25 @@ ROLE_PERMISSIONS: dict[UserRole, set[Permission]] = {
     },
 }
 
-# Database engine and session factory
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+# Database engines and session factories, one pool per workload class
+engine = create_database_engine("api")
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+ingestion_engine = create_database_engine("ingestion")
+ingestion_session_factory = async_sessionmaker(ingestion_engine, expire_on_commit=False)
+telemetry_engine = create_database_engine("telemetry")
+telemetry_session_factory = async_sessionmaker(telemetry_engine, expire_on_commit=False)
+analytics_engine = create_database_engine("analytics")
+analytics_session_factory = async_sessionmaker(analytics_engine, expire_on_commit=False)
+register_pool_metrics({
+    "api": engine,
+    "ingestion": ingestion_engine,
+    "telemetry": telemetry_engine,
+    "analytics": analytics_engine,
+})
+if settings.request_profiling_enabled:
+    # The pools request handlers use; statements outside a request are not counted
+    instrument_engine(engine)
+    instrument_engine(analytics_engine)
 
 # Redis client singleton
 _redis_client: aioredis.Redis | None = None
@@ -165,11 +186,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_analytics_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only session for analytics queries (read replica when configured)."""
+    async with analytics_session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
-    """Get current authenticated user from JWT token."""
+    """Get current authenticated user from JWT token.
+
+    Served from the principal cache when possible. The cached User is merged
+    into the request session without a query, so relationships that point at
+    the current user resolve from the identity map; it carries only the
+    cached fields. Use CurrentDbUser in endpoints that need the full row.
+    """
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -177,11 +213,37 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    token = credentials.credentials
+
+    if settings.principal_cache_enabled:
+        payload = verify_token(token, token_type="access")
+        if payload is None or payload.get("sub") is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        principal = await principal_cache.get(payload["sub"])
+        if principal is None:
+            # Read before the user is loaded, so a change committed meanwhile
+            # keeps what this request reads out of the cache
+            generation = await principal_cache.generation(payload["sub"])
+        else:
+            # Tokens issued before the "tv" claim existed stay valid until expiry
+            claimed_version = payload.get("tv")
+            if claimed_version is not None and claimed_version != principal.token_version:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            return await db.merge(principal.to_user(), load=False)
+
     auth_service = AuthService(db)
 
     try:
-        user = await auth_service.get_current_user(credentials.credentials)
-        return user
+        user = await auth_service.get_current_user(token)
     except AuthenticationError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -189,6 +251,19 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if settings.principal_cache_enabled:
+        claimed_version = payload.get("tv")
+        if claimed_version is not None and claimed_version != user.token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        role = await db.get(Role, user.role_id) if user.role_id else None
+        await principal_cache.put(Principal.from_user(user, role), generation)
+
+    return user
+
 
 async def get_current_active_user(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -202,6 +277,25 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_db_user(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """Get the current user attached to the request's database session.
+
+    For endpoints that need the full row (password, MFA): a cached
+    principal lacks secrets, so the row is reloaded here.
+    """
+    user = await db.get(User, current_user.id, populate_existing=True)
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
 def require_role(*roles: UserRole):
     """Dependency factory for role-based access control."""
 
@@ -257,6 +351,7 @@ def get_user_permissions(user: User) -> set[Permission]:
 # Type aliases for cleaner dependency injection
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_active_user)]
+CurrentDbUser = Annotated[User, Depends(get_current_db_user)]
 
 # Role-specific type aliases
 SystemAdmin = Annotated[User, Depends(require_role(UserRole.SYSTEM_ADMIN))]
@@ -0,0 +1,113 @@
+"""HTTP file serving helpers with conditional requests and caching.
+
+Stored files (floor plans, documents, photos, audio clips) are written once
+under unique names and never modified in place, so their URLs can be cached
+as immutable. Responses carry a strong ETag, honour If-None-Match with a 304,
+and support Range requests (handled by Starlette's FileResponse).
+
+When FILE_ACCEL_REDIRECT_PREFIX is configured, the body is not sent from
+Python at all: an X-Accel-Redirect header hands the transfer to nginx, which
+serves it with sendfile from an `internal` location.
+"""
+
+import asyncio
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from app.core.config import settings
+
+# One year, the conventional ceiling for immutable assets
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    """Build a strong ETag from file size and nanosecond mtime."""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_control(immutable: bool) -> str:
+    """Cache-Control for authenticated file downloads."""
+    if immutable:
+        return f"private, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return "private, no-cache"
+
+
+async def file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    filename: str | None = None,
+    immutable: bool = True,
+    as_attachment: bool = False,
+    vary: str | None = None,
+) -> Response:
+    """Serve a stored file with ETag, 304, Range and cache support.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        path: Path of the file on disk; must exist
+        media_type: Content-Type of the file
+        filename: Download filename for Content-Disposition
+        immutable: Whether the URL's content never changes (long-lived caching)
+        as_attachment: Force a download instead of inline display
+        vary: Request headers the choice of file depended on (e.g. "Accept")
+
+    Returns:
+        304, X-Accel-Redirect, or a FileResponse streaming the file
+    """
+    stat_result = await asyncio.to_thread(os.stat, path)
+    etag = make_etag(stat_result)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control(immutable),
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if vary:
+        headers["Vary"] = vary
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    disposition = "attachment" if as_attachment else "inline"
+    accel_uri = _accel_redirect_uri(path)
+    if accel_uri:
+        headers["X-Accel-Redirect"] = accel_uri
+        if filename:
+            headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(
+        path=path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        headers=headers,
+        content_disposition_type=disposition,
+    )
+
+
+def _accel_redirect_uri(path: Path) -> str | None:
+    """Map a file path to nginx's internal location, if offloading is enabled."""
+    prefix = settings.file_accel_redirect_prefix
+    if not prefix:
+        return None
+    try:
+        relative = path.resolve().relative_to(Path(settings.file_accel_redirect_root).resolve())
+    except ValueError:
+        # Outside the shared volume nginx can see; serve from Python instead
+        return None
+    return f"{prefix.rstrip('/')}/{relative.as_posix()}"
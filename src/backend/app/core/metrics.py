@@ -33,6 +33,20 @@ db_pool_available = Gauge(
     "Number of available database connections in the pool",
 )
 
+# Database pools (in-use, overflow and size are collected at scrape time)
+db_pool_checkout_seconds = Histogram(
+    "eriop_db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    ["pool"],  # 'api', 'ingestion', 'telemetry' or 'analytics'
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0],
+)
+
+db_pool_checkout_timeouts_total = Counter(
+    "eriop_db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after db_pool_timeout_seconds",
+    ["pool"],
+)
+
 # WebSocket connections by transport type
 websocket_connections_total = Counter(
     "eriop_websocket_connections_total",
@@ -53,6 +67,179 @@ redis_connected = Gauge(
     "Whether the application is connected to Redis (1=connected, 0=disconnected)",
 )
 
+# Password hashing pool
+password_hash_queue_depth = Gauge(
+    "eriop_password_hash_pending",
+    "Password hashes queued or running in the hashing pool",
+)
+
+password_hash_rejected_total = Counter(
+    "eriop_password_hash_rejected_total",
+    "Password hash requests rejected because the pool backlog was full",
+    ["operation"],  # 'verify' or 'hash'
+)
+
+password_hash_seconds = Histogram(
+    "eriop_password_hash_seconds",
+    "Time spent computing a password hash",
+    ["operation"],
+    buckets=[0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0],
+)
+
+# Batched audit writer
+audit_queue_depth = Gauge(
+    "eriop_audit_queue_depth",
+    "Audit entries waiting to be written by the batched audit writer",
+)
+
+audit_spooled_total = Counter(
+    "eriop_audit_spooled_total",
+    "Audit entries spooled to Redis because the queue was full or a flush failed",
+)
+
+# Alert deduplication
+alerts_deduplicated_total = Counter(
+    "eriop_alerts_deduplicated_total",
+    "Alerts folded into an earlier alert with the same dedup key",
+    ["path"],  # 'redis' (fast path) or 'database' (index fallback)
+)
+
+# Notification dispatch
+notification_jobs_total = Counter(
+    "eriop_notification_jobs_total",
+    "Notification delivery jobs handed to the dispatcher",
+    ["channel", "path"],  # 'queued' (Redis stream) or 'direct' (Redis unavailable)
+)
+
+notification_reclaimed_total = Counter(
+    "eriop_notification_reclaimed_total",
+    "Pending notification jobs claimed for redelivery",
+    ["channel"],
+)
+
+notification_dead_lettered_total = Counter(
+    "eriop_notification_dead_lettered_total",
+    "Notification jobs moved to the dead-letter stream",
+    ["channel"],
+)
+
+# Telemetry stream consumers
+telemetry_stream_length = Gauge(
+    "eriop_telemetry_stream_length",
+    "Entries held in the telemetry stream",
+)
+
+telemetry_pending_entries = Gauge(
+    "eriop_telemetry_pending_entries",
+    "Telemetry entries delivered to a consumer but not yet acknowledged",
+)
+
+telemetry_oldest_pending_seconds = Gauge(
+    "eriop_telemetry_oldest_pending_seconds",
+    "Age of the oldest unacknowledged telemetry entry",
+)
+
+telemetry_consumer_lag = Gauge(
+    "eriop_telemetry_consumer_lag",
+    "Telemetry entries not yet delivered to any consumer",
+)
+
+telemetry_workers = Gauge(
+    "eriop_telemetry_workers",
+    "Telemetry consumer tasks running in this process",
+)
+
+telemetry_reclaimed_total = Counter(
+    "eriop_telemetry_reclaimed_total",
+    "Pending telemetry entries claimed for retry",
+)
+
+telemetry_dead_lettered_total = Counter(
+    "eriop_telemetry_dead_lettered_total",
+    "Telemetry entries moved to the dead-letter stream",
+)
+
+telemetry_rows_written_total = Counter(
+    "eriop_telemetry_rows_written_total",
+    "Metric rows inserted into the device_telemetry hypertable",
+)
+
+# Leader-elected singleton services
+singleton_leader = Gauge(
+    "eriop_singleton_leader",
+    "Whether this process holds the lease for a singleton service (1=leader)",
+    ["service"],
+)
+
+# CAD synchronization
+cad_sync_cycle_seconds = Histogram(
+    "eriop_cad_sync_cycle_seconds",
+    "Duration of one CAD sync cycle (fetch, lookup and write)",
+    ["vendor"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+cad_sync_records_total = Counter(
+    "eriop_cad_sync_records_total",
+    "CAD records seen by the sync loop",
+    ["vendor", "entity", "outcome"],  # outcome: 'created', 'updated', 'unchanged' or 'skipped'
+)
+
+cad_sync_errors_total = Counter(
+    "eriop_cad_sync_errors_total",
+    "CAD sync cycles that failed and were rolled back",
+    ["vendor"],
+)
+
+# Alarm receiver (Contact ID / SIA over TCP)
+alarm_receiver_connections = Gauge(
+    "eriop_alarm_receiver_connections",
+    "Open alarm receiver TCP connections",
+)
+
+alarm_receiver_messages_total = Counter(
+    "eriop_alarm_receiver_messages_total",
+    "Alarm lines received",
+    ["outcome"],  # 'queued', 'rejected' (queue full, NAKed), 'rate_limited' (NAKed) or 'unparsed'
+)
+
+alarm_receiver_queue_depth = Gauge(
+    "eriop_alarm_receiver_queue_depth",
+    "Alarm events waiting to be written",
+)
+
+alarm_receiver_latency_seconds = Histogram(
+    "eriop_alarm_receiver_latency_seconds",
+    "Time from an alarm line arriving to its alert being committed",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+
+alarm_receiver_write_failures_total = Counter(
+    "eriop_alarm_receiver_write_failures_total",
+    "Alarm alerts that could not be written after retries",
+)
+
+# Request profiling (only recorded when request_profiling_enabled)
+request_db_queries = Histogram(
+    "eriop_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["handler"],
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 250],
+)
+
+request_db_seconds = Histogram(
+    "eriop_request_db_seconds",
+    "Time spent executing SQL per HTTP request",
+    ["handler"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+request_repeated_queries_total = Counter(
+    "eriop_request_repeated_queries_total",
+    "Requests that ran one statement n_plus_one_threshold times or more (likely N+1)",
+    ["handler"],
+)
+
 
 def setup_metrics(app) -> Instrumentator:
     """Set up Prometheus metrics instrumentation for FastAPI app."""
@@ -0,0 +1,222 @@
+"""Opt-in request profiling: SQL statistics, N+1 warnings and sampled profiles.
+
+With ``request_profiling_enabled``, RequestProfilingMiddleware gives each
+HTTP request a RequestQueryStats that the engine event hooks installed by
+instrument_engine() fill in: how many statements ran, how long they took
+and how often each statement text repeated. When the request ends the
+totals are observed per route in Prometheus, a ``Server-Timing`` header
+shows them in the browser's network panel, and a statement repeated
+``n_plus_one_threshold`` times or more is logged as a likely N+1.
+
+Requests can also be profiled with pyinstrument (an optional dependency):
+always when they carry ``request_profile_header`` set to
+``request_profile_secret`` (so clients cannot force profiling without the
+secret), and otherwise for a ``request_profile_sample_rate`` fraction of
+requests, keeping only those slower than ``request_profile_slow_ms``.
+Profiles are written as HTML to ``request_profile_dir``, which keeps the
+newest ``request_profile_max_files``. One request is profiled at a time per
+process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import request_db_queries, request_db_seconds, request_repeated_queries_total
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL executed on behalf of one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most frequent first."""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> RequestQueryStats | None:
+    """Statistics of the request being handled, if profiling is on."""
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    stats = _request_stats.get()
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute the engine's statements to the request they run for."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# pyinstrument is optional; False once it is known to be missing
+_profiler_class = None
+_profiling_active = False
+
+
+def _get_profiler_class():
+    """Lazy load pyinstrument to handle import errors gracefully."""
+    global _profiler_class
+    if _profiler_class is None:
+        try:
+            from pyinstrument import Profiler
+            _profiler_class = Profiler
+        except ImportError as e:
+            logger.error("pyinstrument not installed, request profiles disabled", error=str(e))
+            _profiler_class = False
+    return _profiler_class or None
+
+
+def _handler(scope: Scope) -> str | None:
+    """Route template of the request (``/api/v1/incidents/{incident_id}``)."""
+    return getattr(scope.get("route"), "path", None)
+
+
+class RequestProfilingMiddleware:
+    """Collects per-request SQL statistics and, when asked, a pyinstrument profile."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.profile_header = settings.request_profile_header.lower().encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _request_stats.set(stats)
+        forced = self._profile_requested(scope)
+        profiler = self._start_profiler(forced)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            handler = _handler(scope)
+            if handler is not None:
+                self._record(scope, handler, stats)
+            if profiler is not None:
+                await self._finish_profile(scope, handler or scope["path"], profiler, forced, elapsed)
+
+    def _profile_requested(self, scope: Scope) -> bool:
+        secret = settings.request_profile_secret
+        if not secret:
+            return False
+        for name, value in scope["headers"]:
+            if name == self.profile_header:
+                return hmac.compare_digest(value, secret.encode())
+        return False
+
+    def _start_profiler(self, forced: bool):
+        global _profiling_active
+        if _profiling_active:
+            return None
+        if not forced and random.random() >= settings.request_profile_sample_rate:
+            return None
+        profiler_class = _get_profiler_class()
+        if profiler_class is None:
+            return None
+        profiler = profiler_class(async_mode="enabled")
+        profiler.start()
+        _profiling_active = True
+        return profiler
+
+    @staticmethod
+    def _record(scope: Scope, handler: str, stats: RequestQueryStats) -> None:
+        request_db_queries.labels(handler=handler).observe(stats.count)
+        request_db_seconds.labels(handler=handler).observe(stats.seconds)
+
+        repeated = stats.repeated(settings.n_plus_one_threshold)
+        if repeated:
+            statement, times = repeated[0]
+            request_repeated_queries_total.labels(handler=handler).inc()
+            logger.warning(
+                "Statement repeated within one request, likely N+1",
+                method=scope["method"],
+                handler=handler,
+                times=times,
+                total_queries=stats.count,
+                statement=" ".join(statement.split())[:300],
+            )
+
+    @staticmethod
+    async def _finish_profile(scope: Scope, handler: str, profiler, forced: bool, elapsed: float) -> None:
+        global _profiling_active
+        try:
+            profiler.stop()
+        finally:
+            _profiling_active = False
+        if not forced and elapsed * 1000 < settings.request_profile_slow_ms:
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", handler).strip("_")
+        path = Path(settings.request_profile_dir) / f"{int(time.time() * 1000)}-{scope['method']}-{slug}.html"
+        try:
+            await asyncio.to_thread(_write_profile, path, profiler.output_html(), settings.request_profile_max_files)
+        except OSError as e:
+            logger.warning("Failed to write request profile", path=str(path), error=str(e))
+            return
+        logger.info(
+            "Request profile saved",
+            method=scope["method"],
+            handler=handler,
+            duration_ms=round(elapsed * 1000, 1),
+            sampled=not forced,
+            path=str(path),
+        )
+
+
+def _write_profile(path: Path, html: str, max_files: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(html)
+    # Names start with a millisecond timestamp, so they sort oldest first
+    profiles = sorted(path.parent.glob("*.html"))
+    for old in profiles[:max(len(profiles) - max_files, 0)]:
+        old.unlink(missing_ok=True)
@@ -1,19 +1,37 @@
 """Security utilities for password hashing and JWT token handling."""
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.metrics import (
+    password_hash_queue_depth,
+    password_hash_rejected_total,
+    password_hash_seconds,
+)
 
 # JWT configuration
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password hashes are already queued."""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
+    """Verify a password against its hash.
+
+    Blocks for the full bcrypt cost; async code should use
+    verify_password_async instead.
+    """
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
@@ -21,13 +39,93 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash."""
+    """Generate password hash at the configured bcrypt cost."""
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     ).decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a bcrypt hash uses a lower cost than currently configured."""
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) < settings.bcrypt_rounds
+
+
+# ==================== Hashing thread pool ====================
+
+# bcrypt releases the GIL while hashing, so a small thread pool gives real
+# parallelism without stalling the event loop. Admission control bounds the
+# backlog: during a login wave, requests beyond password_hash_max_pending
+# are rejected immediately instead of queueing for many seconds.
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.password_hash_workers),
+            thread_name_prefix="password-hash",
+        )
+    return _hash_executor
+
+
+def _timed(operation: str, func: Callable[..., T], *args: Any) -> T:
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        password_hash_seconds.labels(operation=operation).observe(time.perf_counter() - start)
+
+
+async def run_password_hash(operation: str, func: Callable[..., T], *args: Any) -> T:
+    """Run a password hashing function in the bounded hashing pool.
+
+    Args:
+        operation: Metric label, e.g. "verify" or "hash"
+        func: Blocking function to run
+        *args: Arguments for func
+
+    Raises:
+        PasswordHasherBusyError: If the pool's backlog is full
+    """
+    global _hash_pending
+    if _hash_pending >= settings.password_hash_max_pending:
+        password_hash_rejected_total.labels(operation=operation).inc()
+        raise PasswordHasherBusyError("Too many concurrent authentication requests")
+
+    _hash_pending += 1
+    password_hash_queue_depth.set(_hash_pending)
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), _timed, operation, func, *args)
+    finally:
+        _hash_pending -= 1
+        password_hash_queue_depth.set(_hash_pending)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool."""
+    return await run_password_hash("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool."""
+    return await run_password_hash("hash", get_password_hash, password)
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the hashing pool's threads."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
 def create_access_token(
     subject: str,
     expires_delta: timedelta | None = None,
@@ -56,6 +154,7 @@ def create_access_token(
 def create_refresh_token(
     subject: str,
     expires_delta: timedelta | None = None,
+    additional_claims: dict[str, Any] | None = None,
 ) -> str:
     """Create a JWT refresh token."""
     if expires_delta:
@@ -71,6 +170,9 @@ def create_refresh_token(
         "type": "refresh",
     }
 
+    if additional_claims:
+        to_encode.update(additional_claims)
+
     return jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
 
 
@@ -0,0 +1,78 @@
+"""OpenTelemetry tracing for the telemetry pipeline.
+
+Spans are created through the OpenTelemetry API, which records nothing
+until setup_tracing() installs an SDK tracer provider (``tracing_enabled``).
+The SDK and its OTLP/HTTP exporter are optional dependencies; spans are
+exported to ``tracing_otlp_endpoint``, e.g. a local OpenTelemetry
+Collector or Jaeger.
+
+A telemetry message is traced across the Redis stream: the MQTT handler
+writes its span context into the stream entry (``trace_context``), and the
+worker's flush span links to the context of every message in its batch, so
+MQTT receipt -> stream -> batch insert -> Socket.IO emit can be followed
+from one trace to the other.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import structlog
+from opentelemetry import propagate, trace
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+tracer = trace.get_tracer("eriop")
+
+_provider = None
+
+
+def setup_tracing() -> bool:
+    """Install the SDK tracer provider with an OTLP exporter; False if unavailable."""
+    global _provider
+    if _provider is not None:
+        return True
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.error("OpenTelemetry SDK not installed, tracing disabled", error=str(e))
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    logger.info("Tracing enabled", endpoint=settings.tracing_otlp_endpoint)
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Export spans still buffered in the batch processor."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def inject_context() -> dict[str, str]:
+    """W3C trace context of the current span, to carry through a queue (empty when not tracing)."""
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def links_from(carriers: Iterable[dict[str, str] | None]) -> list[trace.Link]:
+    """Span links to the producers of the given carried contexts."""
+    links = []
+    for carrier in carriers:
+        if not carrier:
+            continue
+        span_context = trace.get_current_span(propagate.extract(carrier)).get_span_context()
+        if span_context.is_valid:
+            links.append(trace.Link(span_context))
+    return links
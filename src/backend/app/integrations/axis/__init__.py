@@ -16,6 +16,7 @@ from app.integrations.axis.events import (
     AudioEventType,
     AxisAudioEvent,
     AxisEventSubscriber,
+    SubscriptionMode,
 )
 from app.integrations.axis.alert_generator import AudioAlertGenerator
 
@@ -26,5 +27,6 @@ __all__ = [
     "AudioEventType",
     "AxisAudioEvent",
     "AxisEventSubscriber",
+    "SubscriptionMode",
     "AudioAlertGenerator",
 ]
@@ -5,10 +5,13 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Callable, Awaitable, Any
 import asyncio
+import json
 import logging
+import random
+import aiohttp
 import defusedxml.ElementTree as ET
 
-from app.integrations.axis.client import AxisDeviceClient, AxisDeviceInfo
+from app.integrations.axis.client import AxisDeviceClient, AxisDeviceError
 
 
 logger = logging.getLogger(__name__)
@@ -43,24 +46,61 @@ class AxisAudioEvent:
 EventHandler = Callable[[AxisAudioEvent], Awaitable[None]]
 
 
+class SubscriptionMode(str, Enum):
+    """How AxisEventSubscriber receives events from a device."""
+    AUTO = "auto"  # Event stream, polling for devices without one
+    PUSH = "push"
+    POLL = "poll"
+
+
+class PushNotSupported(Exception):
+    """The device does not offer the VAPIX event stream."""
+
+
+# Handshake statuses meaning the event stream endpoint does not exist
+PUSH_UNSUPPORTED_STATUSES = {400, 404, 405, 501}
+# Idle polling slows down by this factor per empty response
+POLL_INTERVAL_GROWTH = 1.5
+AUDIO_TOPIC_FILTER = "tnsaxis:AudioAnalytics//."
+
+
 class AxisEventSubscriber:
     """
     Subscribes to real-time events from Axis devices.
 
-    Uses HTTP long-polling for event subscription since ONVIF
-    requires additional complexity.
+    Devices that offer the VAPIX event stream (``/vapix/ws-data-stream``)
+    push audio analytics events over one long-lived WebSocket each, so an
+    idle device costs nothing. Devices without it are polled through
+    ``eventlist.cgi``: the interval starts at ``poll_interval``, grows while
+    nothing happens up to ``max_poll_interval``, and snaps back when an
+    event arrives. Errors back off exponentially with full jitter, so a
+    fleet that loses the network does not reconnect in lockstep.
+
+    All devices share one pooled HTTP session owned by the subscriber.
     """
 
     def __init__(
         self,
         devices: list[AxisDeviceClient],
         poll_interval: float = 1.0,
+        mode: SubscriptionMode = SubscriptionMode.AUTO,
+        max_poll_interval: float = 10.0,
+        max_backoff: float = 60.0,
+        session: aiohttp.ClientSession | None = None,
+        max_connections: int = 200,
     ):
         self.devices = devices
         self.poll_interval = poll_interval
+        self.mode = SubscriptionMode(mode)
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self.max_backoff = max_backoff
+        self.max_connections = max_connections
+        self._session = session
+        self._owns_session = session is None
         self._handlers: list[EventHandler] = []
         self._running = False
         self._tasks: list[asyncio.Task] = []
+        self._device_modes: dict[str, SubscriptionMode] = {}
 
     def on_event(self, handler: EventHandler):
         """
@@ -77,12 +117,17 @@ class AxisEventSubscriber:
             return
 
         self._running = True
-        logger.info(f"Starting event subscription for {len(self.devices)} devices")
+        logger.info(f"Starting event subscription for {len(self.devices)} devices ({self.mode.value})")
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=2),
+            )
 
         for device in self.devices:
             task = asyncio.create_task(
-                self._poll_device(device),
-                name=f"axis_poll_{device.device_ip}"
+                self._watch_device(device),
+                name=f"axis_events_{device.device_ip}"
             )
             self._tasks.append(task)
 
@@ -98,50 +143,166 @@ class AxisEventSubscriber:
                 pass
 
         self._tasks.clear()
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
         logger.info("Event subscription stopped")
 
-    async def _poll_device(self, device: AxisDeviceClient):
-        """Poll a single device for events."""
+    def device_modes(self) -> dict[str, SubscriptionMode]:
+        """Mode each device ended up using, keyed by device IP."""
+        return dict(self._device_modes)
+
+    async def _watch_device(self, device: AxisDeviceClient):
+        """Receive events from one device, preferring the event stream."""
+        if self.mode != SubscriptionMode.POLL:
+            try:
+                self._device_modes[device.device_ip] = SubscriptionMode.PUSH
+                await self._stream_device(device)
+                return
+            except PushNotSupported:
+                if self.mode == SubscriptionMode.PUSH:
+                    logger.error(f"Device {device.device_ip} does not support the event stream")
+                    self._device_modes.pop(device.device_ip, None)
+                    return
+                logger.info(f"Device {device.device_ip} has no event stream; polling instead")
+
+        self._device_modes[device.device_ip] = SubscriptionMode.POLL
+        await self._poll_device(device)
+
+    # ==================== Event stream ====================
+
+    async def _stream_device(self, device: AxisDeviceClient):
+        """Hold the device's event stream open, reconnecting with backoff."""
+        url = f"{device.base_url.replace('http', 'ws', 1)}/vapix/ws-data-stream"
+        failures = 0
+        connected_once = False
         while self._running:
             try:
-                events = await self._fetch_events(device)
-                for event in events:
-                    await self._dispatch_event(event)
+                async with self._session.ws_connect(
+                    url,
+                    params={"sources": "events"},
+                    auth=self._auth(device),
+                    ssl=device.verify_ssl,
+                    heartbeat=30.0,
+                ) as ws:
+                    connected_once = True
+                    failures = 0
+                    await ws.send_json({
+                        "apiVersion": "1.0",
+                        "method": "events:configure",
+                        "params": {"eventFilterList": [{"topicFilter": AUDIO_TOPIC_FILTER}]},
+                    })
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            for event in self._parse_notification(message.data, device):
+                                await self._dispatch_event(event)
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except aiohttp.WSServerHandshakeError as e:
+                if not connected_once and e.status in PUSH_UNSUPPORTED_STATUSES:
+                    raise PushNotSupported(str(e)) from e
+                logger.warning(f"Event stream handshake failed for {device.device_ip}: {e}")
+            except Exception as e:
+                logger.warning(f"Event stream error for {device.device_ip}: {e}")
+
+            if self._running:
+                failures += 1
+                await asyncio.sleep(self._backoff_delay(failures))
+
+    def _parse_notification(self, data: str, device: AxisDeviceClient) -> list[AxisAudioEvent]:
+        """Parse an ``events:notify`` message from the event stream."""
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            logger.debug(f"Ignoring non-JSON event stream message from {device.device_ip}")
+            return []
+        if payload.get("method") != "events:notify":
+            return []
+
+        notification = payload.get("params", {}).get("notification", {})
+        event_data = notification.get("message", {}).get("data", {})
+        topic = notification.get("topic", "")
+        event_type_str = event_data.get("type") or topic.rsplit("/", 1)[-1]
+        if event_data.get("active") in ("0", 0, False, "false"):
+            # End of the detection; the start was already reported
+            return []
+
+        timestamp = notification.get("timestamp")
+        timestamp_str = (
+            datetime.fromtimestamp(timestamp / 1000, timezone.utc).isoformat()
+            if isinstance(timestamp, (int, float)) else str(timestamp or "")
+        )
+        event = self._build_event(
+            device, event_type_str, str(event_data.get("confidence", "0")), timestamp_str
+        )
+        return [event] if event else []
 
-                await asyncio.sleep(self.poll_interval)
+    # ==================== Polling ====================
 
+    async def _poll_device(self, device: AxisDeviceClient):
+        """Poll a single device for events at an adaptive interval."""
+        interval = self.poll_interval
+        failures = 0
+        while self._running:
+            try:
+                events = await self._fetch_events(device)
             except asyncio.CancelledError:
                 break
             except Exception as e:
+                failures += 1
                 logger.error(f"Error polling device {device.device_ip}: {e}")
-                await asyncio.sleep(5)  # Wait before retry
+                await asyncio.sleep(self._backoff_delay(failures))
+                continue
+
+            failures = 0
+            for event in events:
+                await self._dispatch_event(event)
+
+            if events:
+                interval = self.poll_interval
+            else:
+                interval = min(interval * POLL_INTERVAL_GROWTH, self.max_poll_interval)
+            # Spread requests so devices started together do not stay in phase
+            await asyncio.sleep(interval * random.uniform(0.8, 1.2))
 
     async def _fetch_events(self, device: AxisDeviceClient) -> list[AxisAudioEvent]:
         """
         Fetch audio analytics events from device.
 
         Uses Axis event API to get recent audio events.
-        """
-        if not device._session:
-            return []
 
+        Raises:
+            AxisDeviceError: If the device answers with an error status
+        """
         url = f"{device.base_url}/axis-cgi/eventlist.cgi"
         params = {
             "format": "xml",
             "event": "AudioAnalytics",
         }
 
-        try:
-            async with device._session.get(url, params=params) as response:
-                if response.status != 200:
-                    return []
+        async with self._session.get(
+            url, params=params, auth=self._auth(device), ssl=device.verify_ssl
+        ) as response:
+            if response.status != 200:
+                raise AxisDeviceError(
+                    f"Event list returned HTTP {response.status}", source=device.name
+                )
 
-                xml_text = await response.text()
-                return self._parse_events(xml_text, device)
+            xml_text = await response.text()
+            return self._parse_events(xml_text, device)
 
-        except Exception as e:
-            logger.debug(f"Error fetching events: {e}")
-            return []
+    # ==================== Helpers ====================
+
+    @staticmethod
+    def _auth(device: AxisDeviceClient) -> aiohttp.BasicAuth:
+        return aiohttp.BasicAuth(device.username, device.password)
+
+    def _backoff_delay(self, failures: int) -> float:
+        """Exponential backoff with full jitter."""
+        ceiling = min(self.max_backoff, self.poll_interval * (2 ** min(failures, 16)))
+        return random.uniform(0, ceiling)
 
     def _parse_events(
         self,
@@ -155,49 +316,61 @@ class AxisEventSubscriber:
             root = ET.fromstring(xml_text)
 
             for event_elem in root.findall(".//event"):
-                event_type_str = event_elem.findtext("type", "")
-                confidence_str = event_elem.findtext("confidence", "0")
-                timestamp_str = event_elem.findtext("timestamp", "")
-
-                # Map event type
-                event_type = self._map_event_type(event_type_str)
-                if event_type == AudioEventType.UNKNOWN:
-                    continue
-
-                # Parse confidence
-                try:
-                    confidence = float(confidence_str) / 100.0
-                except ValueError:
-                    confidence = 0.5
-
-                # Parse timestamp
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                except ValueError:
-                    timestamp = datetime.now(timezone.utc)
-
-                device_info = device.device_info
-                event = AxisAudioEvent(
-                    device_id=device_info.device_id if device_info else device.device_ip,
-                    device_name=device_info.name if device_info else device.device_ip,
-                    event_type=event_type,
-                    confidence=confidence,
-                    timestamp=timestamp,
-                    location=device.device_location,
-                    location_name=device.location_name,
-                    raw_event={
-                        "type": event_type_str,
-                        "confidence": confidence_str,
-                        "timestamp": timestamp_str,
-                    },
+                event = self._build_event(
+                    device,
+                    event_elem.findtext("type", ""),
+                    event_elem.findtext("confidence", "0"),
+                    event_elem.findtext("timestamp", ""),
                 )
-                events.append(event)
+                if event:
+                    events.append(event)
 
         except ET.ParseError as e:
             logger.debug(f"Failed to parse event XML: {e}")
 
         return events
 
+    def _build_event(
+        self,
+        device: AxisDeviceClient,
+        event_type_str: str,
+        confidence_str: str,
+        timestamp_str: str,
+    ) -> AxisAudioEvent | None:
+        """Build an event from raw fields, or None for unknown types."""
+        # Map event type
+        event_type = self._map_event_type(event_type_str)
+        if event_type == AudioEventType.UNKNOWN:
+            return None
+
+        # Parse confidence
+        try:
+            confidence = float(confidence_str) / 100.0
+        except ValueError:
+            confidence = 0.5
+
+        # Parse timestamp
+        try:
+            timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        except ValueError:
+            timestamp = datetime.now(timezone.utc)
+
+        device_info = device.device_info
+        return AxisAudioEvent(
+            device_id=device_info.device_id if device_info else device.device_ip,
+            device_name=device_info.name if device_info else device.device_ip,
+            event_type=event_type,
+            confidence=confidence,
+            timestamp=timestamp,
+            location=device.device_location,
+            location_name=device.location_name,
+            raw_event={
+                "type": event_type_str,
+                "confidence": confidence_str,
+                "timestamp": timestamp_str,
+            },
+        )
+
     def _map_event_type(self, event_type_str: str) -> AudioEventType:
         """Map Axis event type string to AudioEventType."""
         type_map = {
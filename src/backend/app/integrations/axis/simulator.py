@@ -0,0 +1,122 @@
+"""Local stand-in for an Axis device's event endpoints.
+
+Serves ``/axis-cgi/eventlist.cgi`` and, optionally, the VAPIX event stream
+at ``/vapix/ws-data-stream`` on a loopback port, so AxisEventSubscriber can
+be exercised (in tests or development) without real hardware.
+"""
+
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+import asyncio
+
+from aiohttp import web
+
+from app.integrations.axis.client import AxisDeviceClient
+
+
+class AxisDeviceSimulator:
+    """
+    Simulated Axis device.
+
+    Events passed to ``emit`` are pushed to connected event streams, or
+    queued for the next ``eventlist.cgi`` poll when no stream is open.
+    """
+
+    def __init__(self, push_supported: bool = True, host: str = "127.0.0.1"):
+        self.push_supported = push_supported
+        self.host = host
+        self.poll_requests = 0
+        self.stream_connections = 0
+        self._queued: list[dict[str, str]] = []
+        self._streams: set[web.WebSocketResponse] = set()
+        self._runner: web.AppRunner | None = None
+        self._port: int | None = None
+
+    @property
+    def device_ip(self) -> str:
+        """Address to give AxisDeviceClient (host:port)."""
+        return f"{self.host}:{self._port}"
+
+    def client(self, **kwargs) -> AxisDeviceClient:
+        """An unconnected client pointing at this simulator."""
+        return AxisDeviceClient(self.device_ip, username="root", password="pass", **kwargs)
+
+    async def start(self) -> None:
+        """Listen on a free loopback port."""
+        app = web.Application()
+        app.router.add_get("/axis-cgi/eventlist.cgi", self._eventlist)
+        if self.push_supported:
+            app.router.add_get("/vapix/ws-data-stream", self._event_stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Close event streams and stop listening."""
+        for ws in list(self._streams):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def emit(self, event_type: str, confidence: int = 90) -> None:
+        """Raise an audio analytics event (confidence in percent)."""
+        now = datetime.now(timezone.utc)
+        if not self._streams:
+            self._queued.append({
+                "type": event_type,
+                "confidence": str(confidence),
+                "timestamp": now.isoformat(),
+            })
+            return
+        message = {
+            "apiVersion": "1.0",
+            "method": "events:notify",
+            "params": {
+                "notification": {
+                    "topic": f"tnsaxis:AudioAnalytics/{event_type}",
+                    "timestamp": int(now.timestamp() * 1000),
+                    "message": {
+                        "source": {},
+                        "key": {},
+                        "data": {"type": event_type, "confidence": str(confidence), "active": "1"},
+                    },
+                },
+            },
+        }
+        for ws in list(self._streams):
+            await ws.send_json(message)
+
+    async def wait_for_stream(self, timeout: float = 5.0) -> None:
+        """Wait until a subscriber holds the event stream open."""
+        async with asyncio.timeout(timeout):
+            while not self._streams:
+                await asyncio.sleep(0.01)
+
+    async def _eventlist(self, request: web.Request) -> web.Response:
+        self.poll_requests += 1
+        events, self._queued = self._queued, []
+        body = "".join(
+            f"<event><type>{escape(e['type'])}</type>"
+            f"<confidence>{e['confidence']}</confidence>"
+            f"<timestamp>{e['timestamp']}</timestamp></event>"
+            for e in events
+        )
+        return web.Response(text=f"<events>{body}</events>", content_type="text/xml")
+
+    async def _event_stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stream_connections += 1
+        # Events are only delivered after the subscriber's events:configure
+        message = await ws.receive_json()
+        if message.get("method") == "events:configure":
+            self._streams.add(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self._streams.discard(ws)
+        return ws
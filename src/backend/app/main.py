@@ -11,7 +11,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import router as api_router
 from app.core.config import settings
-from app.core.deps import async_session_factory, get_db, engine
+from app.core.profiling import RequestProfilingMiddleware
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.security import PasswordHasherBusyError, shutdown_password_hasher
+from app.core.deps import (
+    async_session_factory,
+    get_db,
+    engine,
+    ingestion_session_factory,
+    telemetry_session_factory,
+)
 from app.services.socketio import sio, create_combined_app
 from app.services.fundamentum_mqtt import init_mqtt_client, shutdown_mqtt_client
 from app.services.mqtt_service import VigiliaMQTTService
@@ -20,7 +29,17 @@ from app.services.sound_alert_pipeline import SoundAlertPipeline
 from app.services.notification_service import NotificationService
 from app.services.health_service import health_service
 from app.services.telemetry_worker_service import TelemetryWorkerService
+from app.services.telemetry_shadow_service import TelemetryShadowService
 from app.services.alert_rule_evaluation_service import AlertRuleEvaluationService
+from app.services.bim_import_service import shutdown_bim_import_queue
+from app.services.principal_cache import principal_cache
+from app.services.audit_writer import start_audit_writer, shutdown_audit_writer
+from app.services.notification_dispatcher import (
+    start_notification_dispatcher,
+    shutdown_notification_dispatcher,
+)
+from app.services.delivery.webpush_sender import shutdown_webpush_sender
+from app.services.leader_election import LeaderElectedService
 from app.core.deps import get_redis
 
 logger = structlog.get_logger()
@@ -32,6 +51,8 @@ _sound_pipeline: SoundAlertPipeline | None = None
 _metrics_task: asyncio.Task | None = None
 _telemetry_worker: TelemetryWorkerService | None = None
 _alert_evaluator: AlertRuleEvaluationService | None = None
+# Jobs that run in one worker per deployment (see app.services.leader_election)
+_singletons: list[LeaderElectedService] = []
 
 
 async def _update_health_metrics() -> None:
@@ -45,6 +66,34 @@ async def _update_health_metrics() -> None:
         await asyncio.sleep(15)  # Update every 15 seconds
 
 
+async def _start_singleton(name: str, on_elected, on_demoted) -> None:
+    """Run a job in whichever worker holds the Redis lease for ``name``."""
+    try:
+        redis_client = await get_redis()
+    except Exception as e:
+        logger.warning("Redis unavailable for leader election", service=name, error=str(e))
+        redis_client = None
+    singleton = LeaderElectedService(name, on_elected, on_demoted, redis_client)
+    _singletons.append(singleton)
+    await singleton.start()
+
+
+async def _start_fundamentum_mqtt() -> None:
+    mqtt_client = init_mqtt_client(
+        db_session_factory=ingestion_session_factory,
+        event_loop=asyncio.get_running_loop(),
+    )
+    if mqtt_client:
+        logger.info(
+            "Fundamentum MQTT client initialized",
+            broker=settings.mqtt_broker_host,
+        )
+
+
+async def _stop_fundamentum_mqtt() -> None:
+    shutdown_mqtt_client()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan handler for startup/shutdown events."""
@@ -53,26 +102,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     logger.info("Starting ERIOP application", environment=settings.environment)
 
-    # Start health metrics background task
+    if settings.tracing_enabled:
+        setup_tracing()
+
+    # Start health metrics background task (in every worker: each one
+    # serves its own /metrics registry)
     if settings.metrics_enabled:
         _metrics_task = asyncio.create_task(_update_health_metrics())
         logger.info("Health metrics background task started")
 
-    # Initialize MQTT client for Fundamentum IoT integration
+    # Write routine audit entries in batches off the request path
+    if settings.audit_async_enabled:
+        await start_audit_writer()
+
+    # Evict cached principals when other workers change users or roles
+    if settings.principal_cache_enabled:
+        await principal_cache.start()
+
+    # Initialize MQTT client for Fundamentum IoT integration (one subscriber
+    # per deployment, so each alert is created once)
     if settings.mqtt_broker_host:
-        try:
-            loop = asyncio.get_event_loop()
-            mqtt_client = init_mqtt_client(
-                db_session_factory=async_session_factory,
-                event_loop=loop,
-            )
-            if mqtt_client:
-                logger.info(
-                    "Fundamentum MQTT client initialized",
-                    broker=settings.mqtt_broker_host,
-                )
-        except Exception as e:
-            logger.warning("Failed to initialize MQTT client", error=str(e))
+        await _start_singleton("fundamentum-mqtt", _start_fundamentum_mqtt, _stop_fundamentum_mqtt)
 
     # Initialize Vigilia MQTT service (async, separate from Fundamentum)
     if settings.mqtt_enabled:
@@ -86,6 +136,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 client_id=settings.mqtt_vigilia_client_id,
                 reconnect_interval=settings.mqtt_vigilia_reconnect_interval,
                 max_reconnect_interval=settings.mqtt_vigilia_max_reconnect_interval,
+                shared_group=settings.mqtt_vigilia_shared_group or None,
             )
             await _mqtt_service.start()
             logger.info("Vigilia MQTT service started", broker=settings.mqtt_vigilia_broker_host)
@@ -101,45 +152,70 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             if settings.alert_evaluation_enabled:
                 _alert_evaluator = AlertRuleEvaluationService(
                     redis_client=redis_client,
-                    session_factory=async_session_factory,
+                    session_factory=ingestion_session_factory,
                 )
                 logger.info("Alert rule evaluation service initialized")
 
+            shadow_service = None
+            if settings.telemetry_shadow_enabled:
+                shadow_service = TelemetryShadowService(
+                    redis_client=redis_client,
+                    history_size=settings.telemetry_shadow_history_size,
+                )
+
+            # More workers than telemetry connections would only wait on checkout
+            pool_capacity = settings.db_telemetry_pool_size + settings.db_telemetry_max_overflow
+            max_workers = min(settings.telemetry_worker_max_workers, pool_capacity)
+            if max_workers < settings.telemetry_worker_max_workers:
+                logger.warning(
+                    "telemetry_worker_max_workers exceeds the telemetry pool; capped",
+                    configured=settings.telemetry_worker_max_workers,
+                    pool_capacity=pool_capacity,
+                )
+
             _telemetry_worker = TelemetryWorkerService(
                 redis_client=redis_client,
-                session_factory=async_session_factory,
+                session_factory=telemetry_session_factory,
                 batch_size=settings.telemetry_worker_batch_size,
                 batch_timeout=settings.telemetry_worker_batch_timeout,
                 num_workers=settings.telemetry_worker_num_workers,
                 alert_evaluator=_alert_evaluator,
+                shadow_service=shadow_service,
+                max_workers=max_workers,
+                scale_up_lag=settings.telemetry_worker_scale_up_lag,
+                monitor_interval=settings.telemetry_worker_monitor_interval,
+                claim_idle_ms=settings.telemetry_worker_claim_idle_ms,
+                max_deliveries=settings.telemetry_worker_max_deliveries,
             )
             await _telemetry_worker.start()
             logger.info(
                 "Telemetry worker service started",
                 num_workers=settings.telemetry_worker_num_workers,
+                max_workers=max_workers,
                 batch_size=settings.telemetry_worker_batch_size,
                 alert_evaluation=settings.alert_evaluation_enabled,
+                shadow=settings.telemetry_shadow_enabled,
             )
         except Exception as e:
             logger.warning("Failed to start telemetry worker service", error=str(e))
 
-    # Initialize Device Monitor Service (background polling)
+    # Initialize Device Monitor Service (background polling, one worker per deployment)
     try:
         _device_monitor = DeviceMonitorService(
-            session_factory=async_session_factory,
+            session_factory=ingestion_session_factory,
             poll_interval=30.0,
             offline_threshold_seconds=120,
         )
-        await _device_monitor.start()
-        logger.info("Device monitor service started")
+        await _start_singleton("device-monitor", _device_monitor.start, _device_monitor.stop)
     except Exception as e:
         logger.warning("Failed to start device monitor service", error=str(e))
 
     # Initialize Notification Service and Sound Alert Pipeline
     try:
-        notification_svc = NotificationService(session_factory=async_session_factory)
+        notification_svc = NotificationService(session_factory=ingestion_session_factory)
+        await start_notification_dispatcher(notification_svc)
         _sound_pipeline = SoundAlertPipeline(
-            session_factory=async_session_factory,
+            session_factory=ingestion_session_factory,
             auto_create_incidents=True,
             notification_service=notification_svc,
         )
@@ -169,11 +245,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await _mqtt_service.stop()
         logger.info("Vigilia MQTT service stopped")
 
-    if _device_monitor:
-        await _device_monitor.stop()
-        logger.info("Device monitor service stopped")
+    # Stops the device monitor and Fundamentum client where this worker leads
+    for singleton in _singletons:
+        await singleton.stop()
+    _singletons.clear()
 
-    shutdown_mqtt_client()
+    if _sound_pipeline:
+        await _sound_pipeline.stop()
+    await shutdown_notification_dispatcher()
+    await shutdown_webpush_sender()
+
+    await shutdown_bim_import_queue()
+    await principal_cache.stop()
+    await shutdown_audit_writer()
+    shutdown_password_hasher()
+    shutdown_tracing()
 
 
 fastapi_app = FastAPI(
@@ -194,6 +280,10 @@ fastapi_app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in SQL statistics, N+1 warnings and request profiles
+if settings.request_profiling_enabled:
+    fastapi_app.add_middleware(RequestProfilingMiddleware)
+
 # Include API routes
 fastapi_app.include_router(api_router, prefix="/api/v1")
 
@@ -223,6 +313,17 @@ async def validation_exception_handler(request, exc):
     )
 
 
+@fastapi_app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request, exc):
+    # Shed load during login waves instead of queueing bcrypt work for seconds
+    logger.warning("Password hashing pool saturated", path=str(request.url.path))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Set up Prometheus metrics instrumentation
 _instrumentator = None
 if settings.metrics_enabled:
@@ -4,7 +4,14 @@ from app.models.base import Base, TimestampMixin
 from app.models.role import Role, DEFAULT_ROLES
 from app.models.user import User, UserRole
 from app.models.agency import Agency
-from app.models.incident import Incident, IncidentStatus, IncidentPriority, IncidentCategory
+from app.models.incident import (
+    Incident,
+    IncidentStatus,
+    IncidentPriority,
+    IncidentCategory,
+    IncidentNumberSequence,
+    IncidentTimelineEvent,
+)
 from app.models.resource import Resource, ResourceType, ResourceStatus, Personnel, Vehicle, Equipment
 from app.models.alert import Alert, AlertSeverity, AlertStatus, AlertSource
 from app.models.audit import AuditLog, AuditAction
@@ -46,6 +53,8 @@ __all__ = [
     "IncidentStatus",
     "IncidentPriority",
     "IncidentCategory",
+    "IncidentNumberSequence",
+    "IncidentTimelineEvent",
     "Resource",
     "ResourceType",
     "ResourceStatus",
@@ -5,7 +5,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Text, Float, Integer, ForeignKey, Enum as SQLEnum, DateTime
+from sqlalchemy import String, Text, Float, Integer, ForeignKey, Enum as SQLEnum, DateTime, Index, text
 from sqlalchemy import JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -55,6 +55,16 @@ class Alert(Base, TimestampMixin):
     """Alert model for incoming alerts from various sources."""
 
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Dedup fallback only looks at open alerts within a short window
+        Index(
+            "ix_alerts_open_dedup",
+            "dedup_key",
+            "received_at",
+            postgresql_where=text("status IN ('pending', 'acknowledged')"),
+            sqlite_where=text("status IN ('pending', 'acknowledged')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -75,6 +85,9 @@ class Alert(Base, TimestampMixin):
     )
     source_device_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # Source, type and geohash cell or device (see app/services/alert_dedup.py)
+    dedup_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
     # Classification
     severity: Mapped[AlertSeverity] = mapped_column(
         SQLEnum(AlertSeverity, values_callable=lambda x: [e.value for e in x]),
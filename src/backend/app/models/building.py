@@ -286,6 +286,8 @@ class FloorPlan(Base, TimestampMixin):
     # Plan image/file
     plan_file_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     plan_thumbnail_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    plan_image_variants: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Rendition URLs by variant then format: {"preview": {"jpg": ..., "webp": ...}}
     plan_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     # For storing small plan images directly
     file_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
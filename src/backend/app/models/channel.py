@@ -135,6 +135,15 @@ class ChannelMember(Base, TimestampMixin):
     last_read_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     unread_count: Mapped[int] = mapped_column(default=0, nullable=False)
 
+    # Read receipt high-water mark: every message created at or before
+    # last_read_message_at has been read by this member
+    last_read_message_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("messages.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    last_read_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Joined timestamp
     joined_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -1,11 +1,11 @@
 """Incident model for emergency event management."""
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Text, Float, ForeignKey, Enum as SQLEnum, DateTime
+from sqlalchemy import String, Text, Float, Integer, ForeignKey, Enum as SQLEnum, Date, DateTime, Index, func
 from sqlalchemy import JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -64,6 +64,10 @@ class Incident(Base, TimestampMixin):
     """Incident model for emergency event management."""
 
     __tablename__ = "incidents"
+    __table_args__ = (
+        # CAD sync upserts incidents by the CAD system's own ID
+        Index("ix_incidents_external", "external_source", "external_id", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -164,8 +168,89 @@ class Incident(Base, TimestampMixin):
     )
     building: Mapped["Building | None"] = relationship("Building", backref="incidents")
 
-    # Audit trail stored as JSON
-    timeline_events: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    # Origin in an external system (e.g. a CAD vendor and its incident ID)
+    external_source: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    external_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
     def __repr__(self) -> str:
         return f"<Incident(id={self.id}, number={self.incident_number}, status={self.status})>"
+
+
+class IncidentTimelineEvent(Base):
+    """One entry of an incident's append-only timeline.
+
+    Events used to live in a JSON array on the incident that was rewritten
+    on every change; each event is now its own row, so recording one is a
+    single INSERT and reads can be paged.
+    """
+
+    __tablename__ = "incident_timeline_events"
+    __table_args__ = (
+        Index("ix_incident_timeline_events_incident_occurred", "incident_id", "occurred_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    incident_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("incidents.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Actor (name kept so the entry survives user renames and deletions)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    user_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    event_metadata: Mapped[dict | None] = mapped_column("metadata", JSON, nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def to_dict(self) -> dict:
+        """Convert to the timeline entry format returned by the API."""
+        event = {
+            "id": str(self.id),
+            "type": self.event_type,
+            "description": self.description,
+            "timestamp": self.occurred_at.isoformat() if self.occurred_at else None,
+        }
+        if self.user_id:
+            event["user_id"] = str(self.user_id)
+            event["user_name"] = self.user_name
+        if self.event_metadata:
+            event["metadata"] = self.event_metadata
+        return event
+
+    def __repr__(self) -> str:
+        return f"<IncidentTimelineEvent(incident_id={self.incident_id}, type={self.event_type})>"
+
+
+class IncidentNumberSequence(Base):
+    """Last incident number issued per prefix and UTC day.
+
+    Incrementing this row (INSERT ... ON CONFLICT DO UPDATE ... RETURNING)
+    allocates the next number in O(1). The row stays locked until the
+    creating transaction commits, so concurrent creations are serialized per
+    prefix and a rolled-back creation releases its number.
+    """
+
+    __tablename__ = "incident_number_sequences"
+
+    # Agency code, or "INC" for the shared API/alert numbering
+    prefix: Mapped[str] = mapped_column(String(20), primary_key=True)
+    sequence_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<IncidentNumberSequence(prefix={self.prefix}, date={self.sequence_date}, last={self.last_value})>"
@@ -101,7 +101,8 @@ class Message(Base, TimestampMixin, SoftDeleteMixin):
     is_edited: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     edited_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    # Read receipts (stored as JSON array of user IDs)
+    # Legacy read receipts (JSON array of user IDs), no longer written;
+    # receipts are derived from ChannelMember.last_read_message_at
     read_by: Mapped[Optional[list]] = mapped_column(JSON, default=list, nullable=True)
 
     # Extra data (for extensibility)
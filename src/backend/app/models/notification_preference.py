@@ -4,8 +4,8 @@ import uuid
 from datetime import time
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Boolean, Integer, ForeignKey, Time, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Boolean, Integer, ForeignKey, Time, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -18,6 +18,15 @@ class NotificationPreference(Base, TimestampMixin):
     """Notification preferences per user for alert delivery channels."""
 
     __tablename__ = "notification_preferences"
+    __table_args__ = (
+        # Containment lookups (building_ids @> '["<id>"]') during alert fan-out
+        Index(
+            "ix_notification_preferences_building_ids",
+            "building_ids",
+            postgresql_using="gin",
+            postgresql_ops={"building_ids": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -42,8 +51,10 @@ class NotificationPreference(Base, TimestampMixin):
     push_enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
     # Building scope: which buildings to receive alerts for
-    # Empty list means all buildings
-    building_ids: Mapped[list | None] = mapped_column(JSON, default=list)
+    # Empty list means all buildings (JSONB on PostgreSQL, JSON on SQLite)
+    building_ids: Mapped[list | None] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), default=list
+    )
 
     # Severity filter: 1=critical only, 2=critical+high, 3=+medium, 4=+low, 5=all
     min_severity: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
@@ -23,6 +23,8 @@ class BuildingPhoto(Base):
     description = Column(Text, nullable=True)
     file_url = Column(String(500), nullable=False)
     thumbnail_url = Column(String(500), nullable=True)
+    # Rendition URLs by variant then format: {"preview": {"jpg": ..., "webp": ...}}
+    image_variants = Column(JSON, nullable=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     taken_at = Column(DateTime, nullable=True)
@@ -45,6 +47,7 @@ class BuildingPhoto(Base):
             "description": self.description,
             "file_url": self.file_url,
             "thumbnail_url": self.thumbnail_url,
+            "image_variants": self.image_variants,
             "latitude": self.latitude,
             "longitude": self.longitude,
             "taken_at": self.taken_at.isoformat() if self.taken_at else None,
@@ -39,6 +39,9 @@ class User(Base, TimestampMixin, SoftDeleteMixin):
     )
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Carried as the "tv" token claim; bumped on password change or reset to
+    # revoke issued tokens, but not when login rehashes at a higher cost
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     # Profile information
     full_name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -31,6 +31,7 @@ from app.services.bim_parser import (
     BIMFloorInfo,
     BIMKeyLocation,
 )
+from app.services.bim_import_service import BIMImportQueue, BIMImportStatus, get_bim_import_queue
 from app.services.building_analytics_service import BuildingAnalyticsService, BuildingAnalyticsError
 from app.services.channel_service import ChannelService
 from app.services.message_service import MessageService
@@ -75,6 +76,9 @@ __all__ = [
     "BIMData",
     "BIMFloorInfo",
     "BIMKeyLocation",
+    "BIMImportQueue",
+    "BIMImportStatus",
+    "get_bim_import_queue",
     "BuildingAnalyticsService",
     "BuildingAnalyticsError",
     "ChannelService",
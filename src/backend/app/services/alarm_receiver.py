@@ -7,19 +7,48 @@ Supported protocols:
 - SIA DC-03-1990.01 (Ademco Contact ID)
 - SIA DC-04-1999 (SIA Format)
 - SIA DC-07-2001.04 (IP Protocol)
+
+The TCP receiver acknowledges each line as soon as it is parsed and
+queued, so a central station replaying a backlog is not held to one
+database commit per signal. Queued events are written by
+AlarmEventWriter with one bulk INSERT per batch. When the queue is full,
+or the account is over its event rate, the line is NAKed and the sender
+retries it later; no signal is dropped after being acknowledged.
 """
 
 import asyncio
+import time
 import uuid
 import re
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Callable, Awaitable
 
-from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import (
+    alarm_receiver_connections,
+    alarm_receiver_latency_seconds,
+    alarm_receiver_messages_total,
+    alarm_receiver_queue_depth,
+    alarm_receiver_write_failures_total,
+)
+from app.models.alert import Alert, AlertSeverity, AlertSource, AlertStatus
+
+logger = structlog.get_logger()
 
-from app.models.alert import Alert, AlertSeverity, AlertStatus
+ACK = b"\x06"
+NAK = b"\x15"
+
+# Bulk writes are retried with capped exponential backoff until they succeed.
+# Only while stopping is a batch given up, after this many attempts.
+WRITE_ATTEMPTS = 3
+WRITE_RETRY_DELAY_SECONDS = 0.5
+WRITE_RETRY_MAX_DELAY_SECONDS = 5.0
 
 
 class AlarmProtocol(str, Enum):
@@ -326,8 +355,13 @@ class SIAParser:
 class AlarmReceiverService:
     """Service for receiving and processing alarms."""
 
-    def __init__(self, db: AsyncSession):
-        """Initialize alarm receiver service."""
+    def __init__(self, db: AsyncSession | None = None):
+        """Initialize alarm receiver service.
+
+        Args:
+            db: Session for alerts created inline by process_alarm
+                (not needed when events go through an AlarmEventWriter)
+        """
         self.db = db
         self.contact_id_parser = ContactIDParser()
         self.sia_parser = SIAParser()
@@ -345,6 +379,21 @@ class AlarmReceiverService:
         """Register an event handler."""
         self._event_handlers.append(handler)
 
+    def get_account(self, account_code: str) -> AlarmAccount | None:
+        """Get a registered alarm account."""
+        return self._accounts.get(account_code)
+
+    async def notify_handlers(self, event: AlarmEvent, account: AlarmAccount | None) -> None:
+        """Run the registered handlers; a failing handler does not stop the others."""
+        for handler in self._event_handlers:
+            try:
+                await handler(event, account)
+            except Exception as e:
+                logger.warning(
+                    "Alarm event handler failed",
+                    account=event.account_code, event_code=event.event_code, error=str(e),
+                )
+
     def parse_message(self, message: str, protocol: AlarmProtocol | None = None) -> AlarmEvent | None:
         """Parse an alarm message.
 
@@ -400,11 +449,7 @@ class AlarmReceiverService:
         account = self._accounts.get(event.account_code)
 
         # Notify handlers
-        for handler in self._event_handlers:
-            try:
-                await handler(event, account)
-            except Exception:
-                pass  # Don't let handler errors stop processing
+        await self.notify_handlers(event, account)
 
         # Only create alerts for alarm events, not restores
         if event.is_restore:
@@ -421,6 +466,16 @@ class AlarmReceiverService:
         account: AlarmAccount | None,
     ) -> Alert:
         """Create an alert from an alarm event."""
+        alert = Alert(**self.alert_row(event, account))
+
+        self.db.add(alert)
+        await self.db.commit()
+        await self.db.refresh(alert)
+
+        return alert
+
+    def alert_row(self, event: AlarmEvent, account: AlarmAccount | None) -> dict[str, Any]:
+        """Column values of the alert for an alarm event."""
         # Determine severity based on event type
         severity = self._get_severity(event.event_type)
 
@@ -443,21 +498,25 @@ class AlarmReceiverService:
         if event.user:
             description_parts.append(f"User: {event.user}")
 
-        description = "\n".join(description_parts)
-
-        # Create alert
-        alert = Alert(
-            id=uuid.uuid4(),
-            title=title,
-            description=description,
-            alert_type="alarm_receiver",
-            severity=severity,
-            status=AlertStatus.PENDING,
-            source=f"alarm:{event.protocol.value}",
-            source_id=event.account_code,
-            latitude=account.latitude if account else None,
-            longitude=account.longitude if account else None,
-            raw_data={
+        received_at = event.timestamp
+        if received_at.tzinfo is None:
+            received_at = received_at.replace(tzinfo=timezone.utc)
+
+        return {
+            "id": uuid.uuid4(),
+            "title": title[:200],
+            "description": "\n".join(description_parts),
+            "alert_type": "alarm_receiver",
+            "severity": severity,
+            "status": AlertStatus.PENDING,
+            "source": AlertSource.ALARM_SYSTEM,
+            "source_id": event.account_code,
+            "latitude": account.latitude if account else None,
+            "longitude": account.longitude if account else None,
+            "address": account.address if account else None,
+            "zone": event.zone,
+            "received_at": received_at,
+            "raw_payload": {
                 "event": {
                     "raw_message": event.raw_message,
                     "protocol": event.protocol.value,
@@ -468,24 +527,17 @@ class AlarmReceiverService:
                     "zone": event.zone,
                     "user": event.user,
                     "partition": event.partition,
+                    **event.extra_data,
                 },
                 "account": {
-                    "name": account.name if account else None,
-                    "address": account.address if account else None,
-                    "contact_name": account.contact_name if account else None,
-                    "contact_phone": account.contact_phone if account else None,
+                    "name": account.name,
+                    "address": account.address,
+                    "agency_id": str(account.agency_id) if account.agency_id else None,
+                    "contact_name": account.contact_name,
+                    "contact_phone": account.contact_phone,
                 } if account else None,
             },
-        )
-
-        if account and account.agency_id:
-            alert.agency_id = account.agency_id
-
-        self.db.add(alert)
-        await self.db.commit()
-        await self.db.refresh(alert)
-
-        return alert
+        }
 
     def _get_severity(self, event_type: AlarmEventType) -> AlertSeverity:
         """Get alert severity based on event type."""
@@ -551,11 +603,190 @@ class AlarmReceiverService:
         return titles.get(event_type, f"Alarm Event {event_type.value}")
 
 
+class AccountRateLimiter:
+    """Token bucket per alarm account: ``per_minute`` events, up to ``burst`` at once.
+
+    Keeps one panel stuck in a loop from filling the queue ahead of every
+    other account. Lines over the rate are NAKed, so the panel resends them
+    at the pace the bucket refills.
+    """
+
+    # Full buckets are forgotten once this many accounts are tracked
+    MAX_TRACKED = 10000
+
+    def __init__(self, per_minute: float, burst: float | None = None):
+        self.rate = per_minute / 60
+        self.capacity = burst if burst is not None else max(per_minute, 1.0)
+        self._buckets: dict[str, tuple[float, float]] = {}  # account -> (tokens, updated)
+
+    def allow(self, account_code: str) -> bool:
+        """Take one token for ``account_code`` if it has one left."""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(account_code, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        if account_code not in self._buckets and len(self._buckets) >= self.MAX_TRACKED:
+            self._prune(now)
+        self._buckets[account_code] = (tokens, now)
+        return allowed
+
+    def _prune(self, now: float) -> None:
+        self._buckets = {
+            account: (tokens, updated)
+            for account, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate < self.capacity
+        }
+
+
+class AlarmEventWriter:
+    """Queues parsed alarm events and writes their alerts in bulk from a background task."""
+
+    def __init__(
+        self,
+        receiver_service: AlarmReceiverService,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        batch_size: int = 500,
+        flush_interval_ms: int = 100,
+        max_queue: int = 10000,
+    ):
+        if session_factory is None:
+            from app.core.deps import ingestion_session_factory
+            session_factory = ingestion_session_factory
+        self.receiver_service = receiver_service
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: asyncio.Queue[tuple[AlarmEvent, float]] = asyncio.Queue(maxsize=max_queue)
+        self._flush_task: asyncio.Task | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the flush task is writing queued events."""
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def start(self) -> None:
+        """Start the flush task."""
+        if not self.running:
+            self._stopping = False
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="alarm-event-flush")
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the flush task.
+
+        A batch the database still refuses after WRITE_ATTEMPTS is logged
+        and given up, so shutdown is not held by an outage.
+        """
+        self._stopping = True
+        if self._flush_task is not None:
+            # Not cancelled: an interrupted INSERT would lose an acknowledged batch
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    def submit(self, event: AlarmEvent, received: float | None = None) -> bool:
+        """Queue an event without waiting for it to be written.
+
+        Args:
+            event: Parsed alarm event
+            received: ``time.perf_counter()`` when the line arrived, for latency
+
+        Returns:
+            False when the queue is full and the sender should retry
+        """
+        try:
+            self._queue.put_nowait((event, received if received is not None else time.perf_counter()))
+        except asyncio.QueueFull:
+            return False
+        alarm_receiver_queue_depth.set(self._queue.qsize())
+        return True
+
+    async def flush(self) -> None:
+        """Write everything currently queued."""
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            alarm_receiver_queue_depth.set(self._queue.qsize())
+            await self._write(batch)
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not (self._stopping and self._queue.empty()):
+            try:
+                batch = [await asyncio.wait_for(self._queue.get(), self.flush_interval)]
+            except asyncio.TimeoutError:
+                continue
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            alarm_receiver_queue_depth.set(self._queue.qsize())
+            await self._write(batch)
+
+    async def _write(self, batch: list[tuple[AlarmEvent, float]]) -> None:
+        """Run handlers, then insert one alert per alarm (restores create none).
+
+        The batch is held here until it is written, so during a database
+        outage the queue fills behind it and new lines are NAKed.
+        """
+        rows = []
+        for event, _ in batch:
+            account = self.receiver_service.get_account(event.account_code)
+            await self.receiver_service.notify_handlers(event, account)
+            if not event.is_restore:
+                rows.append(self.receiver_service.alert_row(event, account))
+
+        if rows and not await self._insert(rows):
+            alarm_receiver_write_failures_total.inc(len(rows))
+            logger.error(
+                "Alarm alerts not written before shutdown",
+                count=len(rows),
+                messages=[row["raw_payload"]["event"]["raw_message"] for row in rows],
+            )
+            return
+
+        written = time.perf_counter()
+        for _, received in batch:
+            alarm_receiver_latency_seconds.observe(written - received)
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> bool:
+        attempt = 0
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(Alert), rows)
+                    await session.commit()
+                return True
+            except Exception as e:
+                attempt += 1
+                logger.warning(
+                    "Alarm alert write failed", count=len(rows), attempt=attempt, error=str(e)
+                )
+                if self._stopping and attempt >= WRITE_ATTEMPTS:
+                    return False
+                await asyncio.sleep(
+                    min(WRITE_RETRY_DELAY_SECONDS * 2 ** (attempt - 1), WRITE_RETRY_MAX_DELAY_SECONDS)
+                )
+
+
 class AlarmReceiverTCPServer:
     """TCP server for receiving alarm signals.
 
     This implements a basic receiver that can accept
     connections from alarm panels or central station software.
+    Each line is acknowledged once it is parsed and queued on the
+    AlarmEventWriter; lines keep flowing on a connection while earlier
+    events are still being written.
     """
 
     def __init__(
@@ -563,6 +794,9 @@ class AlarmReceiverTCPServer:
         host: str = "0.0.0.0",  # nosec B104 - Intentional for alarm panel server
         port: int = 5000,
         receiver_service: AlarmReceiverService | None = None,
+        writer: AlarmEventWriter | None = None,
+        rate_limiter: AccountRateLimiter | None = None,
+        idle_timeout_seconds: float = 60.0,
     ):
         """Initialize TCP server.
 
@@ -570,33 +804,78 @@ class AlarmReceiverTCPServer:
             host: Interface to bind to. Default "0.0.0.0" accepts connections from any interface,
                   which is intentional for alarm panel connections. In production, restrict
                   via firewall or set to specific interface IP.
-            port: TCP port to listen on.
+            port: TCP port to listen on (0 picks a free port).
             receiver_service: AlarmReceiverService instance for processing.
+            writer: Batched alert writer (created from settings if omitted).
+            rate_limiter: Per-account limiter (created from settings if omitted).
+            idle_timeout_seconds: Close connections silent for this long.
         """
         self.host = host
         self.port = port
         self.receiver_service = receiver_service
+        if receiver_service is not None and writer is None:
+            writer = AlarmEventWriter(
+                receiver_service,
+                batch_size=settings.alarm_receiver_batch_size,
+                flush_interval_ms=settings.alarm_receiver_flush_interval_ms,
+                max_queue=settings.alarm_receiver_queue_max,
+            )
+        self.writer = writer
+        self.rate_limiter = rate_limiter or AccountRateLimiter(
+            settings.alarm_receiver_account_events_per_minute
+        )
+        self.idle_timeout = idle_timeout_seconds
         self._server: asyncio.Server | None = None
         self._running = False
 
     async def start(self) -> None:
         """Start the TCP server."""
+        if self.writer is not None:
+            self.writer.start()
         self._server = await asyncio.start_server(
             self._handle_connection,
             self.host,
             self.port,
         )
+        self.port = self._server.sockets[0].getsockname()[1]
         self._running = True
 
         async with self._server:
             await self._server.serve_forever()
 
     async def stop(self) -> None:
-        """Stop the TCP server."""
+        """Stop the TCP server and write any queued events."""
         self._running = False
         if self._server:
             self._server.close()
             await self._server.wait_closed()
+        if self.writer is not None:
+            await self.writer.stop()
+
+    def accept_line(self, message: str, source_ip: str | None = None) -> bytes:
+        """Parse and queue one line; returns the byte to answer with."""
+        received = time.perf_counter()
+        if self.receiver_service is None or self.writer is None:
+            return ACK
+
+        event = self.receiver_service.parse_message(message)
+        if event is None:
+            # Heartbeats and unknown formats are acknowledged, as before
+            alarm_receiver_messages_total.labels(outcome="unparsed").inc()
+            return ACK
+        if source_ip:
+            event.extra_data["source_ip"] = source_ip
+
+        if not self.rate_limiter.allow(event.account_code):
+            # NAKed, not dropped: the sender retries it once the bucket refills
+            alarm_receiver_messages_total.labels(outcome="rate_limited").inc()
+            logger.warning("Alarm account over its event rate", account=event.account_code)
+            return NAK
+        if not self.writer.submit(event, received):
+            alarm_receiver_messages_total.labels(outcome="rejected").inc()
+            return NAK
+        alarm_receiver_messages_total.labels(outcome="queued").inc()
+        return ACK
 
     async def _handle_connection(
         self,
@@ -606,13 +885,14 @@ class AlarmReceiverTCPServer:
         """Handle incoming connection."""
         addr = writer.get_extra_info("peername")
         source_ip = addr[0] if addr else None
+        alarm_receiver_connections.inc()
 
         try:
             while self._running:
                 # Read line (most alarm protocols are line-based)
                 data = await asyncio.wait_for(
                     reader.readline(),
-                    timeout=60.0,
+                    timeout=self.idle_timeout,
                 )
 
                 if not data:
@@ -622,25 +902,20 @@ class AlarmReceiverTCPServer:
                 if not message:
                     continue
 
-                # Process the alarm
-                if self.receiver_service:
-                    try:
-                        await self.receiver_service.process_alarm(
-                            message=message,
-                            source_ip=source_ip,
-                        )
-                    except Exception:
-                        pass
-
-                # Send acknowledgment (protocol-specific)
-                # Contact ID expects specific ACK format
-                writer.write(b"\x06")  # ACK
+                # Contact ID expects a single ACK/NAK byte per message
+                writer.write(self.accept_line(message, source_ip))
                 await writer.drain()
 
         except asyncio.TimeoutError:
             pass
-        except Exception:
+        except ConnectionError:
             pass
+        except Exception as e:
+            logger.warning("Alarm receiver connection failed", source_ip=source_ip, error=str(e))
         finally:
+            alarm_receiver_connections.dec()
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
@@ -0,0 +1,199 @@
+"""Time-windowed alert deduplication.
+
+Alerts that describe the same event (same source and type, in the same
+place or from the same device) within ``alert_dedup_window_seconds`` are
+folded into the first one. Each alert gets a composite dedup key; the
+location component is a geohash cell rather than the exact coordinates, so
+two detectors a few metres apart collapse into one alert while distinct
+buildings stay separate. A cell at the default precision of 7 is about
+150 m x 150 m. Events on either side of a cell edge are not merged.
+
+The first alert for a key claims it in Redis with ``SET NX EX``, storing its
+id. Later alerts in the window see the claim in one round-trip. If Redis is
+unavailable, the check falls back to the ``ix_alerts_open_dedup`` partial
+index: an index range scan over open alerts with that key, never a table
+scan.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+import structlog
+import redis.asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import alerts_deduplicated_total
+from app.models.alert import Alert, AlertSource, AlertStatus
+
+logger = structlog.get_logger()
+
+DEDUP_KEY_PREFIX = "alert:dedup"
+# After a Redis error, use only the database for this long
+REDIS_RETRY_SECONDS = 30.0
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 7) -> str:
+    """Encode a coordinate as a geohash of ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def dedup_key(
+    source: AlertSource | str,
+    alert_type: str,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    device_id: uuid.UUID | str | None = None,
+    precision: int | None = None,
+) -> str | None:
+    """Composite dedup key of an alert, or None if it has no place to match on.
+
+    A device id takes precedence over coordinates: alerts from one device
+    are the same event regardless of reported position jitter.
+    """
+    source_value = source.value if isinstance(source, AlertSource) else source
+    if device_id is not None:
+        return f"{source_value}:{alert_type}:dev:{device_id}"
+    if latitude is not None and longitude is not None:
+        cell = geohash_encode(latitude, longitude, precision or settings.alert_dedup_geohash_precision)
+        return f"{source_value}:{alert_type}:geo:{cell}"
+    return None
+
+
+class AlertDeduplicator:
+    """Claims dedup keys in Redis, falling back to the open-alert index."""
+
+    def __init__(self, redis_client: aioredis.Redis | None = None, window_seconds: int = 60):
+        self.redis = redis_client
+        self.window_seconds = window_seconds
+        self._redis_retry_at = 0.0
+
+    @staticmethod
+    def redis_key(key: str) -> str:
+        """Redis key holding the id of the alert that claimed a dedup key."""
+        return f"{DEDUP_KEY_PREFIX}:{key}"
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        key: str,
+        alert_id: uuid.UUID,
+        window_seconds: int | None = None,
+        statuses: Iterable[AlertStatus] = (AlertStatus.PENDING,),
+    ) -> uuid.UUID | None:
+        """Claim ``key`` for a new alert.
+
+        Args:
+            db: Session used for the fallback lookup
+            key: Dedup key from ``dedup_key``
+            alert_id: Id the new alert will be stored with
+            window_seconds: Override of the configured window
+            statuses: Alert statuses that still absorb duplicates (fallback only)
+
+        Returns:
+            Id of the alert already holding the key within the window, or
+            None if the new alert is the first (and now holds the claim).
+        """
+        window = window_seconds or self.window_seconds
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                if await redis.set(self.redis_key(key), str(alert_id), nx=True, ex=window):
+                    return None
+                holder = await redis.get(self.redis_key(key))
+                if holder is None:
+                    # The claim expired between SET and GET; try once more
+                    if await redis.set(self.redis_key(key), str(alert_id), nx=True, ex=window):
+                        return None
+                    holder = await redis.get(self.redis_key(key))
+                if holder is not None:
+                    alerts_deduplicated_total.labels(path="redis").inc()
+                    return uuid.UUID(holder.decode() if isinstance(holder, bytes) else holder)
+            except Exception as e:
+                self._redis_failed(e)
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=window)
+        result = await db.execute(
+            select(Alert.id)
+            .where(
+                Alert.dedup_key == key,
+                Alert.status.in_(list(statuses)),
+                Alert.received_at >= cutoff,
+            )
+            .order_by(Alert.received_at.desc())
+            .limit(1)
+        )
+        holder_id = result.scalar_one_or_none()
+        if holder_id is not None:
+            alerts_deduplicated_total.labels(path="database").inc()
+        return holder_id
+
+    async def reassign(self, key: str, alert_id: uuid.UUID, window_seconds: int | None = None) -> None:
+        """Point a claim at a new alert (the previous holder is gone or closed)."""
+        redis = await self._get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self.redis_key(key), str(alert_id), ex=window_seconds or self.window_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def release(self, key: str, alert_id: uuid.UUID) -> None:
+        """Drop a claim whose alert was never stored, so the next one is not lost."""
+        redis = await self._get_redis()
+        if redis is None:
+            return
+        try:
+            holder = await redis.get(self.redis_key(key))
+            if holder is not None and (holder.decode() if isinstance(holder, bytes) else holder) == str(alert_id):
+                await redis.delete(self.redis_key(key))
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def _get_redis(self) -> aioredis.Redis | None:
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        if self.redis is None:
+            from app.core.deps import get_redis
+
+            try:
+                self.redis = await get_redis()
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+        return self.redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("Alert dedup Redis unavailable; using database index", error=str(error))
+
+
+alert_deduplicator = AlertDeduplicator(window_seconds=settings.alert_dedup_window_seconds)
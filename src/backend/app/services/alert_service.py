@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.alert import Alert, AlertSeverity, AlertStatus, AlertSource
 from app.models.incident import Incident, IncidentCategory, IncidentPriority
 from app.models.user import User
+from app.services.alert_dedup import alert_deduplicator, dedup_key
 from app.services.incident_service import IncidentService
 
 
@@ -56,9 +57,6 @@ SEVERITY_TO_PRIORITY: dict[AlertSeverity, IncidentPriority] = {
 class AlertService:
     """Service for alert management and processing."""
 
-    # Time window for deduplication (seconds)
-    DEDUP_WINDOW_SECONDS = 60
-
     def __init__(self, db: AsyncSession):
         """Initialize alert service with database session."""
         self.db = db
@@ -80,14 +78,17 @@ class AlertService:
     ) -> Alert:
         """Ingest a new alert from an external source."""
         # Check for duplicate alerts
-        if await self._is_duplicate(source, source_id, alert_type, latitude, longitude):
+        alert_id = uuid.uuid4()
+        key = dedup_key(source, alert_type, latitude, longitude, device_id=source_device_id or None)
+        if await self._is_duplicate(alert_id, source, source_id, key):
             raise AlertError("Duplicate alert detected within deduplication window")
 
         alert = Alert(
-            id=uuid.uuid4(),
+            id=alert_id,
             source=source,
             source_id=source_id,
             source_device_id=source_device_id,
+            dedup_key=key,
             severity=severity,
             status=AlertStatus.PENDING,
             alert_type=alert_type,
@@ -102,7 +103,12 @@ class AlertService:
         )
 
         self.db.add(alert)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except Exception:
+            if key is not None:
+                await alert_deduplicator.release(key, alert_id)
+            raise
         await self.db.refresh(alert)
 
         return alert
@@ -336,46 +342,37 @@ class AlertService:
 
     async def _is_duplicate(
         self,
+        alert_id: uuid.UUID,
         source: AlertSource,
         source_id: str | None,
-        alert_type: str,
-        latitude: float | None,
-        longitude: float | None,
+        key: str | None,
     ) -> bool:
         """Check if alert is a duplicate within deduplication window."""
-        # If source_id provided, check for exact match
+        # A redelivered source event is always a duplicate (indexed lookup)
         if source_id:
             result = await self.db.execute(
-                select(Alert).where(
+                select(Alert.id).where(
                     and_(
                         Alert.source == source,
                         Alert.source_id == source_id,
                     )
-                )
+                ).limit(1)
             )
             if result.scalar_one_or_none():
                 return True
 
-        # Check for similar alerts in time window
-        cutoff = datetime.now(timezone.utc).replace(
-            microsecond=0
-        )
-        # Note: In production, use proper time delta
-        # For now, we just check source + type + location
-
-        if latitude is not None and longitude is not None:
-            result = await self.db.execute(
-                select(Alert).where(
-                    and_(
-                        Alert.source == source,
-                        Alert.alert_type == alert_type,
-                        Alert.latitude == latitude,
-                        Alert.longitude == longitude,
-                        Alert.status == AlertStatus.PENDING,
-                    )
-                )
-            )
-            if result.scalar_one_or_none():
+        # Same source, type and geohash cell while the first is still pending
+        if key is not None:
+            holder_id = await alert_deduplicator.claim(self.db, key, alert_id)
+            if holder_id is None:
+                return False
+            holder_status = (
+                await self.db.execute(select(Alert.status).where(Alert.id == holder_id))
+            ).scalar_one_or_none()
+            # A holder not yet committed is an alert being ingested concurrently
+            if holder_status is None or holder_status == AlertStatus.PENDING:
                 return True
+            # The first alert was handled (e.g. dismissed as false); this one is new
+            await alert_deduplicator.reassign(key, alert_id)
 
         return False
@@ -8,7 +8,6 @@ import uuid
 from datetime import datetime, timezone
 
 import structlog
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.alert import Alert, AlertStatus, AlertSeverity, AlertSource
@@ -19,6 +18,7 @@ from app.models.incident import (
     IncidentPriority,
 )
 from app.models.user import User
+from app.services.incident_service import allocate_incident_number, record_timeline_event
 from app.services.socketio import emit_incident_created, emit_alert_updated
 
 logger = structlog.get_logger()
@@ -126,7 +126,7 @@ class AlertToIncidentService:
             )
 
         # Generate incident number
-        incident_number = await self._generate_incident_number()
+        incident_number = await allocate_incident_number(self.db)
 
         # Create title
         title = title_override or self._generate_title(alert, category)
@@ -147,15 +147,17 @@ class AlertToIncidentService:
             agency_id=user.agency_id,
             source_alert_id=alert.id,
             assigned_units=[],
-            timeline_events=[{
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "event": "created_from_alert",
-                "user_id": str(user.id),
-                "details": f"Incident created from alert {alert.id} ({alert.alert_type})",
-            }],
         )
 
         self.db.add(incident)
+        record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="created_from_alert",
+            description=f"Incident created from alert {alert.id} ({alert.alert_type})",
+            user=user,
+            metadata={"alert_id": str(alert.id)},
+        )
 
         # Update alert status
         alert.status = AlertStatus.PROCESSING
@@ -185,23 +187,6 @@ class AlertToIncidentService:
 
         return incident
 
-    async def _generate_incident_number(self) -> str:
-        """Generate a unique incident number."""
-        from sqlalchemy import func
-
-        today = datetime.now(timezone.utc)
-        prefix = today.strftime("%Y%m%d")
-
-        # Count incidents created today
-        start_of_day = today.replace(hour=0, minute=0, second=0, microsecond=0)
-        count_query = select(func.count()).select_from(Incident).where(
-            Incident.created_at >= start_of_day
-        )
-        result = await self.db.execute(count_query)
-        count = (result.scalar() or 0) + 1
-
-        return f"INC-{prefix}-{count:04d}"
-
     def _generate_title(self, alert: Alert, category: IncidentCategory) -> str:
         """Generate incident title from alert."""
         # Use alert title if available
@@ -1,5 +1,6 @@
 """Audio clip storage and retrieval service."""
 
+import asyncio
 import os
 import uuid
 from datetime import datetime, timezone, timedelta
@@ -101,22 +102,42 @@ class AudioStorageService:
         )
         return result.scalar_one_or_none()
 
-    async def get_clip_data(self, clip_id: uuid.UUID) -> tuple[bytes, str] | None:
-        """Get the actual audio file data for streaming/download."""
+    async def get_clip_file(self, clip_id: uuid.UUID) -> tuple[AudioClip, Path, str] | None:
+        """Locate the audio file for a clip without reading it.
+
+        Returns:
+            Tuple of (clip, full_path, content_type), or None if the clip or
+            its file is missing.
+        """
         clip = await self.get_clip(clip_id)
         if not clip:
             return None
 
         full_path = self.storage_path / clip.file_path
-        if not full_path.exists():
+        if not full_path.is_file():
             return None
 
-        with open(full_path, "rb") as f:
-            data = f.read()
+        return clip, full_path, self.get_content_type(clip.format)
+
+    async def get_clip_data(self, clip_id: uuid.UUID) -> tuple[bytes, str] | None:
+        """Get the actual audio file data as bytes.
 
-        content_type = "audio/wav" if clip.format == "wav" else f"audio/{clip.format}"
+        HTTP endpoints should serve get_clip_file's path instead, which
+        supports Range requests without loading the clip into memory.
+        """
+        located = await self.get_clip_file(clip_id)
+        if not located:
+            return None
+
+        _, full_path, content_type = located
+        data = await asyncio.to_thread(full_path.read_bytes)
         return data, content_type
 
+    @staticmethod
+    def get_content_type(format: str) -> str:
+        """Map a stored clip format to its MIME type."""
+        return "audio/wav" if format == "wav" else f"audio/{format}"
+
     async def list_clips(
         self,
         device_id: uuid.UUID | None = None,
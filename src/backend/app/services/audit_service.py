@@ -9,6 +9,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit import AuditLog, AuditAction
 from app.models.user import User
+from app.services.audit_writer import get_audit_writer
+
+# Written in the caller's transaction before the request returns; everything
+# else goes through the batched audit writer when it is running.
+SYNC_AUDIT_ACTIONS = frozenset({
+    AuditAction.LOGIN,
+    AuditAction.LOGOUT,
+    AuditAction.LOGIN_FAILED,
+    AuditAction.PASSWORD_CHANGED,
+    AuditAction.MFA_ENABLED,
+    AuditAction.MFA_DISABLED,
+    AuditAction.USER_CREATED,
+    AuditAction.USER_DELETED,
+    AuditAction.USER_ROLE_CHANGED,
+    AuditAction.SYSTEM_CONFIG_CHANGED,
+    AuditAction.PERMISSION_DENIED,
+})
 
 
 class AuditService:
@@ -29,6 +46,7 @@ class AuditService:
         new_values: dict[str, Any] | None = None,
         request: Request | None = None,
         metadata: dict[str, Any] | None = None,
+        sync: bool | None = None,
     ) -> AuditLog:
         """Create an audit log entry.
 
@@ -42,6 +60,9 @@ class AuditService:
             new_values: New state of entity (for creates/updates)
             request: FastAPI request object for IP/user agent extraction
             metadata: Additional context data
+            sync: Commit the entry before returning. Defaults to True for
+                security-critical actions (SYNC_AUDIT_ACTIONS); other entries
+                are queued and written in bulk by the audit writer.
         """
         # Extract request information
         ip_address = None
@@ -72,6 +93,13 @@ class AuditService:
             extra_data=metadata,
         )
 
+        if sync is None:
+            sync = action in SYNC_AUDIT_ACTIONS
+        writer = None if sync else get_audit_writer()
+        if writer is not None:
+            await writer.enqueue(audit_log)
+            return audit_log
+
         self.db.add(audit_log)
         await self.db.commit()
         await self.db.refresh(audit_log)
@@ -0,0 +1,319 @@
+"""Batched, off-request audit log writer.
+
+AuditService used to add, commit and refresh every entry on the caller's
+session, so each audited mutation paid an extra commit round-trip inside the
+request. Routine entries are now handed to this writer instead: they go into
+a bounded in-memory queue and a background task writes them with one bulk
+INSERT every ``audit_flush_interval_ms`` or ``audit_batch_size`` entries,
+whichever comes first.
+
+Entries are never dropped when the database is slow or down or the process
+crashes. Each entry is first written ahead to the ``audit:spool`` Redis
+stream (one XADD, far cheaper than a commit) and removed from it once its
+batch is inserted. Entries left in the stream longer than
+``WRITE_AHEAD_GRACE_MS`` (the queue was full, a flush failed, or the process
+died before flushing) are inserted by a drain task. Inserts ignore ids that
+already exist, so an entry written by both paths, or drained by two workers,
+is stored once. Only when Redis is unreachable as well do entries live in
+memory alone. Security-critical actions are written synchronously by
+AuditService and never go through this queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any
+
+import structlog
+import redis.asyncio as aioredis
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import audit_queue_depth, audit_spooled_total
+from app.models.audit import AuditAction, AuditLog
+
+logger = structlog.get_logger()
+
+SPOOL_STREAM_KEY = "audit:spool"
+# Keeps the spool bounded if the database stays down for a long time
+SPOOL_MAX_LEN = 1_000_000
+SPOOL_DRAIN_INTERVAL_SECONDS = 30.0
+# Written-ahead entries younger than this are left to the in-memory flush
+WRITE_AHEAD_GRACE_MS = 30_000
+
+AUDIT_COLUMNS = (
+    "id", "timestamp", "action", "user_id", "entity_type", "entity_id",
+    "description", "ip_address", "user_agent", "old_values", "new_values",
+    "extra_data",
+)
+
+
+def audit_log_to_row(audit_log: AuditLog) -> dict[str, Any]:
+    """Column values of an AuditLog for a bulk insert."""
+    return {column: getattr(audit_log, column) for column in AUDIT_COLUMNS}
+
+
+def _encode_row(row: dict[str, Any]) -> bytes:
+    return json.dumps({
+        **row,
+        "id": str(row["id"]),
+        "timestamp": row["timestamp"].isoformat(),
+        "action": AuditAction(row["action"]).value,
+        "user_id": str(row["user_id"]) if row["user_id"] else None,
+    }, default=str).encode()
+
+
+def _decode_row(raw: bytes | str) -> dict[str, Any]:
+    row = json.loads(raw)
+    row["id"] = uuid.UUID(row["id"])
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    row["action"] = AuditAction(row["action"])
+    row["user_id"] = uuid.UUID(row["user_id"]) if row["user_id"] else None
+    return row
+
+
+class AuditWriter:
+    """Queues audit rows and writes them in bulk from a background task."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        redis_client: aioredis.Redis | None = None,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        max_queue: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.redis = redis_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        # (row, write-ahead stream entry id or None)
+        self._queue: asyncio.Queue[tuple[dict[str, Any], bytes | None]] = asyncio.Queue(maxsize=max_queue)
+        self._flush_task: asyncio.Task | None = None
+        self._drain_task: asyncio.Task | None = None
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the flush task is accepting entries."""
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def start(self) -> None:
+        """Start the flush and spool-drain tasks."""
+        if not self.running:
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="audit-flush")
+        if self.redis is not None and (self._drain_task is None or self._drain_task.done()):
+            self._drain_task = asyncio.create_task(self._drain_loop(), name="audit-spool-drain")
+
+    async def stop(self) -> None:
+        """Stop background tasks and write (or spool) everything still queued."""
+        for task in (self._flush_task, self._drain_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = None
+        self._drain_task = None
+
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        while not self._queue.empty():
+            await self._write(self._take_batch())
+
+    async def enqueue(self, audit_log: AuditLog) -> None:
+        """Write an entry ahead to Redis and queue it, without waiting for the database."""
+        row = audit_log_to_row(audit_log)
+        entry_id = await self._write_ahead(row)
+        try:
+            self._queue.put_nowait((row, entry_id))
+        except asyncio.QueueFull:
+            # Never block the request or drop the entry; the drain task
+            # inserts it from the spool
+            if entry_id is not None:
+                audit_spooled_total.inc()
+            else:
+                task = asyncio.create_task(self._spool([row]))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+        audit_queue_depth.set(self._queue.qsize())
+
+    async def flush(self) -> None:
+        """Write everything currently queued."""
+        while not self._queue.empty():
+            await self._write(self._take_batch())
+
+    # ==================== Flushing ====================
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            audit_queue_depth.set(self._queue.qsize())
+            await self._write(batch)
+
+    def _take_batch(self) -> list[tuple[dict[str, Any], bytes | None]]:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        audit_queue_depth.set(self._queue.qsize())
+        return batch
+
+    async def _write(self, batch: list[tuple[dict[str, Any], bytes | None]]) -> None:
+        """Bulk insert rows, then drop them from the spool; spool them if the insert fails."""
+        if not batch:
+            return
+        written_ahead = [entry_id for _, entry_id in batch if entry_id is not None]
+        try:
+            async with self.session_factory() as session:
+                await session.execute(_insert_ignoring_duplicates(session), [row for row, _ in batch])
+                await session.commit()
+        except Exception as e:
+            logger.warning("Audit flush failed; spooling entries", count=len(batch), error=str(e))
+            # Written-ahead entries are already in the spool
+            audit_spooled_total.inc(len(written_ahead))
+            await self._spool([row for row, entry_id in batch if entry_id is None])
+            return
+        if written_ahead:
+            try:
+                await self.redis.xdel(SPOOL_STREAM_KEY, *written_ahead)
+            except Exception as e:
+                # Drained again later; the duplicate insert is ignored
+                logger.warning("Failed to remove written-ahead audit entries", count=len(written_ahead), error=str(e))
+
+    # ==================== Redis spool ====================
+
+    async def _write_ahead(self, row: dict[str, Any]) -> bytes | None:
+        """Append a row to the spool before queueing it; None if Redis is unavailable."""
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.xadd(
+                SPOOL_STREAM_KEY, {"row": _encode_row(row)},
+                maxlen=SPOOL_MAX_LEN, approximate=True,
+            )
+        except Exception as e:
+            logger.warning("Audit write-ahead failed; entry held in memory only", error=str(e))
+            return None
+
+    async def _spool(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self.redis is None:
+            logger.error(
+                "Audit entries lost: database write failed and no spool configured",
+                count=len(rows),
+            )
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for row in rows:
+                    pipe.xadd(
+                        SPOOL_STREAM_KEY, {"row": _encode_row(row)},
+                        maxlen=SPOOL_MAX_LEN, approximate=True,
+                    )
+                await pipe.execute()
+            audit_spooled_total.inc(len(rows))
+        except Exception as e:
+            logger.error("Audit entries lost: spool write failed", count=len(rows), error=str(e))
+
+    async def drain_spool(self, grace_ms: int = WRITE_AHEAD_GRACE_MS) -> int:
+        """Insert spooled entries older than ``grace_ms`` into the database.
+
+        Younger entries are still queued in some worker's memory and are
+        removed from the spool by its flush.
+
+        Returns:
+            Number of entries moved out of the spool
+        """
+        drained = 0
+        # Stream ids start with their creation time in milliseconds
+        max_id = str(int(time.time() * 1000) - grace_ms)
+        while True:
+            entries = await self.redis.xrange(SPOOL_STREAM_KEY, max=max_id, count=self.batch_size)
+            if not entries:
+                return drained
+            rows = [_decode_row(fields[b"row"]) for _, fields in entries]
+            async with self.session_factory() as session:
+                await session.execute(_insert_ignoring_duplicates(session), rows)
+                await session.commit()
+            await self.redis.xdel(SPOOL_STREAM_KEY, *[entry_id for entry_id, _ in entries])
+            drained += len(entries)
+
+    async def _drain_loop(self) -> None:
+        while True:
+            try:
+                drained = await self.drain_spool()
+                if drained:
+                    logger.info("Drained spooled audit entries", count=drained)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Audit spool drain failed", error=str(e))
+            await asyncio.sleep(SPOOL_DRAIN_INTERVAL_SECONDS)
+
+
+def _insert_ignoring_duplicates(session: AsyncSession):
+    """INSERT that skips ids already present (spooled rows may be retried)."""
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(AuditLog).on_conflict_do_nothing(index_elements=["id"])
+    if dialect == "sqlite":
+        return sqlite.insert(AuditLog).on_conflict_do_nothing(index_elements=["id"])
+    return insert(AuditLog)
+
+
+_audit_writer: AuditWriter | None = None
+
+
+def get_audit_writer() -> AuditWriter | None:
+    """The running audit writer, or None when entries must be written inline."""
+    if _audit_writer is not None and _audit_writer.running:
+        return _audit_writer
+    return None
+
+
+async def start_audit_writer() -> AuditWriter:
+    """Create and start the process-wide audit writer."""
+    global _audit_writer
+    if _audit_writer is None:
+        from app.core.deps import ingestion_session_factory, get_redis
+
+        try:
+            redis_client = await get_redis()
+        except Exception as e:
+            logger.warning("Audit spool unavailable", error=str(e))
+            redis_client = None
+        _audit_writer = AuditWriter(
+            session_factory=ingestion_session_factory,
+            redis_client=redis_client,
+            batch_size=settings.audit_batch_size,
+            flush_interval_ms=settings.audit_flush_interval_ms,
+            max_queue=settings.audit_queue_max,
+        )
+    _audit_writer.start()
+    return _audit_writer
+
+
+async def shutdown_audit_writer() -> None:
+    """Flush remaining entries and stop the writer."""
+    global _audit_writer
+    if _audit_writer is not None:
+        await _audit_writer.stop()
+        _audit_writer = None
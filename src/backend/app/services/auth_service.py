@@ -8,13 +8,16 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import (
+    PasswordHasherBusyError,
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
     verify_token,
 )
 from app.models.user import User, UserRole
+from app.services.principal_cache import principal_cache
 
 
 class AuthenticationError(Exception):
@@ -57,13 +60,22 @@ class AuthService:
             raise AuthenticationError("Account is deactivated")
 
         # Verify password
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             await self._handle_failed_login(user)
             raise AuthenticationError("Invalid email or password")
 
         # Reset failed attempts on successful login
         user.failed_login_attempts = 0
         user.locked_until = None
+
+        # Upgrade hashes made with an older cost while the plaintext is at hand
+        # (token_version is left alone, so the user's other sessions stay valid)
+        if password_needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await get_password_hash_async(password)
+            except PasswordHasherBusyError:
+                pass  # Try again on a later login
+
         await self.db.commit()
 
         return user
@@ -75,13 +87,17 @@ class AuthService:
             "email": user.email,
             "role": user.role.value,
             "agency_id": str(user.agency_id) if user.agency_id else None,
+            "tv": user.token_version,
         }
 
         access_token = create_access_token(
             subject=str(user.id),
             additional_claims=additional_claims,
         )
-        refresh_token = create_refresh_token(subject=str(user.id))
+        refresh_token = create_refresh_token(
+            subject=str(user.id),
+            additional_claims={"tv": additional_claims["tv"]},
+        )
 
         return {
             "access_token": access_token,
@@ -107,6 +123,10 @@ class AuthService:
         if not user.is_active:
             raise AuthenticationError("Account is deactivated")
 
+        # A password change revokes refresh tokens issued before it
+        if payload.get("tv") != user.token_version:
+            raise AuthenticationError("Invalid or expired refresh token")
+
         return await self.create_tokens(user)
 
     async def create_user(
@@ -129,7 +149,7 @@ class AuthService:
 
         user = User(
             email=email.lower(),
-            hashed_password=get_password_hash(password),
+            hashed_password=await get_password_hash_async(password),
             full_name=full_name,
             role=role,
             agency_id=agency_id,
@@ -169,13 +189,15 @@ class AuthService:
         new_password: str,
     ) -> None:
         """Change user password."""
-        if not verify_password(current_password, user.hashed_password):
+        if not await verify_password_async(current_password, user.hashed_password):
             raise AuthenticationError("Current password is incorrect")
 
         self._validate_password(new_password)
 
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
+        user.token_version += 1
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
 
     async def _get_user_by_email(self, email: str) -> User | None:
         """Get user by email."""
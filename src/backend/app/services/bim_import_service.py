@@ -0,0 +1,346 @@
+"""Background BIM import jobs.
+
+Parsing an IFC model with ifcopenshell is CPU-bound and can take minutes on
+large files, so the import endpoint only spools the upload to disk and
+enqueues a job. A consumer task in each API process runs the parser in a
+ProcessPoolExecutor, applies the result to the building, and reports
+progress to the ``building:{id}`` Socket.IO room.
+
+Job state is kept in Redis so any API worker can answer status polls, and
+parse results are cached by the SHA-256 of the file so re-importing the same
+IFC skips parsing entirely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import structlog
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.services.bim_parser import BIMData, IFCParserError, parse_ifc_file
+from app.services.building_service import BuildingError, BuildingService
+from app.services.socketio import emit_bim_import_progress
+
+logger = structlog.get_logger()
+
+JOB_KEY_PREFIX = "bim:import:job"
+PARSE_CACHE_KEY_PREFIX = "bim:parse"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Called with the updated Building once an import has been applied
+BuildingUpdatedCallback = Callable[[Any], Awaitable[None]]
+
+_parse_executor: ProcessPoolExecutor | None = None
+
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool used for IFC parsing.
+
+    Uses the spawn start method: forking an event loop process that already
+    runs threads (DB drivers, Redis, thread pools) is not safe.
+    """
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=max(1, settings.bim_import_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_executor
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BIMImportStatus(str, Enum):
+    """Lifecycle of a BIM import job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BIMImportQueue:
+    """Queues IFC imports and runs them in the background.
+
+    Jobs run one at a time per process by default; the process pool bounds
+    parser concurrency independently of the number of queued jobs.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        session_factory: async_sessionmaker,
+        executor: Executor | None = None,
+        parse_func: Callable[[str], dict] = parse_ifc_file,
+        job_ttl_seconds: int = 86400,
+        cache_ttl_seconds: int = 604800,
+        concurrency: int = 1,
+    ):
+        self.redis = redis_client
+        self.session_factory = session_factory
+        self.executor = executor
+        self.parse_func = parse_func
+        self.job_ttl_seconds = job_ttl_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.concurrency = concurrency
+        self._queue: asyncio.Queue[tuple[dict, Path, BuildingUpdatedCallback | None]] = asyncio.Queue()
+        self._worker_tasks: list[asyncio.Task] = []
+
+    @staticmethod
+    def job_key(job_id: str) -> str:
+        """Redis key holding a job's JSON state."""
+        return f"{JOB_KEY_PREFIX}:{job_id}"
+
+    @staticmethod
+    def parse_cache_key(file_hash: str) -> str:
+        """Redis key holding the parsed BIM data for a file hash."""
+        return f"{PARSE_CACHE_KEY_PREFIX}:{file_hash}"
+
+    def start(self) -> None:
+        """Start consumer tasks if they are not already running."""
+        self._worker_tasks = [t for t in self._worker_tasks if not t.done()]
+        for i in range(len(self._worker_tasks), self.concurrency):
+            self._worker_tasks.append(
+                asyncio.create_task(self._worker_loop(), name=f"bim-import-{i}")
+            )
+
+    async def stop(self) -> None:
+        """Cancel consumer tasks. Running and queued jobs are marked failed."""
+        for task in self._worker_tasks:
+            task.cancel()
+        for task in self._worker_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker_tasks.clear()
+
+        while not self._queue.empty():
+            job, file_path, _ = self._queue.get_nowait()
+            file_path.unlink(missing_ok=True)
+            await self._update_job(
+                job, status=BIMImportStatus.FAILED, stage="cancelled",
+                error="Server shut down before the import ran",
+            )
+
+    async def enqueue(
+        self,
+        building_id: uuid.UUID,
+        file_path: Path,
+        filename: str,
+        on_building_updated: BuildingUpdatedCallback | None = None,
+    ) -> dict:
+        """Queue a spooled IFC file for import.
+
+        The queue takes ownership of file_path and deletes it when the job
+        finishes.
+
+        Returns:
+            The initial job state.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "building_id": str(building_id),
+            "filename": filename,
+            "status": BIMImportStatus.QUEUED.value,
+            "stage": "queued",
+            "progress": 0,
+            "error": None,
+            "result": None,
+            "cached": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self._save_job(job)
+        self._queue.put_nowait((job, file_path, on_building_updated))
+        self.start()
+
+        logger.info(
+            "BIM import queued",
+            job_id=job["job_id"],
+            building_id=job["building_id"],
+            queue_depth=self._queue.qsize(),
+        )
+        return job
+
+    async def get_job(self, job_id: str) -> dict | None:
+        """Load a job's current state."""
+        raw = await self.redis.get(self.job_key(job_id))
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def _worker_loop(self) -> None:
+        """Consume queued jobs until cancelled."""
+        while True:
+            job, file_path, callback = await self._queue.get()
+            try:
+                await self.run_job(job, file_path, callback)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("BIM import worker error", job_id=job["job_id"], error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def run_job(
+        self,
+        job: dict,
+        file_path: Path,
+        on_building_updated: BuildingUpdatedCallback | None = None,
+    ) -> dict:
+        """Parse (or load from cache) and apply one import, updating job state."""
+        try:
+            await self._update_job(job, status=BIMImportStatus.RUNNING, stage="hashing", progress=5)
+            file_hash = await asyncio.to_thread(_hash_file, file_path)
+
+            bim_dict = await self._get_cached_parse(file_hash)
+            if bim_dict is not None:
+                job["cached"] = True
+            else:
+                await self._update_job(job, stage="parsing", progress=10)
+                bim_dict = await self._parse(file_path)
+                await self._cache_parse(file_hash, bim_dict)
+
+            await self._update_job(job, stage="applying", progress=80)
+            bim_data = BIMData.from_dict(bim_dict)
+            building_uuid = uuid.UUID(job["building_id"])
+
+            async with self.session_factory() as session:
+                service = BuildingService(session)
+                building, floors_created, floors_updated = await service.apply_bim_import(
+                    building_uuid, bim_data
+                )
+                if on_building_updated is not None:
+                    try:
+                        await on_building_updated(building)
+                    except Exception as e:
+                        logger.warning("BIM import callback failed", job_id=job["job_id"], error=str(e))
+
+            result = {
+                "building_id": job["building_id"],
+                "bim_data": bim_dict,
+                "floors_created": floors_created,
+                "floors_updated": floors_updated,
+                "locations_found": len(bim_data.key_locations),
+                "ifc_schema": bim_data.ifc_schema,
+            }
+            await self._update_job(
+                job, status=BIMImportStatus.COMPLETED, stage="completed", progress=100, result=result,
+            )
+            logger.info(
+                "BIM import completed",
+                job_id=job["job_id"],
+                building_id=job["building_id"],
+                cached=job["cached"],
+                floors_created=floors_created,
+                floors_updated=floors_updated,
+            )
+        except asyncio.CancelledError:
+            # Shutdown: leave a final state so clients stop polling
+            await self._update_job(
+                job, status=BIMImportStatus.FAILED, stage="cancelled",
+                error="Server shut down while the import was running",
+            )
+            logger.warning("BIM import cancelled", job_id=job["job_id"])
+            raise
+        except (IFCParserError, BuildingError) as e:
+            await self._update_job(job, status=BIMImportStatus.FAILED, stage="failed", error=str(e))
+            logger.warning("BIM import failed", job_id=job["job_id"], error=str(e))
+        except Exception as e:
+            await self._update_job(
+                job, status=BIMImportStatus.FAILED, stage="failed", error="Unexpected error during import",
+            )
+            logger.error("BIM import crashed", job_id=job["job_id"], error=str(e))
+        finally:
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
+
+        return job
+
+    async def _parse(self, file_path: Path) -> dict:
+        """Run the IFC parser off the event loop."""
+        loop = asyncio.get_running_loop()
+        executor = self.executor or _get_parse_executor()
+        return await loop.run_in_executor(executor, self.parse_func, str(file_path))
+
+    async def _get_cached_parse(self, file_hash: str) -> dict | None:
+        """Look up a previous parse of the same file."""
+        try:
+            raw = await self.redis.get(self.parse_cache_key(file_hash))
+        except Exception as e:
+            logger.warning("BIM parse cache read failed", error=str(e))
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def _cache_parse(self, file_hash: str, bim_dict: dict) -> None:
+        """Store a parse result; failures only cost a re-parse later."""
+        try:
+            await self.redis.set(
+                self.parse_cache_key(file_hash), json.dumps(bim_dict), ex=self.cache_ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning("BIM parse cache write failed", error=str(e))
+
+    async def _save_job(self, job: dict) -> None:
+        await self.redis.set(self.job_key(job["job_id"]), json.dumps(job), ex=self.job_ttl_seconds)
+
+    async def _update_job(self, job: dict, status: BIMImportStatus | None = None, **fields: Any) -> None:
+        """Persist a job state change and broadcast it to the building room."""
+        if status is not None:
+            job["status"] = status.value
+        job.update(fields)
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            await self._save_job(job)
+        except Exception as e:
+            logger.error("Failed to save BIM import job", job_id=job["job_id"], error=str(e))
+        await emit_bim_import_progress(job, job["building_id"])
+
+
+_bim_import_queue: BIMImportQueue | None = None
+
+
+async def get_bim_import_queue() -> BIMImportQueue:
+    """Get the process-wide BIM import queue."""
+    global _bim_import_queue
+    if _bim_import_queue is None:
+        from app.core.deps import ingestion_session_factory, get_redis
+
+        _bim_import_queue = BIMImportQueue(
+            redis_client=await get_redis(),
+            session_factory=ingestion_session_factory,
+            job_ttl_seconds=settings.bim_import_job_ttl_seconds,
+            cache_ttl_seconds=settings.bim_parse_cache_ttl_seconds,
+        )
+    return _bim_import_queue
+
+
+async def shutdown_bim_import_queue() -> None:
+    """Stop the queue consumer and the parser process pool."""
+    global _bim_import_queue, _parse_executor
+    if _bim_import_queue is not None:
+        await _bim_import_queue.stop()
+        _bim_import_queue = None
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
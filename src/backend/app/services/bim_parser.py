@@ -73,6 +73,22 @@ class BIMData:
             'ifc_schema': self.ifc_schema,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BIMData":
+        """Rebuild BIMData from the output of to_dict()."""
+        return cls(
+            building_name=data.get('building_name'),
+            total_floors=data.get('total_floors', 0),
+            floors=[BIMFloorInfo(**f) for f in data.get('floors', [])],
+            key_locations=[BIMKeyLocation(**loc) for loc in data.get('key_locations', [])],
+            construction_type=data.get('construction_type'),
+            total_area_sqm=data.get('total_area_sqm'),
+            building_height_m=data.get('building_height_m'),
+            materials=data.get('materials', []),
+            raw_properties=data.get('raw_properties', {}),
+            ifc_schema=data.get('ifc_schema'),
+        )
+
 
 class IFCParserError(Exception):
     """IFC parsing related errors."""
@@ -711,3 +727,15 @@ class IFCParser:
             return ifc.schema if hasattr(ifc, 'schema') else 'UNKNOWN'
         except Exception as e:
             raise IFCParserError(f"Could not determine IFC schema: {str(e)}") from e
+
+
+def parse_ifc_file(file_path: str) -> Dict[str, Any]:
+    """Parse an IFC file and return BIMData.to_dict().
+
+    Module-level so it can be submitted to a ProcessPoolExecutor; the plain
+    dict result is cheap to pickle back to the parent process.
+
+    Raises:
+        IFCParserError: If parsing fails.
+    """
+    return IFCParser().parse_file(file_path).to_dict()
@@ -1,7 +1,7 @@
 """Building Service for emergency response building information management."""
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 import uuid
 import math
 
@@ -19,6 +19,9 @@ from app.models.building import (
 )
 from app.models.agency import Agency
 
+if TYPE_CHECKING:
+    from app.services.bim_parser import BIMData
+
 
 class BuildingError(Exception):
     """Building related errors."""
@@ -262,6 +265,7 @@ class BuildingService:
         floor_name: str | None = None,
         plan_file_url: str | None = None,
         plan_thumbnail_url: str | None = None,
+        plan_image_variants: dict | None = None,
         plan_data: bytes | None = None,
         file_type: str | None = None,
         floor_area_sqm: float | None = None,
@@ -295,6 +299,7 @@ class BuildingService:
             floor_name=floor_name or self._default_floor_name(floor_number),
             plan_file_url=plan_file_url,
             plan_thumbnail_url=plan_thumbnail_url,
+            plan_image_variants=plan_image_variants,
             plan_data=plan_data,
             file_type=file_type,
             floor_area_sqm=floor_area_sqm,
@@ -496,6 +501,92 @@ class BuildingService:
 
         return building
 
+    async def apply_bim_import(
+        self,
+        building_id: uuid.UUID,
+        bim_data: "BIMData",
+    ) -> tuple[Building, int, int]:
+        """Apply parsed IFC data to a building and its floor plans.
+
+        Stores the BIM payload on the building, then creates or updates one
+        FloorPlan per IFC storey with its emergency exits, fire equipment and
+        other key locations.
+
+        Returns:
+            Tuple of (building, floors_created, floors_updated)
+        """
+        building = await self.import_bim_data(
+            building_id,
+            bim_data=bim_data.to_dict(),
+            bim_file_url=None,  # IFC file is not persisted
+        )
+
+        floors_created = 0
+        floors_updated = 0
+
+        existing_floors = await self.get_building_floor_plans(building_id)
+        existing_by_number = {fp.floor_number: fp for fp in existing_floors}
+
+        for floor_info in bim_data.floors:
+            floor_key_locations = [
+                loc.to_dict()
+                for loc in bim_data.key_locations
+                if loc.floor_number == floor_info.floor_number
+            ]
+
+            emergency_exits = [
+                loc for loc in floor_key_locations
+                if loc.get('type') == 'door' and loc.get('properties', {}).get('is_emergency_exit')
+            ]
+
+            fire_equipment = [
+                loc for loc in floor_key_locations
+                if loc.get('type') in ('fire_extinguisher', 'aed')
+            ]
+
+            # Other key locations (stairs, elevators, electrical panels)
+            other_locations = [
+                loc for loc in floor_key_locations
+                if loc.get('type') in ('stairwell', 'elevator', 'electrical_panel', 'door')
+                and not loc.get('properties', {}).get('is_emergency_exit')
+            ]
+
+            existing_fp = existing_by_number.get(floor_info.floor_number)
+            if existing_fp is not None:
+                try:
+                    await self.update_floor_plan(
+                        floor_plan_id=existing_fp.id,
+                        floor_name=floor_info.floor_name or existing_fp.floor_name,
+                        floor_area_sqm=floor_info.area_sqm or existing_fp.floor_area_sqm,
+                        ceiling_height_m=floor_info.ceiling_height_m or existing_fp.ceiling_height_m,
+                        key_locations=other_locations or existing_fp.key_locations,
+                        emergency_exits=emergency_exits or existing_fp.emergency_exits,
+                        fire_equipment=fire_equipment or existing_fp.fire_equipment,
+                        bim_floor_data=floor_info.to_dict(),
+                    )
+                    floors_updated += 1
+                except BuildingError:
+                    pass  # Skip if update fails
+            else:
+                try:
+                    await self.add_floor_plan(
+                        building_id=building_id,
+                        floor_number=floor_info.floor_number,
+                        floor_name=floor_info.floor_name,
+                        floor_area_sqm=floor_info.area_sqm,
+                        ceiling_height_m=floor_info.ceiling_height_m,
+                        key_locations=other_locations or None,
+                        emergency_exits=emergency_exits or None,
+                        fire_equipment=fire_equipment or None,
+                        bim_floor_data=floor_info.to_dict(),
+                    )
+                    floors_created += 1
+                except BuildingError:
+                    pass  # Skip if floor already exists (race condition)
+
+        await self.db.commit()
+        return building, floors_created, floors_updated
+
     # ==================== Statistics ====================
 
     async def get_building_stats(
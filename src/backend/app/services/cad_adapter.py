@@ -17,21 +17,30 @@ Each adapter implements a common interface for:
 """
 
 import asyncio
+import time
 import uuid
 import hashlib
 import json
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from datetime import datetime
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Callable, Awaitable
 
 import httpx
+import structlog
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.metrics import cad_sync_cycle_seconds, cad_sync_errors_total, cad_sync_records_total
 from app.models.incident import Incident, IncidentCategory, IncidentStatus
 from app.models.resource import Resource, ResourceStatus
+from app.services.incident_service import allocate_incident_numbers
+
+logger = structlog.get_logger()
 
 
 class CADVendor(str, Enum):
@@ -656,13 +665,72 @@ class TriTechAdapter(CADAdapter):
         )
 
 
+# CAD unit status codes and the resource status each maps to
+CAD_UNIT_STATUS_MAP = {
+    "available": ResourceStatus.AVAILABLE,
+    "enroute": ResourceStatus.EN_ROUTE,
+    "on_scene": ResourceStatus.ON_SCENE,
+    "busy": ResourceStatus.ASSIGNED,
+    "out_of_service": ResourceStatus.OUT_OF_SERVICE,
+}
+
+# Incident columns a sync cycle owns; everything else is left to dispatchers
+CAD_SYNCED_INCIDENT_COLUMNS = ("title", "description", "category", "priority", "address", "latitude", "longitude")
+
+
+def _upsert_incidents_statement(session: AsyncSession):
+    """INSERT that updates the synced fields when the CAD incident already exists.
+
+    Another sync service for the same vendor (or another worker) may insert
+    the same CAD call between our lookup and this insert; the unique
+    (external_source, external_id) index turns that into an update. The
+    incident number allocated for the losing row is left unused.
+    """
+    dialect = session.bind.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return insert(Incident)
+    stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(Incident)
+    return stmt.on_conflict_do_update(
+        index_elements=[Incident.external_source, Incident.external_id],
+        set_={
+            **{column: stmt.excluded[column] for column in CAD_SYNCED_INCIDENT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+
+
 class CADSyncService:
-    """Service for synchronizing data between CAD and Vigilia."""
+    """Service for synchronizing data between CAD and Vigilia.
+
+    Each cycle fetches incidents and units concurrently and drops records
+    whose fingerprint matches the last committed cycle. The rest are looked
+    up with one ``IN`` query per entity type (incidents by external ID,
+    resources by call sign), and all inserts and updates are written in a
+    single transaction. Fingerprints are only remembered once that
+    transaction commits, so a failed cycle is retried in full.
+    """
 
-    def __init__(self, db: AsyncSession, adapter: CADAdapter):
-        """Initialize sync service."""
-        self.db = db
+    def __init__(
+        self,
+        adapter: CADAdapter,
+        agency_id: uuid.UUID | None = None,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ):
+        """Initialize sync service.
+
+        Args:
+            adapter: CAD adapter to pull from
+            agency_id: Agency that owns created incidents and matched resources
+            session_factory: Session factory (defaults to the ingestion pool)
+        """
+        if session_factory is None:
+            from app.core.deps import ingestion_session_factory
+            session_factory = ingestion_session_factory
         self.adapter = adapter
+        self.agency_id = agency_id
+        self.session_factory = session_factory
+        self.last_sync: datetime | None = None
+        self._fingerprints: dict[tuple[str, str], str] = {}
         self._running = False
         self._sync_task: asyncio.Task | None = None
 
@@ -689,113 +757,188 @@ class CADSyncService:
 
     async def _sync_loop(self, interval: int) -> None:
         """Background sync loop."""
-        last_sync: datetime | None = None
-
         while self._running:
             try:
-                # Fetch new incidents
-                incidents = await self.adapter.fetch_incidents(
-                    since=last_sync,
-                    active_only=True,
-                )
-
-                for cad_incident in incidents:
-                    await self._process_cad_incident(cad_incident)
-
-                # Fetch unit updates
-                units = await self.adapter.fetch_units()
-                for cad_unit in units:
-                    await self._process_cad_unit(cad_unit)
-
-                last_sync = datetime.utcnow()
-
-            except Exception:
-                pass
+                await self.sync_once()
+            except Exception as e:
+                logger.error("CAD sync cycle failed", vendor=self.adapter.vendor.value, error=str(e))
 
             await asyncio.sleep(interval)
 
-    async def _process_cad_incident(self, cad_incident: CADIncident) -> Incident | None:
-        """Process a CAD incident - create or update in database."""
-        from sqlalchemy import select
+    async def sync_once(self) -> dict[str, Counter]:
+        """Run one sync cycle.
 
-        # Check if incident already exists
-        result = await self.db.execute(
-            select(Incident).where(
-                Incident.external_id == cad_incident.cad_id
+        Returns:
+            Outcome counts per entity type, e.g. ``{"incident": {"created": 2}}``
+        """
+        vendor = self.adapter.vendor.value
+        cycle_started = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            incidents, units = await asyncio.gather(
+                self.adapter.fetch_incidents(since=self.last_sync, active_only=True),
+                self.adapter.fetch_units(),
+            )
+            outcomes = {"incident": Counter(), "unit": Counter()}
+            changed_incidents, incident_prints = self._changed(
+                "incident", {i.cad_id: i for i in incidents}, outcomes["incident"]
+            )
+            changed_units, unit_prints = self._changed(
+                "unit", {u.call_sign: u for u in units if u.call_sign}, outcomes["unit"]
             )
-        )
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            # Update existing incident
-            existing.title = f"{cad_incident.call_type}: {cad_incident.address}"
-            existing.description = cad_incident.description or ""
-            existing.priority = cad_incident.priority
-            # Map CAD status to internal status
-            # (would need status mapping logic)
-            await self.db.commit()
-            return existing
-
-        # Create new incident
-        incident = Incident(
-            id=uuid.uuid4(),
-            incident_number=cad_incident.incident_number,
-            title=f"{cad_incident.call_type}: {cad_incident.address}",
-            description=cad_incident.description or "",
-            category=self.adapter.map_call_type_to_category(cad_incident.call_type),
-            priority=cad_incident.priority,
-            status=IncidentStatus.NEW,
-            location_address=cad_incident.address,
-            location_city=cad_incident.city,
-            location_state=cad_incident.state,
-            location_zip=cad_incident.postal_code,
-            latitude=cad_incident.latitude,
-            longitude=cad_incident.longitude,
-            caller_name=cad_incident.caller_name,
-            caller_phone=cad_incident.caller_phone,
-            external_id=cad_incident.cad_id,
-            external_source=self.adapter.vendor.value,
-        )
-
-        self.db.add(incident)
-        await self.db.commit()
-        await self.db.refresh(incident)
-
-        return incident
-
-    async def _process_cad_unit(self, cad_unit: CADUnit) -> Resource | None:
-        """Process a CAD unit - update resource status."""
-        from sqlalchemy import select
 
-        # Find matching resource by call sign
-        result = await self.db.execute(
-            select(Resource).where(
-                Resource.call_sign == cad_unit.call_sign
+            if changed_incidents or changed_units:
+                async with self.session_factory() as session:
+                    await self._upsert_incidents(session, changed_incidents, outcomes["incident"])
+                    await self._update_resources(session, changed_units, outcomes["unit"])
+                    await session.commit()
+        except Exception:
+            cad_sync_errors_total.labels(vendor=vendor).inc()
+            raise
+        finally:
+            cad_sync_cycle_seconds.labels(vendor=vendor).observe(time.perf_counter() - started)
+
+        self._fingerprints.update(incident_prints)
+        self._fingerprints.update(unit_prints)
+        self.last_sync = cycle_started
+        for entity, counts in outcomes.items():
+            for outcome, count in counts.items():
+                cad_sync_records_total.labels(vendor=vendor, entity=entity, outcome=outcome).inc(count)
+        return outcomes
+
+    def _changed(
+        self,
+        entity: str,
+        records: dict[str, CADIncident | CADUnit],
+        outcomes: Counter,
+    ) -> tuple[dict[str, Any], dict[tuple[str, str], str]]:
+        """Split out records whose content differs from the last committed cycle."""
+        changed = {}
+        fingerprints = {}
+        for key, record in records.items():
+            fields = asdict(record)
+            fields.pop("raw_data")
+            fingerprint = hashlib.sha256(
+                json.dumps(fields, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            if self._fingerprints.get((entity, key)) == fingerprint:
+                outcomes["unchanged"] += 1
+                continue
+            changed[key] = record
+            fingerprints[(entity, key)] = fingerprint
+        return changed, fingerprints
+
+    async def _upsert_incidents(
+        self,
+        session: AsyncSession,
+        cad_incidents: dict[str, CADIncident],
+        outcomes: Counter,
+    ) -> None:
+        """Insert new and update changed incidents, keyed by CAD ID."""
+        if not cad_incidents:
+            return
+        source = self.adapter.vendor.value
+        existing = await self._existing_incidents(session, source, list(cad_incidents))
+
+        inserts = []
+        updates = []
+        for cad_id, cad_incident in cad_incidents.items():
+            values = {
+                "title": f"{cad_incident.call_type}: {cad_incident.address}"[:200],
+                "description": cad_incident.description or "",
+                "category": self.adapter.map_call_type_to_category(cad_incident.call_type),
+                "priority": cad_incident.priority,
+                "address": cad_incident.address,
+            }
+            if cad_incident.latitude is not None and cad_incident.longitude is not None:
+                values["latitude"] = cad_incident.latitude
+                values["longitude"] = cad_incident.longitude
+
+            incident = existing.get(cad_id)
+            if incident is not None:
+                if any(getattr(incident, column) != value for column, value in values.items()):
+                    updates.append({"id": incident.id, **values})
+                    outcomes["updated"] += 1
+                else:
+                    outcomes["unchanged"] += 1
+            elif self.agency_id is None or "latitude" not in values:
+                # Incidents need an owning agency and a location
+                outcomes["skipped"] += 1
+            else:
+                inserts.append({
+                    "id": uuid.uuid4(),
+                    "status": IncidentStatus.NEW,
+                    "reported_at": cad_incident.received_at or datetime.now(timezone.utc),
+                    "agency_id": self.agency_id,
+                    "external_source": source,
+                    "external_id": cad_id,
+                    **values,
+                })
+                outcomes["created"] += 1
+
+        if inserts:
+            # CAD numbers may be blank or collide across vendors; the CAD
+            # record is identified by (external_source, external_id) instead
+            numbers = await allocate_incident_numbers(session, len(inserts))
+            for row, number in zip(inserts, numbers):
+                row["incident_number"] = number
+            await session.execute(_upsert_incidents_statement(session), inserts)
+        if updates:
+            await session.execute(update(Incident), updates)
+
+    @staticmethod
+    async def _existing_incidents(
+        session: AsyncSession,
+        source: str,
+        cad_ids: list[str],
+    ) -> dict[str, Incident]:
+        """Incidents already synced from ``source``, keyed by CAD ID."""
+        result = await session.execute(
+            select(Incident).where(
+                Incident.external_source == source,
+                Incident.external_id.in_(cad_ids),
             )
         )
-        resource = result.scalar_one_or_none()
-
-        if not resource:
-            return None
+        return {incident.external_id: incident for incident in result.scalars()}
 
-        # Update location if provided
-        if cad_unit.latitude and cad_unit.longitude:
-            resource.current_latitude = cad_unit.latitude
-            resource.current_longitude = cad_unit.longitude
-
-        # Map CAD status to resource status
-        status_map = {
-            "available": ResourceStatus.AVAILABLE,
-            "enroute": ResourceStatus.DISPATCHED,
-            "on_scene": ResourceStatus.ON_SCENE,
-            "busy": ResourceStatus.BUSY,
-            "out_of_service": ResourceStatus.OUT_OF_SERVICE,
-        }
-        if cad_unit.status.lower() in status_map:
-            resource.status = status_map[cad_unit.status.lower()]
-
-        await self.db.commit()
-        return resource
+    async def _update_resources(
+        self,
+        session: AsyncSession,
+        cad_units: dict[str, CADUnit],
+        outcomes: Counter,
+    ) -> None:
+        """Apply CAD unit location and status to resources, keyed by call sign."""
+        if not cad_units:
+            return
+        query = select(Resource).where(
+            Resource.call_sign.in_(list(cad_units)),
+            Resource.deleted_at.is_(None),
+        )
+        if self.agency_id is not None:
+            query = query.where(Resource.agency_id == self.agency_id)
+        resources = {resource.call_sign: resource for resource in (await session.execute(query)).scalars()}
+
+        updates = []
+        for call_sign, cad_unit in cad_units.items():
+            resource = resources.get(call_sign)
+            if resource is None:
+                outcomes["skipped"] += 1
+                continue
+            values = {}
+            if cad_unit.latitude and cad_unit.longitude:
+                values["current_latitude"] = cad_unit.latitude
+                values["current_longitude"] = cad_unit.longitude
+            status = CAD_UNIT_STATUS_MAP.get(cad_unit.status.lower())
+            if status is not None:
+                values["status"] = status
+            if any(getattr(resource, column) != value for column, value in values.items()):
+                updates.append({"id": resource.id, **values})
+                outcomes["updated"] += 1
+            else:
+                outcomes["unchanged"] += 1
+
+        if updates:
+            await session.execute(update(Resource), updates)
 
     async def sync_incident_to_cad(self, incident: Incident) -> bool:
         """Sync an incident update back to CAD."""
@@ -823,13 +966,7 @@ class CADSyncService:
             return False
 
         # Map internal status to CAD status
-        status_map = {
-            ResourceStatus.AVAILABLE: "available",
-            ResourceStatus.DISPATCHED: "enroute",
-            ResourceStatus.ON_SCENE: "on_scene",
-            ResourceStatus.BUSY: "busy",
-            ResourceStatus.OUT_OF_SERVICE: "out_of_service",
-        }
+        status_map = {status: code for code, status in CAD_UNIT_STATUS_MAP.items()}
 
         return await self.adapter.send_unit_status(
             unit_id=resource.call_sign,
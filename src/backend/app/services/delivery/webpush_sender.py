@@ -0,0 +1,181 @@
+"""Asynchronous Web Push sender.
+
+``pywebpush.webpush`` is synchronous: every call opens a new HTTPS
+connection to the push service and signs a fresh VAPID JWT, and callers that
+used it on the event loop sent one subscription at a time. WebPushSender
+goes through pywebpush's aiohttp path instead:
+
+- one pooled ``aiohttp.ClientSession`` per process, so connections to each
+  push service (FCM, Mozilla autopush, APNs web push) are reused;
+- VAPID headers are signed once per push-service origin and reused until
+  shortly before their ``exp`` claim;
+- messages are sent concurrently, bounded by a semaphore;
+- 404/410 responses are reported as expired so callers can prune the
+  subscription.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import aiohttp
+import structlog
+from py_vapid import Vapid
+from pywebpush import WebPusher
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Push service answers meaning the subscription no longer exists
+EXPIRED_STATUSES = frozenset({404, 410})
+# VAPID JWT lifetime (the spec allows at most 24 hours)
+VAPID_TTL_SECONDS = 12 * 60 * 60
+# Re-sign this long before the cached token expires
+VAPID_REFRESH_MARGIN_SECONDS = 60 * 60
+
+
+@dataclass
+class PushTarget:
+    """One browser subscription to deliver to."""
+
+    endpoint: str
+    p256dh: str
+    auth: str
+    subscription_id: uuid.UUID | None = None
+
+    def subscription_info(self) -> dict:
+        return {"endpoint": self.endpoint, "keys": {"p256dh": self.p256dh, "auth": self.auth}}
+
+
+@dataclass
+class PushResult:
+    """Outcome of one push message."""
+
+    target: PushTarget
+    success: bool
+    status: int | None = None
+    error: str | None = None
+
+    @property
+    def expired(self) -> bool:
+        """Whether the push service reported the subscription as gone."""
+        return self.status in EXPIRED_STATUSES
+
+
+class WebPushSender:
+    """Concurrent Web Push delivery over a shared connection pool."""
+
+    def __init__(
+        self,
+        private_key: str,
+        mailto: str,
+        max_concurrency: int = 100,
+        timeout_seconds: float = 10.0,
+        ttl: int = 0,
+        session: aiohttp.ClientSession | None = None,
+    ):
+        if os.path.isfile(private_key):
+            self._vapid = Vapid.from_file(private_key_file=private_key)
+        else:
+            self._vapid = Vapid.from_string(private_key=private_key)
+        self.mailto = mailto
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.ttl = ttl
+        self._session = session
+        self._owns_session = session is None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # push service origin -> (refresh at, signed headers)
+        self._vapid_headers: dict[str, tuple[float, dict[str, str]]] = {}
+
+    def _client(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300),
+            )
+            self._owns_session = True
+        return self._session
+
+    def vapid_headers(self, endpoint: str) -> dict[str, str]:
+        """Signed VAPID headers for the endpoint's push service, cached per origin."""
+        parts = urlsplit(endpoint)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        now = time.time()
+        cached = self._vapid_headers.get(origin)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        expires_at = int(now) + VAPID_TTL_SECONDS
+        headers = self._vapid.sign({"sub": self.mailto, "aud": origin, "exp": expires_at})
+        self._vapid_headers[origin] = (expires_at - VAPID_REFRESH_MARGIN_SECONDS, headers)
+        return headers
+
+    async def send(self, target: PushTarget, data: str) -> PushResult:
+        """Encrypt and send one message."""
+        async with self._slots:
+            try:
+                response = await WebPusher(
+                    target.subscription_info(), aiohttp_session=self._client()
+                ).send_async(
+                    data,
+                    headers=dict(self.vapid_headers(target.endpoint)),
+                    ttl=self.ttl,
+                    content_encoding="aes128gcm",
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                logger.error("Push send failed", subscription_id=str(target.subscription_id), error=str(e))
+                return PushResult(target, False, error=str(e) or type(e).__name__)
+
+        if response.status <= 202:
+            return PushResult(target, True, status=response.status)
+        error = f"Push failed: {response.status} {response.reason}"
+        if response.status in EXPIRED_STATUSES:
+            logger.info("Push subscription expired", subscription_id=str(target.subscription_id))
+        else:
+            logger.error(
+                "Push send failed",
+                subscription_id=str(target.subscription_id),
+                status=response.status,
+            )
+        return PushResult(target, False, status=response.status, error=error)
+
+    async def send_many(self, messages: Iterable[tuple[PushTarget, str]]) -> list[PushResult]:
+        """Send messages concurrently; results are in input order."""
+        return list(await asyncio.gather(*(self.send(target, data) for target, data in messages)))
+
+    async def close(self) -> None:
+        """Close the connection pool (if this sender created it)."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_sender: WebPushSender | None = None
+
+
+def get_webpush_sender() -> WebPushSender | None:
+    """The process-wide sender, or None when VAPID keys are not configured."""
+    global _sender
+    if _sender is None and settings.vapid_private_key:
+        _sender = WebPushSender(
+            settings.vapid_private_key,
+            settings.vapid_mailto,
+            max_concurrency=settings.webpush_max_concurrency,
+            timeout_seconds=settings.webpush_timeout_seconds,
+        )
+    return _sender
+
+
+async def shutdown_webpush_sender() -> None:
+    """Close the shared connection pool."""
+    global _sender
+    if _sender is not None:
+        await _sender.close()
+        _sender = None
@@ -0,0 +1,120 @@
+"""Axis device identity cache.
+
+Audio events identify their camera by serial number or IP address, and
+resolving that to an IoTDevice cost up to two queries per event. This
+in-process cache maps the Axis identifier to the device id (or to "no such
+device", for a shorter time), so the pipeline only loads devices by primary
+key.
+
+Entries are dropped whenever a flush inserts a device, deletes one, or
+changes its serial number, IP address or ``deleted_at``, whichever code path
+does it. Changes made by another worker are covered by the pipeline checking
+that a cached device still carries the identifier, and by the TTL.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.device import IoTDevice
+
+IDENTITY_ATTRIBUTES = ("serial_number", "ip_address", "deleted_at")
+
+
+class DeviceIdentityCache:
+    """LRU of Axis identifier -> IoTDevice id, with negative entries."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 300.0,
+        negative_ttl_seconds: float = 30.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, uuid.UUID | None]] = OrderedDict()
+
+    def get(self, identifier: str) -> tuple[bool, uuid.UUID | None]:
+        """Look up an identifier.
+
+        Returns:
+            ``(hit, device_id)``; a hit with ``device_id`` None means the
+            identifier recently matched no device.
+        """
+        entry = self._entries.get(identifier)
+        if entry is None:
+            return False, None
+        expires_at, device_id = entry
+        if expires_at <= time.monotonic():
+            del self._entries[identifier]
+            return False, None
+        self._entries.move_to_end(identifier)
+        return True, device_id
+
+    def put(self, identifier: str, device_id: uuid.UUID | None) -> None:
+        """Cache the device an identifier resolved to (None for no match)."""
+        ttl = self.ttl_seconds if device_id is not None else self.negative_ttl_seconds
+        self._entries[identifier] = (time.monotonic() + ttl, device_id)
+        self._entries.move_to_end(identifier)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, identifier: str) -> None:
+        """Drop one identifier."""
+        self._entries.pop(identifier, None)
+
+    def invalidate(self, identifiers: set[str], device_ids: set[uuid.UUID]) -> None:
+        """Drop the given identifiers and every entry pointing at the given devices."""
+        for identifier in identifiers:
+            self._entries.pop(identifier, None)
+        if device_ids:
+            stale = [k for k, (_, device_id) in self._entries.items() if device_id in device_ids]
+            for identifier in stale:
+                del self._entries[identifier]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+
+device_identity_cache = DeviceIdentityCache(
+    max_entries=settings.device_identity_cache_max_entries,
+    ttl_seconds=settings.device_identity_cache_ttl_seconds,
+)
+
+
+def _identifiers(device: IoTDevice) -> set[str]:
+    state = inspect(device)
+    identifiers = set()
+    for attr in ("serial_number", "ip_address"):
+        history = state.attrs[attr].history
+        for value in (*history.added, *history.unchanged, *history.deleted):
+            if value:
+                identifiers.add(value)
+    return identifiers
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_devices(session: Session, flush_context) -> None:
+    """Evict devices whose identity changed in this flush."""
+    identifiers: set[str] = set()
+    device_ids: set[uuid.UUID] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, IoTDevice):
+            continue
+        if obj in session.dirty and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[a].history.has_changes() for a in IDENTITY_ATTRIBUTES):
+                continue
+        identifiers |= _identifiers(obj)
+        if obj.id is not None:
+            device_ids.add(obj.id)
+    if identifiers or device_ids:
+        device_identity_cache.invalidate(identifiers, device_ids)
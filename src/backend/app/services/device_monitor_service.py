@@ -40,7 +40,7 @@ class DeviceMonitorService:
             return
         self._running = True
         self._task = asyncio.create_task(self._monitor_loop(), name="device_monitor")
-        logger.info("Device monitor service started", poll_interval=self.poll_interval)
+        logger.info("Device monitor service started (poll interval %ss)", self.poll_interval)
 
     async def stop(self) -> None:
         """Stop the monitoring loop."""
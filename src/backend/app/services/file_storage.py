@@ -1,18 +1,46 @@
-"""File storage service for managing uploaded files."""
+"""File storage service for managing uploaded files.
 
+Uploads are streamed to disk in fixed-size chunks with size and magic-byte
+checks applied as data arrives. Blocking file I/O runs via asyncio.to_thread
+and Pillow rendering runs on a small dedicated thread pool, so large uploads
+never stall the event loop.
+"""
+
+import asyncio
 import os
 import uuid
 import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import BinaryIO
+from typing import BinaryIO, Protocol
 
 from PIL import Image
-import io
 
 logger = logging.getLogger(__name__)
 
+# Pillow work (decode/resize/encode) is CPU-bound; keep it off the event loop
+# and bounded so a burst of uploads cannot starve the default executor.
+_image_executor: ThreadPoolExecutor | None = None
+
+
+def _get_image_executor() -> ThreadPoolExecutor:
+    """Get the shared executor used for image rendering."""
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('IMAGE_WORKERS', '2')),
+            thread_name_prefix='image-render',
+        )
+    return _image_executor
+
+
+class AsyncReadable(Protocol):
+    """Anything with an async read(size) method, e.g. FastAPI's UploadFile."""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
 
 class FileStorageError(Exception):
     """File storage related errors."""
@@ -41,9 +69,34 @@ class FileStorageService:
     # Maximum file size (50MB)
     MAX_FILE_SIZE = 50 * 1024 * 1024
 
+    # Upload read/write chunk size (1MB)
+    CHUNK_SIZE = 1024 * 1024
+
     # Thumbnail settings
     THUMBNAIL_SIZE = (300, 300)
 
+    # Image renditions produced from a single decode, each written in every
+    # IMAGE_FORMATS format as "<original stem>_<variant>.<format>". They are
+    # served with ?variant=&format= on the original's URL and deleted with it.
+    IMAGE_VARIANTS = {
+        'thumb': THUMBNAIL_SIZE,
+        'preview': (1600, 1600),
+    }
+    # Output formats of each variant; the first is the fallback for clients
+    # that do not accept the others
+    IMAGE_FORMATS = ('jpg', 'webp')
+
+    # Magic bytes checked against the first chunk of an upload. Text formats
+    # (SVG) and DWG (many version headers) are not sniffed.
+    FILE_SIGNATURES = {
+        'png': (b'\x89PNG\r\n\x1a\n',),
+        'jpg': (b'\xff\xd8\xff',),
+        'pdf': (b'%PDF',),
+        'gif': (b'GIF87a', b'GIF89a'),
+        'webp': (b'RIFF',),
+        'ifc': (b'ISO-10303-21', b'\xef\xbb\xbfISO-10303-21'),
+    }
+
     def __init__(self, base_path: str = "/data/buildings"):
         """Initialize file storage service.
 
@@ -72,7 +125,13 @@ class FileStorageService:
             logger.debug(f"Building path ready: {path}")
         except PermissionError as e:
             logger.error(f"Cannot create building directory {path}: {e}")
-            raise FileStorageError(f"Cannot create storage directory: permission denied")
+            raise FileStorageError("Cannot create storage directory: permission denied")
+        return path
+
+    def get_building_subdir(self, building_id: uuid.UUID, kind: str) -> Path:
+        """Get (and create) a sibling storage directory such as documents or photos."""
+        path = self._get_building_path(building_id).parent / kind
+        path.mkdir(parents=True, exist_ok=True)
         return path
 
     def _generate_filename(
@@ -112,13 +171,99 @@ class FileStorageService:
             )
 
         # Check file size
-        if file_size > self.MAX_FILE_SIZE:
-            max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
+        self._check_size(file_size, self.MAX_FILE_SIZE)
+
+        return self.ALLOWED_FLOOR_PLAN_TYPES[content_type]
+
+    @staticmethod
+    def _check_size(file_size: int, max_size: int) -> None:
+        """Raise FileStorageError if file_size exceeds max_size."""
+        if file_size > max_size:
+            max_mb = max_size / (1024 * 1024)
             raise FileStorageError(
                 f"File too large. Maximum size is {max_mb:.0f}MB"
             )
 
-        return self.ALLOWED_FLOOR_PLAN_TYPES[content_type]
+    def _check_signature(self, head: bytes, extension: str) -> None:
+        """Verify the leading bytes of a file match its declared type."""
+        signatures = self.FILE_SIGNATURES.get('jpg' if extension == 'jpeg' else extension)
+        if not signatures or not head:
+            return
+        if not any(head.startswith(sig) for sig in signatures):
+            raise FileStorageError(
+                f"File content does not match declared type: {extension}"
+            )
+
+    async def stream_to_file(
+        self,
+        source: AsyncReadable,
+        dest_path: Path,
+        max_size: int | None = None,
+        extension: str | None = None,
+    ) -> int:
+        """Stream an upload to disk chunk by chunk.
+
+        The size limit is enforced as bytes arrive and the first chunk is
+        checked against FILE_SIGNATURES, so oversized or mislabelled uploads
+        are rejected without ever being held in memory. Partial files are
+        removed on failure.
+
+        Args:
+            source: Async readable upload (e.g. UploadFile)
+            dest_path: Destination file path
+            max_size: Maximum accepted size in bytes (defaults to MAX_FILE_SIZE)
+            extension: Declared file extension, used for magic-byte checks
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            FileStorageError: If validation or the write fails
+        """
+        max_size = self.MAX_FILE_SIZE if max_size is None else max_size
+        total = 0
+
+        try:
+            f = await asyncio.to_thread(open, dest_path, 'wb')
+        except PermissionError as e:
+            logger.error(f"Permission denied writing file {dest_path}: {e}")
+            raise FileStorageError("Cannot write file: permission denied")
+
+        try:
+            try:
+                while chunk := await source.read(self.CHUNK_SIZE):
+                    if total == 0 and extension:
+                        self._check_signature(chunk, extension)
+                    total += len(chunk)
+                    self._check_size(total, max_size)
+                    await asyncio.to_thread(f.write, chunk)
+                await asyncio.to_thread(self._flush_and_sync, f)
+            finally:
+                await asyncio.to_thread(f.close)
+        except FileStorageError:
+            dest_path.unlink(missing_ok=True)
+            raise
+        except OSError as e:
+            dest_path.unlink(missing_ok=True)
+            logger.error(f"OS error writing file {dest_path}: {e}")
+            raise FileStorageError(f"Cannot write file: {e}")
+
+        logger.info(f"Upload streamed to {dest_path} ({total} bytes)")
+        return total
+
+    @staticmethod
+    def _flush_and_sync(f: BinaryIO) -> None:
+        """Flush Python buffers and force the file to disk."""
+        f.flush()
+        os.fsync(f.fileno())
+
+    @staticmethod
+    def _write_file(file_path: Path, content: bytes) -> None:
+        """Write and fsync a complete file (runs in a worker thread)."""
+        with open(file_path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())  # Force write to disk
 
     async def save_floor_plan(
         self,
@@ -127,7 +272,10 @@ class FileStorageService:
         file_content: bytes,
         content_type: str,
     ) -> tuple[str, str | None, str]:
-        """Save a floor plan file.
+        """Save a floor plan file from in-memory content.
+
+        Prefer save_floor_plan_upload for request bodies, which streams
+        instead of buffering the whole file.
 
         Args:
             building_id: UUID of the building
@@ -150,17 +298,53 @@ class FileStorageService:
 
         # Save file
         try:
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-                f.flush()
-                os.fsync(f.fileno())  # Force write to disk
+            await asyncio.to_thread(self._write_file, file_path, file_content)
         except PermissionError as e:
             logger.error(f"Permission denied writing file {file_path}: {e}")
-            raise FileStorageError(f"Cannot write file: permission denied")
+            raise FileStorageError("Cannot write file: permission denied")
         except OSError as e:
             logger.error(f"OS error writing file {file_path}: {e}")
             raise FileStorageError(f"Cannot write file: {e}")
 
+        return await self._finalize_floor_plan(building_id, file_path, extension)
+
+    async def save_floor_plan_upload(
+        self,
+        building_id: uuid.UUID,
+        floor_number: int,
+        upload: AsyncReadable,
+        content_type: str,
+        declared_size: int | None = None,
+    ) -> tuple[str, str | None, str]:
+        """Stream a floor plan upload to disk.
+
+        Args:
+            building_id: UUID of the building
+            floor_number: Floor number for this plan
+            upload: Async readable upload body
+            content_type: MIME type of the file
+            declared_size: Size reported by the client, if known (checked up front)
+
+        Returns:
+            Tuple of (file_url, thumbnail_url, file_type)
+        """
+        extension = self.validate_file(content_type, declared_size or 0)
+
+        building_path = self._get_building_path(building_id)
+        filename = self._generate_filename(floor_number, extension)
+        file_path = building_path / filename
+
+        await self.stream_to_file(upload, file_path, self.MAX_FILE_SIZE, extension)
+
+        return await self._finalize_floor_plan(building_id, file_path, extension)
+
+    async def _finalize_floor_plan(
+        self,
+        building_id: uuid.UUID,
+        file_path: Path,
+        extension: str,
+    ) -> tuple[str, str | None, str]:
+        """Verify a saved floor plan, render thumbnails and build URLs."""
         # Verify file was saved
         if file_path.exists():
             file_size = file_path.stat().st_size
@@ -172,50 +356,99 @@ class FileStorageService:
         # Generate thumbnail for images
         thumbnail_url = None
         if extension in ('png', 'jpg', 'jpeg'):
-            thumbnail_url = await self._generate_thumbnail(
-                building_id,
-                floor_number,
-                file_content,
-                extension,
-            )
+            variants = await self.render_image_variants(file_path)
+            if 'thumb' in variants:
+                thumbnail_url = (
+                    f"/api/v1/buildings/{building_id}/floor-plans/files/{variants['thumb']['jpg']}"
+                )
 
         # Generate URL (relative path for API serving)
-        file_url = f"/api/v1/buildings/{building_id}/floor-plans/files/{filename}"
+        file_url = f"/api/v1/buildings/{building_id}/floor-plans/files/{file_path.name}"
 
         return file_url, thumbnail_url, extension
 
-    async def _generate_thumbnail(
+    async def save_document_upload(
         self,
         building_id: uuid.UUID,
-        floor_number: int,
-        file_content: bytes,
+        upload: AsyncReadable,
         extension: str,
-    ) -> str | None:
-        """Generate a thumbnail for an image file."""
-        try:
-            # Open image
-            img = Image.open(io.BytesIO(file_content))
+        declared_size: int | None = None,
+    ) -> tuple[str, int]:
+        """Stream a building document to disk.
+
+        Returns:
+            Tuple of (filename, file_size)
+        """
+        self._check_size(declared_size or 0, self.MAX_FILE_SIZE)
+        filename = f"doc_{uuid.uuid4().hex[:8]}.{extension}"
+        file_path = self.get_building_subdir(building_id, "documents") / filename
+        file_size = await self.stream_to_file(upload, file_path, self.MAX_FILE_SIZE, extension)
+        return filename, file_size
+
+    async def save_photo_upload(
+        self,
+        building_id: uuid.UUID,
+        upload: AsyncReadable,
+        extension: str,
+        declared_size: int | None = None,
+    ) -> tuple[str, str | None, int]:
+        """Stream a building photo to disk and render its image variants.
 
-            # Convert to RGB if necessary (for PNG with transparency)
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
+        Returns:
+            Tuple of (filename, thumbnail_filename or None, file_size)
+        """
+        self._check_size(declared_size or 0, self.MAX_FILE_SIZE)
+        filename = f"photo_{uuid.uuid4().hex[:8]}.{extension}"
+        file_path = self.get_building_subdir(building_id, "photos") / filename
+        file_size = await self.stream_to_file(upload, file_path, self.MAX_FILE_SIZE, extension)
+
+        variants = await self.render_image_variants(file_path)
+        thumb = variants['thumb']['jpg'] if 'thumb' in variants else None
+        return filename, thumb, file_size
+
+    def image_variant_filenames(self, filename: str) -> dict[str, dict[str, str]]:
+        """Names of the renditions of a stored image, by variant then format.
 
-            # Create thumbnail
-            img.thumbnail(self.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        Rendering writes all of them or none, so they exist whenever the
+        original has a thumbnail.
+        """
+        stem = Path(filename).stem
+        return {
+            name: {fmt: f"{stem}_{name}.{fmt}" for fmt in self.IMAGE_FORMATS}
+            for name in self.IMAGE_VARIANTS
+        }
 
-            # Save thumbnail
-            building_path = self._get_building_path(building_id)
-            thumb_filename = self._generate_filename(floor_number, 'jpg', 'thumb')
-            thumb_path = building_path / thumb_filename
+    async def render_image_variants(
+        self,
+        source_path: Path,
+        sizes: dict[str, tuple[int, int]] | None = None,
+    ) -> dict[str, dict[str, str]]:
+        """Render resized JPEG and WebP copies of an image off the event loop.
 
-            img.save(thumb_path, 'JPEG', quality=85)
+        Thumbnails are optional, so failures are logged and yield an empty
+        dict; renditions written before the failure are removed.
 
-            return f"/api/v1/buildings/{building_id}/floor-plans/files/{thumb_filename}"
+        Args:
+            source_path: Path of the stored original
+            sizes: Mapping of variant name to bounding box (defaults to IMAGE_VARIANTS)
 
+        Returns:
+            Mapping of variant name to format to filename
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                _get_image_executor(),
+                _render_variants,
+                source_path,
+                sizes or self.IMAGE_VARIANTS,
+                self.IMAGE_FORMATS,
+            )
         except Exception as e:
             # Log error but don't fail - thumbnail is optional
-            print(f"Failed to generate thumbnail: {e}")
-            return None
+            logger.warning(f"Failed to generate thumbnails for {source_path}: {e}")
+            await asyncio.to_thread(self._unlink_variants, source_path)
+            return {}
 
     def get_file_path(
         self,
@@ -256,6 +489,31 @@ class FileStorageService:
 
         return None
 
+    def get_building_file_path(
+        self,
+        building_id: uuid.UUID,
+        kind: str,
+        filename: str,
+    ) -> Path | None:
+        """Get the path of a stored document or photo, guarding against traversal.
+
+        Args:
+            building_id: UUID of the building
+            kind: Storage subdirectory ("documents" or "photos")
+            filename: Name of the file
+
+        Returns:
+            Full path to the file, or None if not found or outside the directory
+        """
+        directory = self._get_building_path(building_id).parent / kind
+        file_path = directory / filename
+        try:
+            file_path.resolve().relative_to(directory.resolve())
+        except ValueError:
+            logger.warning(f"Path traversal attempt detected: {filename}")
+            return None
+        return file_path if file_path.is_file() else None
+
     def delete_file(
         self,
         building_id: uuid.UUID,
@@ -273,9 +531,34 @@ class FileStorageService:
         file_path = self.get_file_path(building_id, filename)
         if file_path:
             file_path.unlink()
+            self._unlink_variants(file_path)
+            return True
+        return False
+
+    def delete_building_file(
+        self,
+        building_id: uuid.UUID,
+        kind: str,
+        filename: str,
+    ) -> bool:
+        """Delete a stored document or photo along with its image variants.
+
+        Returns:
+            True if deleted, False if not found
+        """
+        file_path = self.get_building_file_path(building_id, kind, filename)
+        if file_path:
+            file_path.unlink()
+            self._unlink_variants(file_path)
             return True
         return False
 
+    def _unlink_variants(self, original_path: Path) -> None:
+        """Remove every rendition of an image (any that exist)."""
+        for formats in self.image_variant_filenames(original_path.name).values():
+            for variant_name in formats.values():
+                original_path.with_name(variant_name).unlink(missing_ok=True)
+
     def delete_building_files(self, building_id: uuid.UUID) -> int:
         """Delete all files for a building.
 
@@ -319,11 +602,53 @@ class FileStorageService:
             'jpeg': 'image/jpeg',
             'pdf': 'application/pdf',
             'svg': 'image/svg+xml',
+            'webp': 'image/webp',
             'dwg': 'application/octet-stream',
         }
         return content_types.get(ext, 'application/octet-stream')
 
 
+# Pillow encoder and options per output format
+_IMAGE_ENCODERS = {
+    'jpg': ('JPEG', {'quality': 85}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+
+def _render_variants(
+    source_path: Path,
+    sizes: dict[str, tuple[int, int]],
+    formats: tuple[str, ...],
+) -> dict[str, dict[str, str]]:
+    """Decode an image once and write every requested rendition.
+
+    Runs in the image executor. Variants are produced largest first, each one
+    downscaled from the previous, so only the first resize touches the
+    full-resolution bitmap. JPEG draft mode lets libjpeg decode at reduced
+    scale when the largest variant is much smaller than the original.
+    """
+    ordered = sorted(sizes.items(), key=lambda item: item[1][0] * item[1][1], reverse=True)
+    written: dict[str, dict[str, str]] = {}
+
+    with Image.open(source_path) as original:
+        largest = ordered[0][1]
+        original.draft('RGB', largest)
+
+        # Convert to RGB if necessary (for PNG with transparency)
+        img = original.convert('RGB') if original.mode != 'RGB' else original.copy()
+
+        for name, box in ordered:
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+            stem = f"{source_path.stem}_{name}"
+            written[name] = {}
+            for fmt in formats:
+                encoder, options = _IMAGE_ENCODERS[fmt]
+                img.save(source_path.with_name(f"{stem}.{fmt}"), encoder, **options)
+                written[name][fmt] = f"{stem}.{fmt}"
+
+    return written
+
+
 # Global instance with configurable path
 _file_storage: FileStorageService | None = None
 
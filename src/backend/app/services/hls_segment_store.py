@@ -0,0 +1,384 @@
+"""Bounded HLS segment store with disk spill and LL-HLS partial segments.
+
+Each stream session keeps a fixed-size ring of media segments with a
+name -> segment index for O(1) lookups. Segment bytes count against a
+global memory budget shared by all sessions; once it is exceeded the oldest
+resident segments are written to a spill directory (tmpfs when available)
+and served from a memory map, so concurrent viewers share the page cache
+instead of each holding a copy.
+
+Playlists are rendered incrementally: every segment's ``#EXTINF`` block is
+formatted once when it is added, and the full M3U8 is assembled (and
+cached) only when a viewer asks for it. Low-latency HLS partial segments,
+blocking playlist reloads (``_HLS_msn`` / ``_HLS_part``) and preload hints
+are supported for the segment currently being produced.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_WINDOW_SIZE = 10
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# LL-HLS: keep EXT-X-PART tags for roughly the last three target durations
+PART_RETENTION_SEGMENTS = 3
+
+
+def default_spill_dir() -> Path:
+    """Prefer tmpfs (/dev/shm) for spilled segments, fall back to the temp dir."""
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+    return base / "vigilia-hls"
+
+
+@dataclass
+class HLSPart:
+    """LL-HLS partial segment (always held in memory; they are small and hot)."""
+
+    index: int
+    name: str
+    duration: float
+    independent: bool
+    data: bytes
+
+
+@dataclass
+class HLSSegment:
+    """A complete media segment, resident in memory or spilled to disk."""
+
+    sequence: int
+    name: str
+    duration: float
+    size: int
+    created_at: datetime
+    data: bytes | None = None
+    spill_path: Path | None = None
+    parts: list[HLSPart] = field(default_factory=list)
+    _map: mmap.mmap | None = field(default=None, repr=False)
+
+    def read(self) -> bytes | memoryview | None:
+        """Return the segment payload without copying spilled data."""
+        if self.data is not None:
+            return self.data
+        if self.size == 0:
+            return b""
+        if self.spill_path is None:
+            return None
+        if self._map is None:
+            try:
+                with open(self.spill_path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+        return memoryview(self._map)
+
+    def release(self) -> None:
+        """Drop the payload, memory map and spill file."""
+        self.data = None
+        self.parts = []
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A response still holds a view; the map closes when it is collected
+                pass
+            self._map = None
+        if self.spill_path is not None:
+            self.spill_path.unlink(missing_ok=True)
+            self.spill_path = None
+
+
+class _SessionStream:
+    """Ring buffer, lookup index and playlist state for one session."""
+
+    def __init__(self, window_size: int):
+        self.segments: deque[HLSSegment] = deque()
+        self.window_size = window_size
+        self.by_name: dict[str, HLSSegment | HLSPart] = {}
+        self.segment_lines: deque[str] = deque()
+        self.pending_parts: list[HLSPart] = []
+        self.next_sequence = 0
+        self.playlist: str | None = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        """Invalidate the cached playlist and wake blocked reloads."""
+        self.playlist = None
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def has(self, msn: int, part: int | None) -> bool:
+        """Whether the playlist already contains media sequence msn (and part)."""
+        if msn < self.next_sequence:
+            return True
+        return (
+            msn == self.next_sequence
+            and part is not None
+            and part < len(self.pending_parts)
+        )
+
+
+class HLSSegmentStore:
+    """Per-session segment rings sharing one memory budget."""
+
+    def __init__(
+        self,
+        target_duration: int = 3,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET,
+        spill_dir: Path | None = None,
+        part_target: float | None = None,
+    ):
+        self.target_duration = target_duration
+        self.window_size = window_size
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir or default_spill_dir()
+        self.part_target = part_target
+        self._sessions: dict[uuid.UUID, _SessionStream] = {}
+        # Resident segments across all sessions, oldest first (spill order)
+        self._resident: OrderedDict[tuple[uuid.UUID, int], HLSSegment] = OrderedDict()
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+
+    # ==================== Writes ====================
+
+    def add_part(
+        self,
+        session_id: uuid.UUID,
+        data: bytes,
+        duration: float,
+        independent: bool = False,
+    ) -> str:
+        """Append an LL-HLS partial segment to the segment being produced.
+
+        Returns the part's URI.
+        """
+        stream = self._get_or_create(session_id)
+        index = len(stream.pending_parts)
+        part = HLSPart(
+            index=index,
+            name=f"segment_{stream.next_sequence:05d}.part{index}.ts",
+            duration=duration,
+            independent=independent,
+            data=data,
+        )
+        stream.pending_parts.append(part)
+        stream.by_name[part.name] = part
+        self.memory_bytes += len(data)
+        stream.notify()
+        return part.name
+
+    def add_segment(self, session_id: uuid.UUID, data: bytes, duration: float) -> str:
+        """Append a complete segment, sliding the window if it is full.
+
+        Partial segments added since the previous segment become this
+        segment's parts. Returns the segment URI.
+        """
+        stream = self._get_or_create(session_id)
+        sequence = stream.next_sequence
+        segment = HLSSegment(
+            sequence=sequence,
+            name=f"segment_{sequence:05d}.ts",
+            duration=duration,
+            size=len(data),
+            created_at=datetime.utcnow(),
+            data=data,
+            parts=stream.pending_parts,
+        )
+        stream.pending_parts = []
+        stream.next_sequence += 1
+
+        stream.segments.append(segment)
+        stream.by_name[segment.name] = segment
+        stream.segment_lines.append(f"#EXTINF:{duration:.3f},\n{segment.name}\n")
+        self._resident[(session_id, sequence)] = segment
+        self.memory_bytes += segment.size
+
+        while len(stream.segments) > stream.window_size:
+            self._evict(session_id, stream, stream.segments.popleft())
+            stream.segment_lines.popleft()
+
+        # Parts are only advertised for the most recent segments
+        if len(stream.segments) > PART_RETENTION_SEGMENTS:
+            self._drop_parts(stream, stream.segments[-PART_RETENTION_SEGMENTS - 1])
+
+        self._enforce_budget()
+        stream.notify()
+        return segment.name
+
+    def remove_session(self, session_id: uuid.UUID) -> None:
+        """Release every segment of a session."""
+        stream = self._sessions.pop(session_id, None)
+        if stream is None:
+            return
+        for segment in stream.segments:
+            self._evict(session_id, stream, segment)
+        for part in stream.pending_parts:
+            self.memory_bytes -= len(part.data)
+        stream.notify()
+        shutil.rmtree(self.spill_dir / str(session_id), ignore_errors=True)
+
+    # ==================== Reads ====================
+
+    def get(self, session_id: uuid.UUID, name: str) -> bytes | memoryview | None:
+        """Look up a segment or part payload by URI."""
+        stream = self._sessions.get(session_id)
+        if stream is None:
+            return None
+        entry = stream.by_name.get(name)
+        if entry is None:
+            return None
+        if isinstance(entry, HLSPart):
+            return entry.data
+        return entry.read()
+
+    def get_playlist(self, session_id: uuid.UUID) -> str | None:
+        """Return the media playlist, rendering it only if it changed."""
+        stream = self._sessions.get(session_id)
+        if stream is None or (not stream.segments and not stream.pending_parts):
+            return None
+        if stream.playlist is None:
+            stream.playlist = self._render_playlist(stream)
+        return stream.playlist
+
+    async def wait_for(
+        self,
+        session_id: uuid.UUID,
+        msn: int,
+        part: int | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """Block until the playlist contains msn/part (LL-HLS blocking reload).
+
+        All viewers waiting on a session share one event, so a new segment
+        or part wakes them with a single set().
+
+        Returns:
+            True if the requested media is available, False on timeout or
+            if the session ended.
+        """
+        if timeout is None:
+            timeout = self.target_duration * 3
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            stream = self._sessions.get(session_id)
+            if stream is None:
+                return False
+            if stream.has(msn, part):
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(stream.changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+
+    def stats(self) -> dict:
+        """Memory and session counters for monitoring."""
+        return {
+            "sessions": len(self._sessions),
+            "memory_bytes": self.memory_bytes,
+            "spilled_bytes": self.spilled_bytes,
+            "resident_segments": len(self._resident),
+        }
+
+    # ==================== Internals ====================
+
+    def _get_or_create(self, session_id: uuid.UUID) -> _SessionStream:
+        stream = self._sessions.get(session_id)
+        if stream is None:
+            stream = _SessionStream(self.window_size)
+            self._sessions[session_id] = stream
+        return stream
+
+    def _render_playlist(self, stream: _SessionStream) -> str:
+        low_latency = self.part_target is not None
+        first_sequence = stream.segments[0].sequence if stream.segments else stream.next_sequence
+        lines = [
+            "#EXTM3U",
+            f"#EXT-X-VERSION:{6 if low_latency else 3}",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+        ]
+        if low_latency:
+            lines.append(
+                f"#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,"
+                f"PART-HOLD-BACK={self.part_target * 3:.3f}"
+            )
+            lines.append(f"#EXT-X-PART-INF:PART-TARGET={self.part_target:.3f}")
+        lines.append(f"#EXT-X-MEDIA-SEQUENCE:{first_sequence}")
+        header = "\n".join(lines) + "\n"
+
+        if not low_latency:
+            return header + "".join(stream.segment_lines)
+
+        body = []
+        for segment, segment_line in zip(stream.segments, stream.segment_lines):
+            body.extend(self._part_line(p) for p in segment.parts)
+            body.append(segment_line)
+        body.extend(self._part_line(p) for p in stream.pending_parts)
+        next_part = (
+            f"segment_{stream.next_sequence:05d}.part{len(stream.pending_parts)}.ts"
+        )
+        body.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="{next_part}"\n')
+        return header + "".join(body)
+
+    @staticmethod
+    def _part_line(part: HLSPart) -> str:
+        independent = ",INDEPENDENT=YES" if part.independent else ""
+        return f'#EXT-X-PART:DURATION={part.duration:.3f},URI="{part.name}"{independent}\n'
+
+    def _drop_parts(self, stream: _SessionStream, segment: HLSSegment) -> None:
+        for part in segment.parts:
+            stream.by_name.pop(part.name, None)
+            self.memory_bytes -= len(part.data)
+        segment.parts = []
+
+    def _evict(self, session_id: uuid.UUID, stream: _SessionStream, segment: HLSSegment) -> None:
+        """Remove a segment that slid out of the window."""
+        self._drop_parts(stream, segment)
+        stream.by_name.pop(segment.name, None)
+        if self._resident.pop((session_id, segment.sequence), None) is not None:
+            self.memory_bytes -= segment.size
+        elif segment.spill_path is not None:
+            self.spilled_bytes -= segment.size
+        segment.release()
+
+    def _enforce_budget(self) -> None:
+        """Spill the oldest resident segments until under the memory budget."""
+        while self.memory_bytes > self.memory_budget_bytes and self._resident:
+            (session_id, _), segment = self._resident.popitem(last=False)
+            try:
+                self._spill(session_id, segment)
+            except OSError as e:
+                # Keep serving from memory rather than dropping the segment
+                logger.warning("HLS segment spill failed", segment=segment.name, error=str(e))
+                self._resident[(session_id, segment.sequence)] = segment
+                return
+            self.memory_bytes -= segment.size
+            self.spilled_bytes += segment.size
+
+    def _spill(self, session_id: uuid.UUID, segment: HLSSegment) -> None:
+        # Written inline: on tmpfs this is a memcpy, comparable to holding the bytes
+        directory = self.spill_dir / str(session_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / segment.name
+        with open(path, "wb") as f:
+            f.write(segment.data)
+        segment.spill_path = path
+        segment.data = None
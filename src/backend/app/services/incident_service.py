@@ -4,13 +4,102 @@ from datetime import datetime, timezone
 from typing import Any
 import uuid
 
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
-from app.models.incident import Incident, IncidentStatus, IncidentPriority, IncidentCategory
+from app.models.incident import (
+    Incident,
+    IncidentStatus,
+    IncidentPriority,
+    IncidentCategory,
+    IncidentNumberSequence,
+    IncidentTimelineEvent,
+)
 from app.models.agency import Agency
 from app.models.user import User
+from app.services.socketio import emit_incident_timeline_event
+
+# Prefix of incidents numbered outside an agency context (API, alerts)
+DEFAULT_INCIDENT_PREFIX = "INC"
+
+
+async def allocate_incident_number(db: AsyncSession, prefix: str = DEFAULT_INCIDENT_PREFIX) -> str:
+    """Allocate the next ``{prefix}-{YYYYMMDD}-{NNNN}`` incident number.
+
+    Increments the (prefix, UTC day) sequence row in one statement. The row
+    lock is held until the caller commits, so numbers are unique and, since
+    a rollback also undoes the increment, contiguous.
+    """
+    (number,) = await allocate_incident_numbers(db, 1, prefix)
+    return number
+
+
+async def allocate_incident_numbers(
+    db: AsyncSession, count: int, prefix: str = DEFAULT_INCIDENT_PREFIX
+) -> list[str]:
+    """Allocate ``count`` consecutive incident numbers with one increment."""
+    if count <= 0:
+        return []
+    today = datetime.now(timezone.utc).date()
+    sequence = IncidentNumberSequence.__table__
+    dialect = db.bind.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = (
+            insert(sequence)
+            .values(prefix=prefix, sequence_date=today, last_value=count)
+            .on_conflict_do_update(
+                index_elements=[sequence.c.prefix, sequence.c.sequence_date],
+                set_={"last_value": sequence.c.last_value + count},
+            )
+            .returning(sequence.c.last_value)
+        )
+        last = (await db.execute(stmt)).scalar_one()
+    else:
+        last = (
+            await db.execute(
+                update(sequence)
+                .where(sequence.c.prefix == prefix, sequence.c.sequence_date == today)
+                .values(last_value=sequence.c.last_value + count)
+                .returning(sequence.c.last_value)
+            )
+        ).scalar_one_or_none()
+        if last is None:
+            await db.execute(
+                sequence.insert().values(prefix=prefix, sequence_date=today, last_value=count)
+            )
+            last = count
+
+    return [f"{prefix}-{today:%Y%m%d}-{value:04d}" for value in range(last - count + 1, last + 1)]
+
+
+def record_timeline_event(
+    db: AsyncSession,
+    incident_id: uuid.UUID,
+    event_type: str,
+    description: str,
+    user: User | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> IncidentTimelineEvent:
+    """Append an event to an incident's timeline.
+
+    The row is added to the session and written by the caller's commit.
+    """
+    event = IncidentTimelineEvent(
+        id=uuid.uuid4(),
+        incident_id=incident_id,
+        event_type=event_type,
+        description=description,
+        user_id=user.id if user else None,
+        user_name=user.full_name if user else None,
+        event_metadata=metadata or None,
+        occurred_at=datetime.now(timezone.utc),
+    )
+    db.add(event)
+    return event
 
 
 class IncidentError(Exception):
@@ -46,7 +135,7 @@ class IncidentService:
             raise IncidentError(f"Agency {agency_id} not found")
 
         # Generate incident number
-        incident_number = await self._generate_incident_number(agency)
+        incident_number = await allocate_incident_number(self.db, agency.code)
 
         incident = Incident(
             id=uuid.uuid4(),
@@ -64,19 +153,16 @@ class IncidentService:
             reported_at=datetime.now(timezone.utc),
             source_alert_id=source_alert_id,
             assigned_units=[],
-            timeline_events=[],
         )
-
-        # Add initial timeline event
-        incident.timeline_events = [
-            self._create_timeline_event(
-                event_type="created",
-                description=f"Incident created: {title}",
-                user=reported_by,
-            )
-        ]
-
         self.db.add(incident)
+        record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="created",
+            description=f"Incident created: {title}",
+            user=reported_by,
+        )
+
         await self.db.commit()
         await self.db.refresh(incident)
 
@@ -171,21 +257,21 @@ class IncidentService:
             incident.description = description
             changes.append("Description updated")
 
+        event = None
         if changes:
             # Add timeline event for changes
-            timeline_events = list(incident.timeline_events or [])
-            timeline_events.append(
-                self._create_timeline_event(
-                    event_type="updated",
-                    description="; ".join(changes),
-                    user=updated_by,
-                )
+            event = record_timeline_event(
+                self.db,
+                incident.id,
+                event_type="updated",
+                description="; ".join(changes),
+                user=updated_by,
             )
-            incident.timeline_events = timeline_events
-            flag_modified(incident, "timeline_events")
 
         await self.db.commit()
         await self.db.refresh(incident)
+        if event is not None:
+            await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         return incident
 
@@ -216,20 +302,18 @@ class IncidentService:
             incident.dispatched_at = datetime.now(timezone.utc)
 
         # Add timeline event
-        timeline_events = list(incident.timeline_events or [])
-        timeline_events.append(
-            self._create_timeline_event(
-                event_type="unit_assigned",
-                description=f"Unit {unit_id} assigned",
-                user=assigned_by,
-                metadata={"unit_id": unit_id_str},
-            )
+        event = record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="unit_assigned",
+            description=f"Unit {unit_id} assigned",
+            user=assigned_by,
+            metadata={"unit_id": unit_id_str},
         )
-        incident.timeline_events = timeline_events
-        flag_modified(incident, "timeline_events")
 
         await self.db.commit()
         await self.db.refresh(incident)
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         return incident
 
@@ -256,20 +340,18 @@ class IncidentService:
         flag_modified(incident, "assigned_units")
 
         # Add timeline event
-        timeline_events = list(incident.timeline_events or [])
-        timeline_events.append(
-            self._create_timeline_event(
-                event_type="unit_unassigned",
-                description=f"Unit {unit_id} unassigned" + (f": {reason}" if reason else ""),
-                user=unassigned_by,
-                metadata={"unit_id": unit_id_str, "reason": reason},
-            )
+        event = record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="unit_unassigned",
+            description=f"Unit {unit_id} unassigned" + (f": {reason}" if reason else ""),
+            user=unassigned_by,
+            metadata={"unit_id": unit_id_str, "reason": reason},
         )
-        incident.timeline_events = timeline_events
-        flag_modified(incident, "timeline_events")
 
         await self.db.commit()
         await self.db.refresh(incident)
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         return incident
 
@@ -299,20 +381,18 @@ class IncidentService:
         incident.priority = new_priority.value
 
         # Add timeline event
-        timeline_events = list(incident.timeline_events or [])
-        timeline_events.append(
-            self._create_timeline_event(
-                event_type="escalated",
-                description=f"Incident escalated from {old_priority_enum.name} to {new_priority.name}: {reason}",
-                user=escalated_by,
-                metadata={"reason": reason, "old_priority": old_priority_enum.value, "new_priority": new_priority.value},
-            )
+        event = record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="escalated",
+            description=f"Incident escalated from {old_priority_enum.name} to {new_priority.name}: {reason}",
+            user=escalated_by,
+            metadata={"reason": reason, "old_priority": old_priority_enum.value, "new_priority": new_priority.value},
         )
-        incident.timeline_events = timeline_events
-        flag_modified(incident, "timeline_events")
 
         await self.db.commit()
         await self.db.refresh(incident)
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         return incident
 
@@ -334,30 +414,40 @@ class IncidentService:
         incident.closed_at = datetime.now(timezone.utc)
 
         # Add timeline event
-        timeline_events = list(incident.timeline_events or [])
-        timeline_events.append(
-            self._create_timeline_event(
-                event_type="closed",
-                description=f"Incident closed" + (f": {resolution_notes}" if resolution_notes else ""),
-                user=closed_by,
-                metadata={"resolution_notes": resolution_notes},
-            )
+        event = record_timeline_event(
+            self.db,
+            incident.id,
+            event_type="closed",
+            description=f"Incident closed" + (f": {resolution_notes}" if resolution_notes else ""),
+            user=closed_by,
+            metadata={"resolution_notes": resolution_notes},
         )
-        incident.timeline_events = timeline_events
-        flag_modified(incident, "timeline_events")
 
         await self.db.commit()
         await self.db.refresh(incident)
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         return incident
 
-    async def get_timeline(self, incident_id: uuid.UUID) -> list[dict[str, Any]]:
-        """Get incident timeline."""
+    async def get_timeline(
+        self,
+        incident_id: uuid.UUID,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Get a page of the incident timeline, oldest first."""
         incident = await self.get_incident(incident_id)
         if incident is None:
             raise IncidentError(f"Incident {incident_id} not found")
 
-        return incident.timeline_events or []
+        result = await self.db.execute(
+            select(IncidentTimelineEvent)
+            .where(IncidentTimelineEvent.incident_id == incident_id)
+            .order_by(IncidentTimelineEvent.occurred_at, IncidentTimelineEvent.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [event.to_dict() for event in result.scalars().all()]
 
     async def get_active_incidents_count(self, agency_id: uuid.UUID | None = None) -> int:
         """Get count of active (non-closed) incidents."""
@@ -376,43 +466,3 @@ class IncidentService:
             select(Agency).where(Agency.id == agency_id)
         )
         return result.scalar_one_or_none()
-
-    async def _generate_incident_number(self, agency: Agency) -> str:
-        """Generate unique incident number for agency."""
-        now = datetime.now(timezone.utc)
-        date_prefix = now.strftime("%Y%m%d")
-
-        # Count today's incidents for this agency
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        result = await self.db.execute(
-            select(Incident).where(
-                and_(
-                    Incident.agency_id == agency.id,
-                    Incident.created_at >= start_of_day,
-                )
-            )
-        )
-        count = len(list(result.scalars().all()))
-
-        return f"{agency.code}-{date_prefix}-{count + 1:04d}"
-
-    @staticmethod
-    def _create_timeline_event(
-        event_type: str,
-        description: str,
-        user: User | None = None,
-        metadata: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
-        """Create a timeline event entry."""
-        event = {
-            "id": str(uuid.uuid4()),
-            "type": event_type,
-            "description": description,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        if user:
-            event["user_id"] = str(user.id)
-            event["user_name"] = user.full_name
-        if metadata:
-            event["metadata"] = metadata
-        return event
@@ -15,6 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.incident import Incident, IncidentStatus
 from app.models.user import User
 from app.services.audit_service import AuditService
+from app.services.incident_service import record_timeline_event
+from app.services.socketio import emit_incident_timeline_event
 from app.models.audit import AuditAction
 
 logger = structlog.get_logger()
@@ -165,17 +167,19 @@ class IncidentStateMachine:
         await self._apply_side_effects(incident, current_status, target_status, notes)
 
         # Record timeline event
-        self._add_timeline_event(
-            incident,
+        event = record_timeline_event(
+            self.db,
+            incident.id,
             event_type="status_change",
+            description=f"Status changed from {current_status.value} to {target_status.value}",
             user=user,
-            details=f"Status changed from {current_status.value} to {target_status.value}",
-            notes=notes,
+            metadata={"notes": notes} if notes else None,
         )
 
         # Commit changes
         await self.db.commit()
         await self.db.refresh(incident)
+        await emit_incident_timeline_event(str(incident.id), event.to_dict())
 
         # Log audit trail
         await self._audit_service.log_entity_change(
@@ -224,34 +228,6 @@ class IncidentStateMachine:
         elif to_status == IncidentStatus.CLOSED:
             incident.closed_at = now
 
-    def _add_timeline_event(
-        self,
-        incident: Incident,
-        event_type: str,
-        user: User | None,
-        details: str,
-        notes: str | None = None,
-    ) -> None:
-        """Add an event to the incident timeline."""
-        if incident.timeline_events is None:
-            incident.timeline_events = []
-
-        event = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "event": event_type,
-            "details": details,
-        }
-
-        if user:
-            event["user_id"] = str(user.id)
-            event["user_name"] = user.full_name
-
-        if notes:
-            event["notes"] = notes
-
-        # Create new list to trigger SQLAlchemy change detection
-        incident.timeline_events = incident.timeline_events + [event]
-
     def get_available_transitions(self, incident: Incident) -> list[IncidentStatus]:
         """Get list of valid transitions from current state."""
         return VALID_TRANSITIONS.get(incident.status, [])
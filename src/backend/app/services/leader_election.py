@@ -0,0 +1,176 @@
+"""Redis-lease leader election for singleton background services.
+
+The API runs as several gunicorn workers, and every worker runs the
+lifespan. Jobs that must run once per deployment (the device monitor, the
+Fundamentum MQTT subscriber) are wrapped in a LeaderElectedService: each
+process campaigns for a Redis key ``leader:<name>`` holding its identity
+with a short expiry, and only the holder runs the job. The holder renews
+the lease every third of its lifetime. If the holder dies, the key expires
+and another worker takes over within one lease period. A holder that
+cannot confirm its lease stops the job once two thirds of the lease have
+passed since its last confirmed renewal, so it has stepped down before the
+key can expire and pass to someone else.
+
+Without Redis (none configured, or not answering when the service
+starts) every process runs the job, as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from typing import Awaitable, Callable
+
+import redis.asyncio as aioredis
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import singleton_leader
+
+logger = structlog.get_logger()
+
+KEY_PREFIX = "leader"
+# Fraction of the lease after the last confirmed renewal at which an
+# unconfirmed leader steps down, leaving a margin before the key expires
+DEMOTE_AFTER = 2 / 3
+
+# Extend the lease only if this process still holds it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the lease only if this process still holds it
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def process_identity() -> str:
+    """Name unique to this process across hosts (``<hostname>-<pid>``)."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderElectedService:
+    """Runs ``on_elected`` / ``on_demoted`` as this process gains and loses a lease."""
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        redis_client: aioredis.Redis | None,
+        lease_seconds: float | None = None,
+        identity: str | None = None,
+    ):
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.redis = redis_client
+        self.lease_seconds = lease_seconds or settings.leader_lease_seconds
+        self.identity = identity or process_identity()
+        self.key = f"{KEY_PREFIX}:{name}"
+        self._leader = False
+        self._confirmed_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process is currently running the job."""
+        return self._leader
+
+    async def start(self) -> None:
+        """Start campaigning (or run the job directly when Redis is unavailable)."""
+        if self.redis is not None:
+            # Clients connect lazily, so probe before relying on the lease:
+            # campaigning against an unreachable Redis would never elect anyone
+            try:
+                await asyncio.wait_for(self.redis.ping(), self.lease_seconds / 3)
+            except Exception as e:
+                logger.warning("Redis unreachable for leader election", service=self.name, error=repr(e))
+                self.redis = None
+        if self.redis is None:
+            logger.warning("No Redis for leader election; running singleton here", service=self.name)
+            await self._promote()
+            return
+        self._task = asyncio.create_task(self._campaign(), name=f"leader-{self.name}")
+
+    async def stop(self) -> None:
+        """Stop the job if running here and hand the lease back."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._leader:
+            await self._demote()
+            if self.redis is not None:
+                try:
+                    await self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.identity)
+                except Exception as e:
+                    logger.warning("Failed to release leader lease", service=self.name, error=str(e))
+
+    async def _campaign(self) -> None:
+        loop = asyncio.get_running_loop()
+        lease_ms = int(self.lease_seconds * 1000)
+        # Bounds a hung Redis call so stepping down is never delayed past the lease
+        call_timeout = self.lease_seconds / 6
+        while True:
+            # The lease runs from when Redis applied the command, which is
+            # no earlier than when it was sent
+            sent = loop.time()
+            try:
+                if self._leader:
+                    held = await asyncio.wait_for(
+                        self.redis.eval(RENEW_SCRIPT, 1, self.key, self.identity, lease_ms), call_timeout
+                    )
+                    if held:
+                        self._confirmed_at = sent
+                    else:
+                        logger.warning("Leader lease lost", service=self.name)
+                        await self._demote()
+                elif await asyncio.wait_for(
+                    self.redis.set(self.key, self.identity, nx=True, px=lease_ms), call_timeout
+                ):
+                    self._confirmed_at = sent
+                    await self._promote()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Leader election error", service=self.name, error=repr(e))
+                if self._leader and loop.time() - self._confirmed_at >= self.lease_seconds * DEMOTE_AFTER:
+                    # Step down while the lease is still ours, before it can pass to another process
+                    await self._demote()
+
+            delay = self.lease_seconds / 3
+            if self._leader:
+                # Retry no later than the step-down point
+                step_down_at = self._confirmed_at + self.lease_seconds * DEMOTE_AFTER
+                delay = min(delay, max(step_down_at - loop.time(), 0.0))
+            await asyncio.sleep(delay)
+
+    async def _promote(self) -> None:
+        self._leader = True
+        singleton_leader.labels(service=self.name).set(1)
+        logger.info("Elected leader", service=self.name, identity=self.identity)
+        try:
+            await self.on_elected()
+        except Exception as e:
+            logger.error("Singleton service failed to start", service=self.name, error=str(e))
+
+    async def _demote(self) -> None:
+        self._leader = False
+        singleton_leader.labels(service=self.name).set(0)
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.error("Singleton service failed to stop", service=self.name, error=str(e))
+        logger.info("Stepped down as leader", service=self.name, identity=self.identity)
@@ -1,16 +1,64 @@
 """Message service for Communication Hub."""
 
+import base64
+import html
+import json
+import re
 import uuid
+from bisect import bisect_left
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import Float, select, and_, or_, func, desc, update, case, literal, literal_column, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.channel import Channel, ChannelMember
 from app.models.message import Message, MessageType, MessagePriority, MessageReaction
 
+# Text search configuration of the messages.search_vector generated column
+# (migration 019); queries must use the same one to hit the GIN index.
+SEARCH_CONFIG = "simple"
+MESSAGE_SEARCH_VECTOR = literal_column("messages.search_vector")
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+@dataclass
+class MessageSearchHit:
+    """A search result with its highlighted snippet."""
+
+    message: Message
+    highlight: str
+    rank: Optional[float] = None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _highlight(content: str, query: str) -> str:
+    """HTML-escape content and wrap case-insensitive matches in <mark>."""
+    parts = re.split(f"({re.escape(query)})", content, flags=re.IGNORECASE)
+    return "".join(
+        f"<mark>{html.escape(part)}</mark>" if i % 2 else html.escape(part)
+        for i, part in enumerate(parts)
+    )
+
+
+def _encode_search_cursor(key: tuple) -> str:
+    values = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, uuid.UUID) else v for v in key]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_search_cursor(cursor: str) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        *rank, created_at, message_id = values
+        return (*rank, datetime.fromisoformat(created_at), uuid.UUID(message_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid search cursor") from e
+
 
 class MessageService:
     """Service for managing messages."""
@@ -51,39 +99,30 @@ class MessageService:
             location_address=location_address,
             reply_to_id=reply_to_id,
             extra_data=extra_data,
-            read_by=[str(sender_id)],  # Sender has read their own message
         )
         self.db.add(message)
 
         # Update channel stats
-        channel_result = await self.db.execute(
-            select(Channel).where(Channel.id == channel_id)
+        await self.db.execute(
+            update(Channel)
+            .where(Channel.id == channel_id)
+            .values(
+                last_message_at=datetime.now(timezone.utc),
+                message_count=Channel.message_count + 1,
+            )
         )
-        channel = channel_result.scalar_one_or_none()
-        if channel:
-            channel.last_message_at = datetime.now(timezone.utc)
-            channel.message_count += 1
 
-        # Update unread counts for other members
+        # Update unread counts for other members in one statement
         await self.db.execute(
-            select(ChannelMember)
+            update(ChannelMember)
             .where(
                 and_(
                     ChannelMember.channel_id == channel_id,
                     ChannelMember.user_id != sender_id,
                 )
             )
+            .values(unread_count=ChannelMember.unread_count + 1)
         )
-        members_result = await self.db.execute(
-            select(ChannelMember).where(
-                and_(
-                    ChannelMember.channel_id == channel_id,
-                    ChannelMember.user_id != sender_id,
-                )
-            )
-        )
-        for member in members_result.scalars():
-            member.unread_count += 1
 
         await self.db.commit()
         await self.db.refresh(message)
@@ -187,45 +226,102 @@ class MessageService:
         user_id: uuid.UUID,
         up_to_message_id: Optional[uuid.UUID] = None,
     ) -> bool:
-        """Mark messages as read for a user."""
-        # Update member's last_read_at and reset unread count
+        """Mark messages as read for a user.
+
+        Moves the member's read high-water mark to up_to_message_id (or the
+        latest message) and resets the unread count. The mark never moves
+        backwards, so a late receipt for an older message is harmless.
+        """
+        if up_to_message_id:
+            mark_query = select(Message.id, Message.created_at).where(
+                and_(
+                    Message.id == up_to_message_id,
+                    Message.channel_id == channel_id,
+                )
+            )
+        else:
+            mark_query = (
+                select(Message.id, Message.created_at)
+                .where(
+                    and_(
+                        Message.channel_id == channel_id,
+                        Message.deleted_at.is_(None),
+                    )
+                )
+                .order_by(desc(Message.created_at))
+                .limit(1)
+            )
+        mark = (await self.db.execute(mark_query)).first()
+
+        values = {
+            "last_read_at": datetime.now(timezone.utc),
+            "unread_count": 0,
+        }
+        if mark:
+            advances = or_(
+                ChannelMember.last_read_message_at.is_(None),
+                ChannelMember.last_read_message_at < mark.created_at,
+            )
+            values["last_read_message_id"] = case(
+                (advances, mark.id), else_=ChannelMember.last_read_message_id
+            )
+            values["last_read_message_at"] = case(
+                (advances, mark.created_at), else_=ChannelMember.last_read_message_at
+            )
+
         result = await self.db.execute(
-            select(ChannelMember).where(
+            update(ChannelMember)
+            .where(
                 and_(
                     ChannelMember.channel_id == channel_id,
                     ChannelMember.user_id == user_id,
                 )
             )
+            .values(**values)
+            .execution_options(synchronize_session="fetch")
         )
-        member = result.scalar_one_or_none()
-        if not member:
-            return False
+        await self.db.commit()
+        return result.rowcount > 0
 
-        member.last_read_at = datetime.now(timezone.utc)
-        member.unread_count = 0
+    async def get_read_receipts(self, messages: list[Message]) -> dict[uuid.UUID, list[str]]:
+        """Get who has read each message, from members' read high-water marks.
 
-        # Update read_by on messages
-        if up_to_message_id:
-            message = await self.get_message(up_to_message_id)
-            if message:
-                # Mark all messages up to this one as read
-                messages_result = await self.db.execute(
-                    select(Message).where(
-                        and_(
-                            Message.channel_id == channel_id,
-                            Message.created_at <= message.created_at,
-                            Message.deleted_at.is_(None),
-                        )
-                    )
-                )
-                for msg in messages_result.scalars():
-                    if msg.read_by is None:
-                        msg.read_by = []
-                    if str(user_id) not in msg.read_by:
-                        msg.read_by = msg.read_by + [str(user_id)]
+        One query for all channels involved; each message is then resolved
+        with a binary search over the channel's sorted marks.
+        """
+        if not messages:
+            return {}
 
-        await self.db.commit()
-        return True
+        channel_ids = {message.channel_id for message in messages}
+        result = await self.db.execute(
+            select(
+                ChannelMember.channel_id,
+                ChannelMember.user_id,
+                ChannelMember.last_read_message_at,
+            )
+            .where(
+                and_(
+                    ChannelMember.channel_id.in_(channel_ids),
+                    ChannelMember.last_read_message_at.is_not(None),
+                )
+            )
+            .order_by(ChannelMember.last_read_message_at)
+        )
+        marks: dict[uuid.UUID, tuple[list[datetime], list[str]]] = {}
+        for channel_id, member_id, read_at in result.all():
+            times, users = marks.setdefault(channel_id, ([], []))
+            times.append(read_at)
+            users.append(str(member_id))
+
+        receipts = {}
+        for message in messages:
+            times, users = marks.get(message.channel_id, ([], []))
+            read_by = users[bisect_left(times, message.created_at):]
+            # Senders have always read their own message
+            if message.sender_id and str(message.sender_id) not in read_by:
+                read_by = [str(message.sender_id)] + read_by
+            receipts[message.id] = read_by
+        return receipts
 
     async def search_messages(
         self,
@@ -233,36 +329,83 @@ class MessageService:
         query: str,
         channel_id: Optional[uuid.UUID] = None,
         limit: int = 50,
-    ) -> list[Message]:
-        """Search messages across user's channels."""
-        # Get user's channel IDs
-        member_result = await self.db.execute(
-            select(ChannelMember.channel_id).where(ChannelMember.user_id == user_id)
-        )
-        channel_ids = [row[0] for row in member_result.all()]
-
-        if not channel_ids:
-            return []
-
-        search_query = (
-            select(Message)
-            .options(selectinload(Message.sender), selectinload(Message.channel))
-            .where(
-                and_(
-                    Message.channel_id.in_(channel_ids),
-                    Message.content.ilike(f"%{query}%"),
-                    Message.deleted_at.is_(None),
-                )
+        cursor: Optional[str] = None,
+    ) -> tuple[list[MessageSearchHit], Optional[str]]:
+        """Search messages across the user's channels.
+
+        On PostgreSQL, matches the full-text index (ranked with ts_rank_cd)
+        or, for partial words, the trigram index on content. Other databases
+        fall back to a substring scan ordered by recency.
+
+        Args:
+            user_id: Searching user; only their channels are searched
+            query: Search text (web-search syntax on PostgreSQL)
+            channel_id: Restrict to one channel
+            limit: Page size
+            cursor: next_cursor from the previous page
+
+        Returns:
+            The page of hits and the cursor for the next page (None at the end)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = _decode_search_cursor(cursor) if cursor else None
+        member_channels = select(ChannelMember.channel_id).where(ChannelMember.user_id == user_id)
+        pattern = "%" + _escape_like(query) + "%"
+        substring_match = Message.content.ilike(pattern, escape="\\")
+        full_text = self.db.bind.dialect.name == "postgresql"
+
+        if full_text:
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            rank = func.ts_rank_cd(MESSAGE_SEARCH_VECTOR, tsquery, type_=Float)
+            # Escape before highlighting so the only markup is <mark>
+            escaped_content = func.replace(
+                func.replace(func.replace(Message.content, "&", "&amp;"), "<", "&lt;"), ">", "&gt;"
+            )
+            headline = func.ts_headline(SEARCH_CONFIG, escaped_content, tsquery, HEADLINE_OPTIONS)
+            search_query = select(Message, rank.label("rank"), headline.label("highlight")).where(
+                or_(MESSAGE_SEARCH_VECTOR.op("@@")(tsquery), substring_match)
+            )
+            sort_key = (rank, Message.created_at, Message.id)
+        else:
+            search_query = select(Message).where(substring_match)
+            sort_key = (Message.created_at, Message.id)
+
+        search_query = search_query.options(
+            selectinload(Message.sender), selectinload(Message.channel)
+        ).where(
+            and_(
+                Message.channel_id.in_(member_channels),
+                Message.deleted_at.is_(None),
             )
         )
-
         if channel_id:
             search_query = search_query.where(Message.channel_id == channel_id)
+        if after is not None:
+            if len(after) != len(sort_key):
+                raise ValueError("Invalid search cursor")
+            bounds = (literal(value, type_=col.type) for value, col in zip(after, sort_key))
+            search_query = search_query.where(tuple_(*sort_key) < tuple_(*bounds))
 
-        search_query = search_query.order_by(desc(Message.created_at)).limit(limit)
-
+        search_query = search_query.order_by(*(col.desc() for col in sort_key)).limit(limit + 1)
         result = await self.db.execute(search_query)
-        return list(result.scalars().all())
+
+        if full_text:
+            hits = [MessageSearchHit(message, highlight, rank) for message, rank, highlight in result.all()]
+        else:
+            hits = [
+                MessageSearchHit(message, _highlight(message.content, query))
+                for message in result.scalars().all()
+            ]
+
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            last = hits[-1]
+            key = (last.rank,) if full_text else ()
+            next_cursor = _encode_search_cursor(key + (last.message.created_at, last.message.id))
+        return hits, next_cursor
 
     async def add_reaction(
         self,
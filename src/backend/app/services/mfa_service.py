@@ -8,6 +8,8 @@ import pyotp
 import qrcode
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.principal_cache import principal_cache
+
 if TYPE_CHECKING:
     from app.models.user import User
 
@@ -83,6 +85,7 @@ class MFAService:
         user.mfa_secret = secret
         user.mfa_enabled = True
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
         return True
 
     async def disable_mfa(self, user: "User", code: str) -> bool:
@@ -96,6 +99,7 @@ class MFAService:
         user.mfa_enabled = False
         user.mfa_secret = None
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
         return True
 
     async def verify_mfa(self, user: "User", code: str) -> bool:
@@ -8,7 +8,7 @@ import uuid
 
 import structlog
 
-from app.core.deps import async_session_factory
+from app.core.deps import ingestion_session_factory
 
 logger = structlog.get_logger()
 
@@ -63,7 +63,7 @@ async def handle_device_config_reported(topic: str, payload: dict) -> None:
         reported_version = payload.get("version")
 
         # Update twin via service (outside request context)
-        async with async_session_factory() as db:
+        async with ingestion_session_factory() as db:
             # Lazy import to avoid circular imports
             from app.main import get_mqtt_service
             from app.services.device_twin_service import DeviceTwinService
@@ -12,7 +12,7 @@ import structlog
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import async_session_factory
+from app.core.deps import ingestion_session_factory
 from app.models.device import IoTDevice
 from app.models.building import Building
 
@@ -68,7 +68,7 @@ async def handle_device_registration(topic: str, payload: dict) -> None:
             return
 
         # Get database session (outside request context, use factory directly)
-        async with async_session_factory() as db:
+        async with ingestion_session_factory() as db:
             # Query device with building to verify agency ownership
             result = await db.execute(
                 select(IoTDevice, Building)
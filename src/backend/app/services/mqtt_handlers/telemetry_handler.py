@@ -9,9 +9,12 @@ import uuid
 from datetime import datetime, timezone
 
 import structlog
+from opentelemetry.trace import SpanKind
 
-from app.core.deps import async_session_factory, get_redis
+from app.core.deps import ingestion_session_factory, get_redis
+from app.core.tracing import inject_context, tracer
 from app.services.telemetry_ingestion_service import (
+    STREAM_NAME,
     TelemetryIngestionService,
     TelemetryIngestionError,
 )
@@ -66,12 +69,22 @@ async def handle_device_telemetry(topic: str, payload: dict) -> None:
             "message_id": payload.get("message_id"),
         }
 
-        # Get DB session and Redis client (outside request context)
-        async with async_session_factory() as db:
-            redis_client = await get_redis()
-            service = TelemetryIngestionService(db, redis_client)
-
-            await service.validate_and_buffer(telemetry)
+        with tracer.start_as_current_span(
+            "telemetry.buffer",
+            kind=SpanKind.PRODUCER,
+            attributes={"messaging.system": "redis", "messaging.destination.name": STREAM_NAME},
+        ):
+            # Lets the worker's flush span link back to this message
+            trace_context = inject_context()
+            if trace_context:
+                telemetry["trace_context"] = trace_context
+
+            # Get DB session and Redis client (outside request context)
+            async with ingestion_session_factory() as db:
+                redis_client = await get_redis()
+                service = TelemetryIngestionService(db, redis_client)
+
+                await service.validate_and_buffer(telemetry)
 
     except TelemetryIngestionError as e:
         logger.warning(
@@ -11,10 +11,13 @@ from typing import Any, Callable, Awaitable
 
 import aiomqtt
 import structlog
+from opentelemetry.trace import SpanKind, StatusCode
 
+from app.core.tracing import tracer
 from app.services.mqtt_handlers.registration_handler import handle_device_registration
 from app.services.mqtt_handlers.telemetry_handler import handle_device_telemetry
 from app.services.mqtt_handlers.config_reported_handler import handle_device_config_reported
+from app.services.leader_election import process_identity
 
 logger = structlog.get_logger()
 
@@ -23,7 +26,13 @@ MessageHandler = Callable[[str, dict[str, Any]], Awaitable[None]]
 
 
 class VigiliaMQTTService:
-    """Async MQTT client for Vigilia IoT platform."""
+    """Async MQTT client for Vigilia IoT platform.
+
+    Every API worker runs one of these. Each connects with its own client
+    identifier (a shared one makes the broker disconnect the previous
+    holder), and with ``shared_group`` set subscribes through
+    ``$share/<group>/`` so the broker hands each message to one worker.
+    """
 
     DEFAULT_SUBSCRIPTIONS = [
         "agency/+/device/+/telemetry",
@@ -41,6 +50,7 @@ class VigiliaMQTTService:
         client_id: str = "vigilia-backend",
         reconnect_interval: int = 5,
         max_reconnect_interval: int = 60,
+        shared_group: str | None = None,
     ):
         self.broker_host = broker_host
         self.broker_port = broker_port
@@ -50,6 +60,8 @@ class VigiliaMQTTService:
         self.client_id = client_id
         self.reconnect_interval = reconnect_interval
         self.max_reconnect_interval = max_reconnect_interval
+        self.shared_group = shared_group
+        self.identifier = f"{client_id}-{process_identity()}"
 
         self._client: aiomqtt.Client | None = None
         self._listener_task: asyncio.Task | None = None
@@ -117,7 +129,7 @@ class VigiliaMQTTService:
                     hostname=self.broker_host,
                     port=self.broker_port,
                     tls_params=tls_params,
-                    identifier=self.client_id,
+                    identifier=self.identifier,
                 ) as client:
                     self._client = client
                     self._connected = True
@@ -126,7 +138,7 @@ class VigiliaMQTTService:
 
                     all_topics = self.DEFAULT_SUBSCRIPTIONS + self._additional_subscriptions
                     for topic in all_topics:
-                        await client.subscribe(topic, qos=1)
+                        await client.subscribe(self._subscription_topic(topic), qos=1)
                         logger.info("Subscribed to MQTT topic", topic=topic)
 
                     async for message in client.messages:
@@ -162,16 +174,29 @@ class VigiliaMQTTService:
         matched = False
         for pattern, handler in self._message_handlers.items():
             if self._topic_matches(topic_str, pattern):
-                try:
-                    await handler(topic_str, payload)
-                    matched = True
-                except Exception as e:
-                    logger.error("MQTT handler error", topic=topic_str, pattern=pattern, error=str(e))
+                with tracer.start_as_current_span(
+                    "mqtt.receive",
+                    kind=SpanKind.CONSUMER,
+                    attributes={"messaging.system": "mqtt", "messaging.destination.name": pattern},
+                ) as span:
+                    try:
+                        await handler(topic_str, payload)
+                        matched = True
+                    except Exception as e:
+                        span.record_exception(e)
+                        span.set_status(StatusCode.ERROR)
+                        logger.error("MQTT handler error", topic=topic_str, pattern=pattern, error=str(e))
                 break
 
         if not matched:
             logger.debug("No handler for MQTT topic", topic=topic_str)
 
+    def _subscription_topic(self, topic: str) -> str:
+        """Topic filter to subscribe with (messages still carry the plain topic)."""
+        if self.shared_group:
+            return f"$share/{self.shared_group}/{topic}"
+        return topic
+
     @staticmethod
     def _topic_matches(topic: str, pattern: str) -> bool:
         topic_parts = topic.split("/")
@@ -0,0 +1,419 @@
+"""Durable, concurrent notification dispatch.
+
+``NotificationService.notify_for_alert`` used to deliver every (user,
+channel) pair one after another, with retries awaited inline, so the last
+SMS of a large fan-out could leave minutes after the alert. Delivery jobs
+now go onto one Redis stream per channel (``notify:deliveries:<channel>``)
+and are consumed by per-channel worker pools:
+
+- each channel has its own concurrency limit, so a slow provider only
+  holds up its own channel;
+- each channel has a token-bucket rate limit matching its provider's
+  sending limits;
+- results are buffered and written to ``notification_deliveries`` with one
+  bulk INSERT per flush, and stream entries are acknowledged only after
+  their record is written.
+
+Jobs are delivered at least once: an entry whose delivery failed, whose
+record was not written, or that was still waiting for a slot at shutdown
+stays pending in the consumer group. A recovery loop claims entries pending
+longer than ``claim_idle_ms`` with XAUTOCLAIM and delivers them again;
+after ``max_deliveries`` attempts, or if the job cannot be parsed, an entry
+is moved to the "notify:dead-letter" stream. Consumers are named after the
+host, so restarts do not add consumers to the group. If Redis is
+unreachable when jobs are enqueued, they are delivered directly by this
+process's pools instead of being dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from typing import Any
+
+import structlog
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.metrics import (
+    notification_dead_lettered_total,
+    notification_jobs_total,
+    notification_reclaimed_total,
+)
+from app.models.notification_delivery import DeliveryChannel
+from app.services.notification_service import (
+    DeliveryJob,
+    NotificationService,
+    channel_concurrency,
+)
+
+logger = structlog.get_logger()
+
+STREAM_PREFIX = "notify:deliveries"
+GROUP_NAME = "notification-workers"
+# Bounds each stream if workers are down for a long time
+STREAM_MAX_LEN = 100_000
+DEAD_LETTER_STREAM = "notify:dead-letter"
+DEAD_LETTER_MAX_LEN = 10_000
+
+
+def stream_name(channel: str) -> str:
+    """Redis stream holding the jobs of one channel."""
+    return f"{STREAM_PREFIX}:{channel}"
+
+
+def channel_rate_limits() -> dict[str, float]:
+    """Provider sends per second allowed per channel."""
+    return {
+        DeliveryChannel.EMAIL.value: settings.notification_email_rate_per_second,
+        DeliveryChannel.SMS.value: settings.notification_sms_rate_per_second,
+        DeliveryChannel.CALL.value: settings.notification_call_rate_per_second,
+        DeliveryChannel.PUSH.value: settings.notification_push_rate_per_second,
+    }
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, up to ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for one token."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class NotificationDispatcher:
+    """Per-channel worker pools draining the delivery streams."""
+
+    def __init__(
+        self,
+        service: NotificationService,
+        redis_client: aioredis.Redis | None,
+        concurrency: dict[str, int] | None = None,
+        rate_limits: dict[str, float] | None = None,
+        record_batch_size: int = 500,
+        record_flush_interval_ms: int = 200,
+        claim_idle_ms: int = 300000,
+        max_deliveries: int = 5,
+        consumer_name: str | None = None,
+    ):
+        self.service = service
+        self.redis = redis_client
+        self.concurrency = concurrency or channel_concurrency()
+        rate_limits = rate_limits or channel_rate_limits()
+        self.record_batch_size = record_batch_size
+        self.record_flush_interval = record_flush_interval_ms / 1000
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.consumer_name = consumer_name or socket.gethostname()
+        self._slots = {channel: asyncio.Semaphore(n) for channel, n in self.concurrency.items()}
+        self._buckets = {channel: TokenBucket(rate_limits.get(channel, 0)) for channel in self.concurrency}
+        # (row, channel, stream entry id) waiting for the next bulk insert
+        self._records: list[tuple[dict[str, Any] | None, str, bytes | None]] = []
+        self._readers: list[asyncio.Task] = []
+        self._recovery_task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._deliveries: set[asyncio.Task] = set()
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """Whether jobs handed to ``enqueue`` will be delivered."""
+        return self._running
+
+    async def start(self) -> None:
+        """Create the consumer groups and start the channel pools."""
+        if self._running:
+            return
+        self._running = True
+        if self.redis is not None:
+            try:
+                for channel in self.concurrency:
+                    await self._create_group(channel)
+            except Exception as e:
+                logger.warning("Notification queue unavailable; delivering in-process", error=str(e))
+                self.redis = None
+        if self.redis is not None:
+            for channel in self.concurrency:
+                self._readers.append(asyncio.create_task(
+                    self._read_loop(channel), name=f"notify-{channel}"
+                ))
+            self._recovery_task = asyncio.create_task(self._recovery_loop(), name="notify-recovery")
+        self._flush_task = asyncio.create_task(self._flush_loop(), name="notify-records")
+        logger.info("Notification dispatcher started", concurrency=self.concurrency)
+
+    async def stop(self) -> None:
+        """Stop reading, finish in-flight deliveries and write their records."""
+        self._running = False
+        tasks = self._readers + ([self._recovery_task] if self._recovery_task else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._readers.clear()
+        self._recovery_task = None
+
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_records()
+        logger.info("Notification dispatcher stopped")
+
+    async def _create_group(self, channel: str) -> None:
+        try:
+            await self.redis.xgroup_create(stream_name(channel), GROUP_NAME, id="0", mkstream=True)
+        except aioredis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    # ==================== Enqueue ====================
+
+    async def enqueue(self, jobs: list[DeliveryJob]) -> None:
+        """Put jobs on their channel streams (or deliver them here if Redis is down)."""
+        if self.redis is not None:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for job in jobs:
+                        pipe.xadd(
+                            stream_name(job.channel), {"job": job.to_json()},
+                            maxlen=STREAM_MAX_LEN, approximate=True,
+                        )
+                    await pipe.execute()
+                for job in jobs:
+                    notification_jobs_total.labels(channel=job.channel, path="queued").inc()
+                return
+            except Exception as e:
+                logger.warning("Notification queue unavailable; delivering directly", error=str(e))
+
+        for job in jobs:
+            notification_jobs_total.labels(channel=job.channel, path="direct").inc()
+            await self._spawn(job, None)
+
+    # ==================== Channel pools ====================
+
+    async def _read_loop(self, channel: str) -> None:
+        stream = stream_name(channel)
+        slots = self._slots[channel]
+        while self._running:
+            try:
+                messages = await self.redis.xreadgroup(
+                    groupname=GROUP_NAME,
+                    consumername=self.consumer_name,
+                    streams={stream: ">"},
+                    count=self.concurrency[channel],
+                    block=1000,
+                )
+                for _, entries in messages or []:
+                    for entry_id, fields in entries:
+                        await self._spawn_entry(channel, entry_id, fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Notification reader error", channel=channel, error=str(e))
+                await asyncio.sleep(1)
+
+            # Wait for a free slot before reading more, so entries are not
+            # claimed by this consumer while it cannot work on them
+            async with slots:
+                pass
+
+    async def _spawn_entry(self, channel: str, entry_id: bytes, fields: dict) -> None:
+        raw = fields.get(b"job") or fields.get("job")
+        try:
+            job = DeliveryJob.from_json(raw)
+        except Exception as e:
+            await self._dead_letter(channel, entry_id, fields, f"malformed job: {e}", 1)
+            return
+        await self._spawn(job, entry_id)
+
+    async def _spawn(self, job: DeliveryJob, entry_id: bytes | None) -> None:
+        """Start a delivery once the channel has a free slot and a token."""
+        slots = self._slots[job.channel]
+        await slots.acquire()
+        try:
+            await self._buckets[job.channel].acquire()
+        except BaseException:
+            slots.release()
+            raise
+        task = asyncio.create_task(self._deliver(job, entry_id))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, job: DeliveryJob, entry_id: bytes | None) -> None:
+        try:
+            result, row = await self.service.deliver(job)
+            self.service.record_result(result)
+            self._records.append((row, job.channel, entry_id))
+        except Exception as e:
+            # Left unacknowledged; the entry stays pending for redelivery
+            logger.error("Notification delivery error", channel=job.channel, user_id=job.user_id, error=str(e))
+        finally:
+            self._slots[job.channel].release()
+        if len(self._records) >= self.record_batch_size:
+            await self.flush_records()
+
+    # ==================== Pending-entry recovery ====================
+
+    async def _recovery_loop(self) -> None:
+        interval = max(self.claim_idle_ms / 1000 / 2, 1.0)
+        while self._running:
+            await asyncio.sleep(interval)
+            for channel in self.concurrency:
+                try:
+                    await self.recover_pending(channel)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Notification recovery error", channel=channel, error=str(e))
+
+    async def recover_pending(self, channel: str, max_entries: int = 1000) -> int:
+        """Claim ``channel`` entries pending longer than ``claim_idle_ms`` and deliver them again.
+
+        Returns:
+            Number of entries claimed
+        """
+        stream = stream_name(channel)
+        start_id = "0-0"
+        claimed_total = 0
+        while claimed_total < max_entries and self._running:
+            response = await self.redis.xautoclaim(
+                stream, GROUP_NAME, self.consumer_name,
+                min_idle_time=self.claim_idle_ms, start_id=start_id,
+                count=self.concurrency[channel],
+            )
+            start_id, entries = response[0], response[1]
+            for entry_id, fields in entries:
+                claimed_total += 1
+                notification_reclaimed_total.labels(channel=channel).inc()
+                attempts = await self._times_delivered(stream, entry_id)
+                if attempts > self.max_deliveries:
+                    await self._dead_letter(channel, entry_id, fields, "max deliveries exceeded", attempts)
+                else:
+                    await self._spawn_entry(channel, entry_id, fields)
+            if start_id in (b"0-0", "0-0"):
+                break
+        return claimed_total
+
+    async def _times_delivered(self, stream: str, entry_id: bytes) -> int:
+        """Delivery count of one entry (queried by id, not by range, so others cannot crowd it out)."""
+        pending = await self.redis.xpending_range(stream, GROUP_NAME, min=entry_id, max=entry_id, count=1)
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def _dead_letter(self, channel: str, entry_id: bytes, fields: dict, reason: str, deliveries: int) -> None:
+        """Move an entry to the dead-letter stream and acknowledge it."""
+        raw = fields.get(b"job") or fields.get("job") or b""
+        await self.redis.xadd(
+            DEAD_LETTER_STREAM,
+            {
+                "channel": channel,
+                "original_id": entry_id,
+                "job": raw,
+                "reason": reason,
+                "deliveries": str(deliveries),
+            },
+            maxlen=DEAD_LETTER_MAX_LEN,
+            approximate=True,
+        )
+        await self.redis.xack(stream_name(channel), GROUP_NAME, entry_id)
+        notification_dead_lettered_total.labels(channel=channel).inc()
+        logger.warning(
+            "Notification job dead-lettered",
+            channel=channel, entry_id=str(entry_id), reason=reason, deliveries=deliveries,
+        )
+
+    # ==================== Delivery records ====================
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.record_flush_interval)
+            await self.flush_records()
+
+    async def flush_records(self) -> None:
+        """Bulk-insert buffered delivery records, then acknowledge their jobs."""
+        if not self._records:
+            return
+        batch, self._records = self._records, []
+        try:
+            await self.service.write_delivery_records([row for row, _, _ in batch if row is not None])
+        except Exception as e:
+            logger.error("Failed to write notification records", count=len(batch), error=str(e))
+            # Unacknowledged entries are redelivered; direct ones are retried here
+            self._records.extend(item for item in batch if item[2] is None)
+            return
+
+        if self.redis is None:
+            return
+        by_channel: dict[str, list[bytes]] = {}
+        for _, channel, entry_id in batch:
+            if entry_id is not None:
+                by_channel.setdefault(channel, []).append(entry_id)
+        for channel, entry_ids in by_channel.items():
+            try:
+                await self.redis.xack(stream_name(channel), GROUP_NAME, *entry_ids)
+            except Exception as e:
+                logger.warning("Failed to acknowledge notification jobs", channel=channel, error=str(e))
+
+
+_dispatcher: NotificationDispatcher | None = None
+
+
+def get_notification_dispatcher() -> NotificationDispatcher | None:
+    """The running dispatcher, or None when notifications are delivered inline."""
+    if _dispatcher is not None and _dispatcher.running:
+        return _dispatcher
+    return None
+
+
+async def start_notification_dispatcher(service: NotificationService) -> NotificationDispatcher:
+    """Create and start the process-wide dispatcher for ``service``."""
+    global _dispatcher
+    if _dispatcher is None:
+        from app.core.deps import get_redis
+
+        try:
+            redis_client = await get_redis()
+        except Exception as e:
+            logger.warning("Notification queue unavailable; delivering in-process", error=str(e))
+            redis_client = None
+        _dispatcher = NotificationDispatcher(
+            service,
+            redis_client,
+            claim_idle_ms=settings.notification_claim_idle_ms,
+            max_deliveries=settings.notification_max_deliveries,
+        )
+    await _dispatcher.start()
+    return _dispatcher
+
+
+async def shutdown_notification_dispatcher() -> None:
+    """Finish in-flight deliveries and stop the dispatcher."""
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
@@ -2,16 +2,31 @@
 
 Supports multiple channels: email, SMS, phone call, and push notifications.
 Integrates with the alert pipeline to send notifications based on user preferences.
+
+Eligibility (severity, building scope, quiet hours) is decided in SQL; on
+PostgreSQL the building scope is a ``building_ids @> '["<id>"]'`` match on
+the GIN-indexed JSONB column. Each eligible (user, channel) pair becomes a
+DeliveryJob. While the NotificationDispatcher is running, jobs go onto its
+durable per-channel queues; otherwise (scripts, tests) they are delivered
+inline, concurrently per channel. Either way delivery records are written
+with bulk INSERTs.
 """
 
+import asyncio
+import json
 import structlog
-from datetime import datetime, timezone, time as dt_time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, and_
+from sqlalchemy import and_, case, insert, literal, literal_column, not_, or_, select, type_coerce
+from sqlalchemy import Time
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import settings
 from app.models.alert import Alert, AlertSeverity
 from app.models.notification_preference import NotificationPreference
 from app.models.user import User
@@ -33,6 +48,18 @@ SEVERITY_LEVELS = {
     AlertSeverity.INFO: 5,
 }
 
+DELIVERY_LOG_SIZE = 1000
+
+
+def channel_concurrency() -> dict[str, int]:
+    """Concurrent deliveries allowed per channel."""
+    return {
+        DeliveryChannel.EMAIL.value: settings.notification_email_concurrency,
+        DeliveryChannel.SMS.value: settings.notification_sms_concurrency,
+        DeliveryChannel.CALL.value: settings.notification_call_concurrency,
+        DeliveryChannel.PUSH.value: settings.notification_push_concurrency,
+    }
+
 
 class NotificationDeliveryResult:
     """Result of a notification delivery attempt."""
@@ -63,6 +90,26 @@ class NotificationDeliveryResult:
         }
 
 
+@dataclass
+class DeliveryJob:
+    """One notification to deliver: an alert, a user and a channel."""
+
+    alert_id: str
+    user_id: str
+    channel: str
+    title: str
+    description: str
+    severity: str
+    address: str | None = None  # Email address or phone number
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: bytes | str) -> "DeliveryJob":
+        return cls(**json.loads(raw))
+
+
 class NotificationService:
     """
     Multi-channel notification delivery service.
@@ -74,7 +121,7 @@ class NotificationService:
 
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self.session_factory = session_factory
-        self._delivery_log: list[dict[str, Any]] = []
+        self._delivery_log: deque[dict[str, Any]] = deque(maxlen=DELIVERY_LOG_SIZE)
         self._stats = {
             "notifications_sent": 0,
             "notifications_failed": 0,
@@ -87,486 +134,402 @@ class NotificationService:
         self.push_service = PushDeliveryService()
         self.retry_manager = NotificationRetryManager()
 
-    async def _create_delivery_record(
-        self,
-        db: AsyncSession,
-        alert_id: UUID,
-        user_id: UUID,
-        channel: str,
-        status: str,
-        external_id: str | None = None,
-        error_message: str | None = None,
-        attempts: int = 1,
-    ) -> NotificationDelivery:
-        """Create a NotificationDelivery record in the database.
+    async def notify_for_alert(self, alert: Alert) -> list[NotificationDeliveryResult]:
+        """
+        Send notifications for a new alert to all eligible users.
 
-        Args:
-            db: Database session
-            alert_id: Alert ID
-            user_id: User ID
-            channel: Delivery channel (email, sms, push, call)
-            status: Delivery status (sent, failed, etc.)
-            external_id: External service ID (SendGrid message ID, Twilio SID, etc.)
-            error_message: Error message if delivery failed
-            attempts: Number of delivery attempts
+        1. Find users whose preferences match this alert (in SQL)
+        2. Build one delivery job per enabled channel
+        3. Queue the jobs on the dispatcher, or deliver them inline
 
         Returns:
-            Created NotificationDelivery record
+            Delivery results when delivered inline; an empty list when the
+            jobs were queued (results are recorded by the dispatcher)
         """
-        delivery = NotificationDelivery(
-            alert_id=alert_id,
-            user_id=user_id,
-            channel=channel,
-            status=status,
-            external_id=external_id,
-            error_message=error_message,
-            attempts=attempts,
-            sent_at=datetime.now(timezone.utc) if status == DeliveryStatus.SENT.value else None,
-            failed_at=datetime.now(timezone.utc) if status == DeliveryStatus.FAILED.value else None,
-            last_attempt_at=datetime.now(timezone.utc),
+        async with self.session_factory() as db:
+            recipients = await self._eligible_recipients(db, alert)
+
+        jobs = self._build_jobs(alert, recipients)
+        self._stats["users_notified"] += len({job.user_id for job in jobs})
+        if not jobs:
+            return []
+
+        from app.services.notification_dispatcher import get_notification_dispatcher
+
+        dispatcher = get_notification_dispatcher()
+        if dispatcher is not None:
+            await dispatcher.enqueue(jobs)
+            return []
+        return await self._deliver_inline(jobs)
+
+    # ==================== Recipient selection ====================
+
+    async def _eligible_recipients(
+        self, db: AsyncSession, alert: Alert
+    ) -> list[tuple[NotificationPreference, User]]:
+        """Preferences (with their active users) that accept this alert."""
+        conditions = [
+            User.is_active.is_(True),
+            NotificationPreference.min_severity >= SEVERITY_LEVELS.get(alert.severity, 5),
+            or_(
+                NotificationPreference.email_enabled.is_(True),
+                NotificationPreference.sms_enabled.is_(True),
+                NotificationPreference.call_enabled.is_(True),
+                NotificationPreference.push_enabled.is_(True),
+            ),
+            self._outside_quiet_hours(alert),
+        ]
+        on_postgres = db.bind.dialect.name == "postgresql"
+        if alert.building_id and on_postgres:
+            conditions.append(self._in_building_scope(alert.building_id))
+
+        result = await db.execute(
+            select(NotificationPreference, User)
+            .join(User, NotificationPreference.user_id == User.id)
+            .where(*conditions)
+        )
+        rows = [tuple(row) for row in result.all()]
+
+        if alert.building_id and not on_postgres:
+            # No JSON containment operator; scope is checked here instead
+            building_id = str(alert.building_id)
+            rows = [
+                (pref, user) for pref, user in rows
+                if not pref.building_ids or building_id in [str(b) for b in pref.building_ids]
+            ]
+        return rows
+
+    @staticmethod
+    def _in_building_scope(building_id: UUID):
+        """Empty scope, or a scope containing the building (uses the GIN index)."""
+        building_ids = type_coerce(NotificationPreference.building_ids, JSONB)
+        return or_(
+            NotificationPreference.building_ids.is_(None),
+            building_ids == literal_column("'[]'::jsonb"),
+            building_ids == literal_column("'null'::jsonb"),
+            building_ids.contains([str(building_id)]),
         )
-        db.add(delivery)
-        await db.flush()
-        return delivery
 
-    async def notify_for_alert(self, alert: Alert) -> list[NotificationDeliveryResult]:
-        """
-        Send notifications for a new alert to all eligible users.
+    @staticmethod
+    def _outside_quiet_hours(alert: Alert):
+        """Not in quiet hours now, or a critical alert the user lets through."""
+        now = literal(datetime.now(timezone.utc).time(), Time)
+        start = NotificationPreference.quiet_start
+        end = NotificationPreference.quiet_end
+        in_quiet_hours = case(
+            # Normal range (e.g., 09:00 to 17:00)
+            (start <= end, and_(start <= now, now <= end)),
+            # Crosses midnight (e.g., 22:00 to 06:00)
+            else_=or_(now >= start, now <= end),
+        )
+        allowed = [start.is_(None), end.is_(None), not_(in_quiet_hours)]
+        if alert.severity == AlertSeverity.CRITICAL:
+            allowed.append(NotificationPreference.quiet_override_critical.is_(True))
+        return or_(*allowed)
+
+    def _build_jobs(
+        self, alert: Alert, recipients: list[tuple[NotificationPreference, User]]
+    ) -> list[DeliveryJob]:
+        """One job per (user, enabled channel)."""
+        jobs = []
+        for pref, user in recipients:
+            phone = getattr(user, "phone", None)
+            channels = []
+            if pref.email_enabled and user.email:
+                channels.append((DeliveryChannel.EMAIL, user.email))
+            if pref.sms_enabled and phone:
+                channels.append((DeliveryChannel.SMS, phone))
+            if pref.call_enabled and phone:
+                channels.append((DeliveryChannel.CALL, phone))
+            if pref.push_enabled:
+                channels.append((DeliveryChannel.PUSH, None))
+            for channel, address in channels:
+                jobs.append(DeliveryJob(
+                    alert_id=str(alert.id),
+                    user_id=str(user.id),
+                    channel=channel.value,
+                    title=alert.title,
+                    description=alert.description or "",
+                    severity=alert.severity.value,
+                    address=address,
+                ))
+        return jobs
 
-        1. Find users with notification preferences matching this alert
-        2. Filter by building scope, severity, and quiet hours
-        3. Deliver via each user's enabled channels
-        """
-        results: list[NotificationDeliveryResult] = []
+    # ==================== Delivery ====================
 
-        alert_severity_level = SEVERITY_LEVELS.get(alert.severity, 5)
+    async def _deliver_inline(self, jobs: list[DeliveryJob]) -> list[NotificationDeliveryResult]:
+        """Deliver jobs concurrently (bounded per channel) and record them in bulk."""
+        limits = {channel: asyncio.Semaphore(n) for channel, n in channel_concurrency().items()}
 
-        async with self.session_factory() as db:
-            # Get all notification preferences
-            prefs_result = await db.execute(
-                select(NotificationPreference, User).join(
-                    User, NotificationPreference.user_id == User.id
-                ).where(User.is_active.is_(True))
-            )
-            rows = prefs_result.all()
+        async def run(job: DeliveryJob):
+            async with limits[job.channel]:
+                return await self.deliver(job)
 
-            for pref, user in rows:
-                # Check severity filter
-                if alert_severity_level > pref.min_severity:
-                    continue
+        outcomes = await asyncio.gather(*(run(job) for job in jobs))
+        await self.write_delivery_records([row for _, row in outcomes if row is not None])
 
-                # Check building scope
-                if pref.building_ids and alert.building_id:
-                    if str(alert.building_id) not in [str(bid) for bid in pref.building_ids]:
-                        continue
+        results = [result for result, _ in outcomes]
+        for result in results:
+            self.record_result(result)
+        return results
 
-                # Check quiet hours
-                if self._is_quiet_hours(pref):
-                    # During quiet hours, only deliver if critical override
-                    is_critical = alert.severity == AlertSeverity.CRITICAL
-                    if not (is_critical and pref.quiet_override_critical):
-                        continue
+    async def deliver(
+        self, job: DeliveryJob
+    ) -> tuple[NotificationDeliveryResult, dict[str, Any] | None]:
+        """Deliver one job on its channel.
 
-                # Deliver via each enabled channel
-                user_results = await self._deliver_to_user(
-                    db=db,
-                    user=user,
-                    pref=pref,
-                    alert=alert,
-                )
-                results.extend(user_results)
+        Returns:
+            The result, and the NotificationDelivery row to record (None
+            when the channel is not configured and nothing was attempted)
+        """
+        senders = {
+            DeliveryChannel.EMAIL.value: self._send_email,
+            DeliveryChannel.SMS.value: self._send_sms,
+            DeliveryChannel.CALL.value: self._send_call,
+            DeliveryChannel.PUSH.value: self._send_push,
+        }
+        return await senders[job.channel](job)
 
-                if any(r.success for r in user_results):
-                    self._stats["users_notified"] += 1
+    def record_result(self, result: NotificationDeliveryResult) -> None:
+        """Add a result to the delivery log and statistics."""
+        self._delivery_log.append(result.to_dict())
+        if result.success:
+            self._stats["notifications_sent"] += 1
+        else:
+            self._stats["notifications_failed"] += 1
 
-            # Commit all NotificationDelivery records
+    async def write_delivery_records(self, rows: list[dict[str, Any]]) -> None:
+        """Insert NotificationDelivery rows with one statement."""
+        if not rows:
+            return
+        async with self.session_factory() as db:
+            await db.execute(insert(NotificationDelivery), rows)
             await db.commit()
 
-        # Log all delivery attempts
-        for result in results:
-            self._delivery_log.append(result.to_dict())
-            if result.success:
-                self._stats["notifications_sent"] += 1
-            else:
-                self._stats["notifications_failed"] += 1
-
-        return results
-
-    async def _deliver_to_user(
-        self,
-        db: AsyncSession,
-        user: User,
-        pref: NotificationPreference,
-        alert: Alert,
-    ) -> list[NotificationDeliveryResult]:
-        """Deliver alert notification to a single user via their enabled channels."""
-        results = []
-
-        if pref.email_enabled and user.email:
-            result = await self._send_email(db, user, alert)
-            results.append(result)
-
-        if pref.sms_enabled and hasattr(user, 'phone') and user.phone:
-            result = await self._send_sms(db, user, alert)
-            results.append(result)
-
-        if pref.call_enabled and hasattr(user, 'phone') and user.phone:
-            result = await self._send_call(user, alert)
-            results.append(result)
-
-        if pref.push_enabled:
-            result = await self._send_push(db, user, alert)
-            results.append(result)
+    @staticmethod
+    def _delivery_row(
+        job: DeliveryJob,
+        status: str,
+        external_id: str | None = None,
+        error_message: str | None = None,
+        attempts: int = 1,
+    ) -> dict[str, Any]:
+        """Column values of a NotificationDelivery for a bulk insert.
 
-        return results
+        Args:
+            job: Delivered job
+            status: Delivery status (sent, failed, etc.)
+            external_id: External service ID (SendGrid message ID, Twilio SID, etc.)
+            error_message: Error message if delivery failed
+            attempts: Number of delivery attempts
+        """
+        now = datetime.now(timezone.utc)
+        return {
+            "id": uuid4(),
+            "alert_id": UUID(job.alert_id),
+            "user_id": UUID(job.user_id),
+            "channel": job.channel,
+            "status": status,
+            "external_id": external_id,
+            "error_message": error_message,
+            "attempts": attempts,
+            "max_attempts": NotificationRetryManager.MAX_TRIES,
+            "sent_at": now if status == DeliveryStatus.SENT.value else None,
+            "failed_at": now if status == DeliveryStatus.FAILED.value else None,
+            "last_attempt_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
 
-    async def _send_email(
-        self, db: AsyncSession, user: User, alert: Alert
+    def _result(
+        self, job: DeliveryJob, success: bool, message: str, external_id: str | None = None
     ) -> NotificationDeliveryResult:
+        return NotificationDeliveryResult(
+            user_id=UUID(job.user_id),
+            channel=job.channel,
+            success=success,
+            message=message,
+            external_id=external_id,
+        )
+
+    async def _send_email(self, job: DeliveryJob):
         """Send email notification via SendGrid."""
         if self.email_service.client is None:
-            logger.debug(
-                "Email not configured, skipping",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
-            )
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="email",
-                success=False,
-                message="Email not configured",
-            )
+            logger.debug("Email not configured, skipping", user_id=job.user_id, alert_id=job.alert_id)
+            return self._result(job, False, "Email not configured"), None
 
         try:
             # Execute with retry logic
             success, message, external_id = await self.retry_manager.execute_with_retry(
                 self.email_service.send_alert_email,
-                user.email,
-                alert.title,
-                alert.description or "",
-                alert.severity.value,
+                job.address,
+                job.title,
+                job.description,
+                job.severity,
             )
-
-            # Create delivery record
-            status = DeliveryStatus.SENT.value if success else DeliveryStatus.FAILED.value
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.EMAIL.value,
-                status=status,
-                external_id=external_id,
-                error_message=None if success else message,
-                attempts=1,  # Retry manager handles attempt count internally
-            )
-
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="email",
-                success=success,
-                message=message,
-                external_id=external_id,
-            )
-
         except Exception as e:
             # All retries exhausted
             logger.error(
                 "Email delivery failed after retries",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
+                user_id=job.user_id,
+                alert_id=job.alert_id,
                 error=str(e),
             )
-
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.EMAIL.value,
-                status=DeliveryStatus.FAILED.value,
-                error_message=str(e),
+            row = self._delivery_row(
+                job, DeliveryStatus.FAILED.value, error_message=str(e),
                 attempts=self.retry_manager.MAX_TRIES,
             )
+            return self._result(job, False, str(e)), row
 
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="email",
-                success=False,
-                message=str(e),
-            )
+        status = DeliveryStatus.SENT.value if success else DeliveryStatus.FAILED.value
+        row = self._delivery_row(
+            job, status, external_id=external_id,
+            error_message=None if success else message,
+            attempts=1,  # Retry manager handles attempt count internally
+        )
+        return self._result(job, success, message, external_id), row
 
-    async def _send_sms(
-        self, db: AsyncSession, user: User, alert: Alert
-    ) -> NotificationDeliveryResult:
+    async def _send_sms(self, job: DeliveryJob):
         """Send SMS notification via Twilio."""
-        phone = getattr(user, "phone", None)
-
         if self.sms_service.client is None:
-            logger.debug(
-                "SMS not configured, skipping",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
-            )
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="sms",
-                success=False,
-                message="SMS not configured",
-            )
-
-        if not phone:
-            logger.debug(
-                "User has no phone number, skipping SMS",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
-            )
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="sms",
-                success=False,
-                message="No phone number",
-            )
+            logger.debug("SMS not configured, skipping", user_id=job.user_id, alert_id=job.alert_id)
+            return self._result(job, False, "SMS not configured"), None
 
         try:
             # Execute with retry logic
             success, message, external_id = await self.retry_manager.execute_with_retry(
                 self.sms_service.send_alert_sms,
-                phone,
-                alert.title,
-                alert.severity.value,
+                job.address,
+                job.title,
+                job.severity,
             )
-
-            # Create delivery record
-            status = DeliveryStatus.SENT.value if success else DeliveryStatus.FAILED.value
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.SMS.value,
-                status=status,
-                external_id=external_id,
-                error_message=None if success else message,
-                attempts=1,
-            )
-
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="sms",
-                success=success,
-                message=message,
-                external_id=external_id,
-            )
-
         except Exception as e:
             # All retries exhausted
             logger.error(
                 "SMS delivery failed after retries",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
+                user_id=job.user_id,
+                alert_id=job.alert_id,
                 error=str(e),
             )
-
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.SMS.value,
-                status=DeliveryStatus.FAILED.value,
-                error_message=str(e),
+            row = self._delivery_row(
+                job, DeliveryStatus.FAILED.value, error_message=str(e),
                 attempts=self.retry_manager.MAX_TRIES,
             )
+            return self._result(job, False, str(e)), row
 
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="sms",
-                success=False,
-                message=str(e),
-            )
+        status = DeliveryStatus.SENT.value if success else DeliveryStatus.FAILED.value
+        row = self._delivery_row(
+            job, status, external_id=external_id,
+            error_message=None if success else message,
+        )
+        return self._result(job, success, message, external_id), row
 
-    async def _send_call(self, user: User, alert: Alert) -> NotificationDeliveryResult:
+    async def _send_call(self, job: DeliveryJob):
         """Send voice call notification. Placeholder for Twilio Voice integration."""
-        try:
-            phone = getattr(user, 'phone', None)
-            # TODO: Integrate with Twilio Voice
-            logger.info(
-                f"Call notification: {alert.title} -> {phone}",
-                extra={
-                    "user_id": str(user.id),
-                    "alert_id": str(alert.id),
-                    "channel": "call",
-                },
-            )
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="call",
-                success=True,
-                message=f"Call queued to {phone}",
-            )
-        except Exception as e:
-            logger.error(f"Call notification failed: {e}")
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="call",
-                success=False,
-                message=str(e),
-            )
+        # TODO: Integrate with Twilio Voice
+        logger.info(
+            f"Call notification: {job.title} -> {job.address}",
+            user_id=job.user_id,
+            alert_id=job.alert_id,
+            channel="call",
+        )
+        return self._result(job, True, f"Call queued to {job.address}"), None
 
-    async def _send_push(
-        self, db: AsyncSession, user: User, alert: Alert
-    ) -> NotificationDeliveryResult:
+    async def _send_push(self, job: DeliveryJob):
         """Send push notification via WebPush."""
         if not self.push_service.enabled:
-            logger.debug(
-                "WebPush not configured, skipping",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
-            )
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="push",
-                success=False,
-                message="WebPush not configured",
-            )
+            logger.debug("WebPush not configured, skipping", user_id=job.user_id, alert_id=job.alert_id)
+            return self._result(job, False, "WebPush not configured"), None
 
         try:
-            # Query active push subscriptions for user
-            result = await db.execute(
-                select(PushSubscription).where(
-                    PushSubscription.user_id == user.id,
-                    PushSubscription.is_active == True,
-                )
-            )
-            subscriptions = list(result.scalars().all())
-
-            if not subscriptions:
-                logger.debug(
-                    "User has no active push subscriptions",
-                    user_id=str(user.id),
-                    alert_id=str(alert.id),
-                )
-                return NotificationDeliveryResult(
-                    user_id=user.id,
-                    channel="push",
-                    success=False,
-                    message="No active subscriptions",
+            async with self.session_factory() as db:
+                # Query active push subscriptions for user
+                result = await db.execute(
+                    select(PushSubscription).where(
+                        PushSubscription.user_id == UUID(job.user_id),
+                        PushSubscription.is_active == True,
+                    )
                 )
+                subscriptions = list(result.scalars().all())
 
-            # Send to each subscription
-            success_count = 0
-            failed_count = 0
-            last_error = None
-
-            for subscription in subscriptions:
-                subscription_info = {
-                    "endpoint": subscription.endpoint,
-                    "keys": {
-                        "p256dh": subscription.p256dh_key,
-                        "auth": subscription.auth_key,
-                    },
-                }
-
-                try:
-                    # Execute with retry logic
-                    success, message, _ = await self.retry_manager.execute_with_retry(
-                        self.push_service.send_alert_push,
-                        subscription_info,
-                        alert.title,
-                        alert.description or "",
-                        alert.severity.value,
-                        str(alert.id),
-                        None,  # url
+                if not subscriptions:
+                    logger.debug(
+                        "User has no active push subscriptions",
+                        user_id=job.user_id,
+                        alert_id=job.alert_id,
                     )
+                    return self._result(job, False, "No active subscriptions"), None
+
+                # Send to each subscription
+                success_count = 0
+                last_error = None
+                for subscription in subscriptions:
+                    subscription_info = {
+                        "endpoint": subscription.endpoint,
+                        "keys": {
+                            "p256dh": subscription.p256dh_key,
+                            "auth": subscription.auth_key,
+                        },
+                    }
+
+                    try:
+                        # Execute with retry logic
+                        success, message, _ = await self.retry_manager.execute_with_retry(
+                            self.push_service.send_alert_push,
+                            subscription_info,
+                            job.title,
+                            job.description,
+                            job.severity,
+                            job.alert_id,
+                            None,  # url
+                        )
+                    except Exception as e:
+                        last_error = str(e)
+                        logger.error(
+                            "Push delivery failed",
+                            subscription_id=str(subscription.id),
+                            error=str(e),
+                        )
+                        continue
 
                     if success:
                         success_count += 1
                     else:
-                        failed_count += 1
                         last_error = message
-
                         # Handle expired subscription
                         if message == "subscription_expired":
                             subscription.is_active = False
                             logger.info(
                                 "Deactivated expired push subscription",
                                 subscription_id=str(subscription.id),
-                                user_id=str(user.id),
+                                user_id=job.user_id,
                             )
 
-                except Exception as e:
-                    failed_count += 1
-                    last_error = str(e)
-                    logger.error(
-                        "Push delivery failed",
-                        subscription_id=str(subscription.id),
-                        error=str(e),
-                    )
-
-            # Create delivery record for overall push attempt
-            overall_success = success_count > 0
-            status = DeliveryStatus.SENT.value if overall_success else DeliveryStatus.FAILED.value
-            error_msg = None if overall_success else last_error
-
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.PUSH.value,
-                status=status,
-                error_message=error_msg,
-                attempts=1,
-            )
-
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="push",
-                success=overall_success,
-                message=f"Sent to {success_count}/{len(subscriptions)} subscriptions",
-            )
+                await db.commit()
 
         except Exception as e:
-            # All retries exhausted or other error
             logger.error(
                 "Push notification failed",
-                user_id=str(user.id),
-                alert_id=str(alert.id),
+                user_id=job.user_id,
+                alert_id=job.alert_id,
                 error=str(e),
             )
-
-            await self._create_delivery_record(
-                db=db,
-                alert_id=alert.id,
-                user_id=user.id,
-                channel=DeliveryChannel.PUSH.value,
-                status=DeliveryStatus.FAILED.value,
-                error_message=str(e),
+            row = self._delivery_row(
+                job, DeliveryStatus.FAILED.value, error_message=str(e),
                 attempts=self.retry_manager.MAX_TRIES,
             )
+            return self._result(job, False, str(e)), row
 
-            return NotificationDeliveryResult(
-                user_id=user.id,
-                channel="push",
-                success=False,
-                message=str(e),
-            )
-
-    def _is_quiet_hours(self, pref: NotificationPreference) -> bool:
-        """Check if current time is within user's quiet hours."""
-        if not pref.quiet_start or not pref.quiet_end:
-            return False
-
-        now = datetime.now(timezone.utc).time()
-        start = pref.quiet_start
-        end = pref.quiet_end
-
-        if start <= end:
-            # Normal range (e.g., 22:00 to 06:00 NOT crossing midnight)
-            return start <= now <= end
-        else:
-            # Crosses midnight (e.g., 22:00 to 06:00)
-            return now >= start or now <= end
+        # One delivery record for the overall push attempt
+        overall_success = success_count > 0
+        status = DeliveryStatus.SENT.value if overall_success else DeliveryStatus.FAILED.value
+        row = self._delivery_row(job, status, error_message=None if overall_success else last_error)
+        message = f"Sent to {success_count}/{len(subscriptions)} subscriptions"
+        return self._result(job, overall_success, message), row
 
     def get_delivery_log(self, limit: int = 100) -> list[dict[str, Any]]:
         """Get recent notification delivery log entries."""
-        return self._delivery_log[-limit:]
+        return list(self._delivery_log)[-limit:]
 
     def get_stats(self) -> dict[str, int]:
         """Get notification service statistics."""
@@ -0,0 +1,368 @@
+"""Authenticated-principal cache.
+
+Resolving the user behind a JWT costs a Postgres round-trip on every API
+call. This cache keeps the fields authorization needs (active flag, role,
+agency, custom role, token version) in a small in-process LRU backed by a
+shared Redis copy, so most requests are authorized without touching the
+database.
+
+Anything that changes those fields (role or permission edits, deactivation,
+password or MFA changes) calls ``invalidate``: the Redis entry is deleted
+and an eviction is published on ``auth:principal:invalidate`` so every API
+worker drops its local copy. Entries also expire on a short TTL in case an
+eviction message is missed.
+
+A request that loaded the user before a change committed must not cache
+what it read after that change's ``invalidate``. Invalidation first bumps a
+per-user generation counter (``invalidate_all`` a global one); callers read
+the generation with ``generation`` before loading the user and pass it to
+``put``, which writes only if neither counter has moved since.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+import structlog
+import redis.asyncio as aioredis
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.models.role import Role
+from app.models.user import User, UserRole
+
+logger = structlog.get_logger()
+
+CACHE_KEY_PREFIX = "auth:principal"
+# Outside CACHE_KEY_PREFIX so invalidate_all's key scan leaves the counters alone
+GENERATION_KEY_PREFIX = "auth:principal-gen"
+ALL_GENERATION_KEY = f"{GENERATION_KEY_PREFIX}:all"
+# Far longer than any request takes to load a user
+GENERATION_TTL_SECONDS = 86400
+INVALIDATE_CHANNEL = "auth:principal:invalidate"
+INVALIDATE_ALL = "*"
+# After a Redis error, use only the local LRU for this long
+REDIS_RETRY_SECONDS = 30.0
+
+# Cache the principal only if neither generation counter moved since it was read
+PUT_IF_GENERATION_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '0') == ARGV[2] and (redis.call('get', KEYS[3]) or '0') == ARGV[3] then
+    redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+@dataclass
+class Principal:
+    """Authorization-relevant snapshot of a user."""
+
+    id: str
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    is_verified: bool
+    mfa_enabled: bool
+    token_version: int
+    agency_id: str | None = None
+    badge_number: str | None = None
+    phone: str | None = None
+    role_id: str | None = None
+    role_name: str | None = None
+    role_display_name: str | None = None
+    role_permissions: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_user(cls, user: User, role: Role | None) -> "Principal":
+        """Snapshot a loaded user and its custom role."""
+        return cls(
+            id=str(user.id),
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role.value,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            mfa_enabled=user.mfa_enabled,
+            token_version=user.token_version,
+            agency_id=str(user.agency_id) if user.agency_id else None,
+            badge_number=user.badge_number,
+            phone=user.phone,
+            role_id=str(role.id) if role else None,
+            role_name=role.name if role else None,
+            role_display_name=role.display_name if role else None,
+            role_permissions=list(role.permissions or []) if role else [],
+        )
+
+    def to_user(self) -> User:
+        """Build a detached User carrying the cached fields.
+
+        Columns that are not cached (password hash, MFA secret, lockout
+        state) are left expired, so code that needs them fails loudly
+        instead of reading stale or empty values. Endpoints that modify the
+        current user must load it from the database instead.
+        """
+        user = User(
+            id=uuid.UUID(self.id),
+            email=self.email,
+            full_name=self.full_name,
+            role=UserRole(self.role),
+            is_active=self.is_active,
+            is_verified=self.is_verified,
+            mfa_enabled=self.mfa_enabled,
+            agency_id=uuid.UUID(self.agency_id) if self.agency_id else None,
+            badge_number=self.badge_number,
+            phone=self.phone,
+            role_id=uuid.UUID(self.role_id) if self.role_id else None,
+        )
+        make_transient_to_detached(user)
+        role = None
+        if self.role_id:
+            role = Role(
+                id=uuid.UUID(self.role_id),
+                name=self.role_name,
+                display_name=self.role_display_name,
+                permissions=self.role_permissions,
+            )
+            make_transient_to_detached(role)
+        # Bypass backrefs so neither object is marked dirty
+        set_committed_value(user, "role_obj", role)
+        return user
+
+
+@dataclass(frozen=True)
+class PrincipalGeneration:
+    """Invalidation state read before loading a user, checked by ``put``."""
+
+    # Local evictions seen by this process
+    evictions: int
+    # (user, all) counters from Redis, or None if they could not be read
+    counters: tuple[str, str] | None = None
+
+
+def _counter(value: bytes | str | None) -> str:
+    if value is None:
+        return "0"
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class PrincipalCache:
+    """In-process LRU of principals, shared through Redis and pub/sub."""
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis | None = None,
+        max_entries: int = 10000,
+        local_ttl_seconds: float = 60.0,
+        redis_ttl_seconds: int = 300,
+    ):
+        self.redis = redis_client
+        self.max_entries = max_entries
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._local: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._redis_retry_at = 0.0
+        self._evictions = 0
+        self._listener_task: asyncio.Task | None = None
+
+    @staticmethod
+    def cache_key(user_id: str) -> str:
+        """Redis key of a cached principal."""
+        return f"{CACHE_KEY_PREFIX}:{user_id}"
+
+    @staticmethod
+    def generation_key(user_id: str) -> str:
+        """Redis key of a user's invalidation counter."""
+        return f"{GENERATION_KEY_PREFIX}:{user_id}"
+
+    # ==================== Lookup ====================
+
+    async def get(self, user_id: uuid.UUID | str) -> Principal | None:
+        """Return the cached principal, checking local memory then Redis."""
+        key = str(user_id)
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return principal
+            del self._local[key]
+
+        redis = await self._get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self.cache_key(key))
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+
+        principal = Principal(**json.loads(raw))
+        self._store_local(principal)
+        return principal
+
+    async def generation(self, user_id: uuid.UUID | str) -> PrincipalGeneration:
+        """Read the invalidation state to pass to ``put`` (before loading the user)."""
+        evictions = self._evictions
+        redis = await self._get_redis()
+        if redis is None:
+            return PrincipalGeneration(evictions)
+        try:
+            user_counter, all_counter = await redis.mget(
+                self.generation_key(str(user_id)), ALL_GENERATION_KEY
+            )
+        except Exception as e:
+            self._redis_failed(e)
+            return PrincipalGeneration(evictions)
+        return PrincipalGeneration(evictions, (_counter(user_counter), _counter(all_counter)))
+
+    async def put(self, principal: Principal, generation: PrincipalGeneration | None = None) -> None:
+        """Cache a principal locally and in Redis.
+
+        With ``generation``, nothing is cached if the user was invalidated
+        since it was read: the principal may predate that change.
+        """
+        if generation is not None and generation.evictions != self._evictions:
+            return
+        redis = await self._get_redis()
+        if redis is not None and (generation is None or generation.counters is not None):
+            value = json.dumps(asdict(principal))
+            try:
+                if generation is None:
+                    await redis.set(self.cache_key(principal.id), value, ex=self.redis_ttl_seconds)
+                elif not await redis.eval(
+                    PUT_IF_GENERATION_SCRIPT,
+                    3,
+                    self.cache_key(principal.id),
+                    self.generation_key(principal.id),
+                    ALL_GENERATION_KEY,
+                    value,
+                    *generation.counters,
+                    self.redis_ttl_seconds,
+                ):
+                    return
+            except Exception as e:
+                self._redis_failed(e)
+        self._store_local(principal)
+
+    # ==================== Invalidation ====================
+
+    async def invalidate(self, user_id: uuid.UUID | str) -> None:
+        """Evict one user everywhere (call after committing the change)."""
+        key = str(user_id)
+        self.evict_local(key)
+        # Always try: a stale shared copy would outlive the local eviction
+        redis = await self._get_redis(ignore_backoff=True)
+        if redis is None:
+            return
+        try:
+            # Bump first, so a put racing with the delete is refused
+            await redis.incr(self.generation_key(key))
+            await redis.expire(self.generation_key(key), GENERATION_TTL_SECONDS)
+            await redis.delete(self.cache_key(key))
+            await redis.publish(INVALIDATE_CHANNEL, key)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def invalidate_all(self) -> None:
+        """Evict every principal, e.g. after a role's permissions change."""
+        self.evict_local(INVALIDATE_ALL)
+        redis = await self._get_redis(ignore_backoff=True)
+        if redis is None:
+            return
+        try:
+            await redis.incr(ALL_GENERATION_KEY)
+            keys = [k async for k in redis.scan_iter(match=f"{CACHE_KEY_PREFIX}:*", count=500)]
+            if keys:
+                await redis.delete(*keys)
+            await redis.publish(INVALIDATE_CHANNEL, INVALIDATE_ALL)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def evict_local(self, user_id: str) -> None:
+        """Drop a local entry (or all of them for "*")."""
+        self._evictions += 1
+        if user_id == INVALIDATE_ALL:
+            self._local.clear()
+        else:
+            self._local.pop(user_id, None)
+
+    # ==================== Pub/sub listener ====================
+
+    async def start(self) -> None:
+        """Subscribe to evictions published by other workers."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(
+                self._listen(), name="principal-cache-invalidation"
+            )
+
+    async def stop(self) -> None:
+        """Stop the eviction listener."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                redis = await self._get_redis(ignore_backoff=True)
+                if redis is None:
+                    return
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        data = message["data"]
+                        self.evict_local(data.decode() if isinstance(data, bytes) else data)
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Missed evictions are bounded by local_ttl_seconds
+                self.evict_local(INVALIDATE_ALL)
+                logger.warning("Principal cache listener error", error=str(e))
+                await asyncio.sleep(5)
+
+    # ==================== Internals ====================
+
+    def _store_local(self, principal: Principal) -> None:
+        self._local[principal.id] = (time.monotonic() + self.local_ttl_seconds, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, ignore_backoff: bool = False) -> aioredis.Redis | None:
+        if not ignore_backoff and time.monotonic() < self._redis_retry_at:
+            return None
+        if self.redis is None:
+            from app.core.deps import get_redis
+
+            self.redis = await get_redis()
+        return self.redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("Principal cache Redis unavailable; using local cache only", error=str(error))
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.principal_cache_max_entries,
+    local_ttl_seconds=settings.principal_cache_local_ttl_seconds,
+    redis_ttl_seconds=settings.principal_cache_ttl_seconds,
+)
@@ -6,21 +6,21 @@ integrates with the Communication Hub for message delivery.
 
 import json
 import uuid
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
 import structlog
-from pywebpush import webpush, WebPushException
-from sqlalchemy import select, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import select, update, String, Boolean, DateTime, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, TimestampMixin
 from app.models.user import User
-from app.core.config import settings
+from app.services.delivery.webpush_sender import PushResult, PushTarget, get_webpush_sender
 
 logger = structlog.get_logger()
 
@@ -240,32 +240,121 @@ class PushNotificationService:
         Returns:
             The notification record
         """
-        # Create notification record
-        notification = Notification(
-            user_id=user_id,
-            notification_type=notification_type.value,
-            title=payload.title,
-            body=payload.body,
-            icon=payload.icon,
-            url=payload.url,
-            data=payload.data,
-            status=NotificationStatus.PENDING.value,
-        )
+        notifications = await self.send_to_multiple_users([user_id], payload, notification_type)
+        return notifications[0]
+
+    async def send_to_multiple_users(
+        self,
+        user_ids: list[uuid.UUID],
+        payload: NotificationPayload,
+        notification_type: NotificationType = NotificationType.SYSTEM,
+    ) -> list[Notification]:
+        """Send a notification to multiple users.
+
+        The notification records are inserted together, every user's
+        subscriptions are loaded with one query, and the pushes are sent
+        concurrently. Statuses are written back with one bulk UPDATE, and
+        subscriptions the push service reports as gone are deactivated.
+
+        Returns:
+            One notification record per user id, in order
+        """
+        if not user_ids:
+            return []
 
-        self.db.add(notification)
+        notifications = [
+            Notification(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                notification_type=notification_type.value,
+                title=payload.title,
+                body=payload.body,
+                icon=payload.icon,
+                url=payload.url,
+                data=payload.data,
+                status=NotificationStatus.PENDING.value,
+                # Set so the bulk UPDATE below refreshes them on these objects
+                sent_at=None,
+                error_message=None,
+            )
+            for user_id in user_ids
+        ]
+        self.db.add_all(notifications)
         await self.db.commit()
-        await self.db.refresh(notification)
 
-        # Get user's subscriptions
-        subscriptions = await self.get_user_subscriptions(user_id)
+        result = await self.db.execute(
+            select(PushSubscription).where(
+                PushSubscription.user_id.in_(set(user_ids)),
+                PushSubscription.is_active == True,
+            )
+        )
+        subscriptions: dict[uuid.UUID, list[PushSubscription]] = defaultdict(list)
+        for sub in result.scalars().all():
+            subscriptions[sub.user_id].append(sub)
+
+        messages: list[tuple[Notification, PushTarget, str]] = []
+        for notification in notifications:
+            data = json.dumps(self._webpush_payload(payload, notification))
+            for sub in subscriptions.get(notification.user_id, []):
+                target = PushTarget(sub.endpoint, sub.p256dh_key, sub.auth_key, subscription_id=sub.id)
+                messages.append((notification, target, data))
+
+        sender = get_webpush_sender()
+        if sender is not None:
+            results = await sender.send_many((target, data) for _, target, data in messages)
+        else:
+            # Stub mode when not configured
+            logger.debug("WebPush not configured, skipping actual send", messages=len(messages))
+            results = [PushResult(target, True) for _, target, _ in messages]
+
+        successes: dict[uuid.UUID, int] = defaultdict(int)
+        errors: dict[uuid.UUID, str] = {}
+        expired: set[uuid.UUID] = set()
+        for (notification, target, _), outcome in zip(messages, results):
+            if outcome.success:
+                successes[notification.id] += 1
+            else:
+                errors[notification.id] = outcome.error or "Push send failed"
+                if outcome.expired:
+                    expired.add(target.subscription_id)
+
+        now = datetime.now(timezone.utc)
+        # ORM bulk UPDATE by primary key: one executemany for every record
+        await self.db.execute(update(Notification), [
+            {
+                "id": n.id,
+                "status": NotificationStatus.SENT.value,
+                "sent_at": now,
+                "error_message": None,
+            } if successes[n.id] else {
+                "id": n.id,
+                "status": NotificationStatus.FAILED.value,
+                "sent_at": None,
+                "error_message": errors.get(n.id, "No active subscriptions"),
+            }
+            for n in notifications
+        ])
+        if expired:
+            await self.db.execute(
+                update(PushSubscription)
+                .where(PushSubscription.id.in_(expired))
+                .values(is_active=False)
+            )
+            logger.info("Deactivated expired push subscriptions", count=len(expired))
+        await self.db.commit()
 
-        if not subscriptions:
-            notification.status = NotificationStatus.FAILED.value
-            notification.error_message = "No active subscriptions"
-            await self.db.commit()
-            return notification
+        logger.info(
+            "Sent push notifications",
+            users=len(user_ids),
+            messages=len(messages),
+            sent=sum(1 for r in results if r.success),
+            expired=len(expired),
+        )
+
+        return notifications
 
-        # Build WebPush payload
+    @staticmethod
+    def _webpush_payload(payload: NotificationPayload, notification: Notification) -> dict:
         webpush_payload = {
             "title": payload.title,
             "body": payload.body,
@@ -280,91 +369,9 @@ class PushNotificationService:
             "requireInteraction": payload.require_interaction,
             "silent": payload.silent,
         }
-
         if payload.actions:
             webpush_payload["actions"] = payload.actions
-
-        # Send to each subscription
-        success_count = 0
-        for sub in subscriptions:
-            try:
-                # Send via pywebpush if VAPID keys configured
-                if settings.vapid_private_key:
-                    webpush(
-                        subscription_info={
-                            "endpoint": sub.endpoint,
-                            "keys": {"p256dh": sub.p256dh_key, "auth": sub.auth_key},
-                        },
-                        data=json.dumps(webpush_payload),
-                        vapid_private_key=settings.vapid_private_key,
-                        vapid_claims={"sub": settings.vapid_mailto},
-                        content_encoding="aes128gcm",
-                    )
-                    success_count += 1
-                    logger.debug(
-                        "Push notification sent",
-                        subscription_id=str(sub.id),
-                        endpoint=sub.endpoint[:50],
-                    )
-                else:
-                    # Stub mode when not configured
-                    success_count += 1
-                    logger.debug(
-                        "WebPush not configured, skipping actual send",
-                        subscription_id=str(sub.id),
-                    )
-            except WebPushException as e:
-                # Handle expired subscription (410 Gone)
-                if "410" in str(e) or "Gone" in str(e):
-                    sub.is_active = False
-                    logger.info(
-                        "Push subscription expired",
-                        subscription_id=str(sub.id),
-                    )
-                else:
-                    logger.error(
-                        "Push send failed",
-                        subscription_id=str(sub.id),
-                        error=str(e),
-                    )
-            except Exception as e:
-                logger.error(
-                    "Failed to send push notification",
-                    subscription_id=str(sub.id),
-                    error=str(e),
-                )
-
-        # Update notification status
-        notification.status = NotificationStatus.SENT.value
-        notification.sent_at = datetime.now(timezone.utc)
-        await self.db.commit()
-
-        logger.info(
-            "Sent push notification",
-            notification_id=str(notification.id),
-            user_id=str(user_id),
-            subscriptions_count=len(subscriptions),
-            success_count=success_count,
-        )
-
-        return notification
-
-    async def send_to_multiple_users(
-        self,
-        user_ids: list[uuid.UUID],
-        payload: NotificationPayload,
-        notification_type: NotificationType = NotificationType.SYSTEM,
-    ) -> list[Notification]:
-        """Send a notification to multiple users."""
-        notifications = []
-        for user_id in user_ids:
-            notification = await self.send_notification(
-                user_id=user_id,
-                payload=payload,
-                notification_type=notification_type,
-            )
-            notifications.append(notification)
-        return notifications
+        return webpush_payload
 
     async def mark_delivered(self, notification_id: uuid.UUID) -> bool:
         """Mark a notification as delivered."""
@@ -7,6 +7,7 @@ from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.role import Role, DEFAULT_ROLES
+from app.services.principal_cache import principal_cache
 
 
 class RoleError(Exception):
@@ -194,6 +195,9 @@ class RoleService:
         await self.db.commit()
         await self.db.refresh(role)
 
+        # Cached principals embed role names and permissions
+        await principal_cache.invalidate_all()
+
         return role
 
     async def delete_role(self, role_id: uuid.UUID) -> None:
@@ -218,6 +222,9 @@ class RoleService:
         role.deleted_at = datetime.now(timezone.utc)
         await self.db.commit()
 
+        # Cached principals embed role names and permissions
+        await principal_cache.invalidate_all()
+
     def get_available_permissions(self) -> list[dict]:
         """Get list of all available permissions."""
         return AVAILABLE_PERMISSIONS
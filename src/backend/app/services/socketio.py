@@ -131,6 +131,14 @@ async def emit_incident_updated(incident: dict[str, Any]) -> None:
     logger.info("Emitted incident:updated", incident_id=incident_id)
 
 
+async def emit_incident_timeline_event(incident_id: str, event: dict[str, Any]) -> None:
+    """Emit a single new timeline entry to the incident room."""
+    await sio.emit(
+        "incident:timeline", {"incident_id": incident_id, "event": event}, room=f"incident:{incident_id}"
+    )
+    logger.debug("Emitted incident:timeline", incident_id=incident_id, event_type=event.get("type"))
+
+
 async def emit_alert_created(alert: dict[str, Any]) -> None:
     """Emit alert created event to all authenticated users."""
     await sio.emit("alert:created", alert, room="authenticated")
@@ -337,6 +345,20 @@ async def emit_building_updated(building: dict, building_id: str) -> None:
         logger.error("Failed to emit building:updated", building_id=building_id, error=str(e))
 
 
+async def emit_bim_import_progress(job: dict, building_id: str) -> None:
+    """Emit BIM import job progress to building-specific room."""
+    try:
+        await sio.emit("bim:import:progress", job, room=f"building:{building_id}")
+        logger.debug(
+            "Emitted bim:import:progress",
+            building_id=building_id,
+            job_id=job.get("job_id"),
+            status=job.get("status"),
+        )
+    except Exception as e:
+        logger.error("Failed to emit bim:import:progress", building_id=building_id, error=str(e))
+
+
 async def emit_floor_plan_uploaded(floor_plan: dict, building_id: str) -> None:
     """Emit floor plan uploaded event to building-specific room."""
     try:
@@ -693,9 +715,35 @@ async def join_device_telemetry(sid: str, data: dict) -> dict:
     if sid in connected_clients:
         connected_clients[sid]["rooms"].add(room)
     logger.info("Client joined device telemetry room", sid=sid, device_id=device_id)
+
+    if settings.telemetry_shadow_enabled:
+        await _emit_telemetry_snapshot(sid, device_id)
+
     return {"status": "joined", "device_id": device_id}
 
 
+async def _emit_telemetry_snapshot(sid: str, device_id: str) -> None:
+    """Send the current latest-value shadow of a device to a newly joined client."""
+    try:
+        # Imported lazily: app.core.deps imports services, which import this module
+        from app.core.deps import get_redis
+        from app.services.telemetry_shadow_service import TelemetryShadowService
+
+        shadow_service = TelemetryShadowService(
+            await get_redis(),
+            history_size=settings.telemetry_shadow_history_size,
+        )
+        metrics = await shadow_service.get_device_shadow(device_id)
+        await sio.emit("telemetry:snapshot", {
+            "device_id": device_id,
+            "metrics": metrics,
+            "timestamp": datetime.utcnow().isoformat(),
+        }, to=sid)
+    except Exception as e:
+        # Live telemetry:data events still flow even if the snapshot fails
+        logger.warning("Failed to emit telemetry snapshot", device_id=device_id, error=str(e))
+
+
 @sio.event
 async def leave_device_telemetry(sid: str, data: dict) -> dict:
     """Leave a device telemetry room."""
@@ -4,19 +4,23 @@ This service connects the existing Axis integration components:
   AxisEventSubscriber -> AudioAlertGenerator -> AlertService -> WebSocket
 """
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import select, and_
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.integrations.axis.events import AxisAudioEvent, AudioEventType
 from app.integrations.axis.alert_generator import AudioAlertGenerator
 from app.models.alert import Alert, AlertSource, AlertSeverity, AlertStatus
 from app.models.device import IoTDevice, DeviceStatus
-from app.services.socketio import emit_alert_created, emit_device_alert, emit_device_status
+from app.core.config import settings
+from app.services.alert_dedup import alert_deduplicator, dedup_key
+from app.services.device_identity_cache import device_identity_cache
+from app.services.socketio import emit_alert_created, emit_device_alert
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +31,7 @@ class SoundAlertPipeline:
 
     Orchestrates all steps:
     1. Receive audio event from AxisEventSubscriber
-    2. Look up IoT device in database by device_id
+    2. Look up IoT device by device_id (cached, batched per window)
     3. Apply confidence thresholds (AudioAlertGenerator logic)
     4. Create Alert with device/building/floor references
     5. Store audio clip (if available)
@@ -52,10 +56,17 @@ class SoundAlertPipeline:
         session_factory: async_sessionmaker[AsyncSession],
         auto_create_incidents: bool = True,
         notification_service: Any | None = None,
+        batch_window_ms: int | None = None,
     ):
         self.session_factory = session_factory
         self.auto_create_incidents = auto_create_incidents
         self.notification_service = notification_service
+        if batch_window_ms is None:
+            batch_window_ms = settings.sound_pipeline_batch_window_ms
+        self.batch_window = batch_window_ms / 1000
+        self._pending: list[tuple[AxisAudioEvent, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
         self._stats = {
             "events_processed": 0,
             "alerts_created": 0,
@@ -70,7 +81,9 @@ class SoundAlertPipeline:
         Process an audio event from the Axis subscriber.
 
         This is the main entry point, registered as an event handler
-        with AxisEventSubscriber.on_event().
+        with AxisEventSubscriber.on_event(). Events arriving within
+        ``batch_window_ms`` of each other are processed together; each
+        caller still gets the alert its own event was recorded on.
         """
         self._stats["events_processed"] += 1
 
@@ -80,183 +93,312 @@ class SoundAlertPipeline:
             self._stats["events_below_threshold"] += 1
             return None
 
+        if self.batch_window <= 0:
+            return (await self._process_batch([event]))[0]
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((event, future))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_pending)
+        return await future
+
+    async def stop(self) -> None:
+        """Process events still waiting for their window to close."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_pending()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    # ==================== Batching ====================
+
+    def _flush_pending(self) -> None:
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list[tuple[AxisAudioEvent, asyncio.Future]]) -> None:
+        try:
+            results = await self._process_batch([event for event, _ in batch])
+        except Exception as e:
+            logger.error(f"Sound alert batch of {len(batch)} events failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _process_batch(self, events: list[AxisAudioEvent]) -> list[dict[str, Any] | None]:
+        """Record a window of events in one session and one transaction.
+
+        Events for the same device and type fold into one alert, and every
+        alert touched by the window is broadcast once.
+        """
         async with self.session_factory() as db:
-            # Find IoT device by source device_id or serial
-            device = await self._find_device(db, event.device_id)
-            if not device:
-                self._stats["device_not_found"] += 1
-                logger.warning(f"IoT device not found for Axis device: {event.device_id}")
-                # Still create alert without device reference
-                device = None
-
-            # Check for repeat alert (same device, same type, within dedup window)
-            existing_alert = await self._find_recent_alert(
-                db, device, event.event_type.value
-            )
-            if existing_alert:
-                # Increment occurrence count
-                existing_alert.occurrence_count += 1
-                existing_alert.last_occurrence = datetime.now(timezone.utc)
-                if event.confidence and (existing_alert.confidence is None or event.confidence > existing_alert.confidence):
-                    existing_alert.confidence = event.confidence
-                await db.commit()
-                await db.refresh(existing_alert)
-
-                alert_data = self._alert_to_dict(existing_alert)
-                await emit_alert_created(alert_data)
-                return alert_data
-
-            # Create new alert
-            severity = self.SEVERITY_MAP.get(event.event_type, AlertSeverity.MEDIUM)
-            risk_level = self.RISK_LEVEL_MAP.get(severity, "elevated")
-
-            title = f"{event.event_type.value.replace('_', ' ').title()} Detected"
-            description = (
-                f"Audio analytics detected {event.event_type.value.replace('_', ' ')} "
-                f"at {event.device_name} with {event.confidence:.0%} confidence"
-            )
-
-            alert = Alert(
-                id=uuid.uuid4(),
-                source=AlertSource.AXIS_MICROPHONE,
-                source_id=f"axis:{event.device_id}:{event.timestamp.isoformat()}",
-                source_device_id=event.device_id,
-                severity=severity,
-                status=AlertStatus.PENDING,
-                alert_type=event.event_type.value,
-                title=title,
-                description=description,
-                received_at=datetime.now(timezone.utc),
-                confidence=event.confidence,
-                risk_level=risk_level,
-                occurrence_count=1,
-                last_occurrence=datetime.now(timezone.utc),
-                raw_payload={
-                    "device_id": event.device_id,
-                    "device_name": event.device_name,
-                    "event_type": event.event_type.value,
-                    "confidence": event.confidence,
-                    "location_name": event.location_name,
-                    "audio_clip_url": event.audio_clip_url,
-                    "raw_event": event.raw_event,
-                },
-            )
-
-            # Add location from event or device
-            if event.location:
-                alert.latitude = event.location[0]
-                alert.longitude = event.location[1]
-            elif device and device.latitude:
-                alert.latitude = device.latitude
-                alert.longitude = device.longitude
-
-            if event.location_name:
-                alert.zone = event.location_name
-            elif device and device.location_name:
-                alert.zone = device.location_name
-
-            # Link to device, building, floor
-            if device:
-                alert.device_id = device.id
-                alert.building_id = device.building_id
-                alert.floor_plan_id = device.floor_plan_id
-
-                # Update device status to ALERT
-                device.status = DeviceStatus.ALERT.value
-                device.last_seen = datetime.now(timezone.utc)
-
-            db.add(alert)
-            await db.commit()
-            await db.refresh(alert)
-            self._stats["alerts_created"] += 1
-
-            # Emit WebSocket events
-            alert_data = self._alert_to_dict(alert)
-            await emit_alert_created(alert_data)
-
-            if device:
-                await emit_device_alert({
-                    "device_id": str(device.id),
-                    "name": device.name,
-                    "status": DeviceStatus.ALERT.value,
-                    "event_type": event.event_type.value,
-                    "confidence": event.confidence,
-                    "alert_id": str(alert.id),
-                    "building_id": str(device.building_id),
-                    "floor_plan_id": str(device.floor_plan_id) if device.floor_plan_id else None,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-
-            # Auto-incident for critical events
-            if self.auto_create_incidents and self._should_auto_create_incident(event):
-                logger.info(
-                    f"Auto-incident triggered: {event.event_type.value} "
-                    f"at {event.confidence:.0%} confidence"
+            devices = await self._resolve_devices(db, {event.device_id for event in events})
+            now = datetime.now(timezone.utc)
+
+            alerts_by_key: dict[str, Alert] = {}
+            created: dict[uuid.UUID, tuple[Alert, AxisAudioEvent, IoTDevice | None]] = {}
+            event_alerts: list[Alert] = []
+            for event in events:
+                device = devices.get(event.device_id)
+                if not device:
+                    self._stats["device_not_found"] += 1
+                    logger.warning(f"IoT device not found for Axis device: {event.device_id}")
+
+                # Check for repeat alert (same device, same type, within dedup window)
+                key = (
+                    dedup_key(AlertSource.AXIS_MICROPHONE, event.event_type.value, device_id=device.id)
+                    if device else None
                 )
-                self._stats["incidents_created"] += 1
-
-            # Send notifications
-            if self.notification_service:
-                try:
-                    results = await self.notification_service.notify_for_alert(alert)
-                    self._stats["notifications_sent"] += len(
-                        [r for r in results if r.success]
-                    )
-                except Exception as e:
-                    logger.error(f"Notification delivery error: {e}")
-
-            return alert_data
-
-    async def _find_device(
-        self, db: AsyncSession, axis_device_id: str
-    ) -> IoTDevice | None:
-        """Find IoT device by Axis device ID (serial number or IP)."""
-        # Try serial number first
-        result = await db.execute(
-            select(IoTDevice).where(
-                and_(
-                    IoTDevice.serial_number == axis_device_id,
+                alert = alerts_by_key.get(key) if key else None
+                if alert is None:
+                    alert_id = uuid.uuid4()
+                    alert = await self._find_recent_alert(db, key, alert_id)
+                    if alert is None:
+                        alert = self._build_alert(event, device, alert_id, key, now)
+                        db.add(alert)
+                        created[alert.id] = (alert, event, device)
+                    else:
+                        self._record_occurrence(alert, event, now)
+                    if key:
+                        alerts_by_key[key] = alert
+                else:
+                    self._record_occurrence(alert, event, now)
+                event_alerts.append(alert)
+
+            try:
+                await db.commit()
+            except Exception:
+                for alert, _, _ in created.values():
+                    if alert.dedup_key is not None:
+                        await alert_deduplicator.release(alert.dedup_key, alert.id)
+                raise
+
+            # Keep folding repeats while the event is ongoing
+            for key, alert in alerts_by_key.items():
+                if alert.id not in created:
+                    await alert_deduplicator.reassign(key, alert.id)
+            for alert, _, _ in created.values():
+                await db.refresh(alert, ["created_at"])
+            self._stats["alerts_created"] += len(created)
+
+            # Emit WebSocket events, one per alert touched in this window
+            alert_data: dict[uuid.UUID, dict[str, Any]] = {}
+            for alert in event_alerts:
+                if alert.id not in alert_data:
+                    alert_data[alert.id] = self._alert_to_dict(alert)
+                    await emit_alert_created(alert_data[alert.id])
+
+            for alert, event, device in created.values():
+                await self._after_alert_created(alert, event, device)
+
+            return [alert_data[alert.id] for alert in event_alerts]
+
+    async def _resolve_devices(
+        self, db: AsyncSession, axis_device_ids: set[str]
+    ) -> dict[str, IoTDevice]:
+        """Find IoT devices by Axis device ID (serial number, then IP).
+
+        Identifiers in the identity cache are loaded by primary key and
+        checked to still belong to the device; the rest are resolved with a
+        single query.
+        """
+        devices: dict[str, IoTDevice] = {}
+        cached: dict[str, uuid.UUID] = {}
+        unresolved: set[str] = set()
+        for axis_device_id in axis_device_ids:
+            hit, device_id = device_identity_cache.get(axis_device_id)
+            if not hit:
+                unresolved.add(axis_device_id)
+            elif device_id is not None:
+                cached[axis_device_id] = device_id
+
+        if cached:
+            result = await db.execute(
+                select(IoTDevice).where(
+                    IoTDevice.id.in_(set(cached.values())),
                     IoTDevice.deleted_at.is_(None),
                 )
             )
-        )
-        device = result.scalar_one_or_none()
-        if device:
-            return device
-
-        # Try IP address
-        result = await db.execute(
-            select(IoTDevice).where(
-                and_(
-                    IoTDevice.ip_address == axis_device_id,
+            by_id = {device.id: device for device in result.scalars()}
+            for axis_device_id, device_id in cached.items():
+                device = by_id.get(device_id)
+                if device and axis_device_id in (device.serial_number, device.ip_address):
+                    devices[axis_device_id] = device
+                else:
+                    # Changed by another worker since it was cached
+                    device_identity_cache.discard(axis_device_id)
+                    unresolved.add(axis_device_id)
+
+        if unresolved:
+            result = await db.execute(
+                select(IoTDevice).where(
+                    or_(
+                        IoTDevice.serial_number.in_(unresolved),
+                        IoTDevice.ip_address.in_(unresolved),
+                    ),
                     IoTDevice.deleted_at.is_(None),
                 )
             )
+            candidates = result.scalars().all()
+            by_serial = {d.serial_number: d for d in candidates if d.serial_number}
+            by_ip = {d.ip_address: d for d in candidates if d.ip_address}
+            for axis_device_id in unresolved:
+                device = by_serial.get(axis_device_id) or by_ip.get(axis_device_id)
+                device_identity_cache.put(axis_device_id, device.id if device else None)
+                if device:
+                    devices[axis_device_id] = device
+
+        return devices
+
+    def _build_alert(
+        self,
+        event: AxisAudioEvent,
+        device: IoTDevice | None,
+        alert_id: uuid.UUID,
+        key: str | None,
+        now: datetime,
+    ) -> Alert:
+        """Create a new alert for an event, linked to its device if known."""
+        severity = self.SEVERITY_MAP.get(event.event_type, AlertSeverity.MEDIUM)
+        risk_level = self.RISK_LEVEL_MAP.get(severity, "elevated")
+
+        title = f"{event.event_type.value.replace('_', ' ').title()} Detected"
+        description = (
+            f"Audio analytics detected {event.event_type.value.replace('_', ' ')} "
+            f"at {event.device_name} with {event.confidence:.0%} confidence"
         )
-        return result.scalar_one_or_none()
+
+        alert = Alert(
+            id=alert_id,
+            source=AlertSource.AXIS_MICROPHONE,
+            source_id=f"axis:{event.device_id}:{event.timestamp.isoformat()}",
+            source_device_id=event.device_id,
+            dedup_key=key,
+            severity=severity,
+            status=AlertStatus.PENDING,
+            alert_type=event.event_type.value,
+            title=title,
+            description=description,
+            received_at=now,
+            confidence=event.confidence,
+            risk_level=risk_level,
+            occurrence_count=1,
+            last_occurrence=now,
+            raw_payload={
+                "device_id": event.device_id,
+                "device_name": event.device_name,
+                "event_type": event.event_type.value,
+                "confidence": event.confidence,
+                "location_name": event.location_name,
+                "audio_clip_url": event.audio_clip_url,
+                "raw_event": event.raw_event,
+            },
+        )
+
+        # Add location from event or device
+        if event.location:
+            alert.latitude = event.location[0]
+            alert.longitude = event.location[1]
+        elif device and device.latitude:
+            alert.latitude = device.latitude
+            alert.longitude = device.longitude
+
+        if event.location_name:
+            alert.zone = event.location_name
+        elif device and device.location_name:
+            alert.zone = device.location_name
+
+        # Link to device, building, floor
+        if device:
+            alert.device_id = device.id
+            alert.building_id = device.building_id
+            alert.floor_plan_id = device.floor_plan_id
+
+            # Update device status to ALERT
+            device.status = DeviceStatus.ALERT.value
+            device.last_seen = now
+
+        return alert
+
+    @staticmethod
+    def _record_occurrence(alert: Alert, event: AxisAudioEvent, now: datetime) -> None:
+        """Fold a repeat event into an open alert."""
+        alert.occurrence_count += 1
+        alert.last_occurrence = now
+        if event.confidence and (alert.confidence is None or event.confidence > alert.confidence):
+            alert.confidence = event.confidence
+
+    async def _after_alert_created(
+        self, alert: Alert, event: AxisAudioEvent, device: IoTDevice | None
+    ) -> None:
+        """Device broadcast, auto-incident and notifications for a new alert."""
+        if device:
+            await emit_device_alert({
+                "device_id": str(device.id),
+                "name": device.name,
+                "status": DeviceStatus.ALERT.value,
+                "event_type": event.event_type.value,
+                "confidence": event.confidence,
+                "alert_id": str(alert.id),
+                "building_id": str(device.building_id),
+                "floor_plan_id": str(device.floor_plan_id) if device.floor_plan_id else None,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+
+        # Auto-incident for critical events
+        if self.auto_create_incidents and self._should_auto_create_incident(event):
+            logger.info(
+                f"Auto-incident triggered: {event.event_type.value} "
+                f"at {event.confidence:.0%} confidence"
+            )
+            self._stats["incidents_created"] += 1
+
+        # Send notifications
+        if self.notification_service:
+            try:
+                results = await self.notification_service.notify_for_alert(alert)
+                self._stats["notifications_sent"] += len(
+                    [r for r in results if r.success]
+                )
+            except Exception as e:
+                logger.error(f"Notification delivery error: {e}")
 
     async def _find_recent_alert(
         self,
         db: AsyncSession,
-        device: IoTDevice | None,
-        alert_type: str,
-        window_seconds: int = 60,
+        key: str | None,
+        alert_id: uuid.UUID,
+        window_seconds: int | None = None,
     ) -> Alert | None:
-        """Find a recent alert from the same device and type for dedup."""
-        if not device:
+        """Find the open alert for the same device and type within the window.
+
+        Claims the dedup key for alert_id when there is none.
+        """
+        if key is None:
             return None
 
-        cutoff = datetime.now(timezone.utc)
-        result = await db.execute(
-            select(Alert).where(
-                and_(
-                    Alert.device_id == device.id,
-                    Alert.alert_type == alert_type,
-                    Alert.status.in_([AlertStatus.PENDING, AlertStatus.ACKNOWLEDGED]),
-                )
-            ).order_by(Alert.received_at.desc()).limit(1)
+        open_statuses = (AlertStatus.PENDING, AlertStatus.ACKNOWLEDGED)
+        holder_id = await alert_deduplicator.claim(
+            db, key, alert_id, window_seconds=window_seconds, statuses=open_statuses
         )
-        return result.scalar_one_or_none()
+        if holder_id is None:
+            return None
+
+        alert = await db.get(Alert, holder_id)
+        if alert is None or alert.status not in open_statuses:
+            # The earlier alert was resolved or dismissed; start a new one
+            await alert_deduplicator.reassign(key, alert_id, window_seconds)
+            return None
+        return alert
 
     def _should_auto_create_incident(self, event: AxisAudioEvent) -> bool:
         """Check if event warrants auto-incident creation."""
@@ -14,10 +14,17 @@ import json
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Any, AsyncIterator, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.hls_segment_store import (
+    DEFAULT_MEMORY_BUDGET,
+    DEFAULT_WINDOW_SIZE,
+    HLSSegmentStore,
+)
+
 
 class StreamType(str, Enum):
     """Stream types."""
@@ -463,13 +470,38 @@ a=rtpmap:111 opus/48000/2
 
 
 class HLSSegmentManager:
-    """Manages HLS stream segments."""
+    """Manages HLS stream segments.
+
+    Storage is delegated to HLSSegmentStore: a bounded ring per session with
+    O(1) lookups, a shared memory budget with disk spill, incrementally
+    rendered playlists and optional LL-HLS partial segments.
+    """
 
-    def __init__(self, segment_duration: int = 2):
-        """Initialize HLS segment manager."""
+    def __init__(
+        self,
+        segment_duration: int = 2,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET,
+        spill_dir: Path | None = None,
+        part_duration: float | None = None,
+    ):
+        """Initialize HLS segment manager.
+
+        Args:
+            segment_duration: Nominal segment length in seconds
+            window_size: Segments kept per session (sliding window)
+            memory_budget_bytes: Segment bytes held in memory across all sessions
+            spill_dir: Where segments beyond the budget are written
+            part_duration: LL-HLS part target in seconds; None disables LL-HLS
+        """
         self.segment_duration = segment_duration
-        self._segments: dict[uuid.UUID, list[dict]] = {}
-        self._playlists: dict[uuid.UUID, str] = {}
+        self.store = HLSSegmentStore(
+            target_duration=segment_duration + 1,
+            window_size=window_size,
+            memory_budget_bytes=memory_budget_bytes,
+            spill_dir=spill_dir,
+            part_target=part_duration,
+        )
 
     def add_segment(
         self,
@@ -481,70 +513,46 @@ class HLSSegmentManager:
 
         Returns segment filename.
         """
-        if session_id not in self._segments:
-            self._segments[session_id] = []
-
-        segment_index = len(self._segments[session_id])
-        segment_name = f"segment_{segment_index:05d}.ts"
+        return self.store.add_segment(session_id, segment_data, duration)
 
-        self._segments[session_id].append({
-            "name": segment_name,
-            "duration": duration,
-            "data": segment_data,
-            "created_at": datetime.utcnow(),
-        })
-
-        # Keep only last 10 segments (sliding window)
-        if len(self._segments[session_id]) > 10:
-            self._segments[session_id] = self._segments[session_id][-10:]
-
-        # Update playlist
-        self._update_playlist(session_id)
+    def add_partial_segment(
+        self,
+        session_id: uuid.UUID,
+        part_data: bytes,
+        duration: float,
+        independent: bool = False,
+    ) -> str:
+        """Add an LL-HLS partial segment for the segment in progress.
 
-        return segment_name
+        Returns part filename.
+        """
+        return self.store.add_part(session_id, part_data, duration, independent)
 
     def get_playlist(self, session_id: uuid.UUID) -> str | None:
         """Get HLS playlist for session."""
-        return self._playlists.get(session_id)
+        return self.store.get_playlist(session_id)
+
+    async def wait_for_playlist(
+        self,
+        session_id: uuid.UUID,
+        msn: int,
+        part: int | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """Wait until the playlist contains media sequence msn (and part)."""
+        return await self.store.wait_for(session_id, msn, part, timeout)
 
     def get_segment(
         self,
         session_id: uuid.UUID,
         segment_name: str,
-    ) -> bytes | None:
-        """Get segment data."""
-        segments = self._segments.get(session_id, [])
-        for segment in segments:
-            if segment["name"] == segment_name:
-                return segment["data"]
-        return None
-
-    def _update_playlist(self, session_id: uuid.UUID) -> None:
-        """Update HLS playlist."""
-        segments = self._segments.get(session_id, [])
-        if not segments:
-            return
-
-        # Build M3U8 playlist
-        lines = [
-            "#EXTM3U",
-            "#EXT-X-VERSION:3",
-            f"#EXT-X-TARGETDURATION:{self.segment_duration + 1}",
-            f"#EXT-X-MEDIA-SEQUENCE:{max(0, len(segments) - 10)}",
-        ]
-
-        for segment in segments:
-            lines.append(f"#EXTINF:{segment['duration']:.3f},")
-            lines.append(segment["name"])
-
-        self._playlists[session_id] = "\n".join(lines)
+    ) -> bytes | memoryview | None:
+        """Get segment or part data."""
+        return self.store.get(session_id, segment_name)
 
     def cleanup_session(self, session_id: uuid.UUID) -> None:
         """Clean up session data."""
-        if session_id in self._segments:
-            del self._segments[session_id]
-        if session_id in self._playlists:
-            del self._playlists[session_id]
+        self.store.remove_session(session_id)
 
 
 class StreamTranscoder:
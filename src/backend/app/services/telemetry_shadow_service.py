@@ -0,0 +1,175 @@
+"""Telemetry shadow service for latest-value lookups.
+
+Maintains a "device shadow" in Redis: one hash per device holding the most
+recent value and timestamp of every metric, plus a short capped history list
+per (device, metric). TelemetryWorkerService updates the shadow after each
+successful batch insert, so dashboards and floor-plan overlays can read the
+current state of many devices without scanning the device_telemetry hypertable.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import structlog
+import redis.asyncio as aioredis
+
+logger = structlog.get_logger()
+
+SHADOW_KEY_PREFIX = "telemetry:shadow"
+DEFAULT_HISTORY_SIZE = 10
+
+
+class TelemetryShadowService:
+    """Reads and writes the latest-value store for device telemetry.
+
+    Layout:
+        telemetry:shadow:{device_id}                   HASH metric -> {"value", "time"}
+        telemetry:shadow:{device_id}:history:{metric}  LIST newest-first {"value", "time"}
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ):
+        self.redis = redis_client
+        self.history_size = history_size
+
+    @staticmethod
+    def shadow_key(device_id: str) -> str:
+        """Redis key of the latest-value hash for a device."""
+        return f"{SHADOW_KEY_PREFIX}:{device_id}"
+
+    @staticmethod
+    def history_key(device_id: str, metric_name: str) -> str:
+        """Redis key of the capped history list for a device metric."""
+        return f"{SHADOW_KEY_PREFIX}:{device_id}:history:{metric_name}"
+
+    async def update_batch(self, items: list[dict]) -> int:
+        """Apply a batch of telemetry payloads to the shadow.
+
+        Payloads are collapsed in memory first so each (device, metric) costs a
+        single HSET field and one LPUSH/LTRIM pair, all sent in one pipeline.
+
+        Args:
+            items: Telemetry payloads as read from the Redis Stream
+                [{"device_id": "...", "metrics": {...}, "server_timestamp": "..."}]
+
+        Returns:
+            Number of (device, metric) entries updated.
+        """
+        latest, history = self.collapse_batch(items)
+        if not latest:
+            return 0
+
+        pipe = self.redis.pipeline(transaction=False)
+        for device_id, metrics in latest.items():
+            pipe.hset(
+                self.shadow_key(device_id),
+                mapping={name: json.dumps(point) for name, point in metrics.items()},
+            )
+
+        if self.history_size > 0:
+            for (device_id, metric_name), points in history.items():
+                key = self.history_key(device_id, metric_name)
+                # LPUSH prepends each value in turn, so oldest-first input
+                # leaves the newest point at the head of the list.
+                pipe.lpush(key, *[json.dumps(p) for p in points[-self.history_size:]])
+                pipe.ltrim(key, 0, self.history_size - 1)
+
+        await pipe.execute()
+        return sum(len(metrics) for metrics in latest.values())
+
+    async def get_device_shadow(
+        self, device_id: str, include_history: bool = False
+    ) -> dict[str, dict]:
+        """Return {metric_name: {"value", "time"[, "history"]}} for one device."""
+        shadows = await self.get_shadows([device_id], include_history=include_history)
+        return shadows.get(device_id, {})
+
+    async def get_shadows(
+        self, device_ids: list[str], include_history: bool = False
+    ) -> dict[str, dict[str, dict]]:
+        """Return the shadow of several devices in one round-trip.
+
+        Devices with no telemetry yet are omitted from the result.
+        """
+        if not device_ids:
+            return {}
+
+        pipe = self.redis.pipeline(transaction=False)
+        for device_id in device_ids:
+            pipe.hgetall(self.shadow_key(device_id))
+        raw_hashes = await pipe.execute()
+
+        shadows: dict[str, dict[str, dict]] = {}
+        for device_id, raw in zip(device_ids, raw_hashes):
+            if not raw:
+                continue
+            shadows[device_id] = {
+                self._decode(name): json.loads(self._decode(point))
+                for name, point in raw.items()
+            }
+
+        if include_history and shadows:
+            await self._attach_history(shadows)
+
+        return shadows
+
+    async def _attach_history(self, shadows: dict[str, dict[str, dict]]) -> None:
+        """Load the capped history list for every metric present in shadows."""
+        keys = [
+            (device_id, metric_name)
+            for device_id, metrics in shadows.items()
+            for metric_name in metrics
+        ]
+        pipe = self.redis.pipeline(transaction=False)
+        for device_id, metric_name in keys:
+            pipe.lrange(self.history_key(device_id, metric_name), 0, self.history_size - 1)
+        raw_lists = await pipe.execute()
+
+        for (device_id, metric_name), raw in zip(keys, raw_lists):
+            shadows[device_id][metric_name]["history"] = [
+                json.loads(self._decode(point)) for point in raw or []
+            ]
+
+    @staticmethod
+    def collapse_batch(
+        items: list[dict],
+    ) -> tuple[dict[str, dict[str, dict]], dict[tuple[str, str], list[dict]]]:
+        """Reduce a batch to latest value and ordered history per (device, metric).
+
+        Returns:
+            (latest, history) where latest is {device_id: {metric: point}} and
+            history is {(device_id, metric): [point, ...]} oldest first.
+        """
+        latest: dict[str, dict[str, dict]] = {}
+        history: dict[tuple[str, str], list[dict]] = {}
+
+        for item in items:
+            device_id = item.get("device_id")
+            timestamp = item.get("server_timestamp")
+            if not device_id or not timestamp:
+                continue
+
+            device_latest = latest.setdefault(device_id, {})
+            for metric_name, value in item.get("metrics", {}).items():
+                point = {"value": value, "time": timestamp}
+                history.setdefault((device_id, metric_name), []).append(point)
+
+                current = device_latest.get(metric_name)
+                # server_timestamp is always UTC isoformat, so string order is time order
+                if current is None or timestamp >= current["time"]:
+                    device_latest[metric_name] = point
+
+        for points in history.values():
+            points.sort(key=lambda p: p["time"])
+
+        return {d: m for d, m in latest.items() if m}, history
+
+    @staticmethod
+    def _decode(value: Any) -> str:
+        """Decode Redis bytes responses (client uses decode_responses=False)."""
+        return value.decode() if isinstance(value, bytes) else value
@@ -3,28 +3,58 @@
 Consumes telemetry from Redis Stream "telemetry:stream" using consumer groups,
 accumulates into batches, expands metrics into narrow-schema rows, and batch-inserts
 into the device_telemetry hypertable.
+
+Entries are acknowledged only after their batch is written. A recovery loop
+claims entries that stayed pending longer than ``claim_idle_ms`` (a failed
+flush, or a consumer whose process died) with XAUTOCLAIM and retries them;
+after ``max_deliveries`` attempts, or if the payload cannot be parsed, an
+entry is moved to the "telemetry:dead-letter" stream. A monitor samples the
+group's lag, pending count and oldest pending age into Prometheus and adds
+or removes worker tasks between ``num_workers`` and ``max_workers``.
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
+import time
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 import structlog
 import redis.asyncio as aioredis
+from opentelemetry.trace import SpanKind
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.core.metrics import (
+    telemetry_consumer_lag,
+    telemetry_dead_lettered_total,
+    telemetry_oldest_pending_seconds,
+    telemetry_pending_entries,
+    telemetry_reclaimed_total,
+    telemetry_rows_written_total,
+    telemetry_stream_length,
+    telemetry_workers,
+)
+from app.core.tracing import links_from, tracer
+from app.services.leader_election import process_identity
+
 if TYPE_CHECKING:
     from app.services.alert_rule_evaluation_service import AlertRuleEvaluationService
+    from app.services.telemetry_shadow_service import TelemetryShadowService
 
 logger = structlog.get_logger()
 
 STREAM_NAME = "telemetry:stream"
 GROUP_NAME = "telemetry-workers"
+DEAD_LETTER_STREAM = "telemetry:dead-letter"
+DEAD_LETTER_MAX_LEN = 10_000
+# Consumers idle this long with nothing pending are removed from the group
+STALE_CONSUMER_IDLE_MS = 60 * 60 * 1000
+# Consecutive quiet samples before a worker is removed
+SCALE_DOWN_SAMPLES = 6
 
 
 class TelemetryWorkerService:
@@ -38,6 +68,12 @@ class TelemetryWorkerService:
         batch_timeout: float = 5.0,
         num_workers: int = 2,
         alert_evaluator: AlertRuleEvaluationService | None = None,
+        shadow_service: TelemetryShadowService | None = None,
+        max_workers: int | None = None,
+        scale_up_lag: int = 5000,
+        monitor_interval: float = 5.0,
+        claim_idle_ms: int = 60000,
+        max_deliveries: int = 5,
     ):
         self.redis = redis_client
         self.session_factory = session_factory
@@ -45,8 +81,18 @@ class TelemetryWorkerService:
         self.batch_timeout = batch_timeout
         self.num_workers = num_workers
         self.alert_evaluator = alert_evaluator
+        self.shadow_service = shadow_service
+        self.max_workers = max(max_workers or num_workers, num_workers)
+        self.scale_up_lag = scale_up_lag
+        self.monitor_interval = monitor_interval
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.consumer_prefix = process_identity()
         self._running = False
         self._worker_tasks: list[asyncio.Task] = []
+        self._next_worker_id = 0
+        self._quiet_samples = 0
+        self._background_tasks: list[asyncio.Task] = []
 
     async def start(self) -> None:
         """Start worker pool consuming from Redis Stream."""
@@ -60,34 +106,66 @@ class TelemetryWorkerService:
                 raise
 
         # Start worker tasks
-        for i in range(self.num_workers):
-            task = asyncio.create_task(
-                self._worker_loop(worker_id=i),
-                name=f"telemetry-worker-{i}",
-            )
-            self._worker_tasks.append(task)
+        for _ in range(self.num_workers):
+            self._add_worker()
 
-        logger.info("Telemetry worker pool started", num_workers=self.num_workers)
+        self._background_tasks = [
+            asyncio.create_task(self._recovery_loop(), name="telemetry-recovery"),
+            asyncio.create_task(self._monitor_loop(), name="telemetry-monitor"),
+        ]
+
+        logger.info(
+            "Telemetry worker pool started",
+            num_workers=self.num_workers,
+            max_workers=self.max_workers,
+        )
 
     async def stop(self) -> None:
         """Stop worker pool gracefully."""
         self._running = False
 
-        for task in self._worker_tasks:
+        for task in self._background_tasks + self._worker_tasks:
             task.cancel()
 
-        for task in self._worker_tasks:
+        for task in self._background_tasks + self._worker_tasks:
             try:
                 await task
             except asyncio.CancelledError:
                 pass
 
+        self._background_tasks.clear()
         self._worker_tasks.clear()
+        telemetry_workers.set(0)
         logger.info("Telemetry worker pool stopped")
 
+    @property
+    def worker_count(self) -> int:
+        """Worker tasks currently consuming."""
+        return len(self._worker_tasks)
+
+    def _add_worker(self) -> None:
+        worker_id = self._next_worker_id
+        self._next_worker_id += 1
+        self._worker_tasks.append(asyncio.create_task(
+            self._worker_loop(worker_id=worker_id),
+            name=f"telemetry-worker-{worker_id}",
+        ))
+        telemetry_workers.set(len(self._worker_tasks))
+
+    async def _remove_worker(self) -> None:
+        task = self._worker_tasks.pop()
+        telemetry_workers.set(len(self._worker_tasks))
+        # Cancelling flushes the worker's partial batch
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     async def _worker_loop(self, worker_id: int) -> None:
         """Main consumer loop for a single worker."""
-        consumer_name = f"worker-{worker_id}"
+        # Unique across gunicorn workers and hosts sharing the consumer group
+        consumer_name = f"{self.consumer_prefix}-{worker_id}"
         batch: list[tuple[bytes, dict]] = []
         last_flush = asyncio.get_event_loop().time()
 
@@ -106,14 +184,7 @@ class TelemetryWorkerService:
 
                 if messages:
                     for stream, msg_list in messages:
-                        for msg_id, msg_data in msg_list:
-                            # Handle both bytes and string keys
-                            raw_payload = msg_data.get(b"payload") or msg_data.get("payload")
-                            if raw_payload:
-                                if isinstance(raw_payload, bytes):
-                                    raw_payload = raw_payload.decode()
-                                payload = json.loads(raw_payload)
-                                batch.append((msg_id, payload))
+                        batch.extend(await self._parse_entries(msg_list))
 
                 now = asyncio.get_event_loop().time()
                 batch_rows = self._count_rows(batch)
@@ -137,18 +208,33 @@ class TelemetryWorkerService:
                 logger.error("Worker error", worker_id=worker_id, error=str(e))
                 await asyncio.sleep(1)
 
+    async def _parse_entries(self, entries: list[tuple[bytes, dict]]) -> list[tuple[bytes, dict]]:
+        """Decode stream entries; unreadable ones go straight to the dead-letter stream."""
+        parsed = []
+        for msg_id, msg_data in entries:
+            # Handle both bytes and string keys
+            raw_payload = msg_data.get(b"payload") or msg_data.get("payload")
+            try:
+                if isinstance(raw_payload, bytes):
+                    raw_payload = raw_payload.decode()
+                payload = json.loads(raw_payload)
+                if not isinstance(payload, dict):
+                    raise ValueError("payload is not an object")
+            except (TypeError, ValueError) as e:
+                await self._dead_letter(msg_id, msg_data, f"unparseable: {e}", deliveries=1)
+                continue
+            parsed.append((msg_id, payload))
+        return parsed
+
     def _count_rows(self, batch: list) -> int:
         """Count total rows that would be inserted (metrics per message)."""
         return sum(len(payload.get("metrics", {})) for _, payload in batch)
 
-    async def _flush_batch(self, batch: list[tuple], worker_id: int) -> None:
-        """Expand metrics into rows and batch-insert to device_telemetry."""
-        if not batch:
-            return
-
-        # Expand metrics into narrow-schema rows
+    @staticmethod
+    def _expand_rows(batch: list[tuple]) -> list[dict]:
+        """Expand each message's metrics into narrow-schema device_telemetry rows."""
         rows = []
-        for msg_id, item in batch:
+        for _, item in batch:
             server_ts = datetime.fromisoformat(item["server_timestamp"])
             device_id = uuid.UUID(item["device_id"])
 
@@ -174,6 +260,38 @@ class TelemetryWorkerService:
                     "value_bool": value_bool,
                 })
 
+        return rows
+
+    async def _flush_batch(self, batch: list[tuple], worker_id: int) -> bool:
+        """Write a batch inside a span linked to each message's MQTT receipt."""
+        if not batch:
+            return True
+        with tracer.start_as_current_span(
+            "telemetry.flush",
+            kind=SpanKind.CONSUMER,
+            links=links_from(payload.get("trace_context") for _, payload in batch),
+            attributes={
+                "messaging.system": "redis",
+                "messaging.destination.name": STREAM_NAME,
+                "messaging.batch.message_count": len(batch),
+                "eriop.worker_id": worker_id,
+            },
+        ) as span:
+            written = await self._write_batch(batch, worker_id)
+            span.set_attribute("eriop.written", written)
+            return written
+
+    async def _write_batch(self, batch: list[tuple], worker_id: int) -> bool:
+        """Expand metrics into rows and batch-insert to device_telemetry.
+
+        Returns:
+            True if the batch was written and acknowledged
+        """
+        if not batch:
+            return True
+
+        rows = self._expand_rows(batch)
+
         # Evaluate alert rules (non-blocking, must not fail the batch insert)
         if self.alert_evaluator:
             try:
@@ -188,29 +306,39 @@ class TelemetryWorkerService:
             message_ids = [msg_id for msg_id, _ in batch]
             if message_ids:
                 await self.redis.xack(STREAM_NAME, GROUP_NAME, *message_ids)
-            return
+            return True
 
         try:
             # Batch insert via SQLAlchemy session.execute with list of dicts
-            async with self.session_factory() as session:
-                await session.execute(
-                    text("""
-                        INSERT INTO device_telemetry
-                            (time, device_id, metric_name, value_numeric, value_string, value_bool)
-                        VALUES
-                            (:time, :device_id, :metric_name, :value_numeric, :value_string, :value_bool)
-                    """),
-                    rows,
-                )
-                await session.commit()
+            with tracer.start_as_current_span(
+                "telemetry.insert",
+                kind=SpanKind.CLIENT,
+                attributes={"db.system": "postgresql", "db.sql.table": "device_telemetry", "eriop.rows": len(rows)},
+            ):
+                async with self.session_factory() as session:
+                    await session.execute(
+                        text("""
+                            INSERT INTO device_telemetry
+                                (time, device_id, metric_name, value_numeric, value_string, value_bool)
+                            VALUES
+                                (:time, :device_id, :metric_name, :value_numeric, :value_string, :value_bool)
+                        """),
+                        rows,
+                    )
+                    await session.commit()
+            telemetry_rows_written_total.inc(len(rows))
 
             # Acknowledge all messages after successful insert
             message_ids = [msg_id for msg_id, _ in batch]
             if message_ids:
                 await self.redis.xack(STREAM_NAME, GROUP_NAME, *message_ids)
 
+            # Refresh latest-value shadow before notifying clients
+            await self._update_shadow(batch)
+
             # Emit real-time telemetry events via Socket.IO
-            await self._emit_telemetry_events(batch)
+            with tracer.start_as_current_span("socketio.emit", kind=SpanKind.PRODUCER):
+                await self._emit_telemetry_events(batch)
 
             logger.info(
                 "Batch flushed",
@@ -218,6 +346,7 @@ class TelemetryWorkerService:
                 messages=len(batch),
                 rows=len(rows),
             )
+            return True
 
         except Exception as e:
             # Do NOT acknowledge - messages remain in pending list for retry
@@ -228,6 +357,17 @@ class TelemetryWorkerService:
                 rows=len(rows),
                 error=str(e),
             )
+            return False
+
+    async def _update_shadow(self, batch: list[tuple]) -> None:
+        """Update the latest-value shadow for the devices in this batch."""
+        if not self.shadow_service:
+            return
+        try:
+            await self.shadow_service.update_batch([payload for _, payload in batch])
+        except Exception as e:
+            # Shadow is a read cache; the hypertable remains the source of truth
+            logger.warning("Failed to update telemetry shadow", error=str(e))
 
     async def _emit_telemetry_events(self, batch: list[tuple]) -> None:
         """Emit telemetry data points to Socket.IO clients subscribed to device rooms."""
@@ -245,3 +385,171 @@ class TelemetryWorkerService:
         except Exception as e:
             # Don't fail the batch if Socket.IO emit fails
             logger.warning("Failed to emit telemetry events", error=str(e))
+
+    # ==================== Pending-entry recovery ====================
+
+    async def _recovery_loop(self) -> None:
+        interval = max(self.claim_idle_ms / 1000 / 2, 1.0)
+        while self._running:
+            await asyncio.sleep(interval)
+            try:
+                await self.recover_pending()
+                await self._remove_stale_consumers()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Telemetry recovery error", error=str(e))
+
+    async def recover_pending(self, max_entries: int = 1000) -> int:
+        """Claim entries pending longer than ``claim_idle_ms`` and retry them.
+
+        Returns:
+            Number of entries claimed
+        """
+        consumer = f"{self.consumer_prefix}-recovery"
+        start_id = "0-0"
+        claimed_total = 0
+        while claimed_total < max_entries:
+            response = await self.redis.xautoclaim(
+                STREAM_NAME, GROUP_NAME, consumer,
+                min_idle_time=self.claim_idle_ms, start_id=start_id, count=100,
+            )
+            start_id, entries = response[0], response[1]
+            # Redis 7 drops entries trimmed from the stream and reports their ids
+            if len(response) > 2 and response[2]:
+                logger.warning("Pending telemetry entries were trimmed before delivery", count=len(response[2]))
+            if entries:
+                claimed_total += len(entries)
+                telemetry_reclaimed_total.inc(len(entries))
+                await self._retry_claimed(entries)
+            if start_id in (b"0-0", "0-0"):
+                break
+        return claimed_total
+
+    async def _retry_claimed(self, entries: list[tuple[bytes, dict]]) -> None:
+        deliveries = await self._delivery_counts(entries)
+        retry = []
+        for msg_id, msg_data in entries:
+            attempts = deliveries.get(msg_id, 0)
+            if attempts > self.max_deliveries:
+                await self._dead_letter(msg_id, msg_data, "max deliveries exceeded", attempts)
+            else:
+                retry.append((msg_id, msg_data))
+
+        batch = await self._parse_entries(retry)
+        if not batch or await self._flush_safely(batch):
+            return
+        # Retry one by one so a poison entry does not hold back the rest;
+        # failures stay pending and are claimed again later
+        for item in batch:
+            await self._flush_safely([item])
+
+    async def _flush_safely(self, batch: list[tuple]) -> bool:
+        try:
+            return await self._flush_batch(batch, worker_id=-1)
+        except Exception as e:
+            logger.error("Recovered telemetry flush failed", messages=len(batch), error=str(e))
+            return False
+
+    async def _delivery_counts(self, entries: list[tuple[bytes, dict]]) -> dict:
+        # Queried per id: a range query over the whole group can be filled
+        # by other consumers' entries and leave claimed ones uncounted
+        counts = {}
+        for msg_id, _ in entries:
+            pending = await self.redis.xpending_range(STREAM_NAME, GROUP_NAME, min=msg_id, max=msg_id, count=1)
+            if pending:
+                counts[msg_id] = pending[0]["times_delivered"]
+        return counts
+
+    async def _dead_letter(self, msg_id, msg_data: dict, reason: str, deliveries: int) -> None:
+        """Move an entry to the dead-letter stream and acknowledge it."""
+        raw_payload = msg_data.get(b"payload") or msg_data.get("payload") or b""
+        await self.redis.xadd(
+            DEAD_LETTER_STREAM,
+            {
+                "original_id": msg_id,
+                "payload": raw_payload,
+                "reason": reason,
+                "deliveries": str(deliveries),
+            },
+            maxlen=DEAD_LETTER_MAX_LEN,
+            approximate=True,
+        )
+        await self.redis.xack(STREAM_NAME, GROUP_NAME, msg_id)
+        telemetry_dead_lettered_total.inc()
+        logger.warning("Telemetry entry dead-lettered", message_id=str(msg_id), reason=reason, deliveries=deliveries)
+
+    async def _remove_stale_consumers(self) -> None:
+        """Drop consumers of exited processes once they have nothing pending."""
+        for consumer in await self.redis.xinfo_consumers(STREAM_NAME, GROUP_NAME):
+            name = consumer["name"]
+            if isinstance(name, bytes):
+                name = name.decode()
+            if name.startswith(self.consumer_prefix):
+                continue
+            if consumer["pending"] == 0 and consumer["idle"] >= STALE_CONSUMER_IDLE_MS:
+                await self.redis.xgroup_delconsumer(STREAM_NAME, GROUP_NAME, name)
+
+    # ==================== Lag monitoring and scaling ====================
+
+    async def _monitor_loop(self) -> None:
+        while self._running:
+            try:
+                lag = await self.sample_lag()
+                await self._scale(lag)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Telemetry lag sampling failed", error=str(e))
+            await asyncio.sleep(self.monitor_interval)
+
+    async def sample_lag(self) -> int:
+        """Export stream length, pending count, oldest pending age and lag.
+
+        Returns:
+            Entries not yet delivered to any consumer in the group
+        """
+        length = await self.redis.xlen(STREAM_NAME)
+        summary = await self.redis.xpending(STREAM_NAME, GROUP_NAME)
+        pending = summary["pending"]
+        oldest_age = 0.0
+        if pending and summary["min"]:
+            oldest_age = max(time.time() - _stream_id(summary["min"])[0] / 1000, 0.0)
+
+        lag = 0
+        for group in await self.redis.xinfo_groups(STREAM_NAME):
+            name = group["name"]
+            if (name.decode() if isinstance(name, bytes) else name) == GROUP_NAME:
+                # "lag" needs Redis 7; it is None when Redis cannot tell
+                lag = group.get("lag") or 0
+
+        telemetry_stream_length.set(length)
+        telemetry_pending_entries.set(pending)
+        telemetry_oldest_pending_seconds.set(oldest_age)
+        telemetry_consumer_lag.set(lag)
+        return lag
+
+    async def _scale(self, lag: int) -> None:
+        """Add a worker while lag is high; remove one after a quiet spell."""
+        if lag >= self.scale_up_lag:
+            self._quiet_samples = 0
+            if self.worker_count < self.max_workers:
+                self._add_worker()
+                logger.info("Telemetry workers scaled up", workers=self.worker_count, lag=lag)
+            return
+        if lag < self.scale_up_lag // 10:
+            self._quiet_samples += 1
+        else:
+            self._quiet_samples = 0
+        if self._quiet_samples >= SCALE_DOWN_SAMPLES and self.worker_count > self.num_workers:
+            self._quiet_samples = 0
+            await self._remove_worker()
+            logger.info("Telemetry workers scaled down", workers=self.worker_count, lag=lag)
+
+
+def _stream_id(entry_id) -> tuple[int, int]:
+    """Sortable (milliseconds, sequence) form of a stream entry id."""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
@@ -8,9 +8,10 @@ from sqlalchemy import select, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async
 from app.models.user import User, UserRole
 from app.models.role import Role
+from app.services.principal_cache import principal_cache
 
 
 class UserError(Exception):
@@ -144,7 +145,7 @@ class UserService:
 
         user = User(
             email=email.lower(),
-            hashed_password=get_password_hash(password),
+            hashed_password=await get_password_hash_async(password),
             full_name=full_name,
             role=legacy_role,
             role_id=role_id,
@@ -212,6 +213,7 @@ class UserService:
             user.is_verified = is_verified
 
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return await self.get_user(user_id)
 
     async def deactivate_user(self, user_id: uuid.UUID) -> User:
@@ -222,6 +224,7 @@ class UserService:
 
         user.is_active = False
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return await self.get_user(user_id)
 
     async def activate_user(self, user_id: uuid.UUID) -> User:
@@ -234,6 +237,7 @@ class UserService:
         user.failed_login_attempts = 0
         user.locked_until = None
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return await self.get_user(user_id)
 
     async def verify_user(self, user_id: uuid.UUID) -> User:
@@ -244,6 +248,7 @@ class UserService:
 
         user.is_verified = True
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return await self.get_user(user_id)
 
     async def reset_password(
@@ -257,10 +262,12 @@ class UserService:
             raise UserError("User not found")
 
         self._validate_password(new_password)
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
+        user.token_version += 1
         user.failed_login_attempts = 0
         user.locked_until = None
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
 
     async def delete_user(self, user_id: uuid.UUID) -> None:
         """Soft delete a user."""
@@ -271,6 +278,7 @@ class UserService:
         user.deleted_at = datetime.now(timezone.utc)
         user.is_active = False
         await self.db.commit()
+        await principal_cache.invalidate(user_id)
 
     async def get_user_stats(
         self,
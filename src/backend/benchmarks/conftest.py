@@ -0,0 +1,80 @@
+"""Synthetic datasets for the microbenchmarks.
+
+Every dataset is built from a fixed seed, so runs on different days (and
+the stored baselines in ``benchmarks/baselines``) measure the same inputs.
+
+Run from ``src/backend``::
+
+    # Compare against the stored baseline; fail on a >25% median regression
+    pytest benchmarks --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=median:25%
+
+    # Record a new baseline after an intended change
+    pytest benchmarks --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+
+Baselines are stored per machine type (``Linux-CPython-3.11-64bit/``) and
+are only comparable on the hardware that recorded them: record one on the
+runner that does the comparison. Shared single-core VMs drift by more than
+the threshold between runs.
+"""
+
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+SEED = 20260101
+
+# Montreal area
+BASE_LAT = 45.5017
+BASE_LON = -73.5673
+
+
+@pytest.fixture
+def rng() -> random.Random:
+    return random.Random(SEED)
+
+
+@pytest.fixture
+def telemetry_batch(rng) -> list[tuple]:
+    """500 stream entries from 100 devices, 6 metrics each (numeric, bool, string)."""
+    devices = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(100)]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    batch = []
+    for n in range(500):
+        payload = {
+            "device_id": devices[n % len(devices)],
+            "server_timestamp": (start + timedelta(milliseconds=n * 20)).isoformat(),
+            "metrics": {
+                "temperature": round(rng.uniform(15, 35), 2),
+                "humidity": rng.randint(20, 90),
+                "sound_level_db": round(rng.uniform(30, 110), 1),
+                "battery": round(rng.uniform(0, 100), 1),
+                "door_open": rng.random() < 0.1,
+                "state": rng.choice(["idle", "armed", "alarm"]),
+            },
+        }
+        batch.append((f"{1735689600000 + n}-0".encode(), payload))
+    return batch
+
+
+@pytest.fixture
+def polygon(rng) -> list[tuple[float, float]]:
+    """A 64-vertex (lat, lon) ring around Montreal."""
+    points = []
+    for i in range(64):
+        angle = 2 * math.pi * i / 64
+        radius = rng.uniform(0.05, 0.1)
+        points.append((BASE_LAT + radius * math.sin(angle), BASE_LON + radius * math.cos(angle)))
+    return points
+
+
+@pytest.fixture
+def points(rng) -> list[tuple[float, float]]:
+    """1000 (lat, lon) points, roughly half inside ``polygon``."""
+    return [
+        (BASE_LAT + rng.uniform(-0.12, 0.12), BASE_LON + rng.uniform(-0.12, 0.12))
+        for _ in range(1000)
+    ]
@@ -0,0 +1,59 @@
+"""Benchmarks for alarm line parsing."""
+
+import pytest
+
+from app.services.alarm_receiver import AlarmReceiverService, ContactIDParser, SIAParser
+
+CONTACT_ID_CODES = ["130", "110", "120", "100", "137", "401", "602", "301"]
+SIA_CODES = ["BA", "FA", "PA", "MA", "TA", "OP", "CL", "TR", "RP"]
+
+
+@pytest.fixture
+def contact_id_lines(rng) -> list[str]:
+    """1000 Contact ID lines, a tenth of them bracketed and spaced as some panels send."""
+    lines = []
+    for _ in range(1000):
+        account = rng.randrange(10000)
+        qualifier = rng.choice("1136")
+        code = rng.choice(CONTACT_ID_CODES)
+        zone = rng.randrange(1000)
+        if rng.random() < 0.1:
+            lines.append(f"[{account:04d} 18 {qualifier} {code} 01 {zone:03d}]")
+        else:
+            lines.append(f"{account:04d}18{qualifier}{code}01{zone:03d}")
+    return lines
+
+
+@pytest.fixture
+def sia_lines(rng) -> list[str]:
+    """1000 SIA DC-04 lines."""
+    return [
+        f'#{rng.randrange(100000):06d}|Nri{rng.randrange(1, 9):02d}*"{rng.choice(SIA_CODES)}"{rng.randrange(1000):03d}'
+        for _ in range(1000)
+    ]
+
+
+def test_contact_id_parse(benchmark, contact_id_lines):
+    parser = ContactIDParser()
+
+    events = benchmark(lambda: [parser.parse(line) for line in contact_id_lines])
+
+    assert all(events)
+
+
+def test_sia_parse(benchmark, sia_lines):
+    parser = SIAParser()
+
+    events = benchmark(lambda: [parser.parse(line) for line in sia_lines])
+
+    assert all(events)
+
+
+def test_protocol_detection(benchmark, contact_id_lines, sia_lines):
+    """parse_message as the TCP receiver calls it, without a protocol hint."""
+    service = AlarmReceiverService()
+    lines = contact_id_lines[:500] + sia_lines[:500]
+
+    events = benchmark(lambda: [service.parse_message(line) for line in lines])
+
+    assert all(events)
@@ -0,0 +1,61 @@
+"""Benchmarks for distance, polygon and bounds checks."""
+
+import pytest
+
+from app.services.geospatial import GeospatialService, haversine_distance
+from app.services.gis_layers import BoundingBox, GISLayerService
+
+from benchmarks.conftest import BASE_LAT, BASE_LON
+
+
+@pytest.fixture
+def features(rng, polygon) -> list[dict]:
+    """1000 GeoJSON features: points, lines and polygons, in and out of the viewport."""
+    features = []
+    for n in range(1000):
+        lat = BASE_LAT + rng.uniform(-0.3, 0.3)
+        lon = BASE_LON + rng.uniform(-0.3, 0.3)
+        kind = n % 4
+        if kind == 0:
+            geometry = {"type": "Point", "coordinates": [lon, lat]}
+        elif kind == 1:
+            geometry = {
+                "type": "LineString",
+                "coordinates": [[lon + i * 0.002, lat + i * 0.001] for i in range(20)],
+            }
+        elif kind == 2:
+            ring = [[p_lon + lon - BASE_LON, p_lat + lat - BASE_LAT] for p_lat, p_lon in polygon]
+            geometry = {"type": "Polygon", "coordinates": [ring]}
+        else:
+            ring = [[p_lon + lon - BASE_LON, p_lat + lat - BASE_LAT] for p_lat, p_lon in polygon[::4]]
+            geometry = {"type": "MultiPolygon", "coordinates": [[ring], [ring]]}
+        features.append({"type": "Feature", "geometry": geometry, "properties": {"id": n}})
+    return features
+
+
+def test_haversine_distance(benchmark, points):
+    """Distance from one incident to 1000 resources."""
+    origin_lat, origin_lon = BASE_LAT, BASE_LON
+
+    distances = benchmark(lambda: [haversine_distance(origin_lat, origin_lon, lat, lon) for lat, lon in points])
+
+    assert max(distances) < 20
+
+
+def test_point_in_polygon(benchmark, polygon, points):
+    """1000 points against a 64-vertex polygon."""
+    service = GeospatialService(db=None)
+
+    inside = benchmark(lambda: sum(service._point_in_polygon(lat, lon, polygon) for lat, lon in points))
+
+    assert 0 < inside < len(points)
+
+
+def test_feature_in_bounds(benchmark, features):
+    """Viewport filtering of 1000 mixed features."""
+    service = GISLayerService(db=None)
+    bounds = BoundingBox(min_lng=BASE_LON - 0.1, min_lat=BASE_LAT - 0.1, max_lng=BASE_LON + 0.1, max_lat=BASE_LAT + 0.1)
+
+    visible = benchmark(lambda: sum(service._feature_in_bounds(f, bounds) for f in features))
+
+    assert 0 < visible < len(features)
@@ -0,0 +1,85 @@
+"""Benchmarks for the per-message telemetry paths."""
+
+import pytest
+
+from app.services.alert_rule_evaluation_service import AlertRuleEvaluationService
+from app.services.mqtt_service import VigiliaMQTTService
+from app.services.telemetry_worker_service import TelemetryWorkerService
+
+# Handler patterns in registration order, as _dispatch_message tries them
+HANDLER_PATTERNS = [
+    "agency/+/device/+/register",
+    "agency/+/device/+/telemetry",
+    "agency/+/device/+/config/reported",
+]
+
+
+class FakeProfile:
+    """The only attribute _evaluate_rules reads."""
+
+    def __init__(self, alert_rules: list[dict]):
+        self.alert_rules = alert_rules
+
+
+@pytest.fixture
+def topics(rng, telemetry_batch) -> list[str]:
+    """1000 topics: mostly telemetry, some reported config and registrations."""
+    suffixes = ["telemetry"] * 8 + ["config/reported", "register"]
+    return [
+        f"agency/{rng.getrandbits(32):08x}/device/{telemetry_batch[n % 500][1]['device_id']}/{rng.choice(suffixes)}"
+        for n in range(1000)
+    ]
+
+
+@pytest.fixture
+def profile() -> FakeProfile:
+    """20 rules over the telemetry_batch metrics, covering every condition."""
+    rules = []
+    for threshold in range(20, 40, 4):
+        rules.append({"metric": "temperature", "condition": "gt", "threshold": threshold})
+        rules.append({"metric": "humidity", "condition": "range", "threshold": {"min": threshold, "max": threshold + 40}})
+    rules += [
+        {"metric": "sound_level_db", "condition": "gte", "threshold": 85},
+        {"metric": "sound_level_db", "condition": "lt", "threshold": 35},
+        {"metric": "battery", "condition": "lte", "threshold": 10},
+        {"metric": "battery", "condition": "lt", "threshold": 20},
+        {"metric": "door_open", "condition": "eq", "threshold": True},
+        {"metric": "state", "condition": "eq", "threshold": "alarm"},
+        {"metric": "state", "condition": "ne", "threshold": "idle"},
+        {"metric": "co2_ppm", "condition": "gt", "threshold": 1000},  # Never reported
+        {"metric": "temperature"},  # No threshold: skipped
+        {"metric": "humidity", "condition": "gt", "threshold": 75},
+    ]
+    return FakeProfile(rules)
+
+
+def test_topic_matching(benchmark, topics):
+    """Pattern lookup for 1000 incoming MQTT topics."""
+
+    def dispatch_all():
+        matched = 0
+        for topic in topics:
+            for pattern in HANDLER_PATTERNS:
+                if VigiliaMQTTService._topic_matches(topic, pattern):
+                    matched += 1
+                    break
+        return matched
+
+    assert benchmark(dispatch_all) == len(topics)
+
+
+def test_alert_rule_evaluation(benchmark, profile, telemetry_batch):
+    """20 profile rules against each of 500 telemetry messages."""
+    metrics = [payload["metrics"] for _, payload in telemetry_batch]
+
+    def evaluate_all():
+        return sum(len(AlertRuleEvaluationService._evaluate_rules(profile, m)) for m in metrics)
+
+    assert benchmark(evaluate_all) > 0
+
+
+def test_row_expansion(benchmark, telemetry_batch):
+    """500 stream entries with 6 metrics each into device_telemetry rows."""
+    rows = benchmark(TelemetryWorkerService._expand_rows, telemetry_batch)
+
+    assert len(rows) == 3000
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""ERIOP Alarm Receiver - Run the Contact ID / SIA TCP receiver on its own."""
+
+import asyncio
+import argparse
+import signal
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from prometheus_client import start_http_server
+
+from app.services.alarm_receiver import AlarmReceiverService, AlarmReceiverTCPServer
+
+
+async def serve(host: str, port: int) -> None:
+    """Serve until interrupted, then write any queued events."""
+    server = AlarmReceiverTCPServer(host, port, AlarmReceiverService())
+    # docker stop sends SIGTERM: flush the queue before exiting
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        await server.start()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ERIOP Alarm Receiver")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to bind")  # nosec B104
+    parser.add_argument("--port", type=int, default=5000, help="TCP port for alarm lines")
+    parser.add_argument("--metrics-port", type=int, default=9105, help="Prometheus metrics port (0 disables)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    print(f"Alarm receiver listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ from app.models import (
 # Import communication models
 from app.models.channel import Channel, ChannelMember, ChannelType
 from app.models.message import Message, MessageType, MessagePriority
-from app.core.deps import get_db
+from app.core.deps import get_analytics_db, get_db
 from app.core.security import get_password_hash
 
 # Test database URL (use SQLite for tests)
@@ -75,6 +75,12 @@ async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture
+def session_factory(db_engine) -> async_sessionmaker[AsyncSession]:
+    """Session factory for services that open their own sessions."""
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def client(db_engine) -> AsyncGenerator[AsyncClient, None]:
     """Create test HTTP client with database override."""
@@ -89,6 +95,7 @@ async def client(db_engine) -> AsyncGenerator[AsyncClient, None]:
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_analytics_db] = override_get_db
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -0,0 +1,162 @@
+"""Tests for the queued, batched alarm receiver."""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select
+
+from app.models.alert import Alert, AlertSeverity, AlertSource
+from app.services import alarm_receiver
+from app.services.alarm_receiver import (
+    ACK,
+    NAK,
+    AccountRateLimiter,
+    AlarmAccount,
+    AlarmEventWriter,
+    AlarmReceiverService,
+    AlarmReceiverTCPServer,
+)
+
+
+def _line(account: int, qualifier: str = "1", code: str = "130", zone: int = 1) -> str:
+    return f"{account:04d}18{qualifier}{code}01{zone:03d}"
+
+
+def _messages(outcome: str) -> float:
+    return REGISTRY.get_sample_value("eriop_alarm_receiver_messages_total", {"outcome": outcome}) or 0.0
+
+
+async def _alert_count(session_factory) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(Alert))).scalar_one()
+
+
+class TestAlarmReceiverService:
+    """Inline processing used by the HTTP endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_process_alarm_creates_alert(self, db_session):
+        service = AlarmReceiverService(db_session)
+        service.register_account(AlarmAccount(account_code="1234", name="Warehouse", latitude=45.5, longitude=-73.6))
+
+        alert = await service.process_alarm(_line(1234, code="110", zone=5), source_ip="10.0.0.9")
+
+        assert alert.source == AlertSource.ALARM_SYSTEM
+        assert alert.severity == AlertSeverity.CRITICAL
+        assert alert.title == "Fire Alarm - Zone 005"
+        assert alert.latitude == 45.5
+        assert alert.raw_payload["event"]["source_ip"] == "10.0.0.9"
+
+
+class TestTCPReceiver:
+    """Lines are ACKed on queueing and written in bulk."""
+
+    @pytest.mark.asyncio
+    async def test_replayed_backlog_is_acked_and_written(self, session_factory):
+        service = AlarmReceiverService()
+        writer = AlarmEventWriter(service, session_factory, batch_size=100, flush_interval_ms=20)
+        server = AlarmReceiverTCPServer(
+            "127.0.0.1", 0, service, writer=writer, rate_limiter=AccountRateLimiter(per_minute=0)
+        )
+        serving = asyncio.create_task(server.start())
+        await asyncio.sleep(0.05)
+        try:
+            lines = [_line(n % 50) for n in range(250)] + [_line(1, qualifier="3")]
+            async with asyncio.timeout(10):
+                reader, conn = await asyncio.open_connection("127.0.0.1", server.port)
+                conn.write("".join(f"{line}\n" for line in lines).encode())
+                await conn.drain()
+                acks = await reader.readexactly(len(lines))
+                conn.close()
+                await conn.wait_closed()
+        finally:
+            await server.stop()
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+
+        assert acks == ACK * len(lines)
+        # The restore is acknowledged but creates no alert
+        assert await _alert_count(session_factory) == 250
+
+    @pytest.mark.asyncio
+    async def test_full_queue_naks(self, session_factory):
+        service = AlarmReceiverService()
+        writer = AlarmEventWriter(service, session_factory, max_queue=1)
+        server = AlarmReceiverTCPServer(receiver_service=service, writer=writer)
+        rejected = _messages("rejected")
+
+        assert server.accept_line(_line(1)) == ACK
+        assert server.accept_line(_line(2)) == NAK
+        assert _messages("rejected") == rejected + 1
+
+        await writer.flush()
+        assert server.accept_line(_line(2)) == ACK
+
+    def test_rate_limited_account_is_naked_and_not_queued(self, session_factory):
+        service = AlarmReceiverService()
+        writer = AlarmEventWriter(service, session_factory)
+        server = AlarmReceiverTCPServer(
+            receiver_service=service, writer=writer, rate_limiter=AccountRateLimiter(per_minute=60, burst=2)
+        )
+        limited = _messages("rate_limited")
+
+        replies = [server.accept_line(_line(7)) for _ in range(4)]
+
+        assert replies == [ACK, ACK, NAK, NAK]
+        assert _messages("rate_limited") == limited + 2
+        assert server.accept_line(_line(8)) == ACK
+        assert writer._queue.qsize() == 3
+
+
+class TestAlarmEventWriter:
+    """Failed writes are retried until they succeed, or counted at shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_outage_holds_batch_and_naks_until_database_returns(self, session_factory, monkeypatch):
+        monkeypatch.setattr(alarm_receiver, "WRITE_RETRY_DELAY_SECONDS", 0.01)
+        monkeypatch.setattr(alarm_receiver, "WRITE_RETRY_MAX_DELAY_SECONDS", 0.02)
+        database_up = False
+
+        def flaky_session():
+            if not database_up:
+                raise ConnectionError("database down")
+            return session_factory()
+
+        service = AlarmReceiverService()
+        writer = AlarmEventWriter(service, flaky_session, batch_size=2, flush_interval_ms=10, max_queue=2)
+        server = AlarmReceiverTCPServer(
+            receiver_service=service, writer=writer, rate_limiter=AccountRateLimiter(per_minute=0)
+        )
+        writer.start()
+        try:
+            assert [server.accept_line(_line(n)) for n in (1, 2)] == [ACK, ACK]
+            await asyncio.sleep(0.1)  # first batch taken and failing well past WRITE_ATTEMPTS
+            assert [server.accept_line(_line(n)) for n in (3, 4, 5)] == [ACK, ACK, NAK]
+
+            database_up = True
+            async with asyncio.timeout(5):
+                while await _alert_count(session_factory) < 4:
+                    await asyncio.sleep(0.02)
+        finally:
+            await writer.stop()
+
+        assert await _alert_count(session_factory) == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_counted_at_shutdown(self, monkeypatch):
+        monkeypatch.setattr(alarm_receiver, "WRITE_ATTEMPTS", 2)
+        monkeypatch.setattr(alarm_receiver, "WRITE_RETRY_DELAY_SECONDS", 0)
+
+        def broken_session():
+            raise ConnectionError("database down")
+
+        service = AlarmReceiverService()
+        writer = AlarmEventWriter(service, broken_session)
+        failures = REGISTRY.get_sample_value("eriop_alarm_receiver_write_failures_total") or 0.0
+        writer.submit(service.parse_message(_line(1)))
+        writer.submit(service.parse_message(_line(2)))
+
+        await writer.stop()
+
+        assert REGISTRY.get_sample_value("eriop_alarm_receiver_write_failures_total") == failures + 2
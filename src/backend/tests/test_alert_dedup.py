@@ -0,0 +1,199 @@
+"""Tests for time-windowed alert deduplication."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert, AlertSource, AlertStatus
+from app.services import alert_service
+from app.services.alert_dedup import AlertDeduplicator, dedup_key, geohash_encode
+from app.services.alert_service import AlertError, AlertService
+
+
+class FakeRedis:
+    """In-memory SET NX / GET / DELETE (expiry is not simulated)."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        self.ttls[key] = ex
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class BrokenRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+    async def get(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+def _alert(key: str, received_at: datetime, status: AlertStatus = AlertStatus.PENDING) -> Alert:
+    return Alert(
+        id=uuid.uuid4(),
+        source=AlertSource.ALARM_SYSTEM,
+        alert_type="fire_alarm",
+        title="Fire Alarm",
+        status=status,
+        received_at=received_at,
+        dedup_key=key,
+    )
+
+
+class TestDedupKey:
+    """Tests for geohash cells and composite keys."""
+
+    def test_geohash_matches_reference_encoding(self):
+        """Encoding matches the published geohash reference point."""
+        assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_nearby_points_share_a_cell(self):
+        """Points a few metres apart get the same key; distant ones do not."""
+        a = dedup_key(AlertSource.ALARM_SYSTEM, "fire_alarm", 45.50170, -73.56730)
+        b = dedup_key(AlertSource.ALARM_SYSTEM, "fire_alarm", 45.50172, -73.56733)
+        far = dedup_key(AlertSource.ALARM_SYSTEM, "fire_alarm", 45.5200, -73.5673)
+
+        assert a == b == f"alarm_system:fire_alarm:geo:{geohash_encode(45.5017, -73.5673, 7)}"
+        assert far != a
+
+    def test_device_takes_precedence_and_missing_place_gives_none(self):
+        """Device keys ignore coordinates; alerts with no place have no key."""
+        device_id = uuid.uuid4()
+
+        assert dedup_key("axis_microphone", "gunshot", 1.0, 2.0, device_id=device_id) == (
+            f"axis_microphone:gunshot:dev:{device_id}"
+        )
+        assert dedup_key(AlertSource.MANUAL, "panic_button") is None
+
+
+class TestAlertDeduplicator:
+    """Tests for the Redis claim and the database fallback."""
+
+    @pytest.mark.asyncio
+    async def test_first_claim_wins(self, db_session: AsyncSession):
+        """The first alert claims the key with the window as TTL."""
+        redis = FakeRedis()
+        dedup = AlertDeduplicator(redis, window_seconds=45)
+        first, second = uuid.uuid4(), uuid.uuid4()
+
+        assert await dedup.claim(db_session, "k", first) is None
+        assert await dedup.claim(db_session, "k", second) == first
+        assert redis.ttls["alert:dedup:k"] == 45
+
+    @pytest.mark.asyncio
+    async def test_release_only_drops_own_claim(self, db_session: AsyncSession):
+        """A failed insert frees its claim but never someone else's."""
+        redis = FakeRedis()
+        dedup = AlertDeduplicator(redis)
+        holder = uuid.uuid4()
+        await dedup.claim(db_session, "k", holder)
+
+        await dedup.release("k", uuid.uuid4())
+        assert await dedup.claim(db_session, "k", uuid.uuid4()) == holder
+
+        await dedup.release("k", holder)
+        assert await dedup.claim(db_session, "k", uuid.uuid4()) is None
+
+    @pytest.mark.asyncio
+    async def test_database_fallback_respects_window_and_status(self, db_session: AsyncSession):
+        """Without Redis, only open alerts inside the window match."""
+        now = datetime.now(timezone.utc)
+        recent = _alert("recent", now - timedelta(seconds=10))
+        stale = _alert("stale", now - timedelta(seconds=600))
+        closed = _alert("closed", now - timedelta(seconds=10), status=AlertStatus.RESOLVED)
+        db_session.add_all([recent, stale, closed])
+        await db_session.commit()
+        dedup = AlertDeduplicator(BrokenRedis(), window_seconds=60)
+
+        assert await dedup.claim(db_session, "recent", uuid.uuid4()) == recent.id
+        assert await dedup.claim(db_session, "stale", uuid.uuid4()) is None
+        assert await dedup.claim(db_session, "closed", uuid.uuid4()) is None
+
+
+class TestAlertServiceDedup:
+    """Tests for deduplication on alert ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_nearby_alerts_in_window_are_duplicates(self, db_session: AsyncSession, monkeypatch):
+        """A second alarm from the same cell is rejected; another cell is not."""
+        monkeypatch.setattr(alert_service, "alert_deduplicator", AlertDeduplicator(FakeRedis()))
+        service = AlertService(db_session)
+        first = await service.ingest_alert(
+            source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="Fire",
+            latitude=45.50170, longitude=-73.56730,
+        )
+
+        with pytest.raises(AlertError):
+            await service.ingest_alert(
+                source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="Fire again",
+                latitude=45.50172, longitude=-73.56733,
+            )
+        other = await service.ingest_alert(
+            source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="Elsewhere",
+            latitude=45.5200, longitude=-73.5673,
+        )
+
+        assert first.dedup_key is not None
+        assert other.dedup_key != first.dedup_key
+
+    @pytest.mark.asyncio
+    async def test_device_alerts_dedup_across_cells(self, db_session: AsyncSession, monkeypatch):
+        """Jitter that crosses a cell edge does not split one device's alerts."""
+        monkeypatch.setattr(alert_service, "alert_deduplicator", AlertDeduplicator(FakeRedis()))
+        service = AlertService(db_session)
+        first = await service.ingest_alert(
+            source=AlertSource.IOT_TELEMETRY, alert_type="smoke", title="Smoke",
+            source_device_id="sensor-12", latitude=45.50170, longitude=-73.56730,
+        )
+        assert geohash_encode(45.50170, -73.56730, 7) != geohash_encode(45.5200, -73.5673, 7)
+
+        with pytest.raises(AlertError):
+            await service.ingest_alert(
+                source=AlertSource.IOT_TELEMETRY, alert_type="smoke", title="Smoke again",
+                source_device_id="sensor-12", latitude=45.5200, longitude=-73.5673,
+            )
+
+        assert first.dedup_key == dedup_key(AlertSource.IOT_TELEMETRY, "smoke", device_id="sensor-12")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [AlertStatus.ACKNOWLEDGED, AlertStatus.RESOLVED, AlertStatus.DISMISSED])
+    async def test_alert_after_first_is_handled_is_not_duplicate(
+        self, db_session: AsyncSession, monkeypatch, status
+    ):
+        """Once the claiming alert leaves PENDING, the cell accepts a new alert."""
+        redis = FakeRedis()
+        monkeypatch.setattr(alert_service, "alert_deduplicator", AlertDeduplicator(redis))
+        service = AlertService(db_session)
+        first = await service.ingest_alert(
+            source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="False alarm",
+            latitude=45.50170, longitude=-73.56730,
+        )
+        first.status = status
+        await db_session.commit()
+
+        second = await service.ingest_alert(
+            source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="Real fire",
+            latitude=45.50172, longitude=-73.56733,
+        )
+
+        assert second.dedup_key == first.dedup_key
+        assert redis.data[f"alert:dedup:{first.dedup_key}"] == str(second.id).encode()
+        with pytest.raises(AlertError):
+            await service.ingest_alert(
+                source=AlertSource.ALARM_SYSTEM, alert_type="fire_alarm", title="Real fire again",
+                latitude=45.50171, longitude=-73.56731,
+            )
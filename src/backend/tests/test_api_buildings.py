@@ -1410,3 +1410,45 @@ class TestBuildingsAPI:
         )
         # Parser will fail on invalid content
         assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_import_bim_queue_unavailable_removes_spool(
+        self, client: AsyncClient, admin_user: User, test_agency: Agency, monkeypatch, tmp_path
+    ):
+        """A failed enqueue returns 503 and deletes the spooled upload."""
+        from app.api import buildings as buildings_api
+
+        class UnavailableQueue:
+            async def enqueue(self, *args, **kwargs):
+                raise ConnectionError("redis down")
+
+        async def get_queue():
+            return UnavailableQueue()
+
+        monkeypatch.setattr(buildings_api, "get_bim_import_queue", get_queue)
+        monkeypatch.setattr(buildings_api.tempfile, "gettempdir", lambda: str(tmp_path))
+        token = await self.get_admin_token(client)
+
+        building_response = await client.post(
+            "/api/v1/buildings",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "name": "BIM Queue Down Building",
+                "street_name": "Queue Street",
+                "city": "Montreal",
+                "province_state": "Quebec",
+                "latitude": 45.54,
+                "longitude": -73.60,
+            },
+        )
+        building_id = building_response.json()["id"]
+
+        files = {"file": ("model.ifc", b"ISO-10303-21;\nHEADER;", "application/octet-stream")}
+        response = await client.post(
+            f"/api/v1/buildings/{building_id}/import-bim",
+            headers={"Authorization": f"Bearer {token}"},
+            files=files,
+        )
+
+        assert response.status_code == 503
+        assert list(tmp_path.glob("bim-import-*")) == []
@@ -227,3 +227,91 @@ class TestTelemetryIngestionAPI:
         )
 
         assert response.status_code == 422
+
+
+class TestLatestTelemetryAPI:
+    """Tests for latest-value (telemetry shadow) endpoints."""
+
+    @pytest.fixture
+    def shadow_redis(self):
+        """Override get_redis with an in-memory shadow store."""
+        from app.core.deps import get_redis
+        from app.main import fastapi_app
+        from tests.test_telemetry_shadow_service import FakeRedis
+
+        fake = FakeRedis()
+        fastapi_app.dependency_overrides[get_redis] = lambda: fake
+        yield fake
+        fastapi_app.dependency_overrides.pop(get_redis, None)
+
+    async def _token(self, client: AsyncClient) -> str:
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "TestPassword123!"},
+        )
+        return response.json()["access_token"]
+
+    @pytest.mark.asyncio
+    async def test_get_latest_for_device(
+        self, client: AsyncClient, test_user: User, shadow_redis
+    ):
+        """Latest values for a single device come from the shadow."""
+        from app.services.telemetry_shadow_service import TelemetryShadowService
+
+        device_id = str(uuid.uuid4())
+        await TelemetryShadowService(shadow_redis).update_batch([{
+            "device_id": device_id,
+            "server_timestamp": "2026-01-01T00:00:00+00:00",
+            "metrics": {"temperature": 21.5},
+        }])
+        token = await self._token(client)
+
+        response = await client.get(
+            f"/api/v1/devices/{device_id}/telemetry/latest",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["device_id"] == device_id
+        assert data["metrics"]["temperature"]["value"] == 21.5
+
+    @pytest.mark.asyncio
+    async def test_get_latest_bulk_by_device_ids(
+        self, client: AsyncClient, test_user: User, shadow_redis
+    ):
+        """Bulk endpoint returns only devices present in the shadow."""
+        from app.services.telemetry_shadow_service import TelemetryShadowService
+
+        reported, silent = str(uuid.uuid4()), str(uuid.uuid4())
+        await TelemetryShadowService(shadow_redis).update_batch([{
+            "device_id": reported,
+            "server_timestamp": "2026-01-01T00:00:00+00:00",
+            "metrics": {"door_open": True},
+        }])
+        token = await self._token(client)
+
+        response = await client.get(
+            "/api/v1/devices/telemetry/latest",
+            params={"device_ids": [reported, silent]},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert data["devices"][reported]["door_open"]["value"] is True
+
+    @pytest.mark.asyncio
+    async def test_get_latest_bulk_requires_selector(
+        self, client: AsyncClient, test_user: User, shadow_redis
+    ):
+        """Bulk endpoint rejects requests without any device selector."""
+        token = await self._token(client)
+
+        response = await client.get(
+            "/api/v1/devices/telemetry/latest",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 422
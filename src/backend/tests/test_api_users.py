@@ -2,7 +2,10 @@
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.audit import AuditAction, AuditLog
 from app.models.user import User, UserRole
 from app.models.agency import Agency
 
@@ -335,6 +338,24 @@ class TestUsersAPI:
         assert response.status_code == 200
         assert response.json()["role"] == "dispatcher"
 
+    @pytest.mark.asyncio
+    async def test_change_role_is_audited_as_role_change(
+        self, client: AsyncClient, db_session: AsyncSession, admin_user: User, test_user: User
+    ):
+        """Role changes are logged with the dedicated, synchronously written action."""
+        token = await self.get_admin_token(client)
+
+        await client.post(
+            f"/api/v1/users/{test_user.id}/role",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"role": "dispatcher"},
+        )
+
+        entries = (
+            await db_session.execute(select(AuditLog).where(AuditLog.entity_id == str(test_user.id)))
+        ).scalars().all()
+        assert [entry.action for entry in entries] == [AuditAction.USER_ROLE_CHANGED]
+
     @pytest.mark.asyncio
     async def test_change_role_invalid(self, client: AsyncClient, admin_user: User, test_user: User):
         """Changing to invalid role should fail."""
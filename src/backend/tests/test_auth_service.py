@@ -71,6 +71,43 @@ class TestAuthService:
         assert user.id == test_user.id
         assert user.email == test_user.email
 
+    @pytest.mark.asyncio
+    async def test_authenticate_user_upgrades_hash_cost(
+        self, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        """A successful login rehashes passwords stored with an older bcrypt cost."""
+        from app.core import security
+
+        old_hash = test_user.hashed_password
+        monkeypatch.setattr(security.settings, "bcrypt_rounds", security.settings.bcrypt_rounds + 1)
+        auth_service = AuthService(db_session)
+
+        user = await auth_service.authenticate_user(test_user.email, "TestPassword123!")
+
+        assert user.hashed_password != old_hash
+        assert not security.password_needs_rehash(user.hashed_password)
+        assert security.verify_password("TestPassword123!", user.hashed_password)
+
+    @pytest.mark.asyncio
+    async def test_hash_cost_upgrade_keeps_issued_tokens_valid(
+        self, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        """Rehashing at a higher cost does not revoke the user's other sessions."""
+        from app.core import security
+
+        auth_service = AuthService(db_session)
+        tokens = await auth_service.create_tokens(test_user)
+        old_hash = test_user.hashed_password
+        monkeypatch.setattr(security.settings, "bcrypt_rounds", security.settings.bcrypt_rounds + 1)
+
+        user = await auth_service.authenticate_user(test_user.email, "TestPassword123!")
+
+        assert user.hashed_password != old_hash
+        new_tokens = await auth_service.refresh_access_token(tokens["refresh_token"])
+        old_claims = security.verify_token(tokens["access_token"])
+        new_claims = security.verify_token(new_tokens["access_token"])
+        assert old_claims["tv"] == new_claims["tv"] == user.token_version
+
     @pytest.mark.asyncio
     async def test_authenticate_user_wrong_password(self, db_session: AsyncSession, test_user: User):
         """Authentication should fail with wrong password."""
@@ -126,6 +163,17 @@ class TestAuthService:
         user = await auth_service.get_current_user(new_tokens["access_token"])
         assert user.id == test_user.id
 
+    @pytest.mark.asyncio
+    async def test_refresh_rejected_after_password_change(self, db_session: AsyncSession, test_user: User):
+        """A password change revokes refresh tokens issued before it."""
+        auth_service = AuthService(db_session)
+        tokens = await auth_service.create_tokens(test_user)
+
+        await auth_service.change_password(test_user, "TestPassword123!", "NewSecurePassword456!")
+
+        with pytest.raises(AuthenticationError):
+            await auth_service.refresh_access_token(tokens["refresh_token"])
+
     @pytest.mark.asyncio
     async def test_refresh_with_invalid_token(self, db_session: AsyncSession):
         """Token refresh should fail with invalid token."""
@@ -0,0 +1,214 @@
+"""Tests for background BIM import jobs."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.agency import Agency
+from app.services import bim_import_service
+from app.services.bim_import_service import BIMImportQueue, BIMImportStatus
+from app.services.bim_parser import IFCParserError
+from app.services.building_service import BuildingService
+
+
+class FakeRedis:
+    """In-memory GET/SET store."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+PARSED = {
+    "building_name": "Tower",
+    "total_floors": 2,
+    "floors": [
+        {"floor_number": 0, "floor_name": "Ground", "elevation": 0.0, "area_sqm": 500.0, "ceiling_height_m": 3.5},
+        {"floor_number": 1, "floor_name": "Level 1", "elevation": 3.5, "area_sqm": 480.0, "ceiling_height_m": 3.0},
+    ],
+    "key_locations": [
+        {"type": "door", "name": "Exit A", "floor_number": 0, "x": 1.0, "y": 2.0,
+         "z": None, "properties": {"is_emergency_exit": True}},
+        {"type": "fire_extinguisher", "name": "FE-1", "floor_number": 1, "x": 3.0, "y": 4.0,
+         "z": None, "properties": {}},
+    ],
+    "construction_type": None,
+    "total_area_sqm": 980.0,
+    "building_height_m": 6.5,
+    "materials": [],
+    "raw_properties": {},
+    "ifc_schema": "IFC4",
+}
+
+
+class CountingParser:
+    """Picklable-free stand-in for parse_ifc_file that records calls."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self, path):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def progress_events(monkeypatch):
+    events = []
+
+    async def record(job, building_id):
+        events.append(dict(job))
+
+    monkeypatch.setattr(bim_import_service, "emit_bim_import_progress", record)
+    return events
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession):
+    @asynccontextmanager
+    async def factory():
+        yield db_session
+
+    return factory
+
+
+@pytest.fixture
+async def building(db_session: AsyncSession, test_agency: Agency):
+    return await BuildingService(db_session).create_building(
+        agency_id=test_agency.id,
+        name="IFC Building",
+        street_name="Model Street",
+        city="Montreal",
+        province_state="Quebec",
+        latitude=45.5,
+        longitude=-73.5,
+    )
+
+
+def _spool(tmp_path, content=b"ISO-10303-21;\nHEADER;"):
+    path = tmp_path / "upload.ifc"
+    path.write_bytes(content)
+    return path
+
+
+class TestBIMImportQueue:
+    """Tests for BIMImportQueue job execution."""
+
+    @pytest.mark.asyncio
+    async def test_job_applies_floors_and_reports_progress(
+        self, tmp_path, building, session_factory, progress_events, db_session
+    ):
+        """A completed job creates floor plans and stores its result."""
+        parser = CountingParser(result=PARSED)
+        queue = BIMImportQueue(
+            FakeRedis(), session_factory, executor=ThreadPoolExecutor(1), parse_func=parser,
+        )
+        spool = _spool(tmp_path)
+
+        job = await queue.enqueue(building.id, spool, "tower.ifc")
+        await queue._queue.join()
+
+        stored = await queue.get_job(job["job_id"])
+        assert stored["status"] == BIMImportStatus.COMPLETED.value
+        assert stored["progress"] == 100
+        result = stored["result"]
+        assert result["floors_created"] + result["floors_updated"] == 2
+        assert stored["result"]["locations_found"] == 2
+        assert not spool.exists()
+
+        stages = [e["stage"] for e in progress_events]
+        assert stages == ["hashing", "parsing", "applying", "completed"]
+
+        floors = await BuildingService(db_session).get_building_floor_plans(building.id)
+        assert sorted(fp.floor_number for fp in floors) == [0, 1]
+        ground = next(fp for fp in floors if fp.floor_number == 0)
+        assert ground.emergency_exits[0]["name"] == "Exit A"
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_reimport_of_same_file_uses_parse_cache(
+        self, tmp_path, building, session_factory, progress_events
+    ):
+        """The second import of identical bytes skips the parser."""
+        parser = CountingParser(result=PARSED)
+        redis = FakeRedis()
+        queue = BIMImportQueue(redis, session_factory, executor=ThreadPoolExecutor(1), parse_func=parser)
+
+        first = await queue.enqueue(building.id, _spool(tmp_path), "a.ifc")
+        await queue._queue.join()
+        second = await queue.enqueue(building.id, _spool(tmp_path), "b.ifc")
+        await queue._queue.join()
+
+        assert parser.calls == 1
+        assert (await queue.get_job(first["job_id"]))["cached"] is False
+        second_state = await queue.get_job(second["job_id"])
+        assert second_state["cached"] is True
+        assert second_state["status"] == BIMImportStatus.COMPLETED.value
+        assert any(k.startswith("bim:parse:") for k in redis.values)
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_parse_error_marks_job_failed(
+        self, tmp_path, building, session_factory, progress_events
+    ):
+        """Parser errors are reported on the job instead of raised."""
+        parser = CountingParser(error=IFCParserError("bad model"))
+        queue = BIMImportQueue(FakeRedis(), session_factory, executor=ThreadPoolExecutor(1), parse_func=parser)
+        spool = _spool(tmp_path)
+
+        job = await queue.enqueue(building.id, spool, "bad.ifc")
+        await queue._queue.join()
+
+        stored = await queue.get_job(job["job_id"])
+        assert stored["status"] == BIMImportStatus.FAILED.value
+        assert stored["error"] == "bad model"
+        assert stored["result"] is None
+        assert not spool.exists()
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_marks_running_job_cancelled(
+        self, tmp_path, building, session_factory, progress_events
+    ):
+        """A job interrupted by stop() ends failed instead of staying running."""
+        release = threading.Event()
+
+        def blocking_parser(path):
+            release.wait(5)
+            return PARSED
+
+        queue = BIMImportQueue(
+            FakeRedis(), session_factory, executor=ThreadPoolExecutor(1), parse_func=blocking_parser,
+        )
+        spool = _spool(tmp_path)
+        job = await queue.enqueue(building.id, spool, "slow.ifc")
+        async with asyncio.timeout(5):
+            while not progress_events or progress_events[-1]["stage"] != "parsing":
+                await asyncio.sleep(0.01)
+
+        await queue.stop()
+        release.set()
+
+        stored = await queue.get_job(job["job_id"])
+        assert stored["status"] == BIMImportStatus.FAILED.value
+        assert stored["stage"] == "cancelled"
+        assert not spool.exists()
+
+    @pytest.mark.asyncio
+    async def test_get_unknown_job(self, session_factory):
+        """Unknown job ids return None."""
+        queue = BIMImportQueue(FakeRedis(), session_factory)
+        assert await queue.get_job("missing") is None
@@ -0,0 +1,253 @@
+"""Tests for the batched, fingerprinting CAD sync cycle."""
+
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.incident import Incident, IncidentCategory
+from app.models.resource import Resource, ResourceStatus, ResourceType
+from app.services.cad_adapter import CADAdapter, CADIncident, CADSyncService, CADUnit, CADVendor
+
+
+class ScriptedCADAdapter(CADAdapter):
+    """Serves whatever incidents and units the test puts in it."""
+
+    def __init__(self):
+        super().__init__({})
+        self.incidents: list[CADIncident] = []
+        self.units: list[CADUnit] = []
+        self.fail = False
+
+    @property
+    def vendor(self) -> CADVendor:
+        return CADVendor.GENERIC
+
+    async def connect(self) -> bool:
+        return True
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def fetch_incidents(self, since=None, active_only=True) -> list[CADIncident]:
+        if self.fail:
+            raise ConnectionError("CAD unreachable")
+        return list(self.incidents)
+
+    async def fetch_units(self) -> list[CADUnit]:
+        return list(self.units)
+
+    async def send_unit_status(self, unit_id, status, incident_id=None) -> bool:
+        return True
+
+    async def send_incident_update(self, incident_id, status=None, comment=None) -> bool:
+        return True
+
+
+def _incident(n: int, **overrides) -> CADIncident:
+    fields = {
+        "cad_id": f"CAD-{n}",
+        "incident_number": f"CAD-2026-{n:05d}",
+        "call_type": "Structure Fire",
+        "priority": 2,
+        "status": "pending",
+        "address": f"{n} Main St",
+        "latitude": 45.5,
+        "longitude": -73.6,
+    }
+    fields.update(overrides)
+    return CADIncident(**fields)
+
+
+def _unit(call_sign: str, status: str = "available", **overrides) -> CADUnit:
+    return CADUnit(
+        cad_id=call_sign, unit_id=call_sign, call_sign=call_sign, unit_type="Engine", status=status, **overrides
+    )
+
+
+def _records(outcome: str, entity: str = "incident") -> float:
+    return REGISTRY.get_sample_value(
+        "eriop_cad_sync_records_total", {"vendor": "generic", "entity": entity, "outcome": outcome}
+    ) or 0.0
+
+
+@pytest.fixture
+def adapter():
+    return ScriptedCADAdapter()
+
+
+@pytest.fixture
+def service(adapter, db_engine, test_agency):
+    factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return CADSyncService(adapter, agency_id=test_agency.id, session_factory=factory)
+
+
+@pytest.fixture
+def statements(db_engine):
+    """SQL statements executed against the test database."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+class TestIncidentSync:
+    """Incidents are created and updated in bulk and skipped when unchanged."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_uses_one_lookup_and_one_insert(self, adapter, service, db_session, statements):
+        adapter.incidents = [_incident(n) for n in range(50)]
+        created = _records("created")
+
+        outcomes = await service.sync_once()
+
+        assert outcomes["incident"] == {"created": 50}
+        assert _records("created") == created + 50
+        incident_statements = [s for s in statements if "incidents" in s]
+        assert len(incident_statements) == 2  # SELECT ... IN, then one INSERT
+        assert len([s for s in statements if "incident_number_sequences" in s]) == 1
+        incidents = (await db_session.execute(select(Incident))).scalars().all()
+        assert len(incidents) == 50
+        assert {i.external_source for i in incidents} == {"generic"}
+        assert incidents[0].category == IncidentCategory.FIRE
+
+    @pytest.mark.asyncio
+    async def test_created_incidents_get_allocated_numbers(self, adapter, service, db_session):
+        # Vendors that send no incident number must not collide on the unique column
+        adapter.incidents = [_incident(n, incident_number="") for n in range(3)]
+        await service.sync_once()
+        adapter.incidents.append(_incident(3, incident_number=""))
+
+        outcomes = await service.sync_once()
+
+        assert outcomes["incident"] == {"unchanged": 3, "created": 1}
+        incidents = (await db_session.execute(select(Incident))).scalars().all()
+        numbers = {i.incident_number for i in incidents}
+        assert len(numbers) == 4
+        assert all(number.startswith("INC-") for number in numbers)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_records_skip_the_database(self, adapter, service, statements):
+        adapter.incidents = [_incident(n) for n in range(10)]
+        await service.sync_once()
+        statements.clear()
+
+        outcomes = await service.sync_once()
+
+        assert outcomes["incident"] == {"unchanged": 10}
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_only_changed_incidents_are_updated(self, adapter, service, db_session):
+        adapter.incidents = [_incident(n) for n in range(3)]
+        await service.sync_once()
+
+        adapter.incidents[1] = _incident(1, priority=1, description="Second alarm")
+        outcomes = await service.sync_once()
+
+        assert outcomes["incident"] == {"unchanged": 2, "updated": 1}
+        incident = (
+            await db_session.execute(select(Incident).where(Incident.external_id == "CAD-1"))
+        ).scalar_one()
+        assert incident.priority == 1
+        assert incident.description == "Second alarm"
+
+    @pytest.mark.asyncio
+    async def test_restart_compares_against_stored_rows(self, adapter, service, db_engine, test_agency):
+        adapter.incidents = [_incident(n) for n in range(3)]
+        await service.sync_once()
+
+        restarted = CADSyncService(adapter, agency_id=test_agency.id, session_factory=service.session_factory)
+        outcomes = await restarted.sync_once()
+
+        assert outcomes["incident"] == {"unchanged": 3}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sync_of_same_call_upserts_one_incident(
+        self, adapter, service, db_session, test_agency, monkeypatch
+    ):
+        adapter.incidents = [_incident(1)]
+        await service.sync_once()
+
+        # A second sync service whose lookup ran before the first one's insert
+        racing = CADSyncService(adapter, agency_id=test_agency.id, session_factory=service.session_factory)
+
+        async def missed_lookup(session, source, cad_ids):
+            return {}
+
+        monkeypatch.setattr(racing, "_existing_incidents", missed_lookup)
+        adapter.incidents = [_incident(1, priority=1)]
+        await racing.sync_once()
+
+        incidents = (
+            await db_session.execute(select(Incident).where(Incident.external_id == "CAD-1"))
+        ).scalars().all()
+        assert len(incidents) == 1
+        await db_session.refresh(incidents[0])
+        assert incidents[0].priority == 1
+
+    @pytest.mark.asyncio
+    async def test_incident_without_location_is_skipped(self, adapter, service):
+        adapter.incidents = [_incident(1, latitude=None, longitude=None), _incident(2)]
+
+        outcomes = await service.sync_once()
+
+        assert outcomes["incident"] == {"skipped": 1, "created": 1}
+
+
+class TestUnitSync:
+    """Units update matching resources by call sign."""
+
+    @pytest.mark.asyncio
+    async def test_units_update_resources_by_call_sign(self, adapter, service, db_session, test_agency):
+        for call_sign in ("E1", "E2"):
+            db_session.add(Resource(
+                id=uuid.uuid4(),
+                agency_id=test_agency.id,
+                resource_type=ResourceType.VEHICLE,
+                name=f"Engine {call_sign}",
+                call_sign=call_sign,
+                status=ResourceStatus.AVAILABLE,
+            ))
+        await db_session.commit()
+        adapter.units = [
+            _unit("E1", "enroute", latitude=45.5, longitude=-73.6),
+            _unit("E2", "available"),
+            _unit("L9", "busy"),
+        ]
+
+        outcomes = await service.sync_once()
+
+        assert outcomes["unit"] == {"updated": 1, "unchanged": 1, "skipped": 1}
+        db_session.expire_all()
+        e1 = (await db_session.execute(select(Resource).where(Resource.call_sign == "E1"))).scalar_one()
+        assert e1.status == ResourceStatus.EN_ROUTE
+        assert e1.current_latitude == 45.5
+
+
+class TestSyncFailures:
+    """Failed cycles are counted and retried in full."""
+
+    @pytest.mark.asyncio
+    async def test_failed_cycle_is_counted_and_not_remembered(self, adapter, service):
+        adapter.incidents = [_incident(1)]
+        adapter.fail = True
+        errors = REGISTRY.get_sample_value("eriop_cad_sync_errors_total", {"vendor": "generic"}) or 0.0
+        cycles = REGISTRY.get_sample_value("eriop_cad_sync_cycle_seconds_count", {"vendor": "generic"}) or 0.0
+
+        with pytest.raises(ConnectionError):
+            await service.sync_once()
+
+        assert REGISTRY.get_sample_value("eriop_cad_sync_errors_total", {"vendor": "generic"}) == errors + 1
+        assert REGISTRY.get_sample_value("eriop_cad_sync_cycle_seconds_count", {"vendor": "generic"}) == cycles + 1
+        assert service.last_sync is None
+
+        adapter.fail = False
+        outcomes = await service.sync_once()
+        assert outcomes["incident"] == {"created": 1}
@@ -0,0 +1,100 @@
+"""Tests for conditional, cacheable file responses."""
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.core import file_serving
+from app.core.file_serving import etag_matches, file_response
+
+
+@pytest.fixture
+def stored_file(tmp_path):
+    path = tmp_path / "buildings" / "b1" / "documents" / "doc.pdf"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"%PDF-" + bytes(range(256)) * 4)
+    return path
+
+
+@pytest.fixture
+def app(stored_file):
+    app = FastAPI()
+
+    @app.get("/file")
+    async def serve(request: Request):
+        return await file_response(request, stored_file, "application/pdf", filename="doc.pdf")
+
+    return app
+
+
+@pytest.fixture
+async def http(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+class TestEtagMatches:
+    """Tests for If-None-Match evaluation."""
+
+    def test_matches_listed_and_weak_tags(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+
+    def test_no_match(self):
+        assert not etag_matches(None, '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+
+class TestFileResponse:
+    """Tests for file_response over HTTP."""
+
+    @pytest.mark.asyncio
+    async def test_full_response_has_cache_headers(self, http, stored_file):
+        response = await http.get("/file")
+
+        assert response.status_code == 200
+        assert response.content == stored_file.read_bytes()
+        assert response.headers["etag"]
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-disposition"].startswith("inline")
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_304(self, http):
+        etag = (await http.get("/file")).headers["etag"]
+
+        response = await http.get("/file", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_range_request_returns_partial_content(self, http, stored_file):
+        response = await http.get("/file", headers={"Range": "bytes=5-14"})
+
+        assert response.status_code == 206
+        assert response.content == stored_file.read_bytes()[5:15]
+
+    @pytest.mark.asyncio
+    async def test_accel_redirect_offloads_body(self, http, stored_file, monkeypatch):
+        monkeypatch.setattr(file_serving.settings, "file_accel_redirect_prefix", "/_protected_files/")
+        monkeypatch.setattr(
+            file_serving.settings, "file_accel_redirect_root", str(stored_file.parents[3])
+        )
+
+        response = await http.get("/file")
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == "/_protected_files/buildings/b1/documents/doc.pdf"
+
+    @pytest.mark.asyncio
+    async def test_accel_redirect_skipped_outside_root(self, http, monkeypatch):
+        monkeypatch.setattr(file_serving.settings, "file_accel_redirect_prefix", "/_protected_files")
+        monkeypatch.setattr(file_serving.settings, "file_accel_redirect_root", "/nonexistent-root")
+
+        response = await http.get("/file")
+
+        assert "x-accel-redirect" not in response.headers
+        assert response.content.startswith(b"%PDF-")
@@ -1,5 +1,6 @@
 """Tests for FileStorageService."""
 
+import io
 import os
 import tempfile
 from pathlib import Path
@@ -380,6 +381,112 @@ class TestFileStoragePermissions:
                 os.chmod(building_path, stat.S_IRWXU)
 
 
+class _ChunkedUpload:
+    """Async reader standing in for UploadFile."""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+class TestStreamingUploads:
+    """Tests for chunked upload streaming and off-loop rendering."""
+
+    @pytest.fixture
+    def storage_service(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield FileStorageService(base_path=tmpdir)
+
+    @staticmethod
+    def _png_bytes(size=(800, 600)) -> bytes:
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGBA', size, (200, 30, 30, 255)).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    @pytest.mark.asyncio
+    async def test_stream_to_file_reads_in_chunks(self, storage_service):
+        """Uploads are consumed in CHUNK_SIZE pieces."""
+        storage_service.CHUNK_SIZE = 4
+        dest = Path(storage_service.base_path) / 'out.bin'
+        upload = _ChunkedUpload(b'0123456789')
+
+        written = await storage_service.stream_to_file(upload, dest)
+
+        assert written == 10
+        assert dest.read_bytes() == b'0123456789'
+        assert upload.reads == 4  # 3 data chunks + EOF
+
+    @pytest.mark.asyncio
+    async def test_stream_to_file_enforces_size_incrementally(self, storage_service):
+        """Oversized uploads are rejected and the partial file removed."""
+        storage_service.CHUNK_SIZE = 4
+        dest = Path(storage_service.base_path) / 'big.bin'
+
+        with pytest.raises(FileStorageError, match='File too large'):
+            await storage_service.stream_to_file(_ChunkedUpload(b'x' * 20), dest, max_size=8)
+
+        assert not dest.exists()
+
+    @pytest.mark.asyncio
+    async def test_stream_to_file_rejects_signature_mismatch(self, storage_service):
+        """Content that does not match the declared type is rejected."""
+        dest = Path(storage_service.base_path) / 'fake.png'
+
+        with pytest.raises(FileStorageError, match='does not match'):
+            await storage_service.stream_to_file(_ChunkedUpload(b'MZ\x90\x00'), dest, extension='png')
+
+        assert not dest.exists()
+
+    @pytest.mark.asyncio
+    async def test_save_floor_plan_upload_renders_variants(self, storage_service):
+        """A PNG upload yields JPEG and WebP thumbnail and preview renditions."""
+        building_id = uuid.uuid4()
+
+        file_url, thumb_url, file_type = await storage_service.save_floor_plan_upload(
+            building_id=building_id,
+            floor_number=2,
+            upload=_ChunkedUpload(self._png_bytes()),
+            content_type='image/png',
+        )
+
+        assert file_type == 'png'
+        original_name = file_url.rsplit('/', 1)[-1]
+        variants = storage_service.image_variant_filenames(original_name)
+        assert thumb_url.rsplit('/', 1)[-1] == variants['thumb']['jpg']
+        rendered = [name for formats in variants.values() for name in formats.values()]
+        assert len(rendered) == 4
+        for name in rendered:
+            assert storage_service.get_file_path(building_id, name) is not None
+
+        from PIL import Image
+        with Image.open(storage_service.get_file_path(building_id, variants['thumb']['webp'])) as thumb:
+            assert thumb.format == 'WEBP'
+            assert max(thumb.size) <= storage_service.THUMBNAIL_SIZE[0]
+
+        # Deleting the original removes every rendition with it
+        assert storage_service.delete_file(building_id, original_name) is True
+        assert list(storage_service._get_building_path(building_id).iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_save_photo_upload_unreadable_image(self, storage_service):
+        """Photos that cannot be decoded are stored without a thumbnail."""
+        content = b'\xff\xd8\xff\xe0\x00\x10JFIF' + b'\x00' * 100
+
+        filename, thumb, size = await storage_service.save_photo_upload(
+            uuid.uuid4(), _ChunkedUpload(content), 'jpg'
+        )
+
+        assert filename.endswith('.jpg')
+        assert thumb is None
+        assert size == len(content)
+
+
 class TestFileStorageServiceHelpers:
     """Tests for helper functions in file storage."""
 
@@ -0,0 +1,153 @@
+"""Tests for the HLS segment store and HLSSegmentManager."""
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import Response
+
+from app.services.hls_segment_store import HLSSegmentStore
+from app.services.streaming import HLSSegmentManager
+
+
+@pytest.fixture
+def session_id():
+    return uuid.uuid4()
+
+
+class TestSegmentRing:
+    """Tests for the sliding window and playlist."""
+
+    def test_media_sequence_follows_window(self, tmp_path, session_id):
+        """MEDIA-SEQUENCE is the first listed segment and names never repeat."""
+        manager = HLSSegmentManager(window_size=3, spill_dir=tmp_path)
+        names = [manager.add_segment(session_id, b"x" * 10, 2.0) for _ in range(5)]
+
+        assert names == [f"segment_{i:05d}.ts" for i in range(5)]
+        playlist = manager.get_playlist(session_id)
+        assert "#EXT-X-MEDIA-SEQUENCE:2" in playlist
+        assert "segment_00001.ts" not in playlist
+        assert playlist.count("#EXTINF") == 3
+        assert manager.get_segment(session_id, "segment_00000.ts") is None
+        assert manager.get_segment(session_id, "segment_00004.ts") == b"x" * 10
+
+    def test_playlist_cached_until_change(self, tmp_path, session_id):
+        """The playlist string is reused until a segment is added."""
+        store = HLSSegmentStore(spill_dir=tmp_path)
+        store.add_segment(session_id, b"a", 2.0)
+
+        first = store.get_playlist(session_id)
+        assert store.get_playlist(session_id) is first
+        store.add_segment(session_id, b"b", 2.0)
+        assert store.get_playlist(session_id) is not first
+
+    def test_cleanup_session(self, tmp_path, session_id):
+        """Removing a session frees its memory and spill files."""
+        store = HLSSegmentStore(memory_budget_bytes=10, spill_dir=tmp_path)
+        store.add_segment(session_id, b"a" * 8, 2.0)
+        store.add_segment(session_id, b"b" * 8, 2.0)
+
+        store.remove_session(session_id)
+
+        assert store.get_playlist(session_id) is None
+        assert store.memory_bytes == 0
+        assert store.spilled_bytes == 0
+        assert not (tmp_path / str(session_id)).exists()
+
+
+class TestMemoryBudget:
+    """Tests for spilling segments over the global budget."""
+
+    def test_oldest_segments_spill_across_sessions(self, tmp_path):
+        """Exceeding the budget spills the oldest segments and serves them via mmap."""
+        store = HLSSegmentStore(memory_budget_bytes=250, spill_dir=tmp_path)
+        a, b = uuid.uuid4(), uuid.uuid4()
+        store.add_segment(a, b"a" * 100, 2.0)
+        store.add_segment(b, b"b" * 100, 2.0)
+        store.add_segment(a, b"c" * 100, 2.0)
+
+        assert store.memory_bytes == 200
+        assert store.spilled_bytes == 100
+        assert (tmp_path / str(a) / "segment_00000.ts").exists()
+
+        data = store.get(a, "segment_00000.ts")
+        assert isinstance(data, memoryview)
+        assert bytes(data) == b"a" * 100
+
+    def test_spilled_segment_removed_when_window_slides(self, tmp_path, session_id):
+        """Evicted spilled segments delete their spill file."""
+        store = HLSSegmentStore(window_size=1, memory_budget_bytes=5, spill_dir=tmp_path)
+        store.add_segment(session_id, b"a" * 10, 2.0)
+        spill = tmp_path / str(session_id) / "segment_00000.ts"
+        assert spill.exists()
+
+        store.add_segment(session_id, b"b" * 10, 2.0)
+
+        assert not spill.exists()
+        assert store.spilled_bytes == 10
+
+    def test_memoryview_can_be_sent_as_response(self, tmp_path, session_id):
+        """Spilled payloads are usable as a Response body without copying."""
+        store = HLSSegmentStore(memory_budget_bytes=0, spill_dir=tmp_path)
+        store.add_segment(session_id, b"z" * 32, 2.0)
+
+        response = Response(content=store.get(session_id, "segment_00000.ts"))
+
+        assert response.headers["content-length"] == "32"
+
+
+class TestLowLatency:
+    """Tests for LL-HLS partial segments and blocking reloads."""
+
+    def test_parts_and_preload_hint(self, tmp_path, session_id):
+        """Parts are listed before their segment and a preload hint follows."""
+        store = HLSSegmentStore(spill_dir=tmp_path, part_target=0.5)
+        store.add_part(session_id, b"p0", 0.5, independent=True)
+        store.add_part(session_id, b"p1", 0.5)
+        store.add_segment(session_id, b"p0p1", 1.0)
+        part = store.add_part(session_id, b"q0", 0.5, independent=True)
+
+        playlist = store.get_playlist(session_id)
+        assert "#EXT-X-PART-INF:PART-TARGET=0.500" in playlist
+        assert "CAN-BLOCK-RELOAD=YES" in playlist
+        assert playlist.index('URI="segment_00000.part1.ts"') < playlist.index("segment_00000.ts\n")
+        assert f'URI="{part}",INDEPENDENT=YES' in playlist
+        assert playlist.rstrip().endswith('#EXT-X-PRELOAD-HINT:TYPE=PART,URI="segment_00001.part1.ts"')
+        assert store.get(session_id, "segment_00000.part0.ts") == b"p0"
+
+    def test_old_parts_are_dropped(self, tmp_path, session_id):
+        """Only the most recent segments keep their parts."""
+        store = HLSSegmentStore(spill_dir=tmp_path, part_target=1.0)
+        for _ in range(5):
+            store.add_part(session_id, b"p", 1.0)
+            store.add_segment(session_id, b"p", 1.0)
+
+        assert store.get(session_id, "segment_00000.part0.ts") is None
+        assert store.get(session_id, "segment_00004.part0.ts") == b"p"
+        assert store.memory_bytes == 5 + 3
+
+    @pytest.mark.asyncio
+    async def test_blocking_reload_wakes_all_viewers(self, tmp_path, session_id):
+        """Viewers waiting for the next part are released when it arrives."""
+        store = HLSSegmentStore(spill_dir=tmp_path, part_target=0.5)
+        store.add_segment(session_id, b"s", 1.0)
+
+        waiters = [
+            asyncio.create_task(store.wait_for(session_id, msn=1, part=0, timeout=5))
+            for _ in range(50)
+        ]
+        await asyncio.sleep(0)
+        assert not any(w.done() for w in waiters)
+
+        store.add_part(session_id, b"p", 0.5)
+
+        assert all(await asyncio.gather(*waiters))
+
+    @pytest.mark.asyncio
+    async def test_blocking_reload_times_out(self, tmp_path, session_id):
+        """An unsatisfied reload returns False after the timeout."""
+        store = HLSSegmentStore(spill_dir=tmp_path, part_target=0.5)
+        store.add_segment(session_id, b"s", 1.0)
+
+        assert await store.wait_for(session_id, msn=0) is True
+        assert await store.wait_for(session_id, msn=3, timeout=0.01) is False
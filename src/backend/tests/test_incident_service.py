@@ -1,10 +1,19 @@
 """Tests for incident service."""
 
+import asyncio
 import pytest
 import uuid
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.services.incident_service import IncidentService, IncidentError
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.services import incident_service
+from app.services.incident_service import (
+    IncidentService,
+    IncidentError,
+    allocate_incident_number,
+    allocate_incident_numbers,
+)
 from app.models.incident import IncidentStatus, IncidentPriority, IncidentCategory
 from app.models.agency import Agency
 from app.models.user import User
@@ -35,8 +44,9 @@ class TestIncidentService:
         assert incident.priority == IncidentPriority.HIGH
         assert incident.status == IncidentStatus.NEW
         assert incident.title == "Structure Fire at 123 Main St"
-        assert len(incident.timeline_events) == 1
-        assert incident.timeline_events[0]["type"] == "created"
+        timeline = await service.get_timeline(incident.id)
+        assert len(timeline) == 1
+        assert timeline[0]["type"] == "created"
 
     @pytest.mark.asyncio
     async def test_create_incident_invalid_agency(self, db_session: AsyncSession):
@@ -135,7 +145,7 @@ class TestIncidentService:
 
         assert updated.status == IncidentStatus.ASSIGNED
         assert updated.dispatched_at is not None
-        assert len(updated.timeline_events) == 2  # created + updated
+        assert len(await service.get_timeline(incident.id)) == 2  # created + updated
 
     @pytest.mark.asyncio
     async def test_assign_unit(
@@ -327,6 +337,56 @@ class TestIncidentService:
         assert timeline[0]["type"] == "created"
         assert timeline[1]["type"] == "updated"
 
+    @pytest.mark.asyncio
+    async def test_get_timeline_paginates(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Timeline reads are paged oldest first."""
+        service = IncidentService(db_session)
+
+        incident = await service.create_incident(
+            agency_id=test_agency.id,
+            category=IncidentCategory.FIRE,
+            title="Fire Call",
+            latitude=45.5017,
+            longitude=-73.5673,
+        )
+        for i in range(4):
+            await service.escalate_incident(incident.id, escalated_by=test_user, reason=f"step {i}")
+
+        page = await service.get_timeline(incident.id, limit=2, offset=2)
+
+        assert [event["metadata"]["reason"] for event in page] == ["step 1", "step 2"]
+        assert page[0]["user_id"] == str(test_user.id)
+
+    @pytest.mark.asyncio
+    async def test_update_emits_only_new_event(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User, monkeypatch
+    ):
+        """Updates broadcast the appended event, not the whole timeline."""
+        emitted = []
+
+        async def capture(incident_id, event):
+            emitted.append((incident_id, event))
+
+        monkeypatch.setattr(incident_service, "emit_incident_timeline_event", capture)
+        service = IncidentService(db_session)
+        incident = await service.create_incident(
+            agency_id=test_agency.id,
+            category=IncidentCategory.FIRE,
+            title="Fire Call",
+            latitude=45.5017,
+            longitude=-73.5673,
+        )
+
+        await service.close_incident(incident.id, closed_by=test_user, resolution_notes="Out")
+
+        assert len(emitted) == 1
+        incident_id, event = emitted[0]
+        assert incident_id == str(incident.id)
+        assert event["type"] == "closed"
+        assert event["metadata"] == {"resolution_notes": "Out"}
+
     @pytest.mark.asyncio
     async def test_get_active_incidents_count(
         self, db_session: AsyncSession, test_agency: Agency, test_user: User
@@ -355,3 +415,92 @@ class TestIncidentService:
 
         count = await service.get_active_incidents_count(test_agency.id)
         assert count == 1
+
+
+class TestIncidentNumberAllocation:
+    """Tests for the per-prefix, per-day incident number sequence."""
+
+    @pytest.mark.asyncio
+    async def test_numbers_are_sequential_per_agency(self, db_session: AsyncSession, test_agency: Agency):
+        """Each agency gets its own contiguous daily sequence."""
+        other = Agency(id=uuid.uuid4(), name="Other", code="OTH", is_active=True)
+        db_session.add(other)
+        await db_session.commit()
+        service = IncidentService(db_session)
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+
+        numbers = []
+        for agency in (test_agency, test_agency, other, test_agency):
+            incident = await service.create_incident(
+                agency_id=agency.id,
+                category=IncidentCategory.FIRE,
+                title="Fire",
+                latitude=45.5,
+                longitude=-73.5,
+            )
+            numbers.append(incident.incident_number)
+
+        assert numbers == [
+            f"TFD-{today}-0001",
+            f"TFD-{today}-0002",
+            f"OTH-{today}-0001",
+            f"TFD-{today}-0003",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rollback_releases_number(self, db_session: AsyncSession):
+        """A number allocated in a rolled-back transaction is reissued."""
+        first = await allocate_incident_number(db_session)
+        await db_session.rollback()
+
+        assert await allocate_incident_number(db_session) == first
+
+    @pytest.mark.asyncio
+    async def test_block_allocation_continues_the_sequence(self, db_session: AsyncSession):
+        """A block of numbers is contiguous with single allocations."""
+        first = await allocate_incident_number(db_session)
+        block = await allocate_incident_numbers(db_session, 3)
+        after = await allocate_incident_number(db_session)
+
+        prefix = first.rsplit("-", 1)[0]
+        assert block == [f"{prefix}-0002", f"{prefix}-0003", f"{prefix}-0004"]
+        assert after == f"{prefix}-0005"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creation_is_unique_and_contiguous(self, tmp_path):
+        """1000 incidents created in parallel get numbers 1..1000."""
+        # A file database so each session has its own connection and transaction
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'incidents.db'}",
+            connect_args={"timeout": 60},
+            pool_size=20,
+            max_overflow=0,
+            pool_timeout=120,
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        agency = Agency(id=uuid.uuid4(), name="Surge", code="SRG", is_active=True)
+        async with session_factory() as session:
+            session.add(agency)
+            await session.commit()
+
+        async def create(i: int) -> str:
+            async with session_factory() as session:
+                incident = await IncidentService(session).create_incident(
+                    agency_id=agency.id,
+                    category=IncidentCategory.FIRE,
+                    title=f"Surge {i}",
+                    latitude=45.5,
+                    longitude=-73.5,
+                )
+                return incident.incident_number
+
+        try:
+            numbers = await asyncio.gather(*(create(i) for i in range(1000)))
+        finally:
+            await engine.dispose()
+
+        assert len(set(numbers)) == 1000
+        assert sorted(int(n.rsplit("-", 1)[1]) for n in numbers) == list(range(1, 1001))
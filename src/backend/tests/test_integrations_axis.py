@@ -1,13 +1,17 @@
 """Tests for Axis audio analytics integration."""
 
+import asyncio
 import pytest
 from datetime import datetime, timezone
 
 from app.integrations.axis.events import (
     AudioEventType,
     AxisAudioEvent,
+    AxisEventSubscriber,
     MockAxisEventGenerator,
+    SubscriptionMode,
 )
+from app.integrations.axis.simulator import AxisDeviceSimulator
 from app.integrations.axis.alert_generator import AudioAlertGenerator
 
 
@@ -243,3 +247,109 @@ class TestAudioAlertGenerator:
         assert "alert_thresholds" in thresholds
         assert "auto_dispatch_thresholds" in thresholds
         assert "gunshot" in thresholds["alert_thresholds"]
+
+
+async def _wait_for(condition, timeout: float = 5.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+class TestAxisEventSubscriber:
+    """Tests for push and polling subscriptions against simulated devices."""
+
+    @pytest.mark.asyncio
+    async def test_push_stream_delivers_events(self):
+        """Devices with the event stream are not polled."""
+        simulator = AxisDeviceSimulator(push_supported=True)
+        await simulator.start()
+        subscriber = AxisEventSubscriber([simulator.client()], poll_interval=0.05)
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        subscriber.on_event(handler)
+        try:
+            await subscriber.start()
+            await simulator.wait_for_stream()
+            await simulator.emit("GunshotDetection", confidence=92)
+            await _wait_for(lambda: received)
+        finally:
+            await subscriber.stop()
+            await simulator.stop()
+
+        assert received[0].event_type == AudioEventType.GUNSHOT
+        assert received[0].confidence == pytest.approx(0.92)
+        assert subscriber.device_modes() == {simulator.device_ip: SubscriptionMode.PUSH}
+        assert simulator.poll_requests == 0
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_polling_without_push(self):
+        """Devices without the event stream are polled instead."""
+        simulator = AxisDeviceSimulator(push_supported=False)
+        await simulator.start()
+        subscriber = AxisEventSubscriber([simulator.client()], poll_interval=0.02, max_poll_interval=0.05)
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        subscriber.on_event(handler)
+        try:
+            await subscriber.start()
+            await _wait_for(lambda: simulator.poll_requests > 0)
+            await simulator.emit("glass_break", confidence=80)
+            await _wait_for(lambda: received)
+        finally:
+            await subscriber.stop()
+            await simulator.stop()
+
+        assert received[0].event_type == AudioEventType.GLASS_BREAK
+        assert subscriber.device_modes() == {simulator.device_ip: SubscriptionMode.POLL}
+
+    @pytest.mark.asyncio
+    async def test_devices_share_one_session(self):
+        simulators = [AxisDeviceSimulator(push_supported=i % 2 == 0) for i in range(4)]
+        for simulator in simulators:
+            await simulator.start()
+        subscriber = AxisEventSubscriber([s.client() for s in simulators], poll_interval=0.02)
+        try:
+            await subscriber.start()
+            session = subscriber._session
+            await _wait_for(lambda: len(subscriber.device_modes()) == 4)
+            modes = subscriber.device_modes()
+        finally:
+            await subscriber.stop()
+            for simulator in simulators:
+                await simulator.stop()
+
+        assert session.closed
+        assert sorted(m.value for m in modes.values()) == ["poll", "poll", "push", "push"]
+
+    @pytest.mark.asyncio
+    async def test_idle_polling_slows_down(self):
+        """Empty polls stretch the interval up to the maximum."""
+        simulator = AxisDeviceSimulator(push_supported=False)
+        await simulator.start()
+        subscriber = AxisEventSubscriber(
+            [simulator.client()], mode=SubscriptionMode.POLL,
+            poll_interval=0.01, max_poll_interval=0.2,
+        )
+        try:
+            await subscriber.start()
+            await asyncio.sleep(0.6)
+        finally:
+            await subscriber.stop()
+            await simulator.stop()
+
+        # A fixed 10 ms interval would have made about 60 requests
+        assert 0 < simulator.poll_requests < 20
+
+    def test_backoff_is_jittered_and_capped(self):
+        subscriber = AxisEventSubscriber([], poll_interval=1.0, max_backoff=30.0)
+
+        delays = [subscriber._backoff_delay(10) for _ in range(50)]
+
+        assert all(0 <= d <= 30.0 for d in delays)
+        assert len(set(delays)) > 1
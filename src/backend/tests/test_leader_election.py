@@ -0,0 +1,163 @@
+"""Tests for Redis-lease leader election of singleton services."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.leader_election import RELEASE_SCRIPT, RENEW_SCRIPT, LeaderElectedService
+
+
+class FakeLeaseRedis:
+    """SET NX PX plus the renew/release scripts, with expiry."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[str, float]] = {}
+        self.fail = False
+        self.hang = False
+
+    async def _check(self):
+        if self.hang:
+            await asyncio.sleep(3600)
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+    async def ping(self):
+        await self._check()
+        return True
+
+    async def set(self, key, value, nx=False, px=None):
+        await self._check()
+        if nx and self._get(key) is not None:
+            return None
+        self.data[key] = (value, time.monotonic() + px / 1000)
+        return True
+
+    async def eval(self, script, numkeys, key, owner, *args):
+        await self._check()
+        if self._get(key) != owner:
+            return 0
+        if script == RENEW_SCRIPT:
+            self.data[key] = (owner, time.monotonic() + int(args[0]) / 1000)
+        elif script == RELEASE_SCRIPT:
+            del self.data[key]
+        return 1
+
+
+class Job:
+    """Records whether the singleton job is running."""
+
+    def __init__(self):
+        self.running = False
+        self.starts = 0
+
+    async def start(self):
+        self.running = True
+        self.starts += 1
+
+    async def stop(self):
+        self.running = False
+
+
+def _candidate(redis, job: Job, identity: str, lease: float = 0.3) -> LeaderElectedService:
+    return LeaderElectedService(
+        "device-monitor", job.start, job.stop, redis, lease_seconds=lease, identity=identity
+    )
+
+
+async def _wait_for(condition, timeout: float = 2.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+class TestLeaderElectedService:
+    """Tests for LeaderElectedService."""
+
+    @pytest.mark.asyncio
+    async def test_one_leader_and_failover_on_stop(self):
+        redis = FakeLeaseRedis()
+        jobs = [Job(), Job()]
+        candidates = [_candidate(redis, job, f"worker-{i}") for i, job in enumerate(jobs)]
+        for candidate in candidates:
+            await candidate.start()
+
+        await _wait_for(lambda: any(job.running for job in jobs))
+        await asyncio.sleep(0.3)  # renewals keep the same leader
+        assert [job.running for job in jobs].count(True) == 1
+        assert sum(job.starts for job in jobs) == 1
+
+        leader = next(c for c in candidates if c.is_leader)
+        follower = next(c for c in candidates if not c.is_leader)
+        await leader.stop()
+        await _wait_for(lambda: follower.is_leader)
+
+        assert [job.running for job in jobs].count(True) == 1
+        await follower.stop()
+        assert not any(job.running for job in jobs)
+        assert redis.data == {}
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_stops_job(self):
+        redis = FakeLeaseRedis()
+        job = Job()
+        candidate = _candidate(redis, job, "worker-0")
+        await candidate.start()
+        await _wait_for(lambda: job.running)
+
+        # Another process took the key (e.g. after a long pause here)
+        redis.data["leader:device-monitor"] = ("worker-1", time.monotonic() + 60)
+        await _wait_for(lambda: not job.running)
+
+        assert not candidate.is_leader
+        await candidate.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("outage", ["fail", "hang"])
+    async def test_unreachable_redis_stops_job_before_lease_expires(self, outage):
+        redis = FakeLeaseRedis()
+        job = Job()
+        candidate = _candidate(redis, job, "worker-0", lease=0.3)
+        await candidate.start()
+        await _wait_for(lambda: job.running)
+
+        setattr(redis, outage, True)
+        (_, expires_at), = redis.data.values()
+        await _wait_for(lambda: not job.running)
+
+        # Stepped down while the key still names this process
+        assert time.monotonic() < expires_at
+        redis.hang = redis.fail = False
+        await candidate.stop()
+
+    @pytest.mark.asyncio
+    async def test_without_redis_job_runs_here(self):
+        job = Job()
+        candidate = _candidate(None, job, "worker-0")
+
+        await candidate.start()
+        assert job.running and candidate.is_leader
+
+        await candidate.stop()
+        assert not job.running
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("outage", ["fail", "hang"])
+    async def test_unreachable_redis_at_start_runs_job_here(self, outage):
+        redis = FakeLeaseRedis()
+        setattr(redis, outage, True)
+        job = Job()
+        candidate = _candidate(redis, job, "worker-0")
+
+        await candidate.start()
+        assert job.running and candidate.is_leader
+
+        await candidate.stop()
+        assert not job.running
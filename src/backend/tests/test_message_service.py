@@ -3,11 +3,12 @@
 import uuid
 from datetime import datetime, timezone
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.agency import Agency
 from app.models.user import User
-from app.models.channel import Channel, ChannelType
+from app.models.channel import Channel, ChannelMember, ChannelType
 from app.models.message import Message, MessageType, MessagePriority
 from app.services.channel_service import ChannelService
 from app.services.message_service import MessageService
@@ -182,6 +183,167 @@ class TestMessageService:
 
         assert result is True
 
+    async def _channel_with_member(self, db_session: AsyncSession, test_agency: Agency, test_user: User):
+        from app.core.security import get_password_hash
+
+        user2 = User(
+            id=uuid.uuid4(),
+            email="reader@test.com",
+            full_name="Reader",
+            hashed_password=get_password_hash("password"),
+            agency_id=test_agency.id,
+        )
+        db_session.add(user2)
+        await db_session.commit()
+
+        channel = await ChannelService(db_session).create_channel(
+            name="Read Receipts",
+            channel_type=ChannelType.TEAM,
+            created_by_id=test_user.id,
+            member_ids=[user2.id],
+        )
+        return channel, user2
+
+    async def _member(self, db_session: AsyncSession, channel_id, user_id) -> ChannelMember:
+        result = await db_session.execute(
+            select(ChannelMember)
+            .where(ChannelMember.channel_id == channel_id, ChannelMember.user_id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
+
+    async def test_unread_counts_increment_and_reset(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Sending bumps other members' unread counts; reading resets them."""
+        channel, user2 = await self._channel_with_member(db_session, test_agency, test_user)
+        message_service = MessageService(db_session)
+
+        for i in range(3):
+            await message_service.send_message(channel.id, test_user.id, f"Message {i}")
+
+        assert (await self._member(db_session, channel.id, user2.id)).unread_count == 3
+        assert (await self._member(db_session, channel.id, test_user.id)).unread_count == 0
+
+        assert await message_service.mark_as_read(channel.id, user2.id) is True
+        member = await self._member(db_session, channel.id, user2.id)
+        assert member.unread_count == 0
+        assert member.last_read_message_id is not None
+
+    async def test_read_receipts_from_high_water_mark(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Receipts cover messages up to the member's mark, which never moves back."""
+        channel, user2 = await self._channel_with_member(db_session, test_agency, test_user)
+        base = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        messages = []
+        for i in range(3):
+            message = Message(
+                channel_id=channel.id,
+                sender_id=test_user.id,
+                content=f"Message {i}",
+                created_at=base.replace(minute=i),
+            )
+            db_session.add(message)
+            messages.append(message)
+        await db_session.commit()
+        for message in messages:
+            await db_session.refresh(message)
+
+        message_service = MessageService(db_session)
+        await message_service.mark_as_read(channel.id, user2.id, up_to_message_id=messages[1].id)
+        # A late receipt for an older message must not move the mark back
+        await message_service.mark_as_read(channel.id, user2.id, up_to_message_id=messages[0].id)
+
+        member = await self._member(db_session, channel.id, user2.id)
+        assert member.last_read_message_id == messages[1].id
+
+        receipts = await message_service.get_read_receipts(messages)
+        assert receipts[messages[0].id] == [str(test_user.id), str(user2.id)]
+        assert receipts[messages[1].id] == [str(test_user.id), str(user2.id)]
+        assert receipts[messages[2].id] == [str(test_user.id)]
+
+    async def test_mark_as_read_non_member(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Marking a channel read for a non-member reports failure."""
+        channel = await ChannelService(db_session).create_channel(
+            name="Solo",
+            channel_type=ChannelType.TEAM,
+            created_by_id=test_user.id,
+        )
+
+        assert await MessageService(db_session).mark_as_read(channel.id, uuid.uuid4()) is False
+
+    async def _search_fixture(self, db_session: AsyncSession, test_user: User):
+        channel_service = ChannelService(db_session)
+        channel = await channel_service.create_channel(
+            name="Search", channel_type=ChannelType.TEAM, created_by_id=test_user.id,
+        )
+        other = await channel_service.create_channel(
+            name="Not Joined", channel_type=ChannelType.TEAM, created_by_id=test_user.id,
+        )
+        await channel_service.remove_member(other.id, test_user.id)
+
+        message_service = MessageService(db_session)
+        for i in range(5):
+            message = await message_service.send_message(
+                channel_id=channel.id, sender_id=test_user.id, content=f"Fire on floor {i}",
+            )
+            message.created_at = datetime(2026, 1, 1, 12, i, tzinfo=timezone.utc)
+        await message_service.send_message(
+            channel_id=channel.id, sender_id=test_user.id, content="All clear",
+        )
+        db_session.add(Message(channel_id=other.id, sender_id=test_user.id, content="Fire elsewhere"))
+        await db_session.commit()
+        return channel, message_service
+
+    async def test_search_messages_pages_with_cursor(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Search returns newest matches first, paged by an opaque cursor."""
+        channel, message_service = await self._search_fixture(db_session, test_user)
+
+        first, cursor = await message_service.search_messages(test_user.id, "fire", limit=3)
+        second, end = await message_service.search_messages(test_user.id, "fire", limit=3, cursor=cursor)
+
+        assert [hit.message.content for hit in first] == [f"Fire on floor {i}" for i in (4, 3, 2)]
+        assert [hit.message.content for hit in second] == ["Fire on floor 1", "Fire on floor 0"]
+        assert end is None
+        assert all(hit.message.channel_id == channel.id for hit in first + second)
+
+    async def test_search_messages_highlights_escaped_content(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """Matches are wrapped in <mark> and message markup is escaped."""
+        channel, message_service = await self._search_fixture(db_session, test_user)
+        await message_service.send_message(
+            channel_id=channel.id, sender_id=test_user.id, content="<b>Smoke</b> in stairwell",
+        )
+
+        hits, _ = await message_service.search_messages(test_user.id, "smoke")
+
+        assert [hit.highlight for hit in hits] == ["&lt;b&gt;<mark>Smoke</mark>&lt;/b&gt; in stairwell"]
+
+    async def test_search_messages_treats_wildcards_literally(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """LIKE wildcards in the query match only themselves."""
+        _, message_service = await self._search_fixture(db_session, test_user)
+
+        hits, _ = await message_service.search_messages(test_user.id, "f%r")
+
+        assert hits == []
+
+    async def test_search_messages_invalid_cursor(
+        self, db_session: AsyncSession, test_agency: Agency, test_user: User
+    ):
+        """A malformed cursor is rejected."""
+        message_service = MessageService(db_session)
+
+        with pytest.raises(ValueError):
+            await message_service.search_messages(test_user.id, "fire", cursor="not-a-cursor")
+
     async def test_delete_message(self, db_session: AsyncSession, test_agency: Agency, test_user: User):
         """Test soft deleting a message."""
         channel_service = ChannelService(db_session)
@@ -0,0 +1,366 @@
+"""Tests for SQL recipient filtering and the concurrent notification dispatcher."""
+
+import asyncio
+import uuid
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.agency import Agency
+from app.models.alert import Alert, AlertSeverity, AlertSource, AlertStatus
+from app.models.notification_delivery import NotificationDelivery
+from app.models.notification_preference import NotificationPreference
+from app.models.user import User, UserRole
+from app.services import notification_dispatcher
+from app.services.notification_dispatcher import NotificationDispatcher, TokenBucket
+from app.services.notification_service import NotificationDeliveryResult, NotificationService
+
+
+class FakeStreamRedis:
+    """Consumer-group stream subset: XGROUP CREATE, XADD, XREADGROUP, XACK, XAUTOCLAIM, XPENDING."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[bytes, dict]]] = {}
+        self.delivered: dict[str, int] = {}
+        self.acked: list[bytes] = []
+        # entry id -> times delivered
+        self.pending: dict[bytes, int] = {}
+        self._next_id = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def xgroup_create(self, name, group, id="0", mkstream=False):
+        self.streams.setdefault(name, [])
+        self.delivered.setdefault(name, 0)
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self._next_id += 1
+        entry_id = f"{self._next_id}-0".encode()
+        self.streams.setdefault(name, []).append((entry_id, {k.encode(): v if isinstance(v, bytes) else v.encode() for k, v in fields.items()}))
+        return entry_id
+
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        (name, _), = streams.items()
+        start = self.delivered.get(name, 0)
+        entries = self.streams.get(name, [])[start:start + count]
+        if not entries:
+            await asyncio.sleep(0.01)
+            return []
+        self.delivered[name] = start + len(entries)
+        for entry_id, _ in entries:
+            self.pending[entry_id] = 1
+        return [(name.encode(), entries)]
+
+    async def xack(self, name, group, *ids):
+        self.acked.extend(ids)
+        for entry_id in ids:
+            self.pending.pop(entry_id, None)
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        claimed = [(entry_id, fields) for entry_id, fields in self.streams.get(name, []) if entry_id in self.pending]
+        for entry_id, _ in claimed:
+            self.pending[entry_id] += 1
+        return [b"0-0", claimed, []]
+
+    async def xpending_range(self, name, groupname, min, max, count):
+        return [
+            {"message_id": entry_id, "times_delivered": times}
+            for entry_id, times in self.pending.items()
+            if min <= entry_id <= max
+        ][:count]
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    async def execute(self):
+        for args, kwargs in self.calls:
+            await self.redis.xadd(*args, **kwargs)
+
+
+class BrokenRedis:
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis down")
+
+
+class RecordingService(NotificationService):
+    """Counts bulk writes and delivers with a fixed latency."""
+
+    def __init__(self, session_factory, latency: float = 0.0):
+        super().__init__(session_factory)
+        self.latency = latency
+        self.writes: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _send_email(self, job):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        result = NotificationDeliveryResult(uuid.UUID(job.user_id), job.channel, True, "sent", "msg-1")
+        return result, self._delivery_row(job, "sent", external_id="msg-1")
+
+    async def write_delivery_records(self, rows):
+        self.writes.append(len(rows))
+        await super().write_delivery_records(rows)
+
+
+class FlakyService(RecordingService):
+    """Raises on the first ``failures`` delivery attempts."""
+
+    def __init__(self, session_factory, failures: int):
+        super().__init__(session_factory)
+        self.failures = failures
+        self.attempts = 0
+
+    async def deliver(self, job):
+        self.attempts += 1
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("provider unreachable")
+        return await super().deliver(job)
+
+
+async def _alert(db_session, severity=AlertSeverity.CRITICAL, building_id=None) -> Alert:
+    alert = Alert(
+        id=uuid.uuid4(),
+        source=AlertSource.ALARM_SYSTEM,
+        alert_type="fire_alarm",
+        title="Fire Alarm",
+        severity=severity,
+        status=AlertStatus.PENDING,
+        received_at=datetime.now(timezone.utc),
+        building_id=building_id,
+    )
+    db_session.add(alert)
+    await db_session.commit()
+    return alert
+
+
+async def _subscriber(db_session, agency: Agency, name: str, **prefs) -> User:
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{name}@example.com",
+        hashed_password="not-a-real-hash",
+        full_name=name.title(),
+        role=UserRole.RESPONDER,
+        agency_id=agency.id,
+        is_active=prefs.pop("is_active", True),
+        is_verified=True,
+    )
+    db_session.add(user)
+    db_session.add(NotificationPreference(
+        user_id=user.id,
+        email_enabled=True,
+        push_enabled=False,
+        **prefs,
+    ))
+    await db_session.commit()
+    return user
+
+
+async def _delivery_count(db_session) -> int:
+    return (await db_session.execute(select(func.count()).select_from(NotificationDelivery))).scalar_one()
+
+
+class TestRecipientFiltering:
+    """Eligibility is decided by the preference query."""
+
+    @pytest.mark.asyncio
+    async def test_severity_quiet_hours_and_active_flag(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory
+    ):
+        now = datetime.now(timezone.utc)
+        quiet = {
+            "quiet_start": (now - timedelta(hours=1)).time(),
+            "quiet_end": (now + timedelta(hours=1)).time(),
+        }
+        eligible = await _subscriber(db_session, test_agency, "eligible", min_severity=2)
+        await _subscriber(db_session, test_agency, "critical-only", min_severity=1)
+        await _subscriber(db_session, test_agency, "sleeping", min_severity=5, quiet_override_critical=False, **quiet)
+        await _subscriber(db_session, test_agency, "inactive", min_severity=5, is_active=False)
+        alert = await _alert(db_session, severity=AlertSeverity.HIGH)
+
+        service = NotificationService(session_factory)
+        async with session_factory() as db:
+            recipients = await service._eligible_recipients(db, alert)
+
+        assert [user.id for _, user in recipients] == [eligible.id]
+
+    @pytest.mark.asyncio
+    async def test_critical_alert_overrides_quiet_hours_across_midnight(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory
+    ):
+        # 00:00-23:59:59 with start > end is a window crossing midnight that covers now
+        window = {"quiet_start": time(0, 0, 1), "quiet_end": time(0, 0, 0)}
+        override = await _subscriber(db_session, test_agency, "override", min_severity=1, **window)
+        await _subscriber(db_session, test_agency, "strict", min_severity=1, quiet_override_critical=False, **window)
+        alert = await _alert(db_session)
+
+        service = NotificationService(session_factory)
+        async with session_factory() as db:
+            recipients = await service._eligible_recipients(db, alert)
+
+        assert [user.id for _, user in recipients] == [override.id]
+
+    @pytest.mark.asyncio
+    async def test_building_scope(self, db_session: AsyncSession, test_agency: Agency, session_factory):
+        building_id = uuid.uuid4()
+        everywhere = await _subscriber(db_session, test_agency, "everywhere", min_severity=5, building_ids=[])
+        scoped = await _subscriber(
+            db_session, test_agency, "scoped", min_severity=5, building_ids=[str(building_id)]
+        )
+        await _subscriber(db_session, test_agency, "elsewhere", min_severity=5, building_ids=[str(uuid.uuid4())])
+        alert = await _alert(db_session, building_id=building_id)
+
+        service = NotificationService(session_factory)
+        async with session_factory() as db:
+            recipients = await service._eligible_recipients(db, alert)
+
+        assert {user.id for _, user in recipients} == {everywhere.id, scoped.id}
+
+
+class TestInlineDelivery:
+    """Without a dispatcher, jobs are delivered concurrently in the caller."""
+
+    @pytest.mark.asyncio
+    async def test_deliveries_run_concurrently_and_records_are_bulk_written(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory
+    ):
+        for i in range(10):
+            await _subscriber(db_session, test_agency, f"user{i}", min_severity=1)
+        alert = await _alert(db_session)
+        service = RecordingService(session_factory, latency=0.05)
+
+        results = await service.notify_for_alert(alert)
+
+        assert len(results) == 10
+        assert all(r.success for r in results)
+        assert service.max_in_flight > 1
+        assert service.writes == [10]
+        assert await _delivery_count(db_session) == 10
+        assert service.get_stats()["users_notified"] == 10
+
+
+class TestNotificationDispatcher:
+    """Tests for the queue-backed channel pools."""
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_are_delivered_recorded_and_acked(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory, monkeypatch
+    ):
+        for i in range(6):
+            await _subscriber(db_session, test_agency, f"user{i}", min_severity=1)
+        alert = await _alert(db_session)
+        service = RecordingService(session_factory, latency=0.01)
+        redis = FakeStreamRedis()
+        dispatcher = NotificationDispatcher(
+            service, redis, concurrency={"email": 2, "sms": 1, "call": 1, "push": 1},
+            rate_limits={}, record_flush_interval_ms=20,
+        )
+        monkeypatch.setattr(notification_dispatcher, "_dispatcher", dispatcher)
+        await dispatcher.start()
+        try:
+            assert await service.notify_for_alert(alert) == []
+            assert len(redis.streams["notify:deliveries:email"]) == 6
+            async with asyncio.timeout(5):
+                while len(redis.acked) < 6:
+                    await asyncio.sleep(0.01)
+        finally:
+            await dispatcher.stop()
+
+        assert service.max_in_flight <= 2
+        assert await _delivery_count(db_session) == 6
+        assert service.get_stats()["notifications_sent"] == 6
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_delivers_directly(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory
+    ):
+        await _subscriber(db_session, test_agency, "user", min_severity=1)
+        alert = await _alert(db_session)
+        service = RecordingService(session_factory)
+        dispatcher = NotificationDispatcher(service, None, rate_limits={})
+        await dispatcher.start()
+        dispatcher.redis = BrokenRedis()
+
+        async with session_factory() as db:
+            jobs = service._build_jobs(alert, await service._eligible_recipients(db, alert))
+        await dispatcher.enqueue(jobs)
+        await dispatcher.stop()
+
+        assert await _delivery_count(db_session) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_is_reclaimed_then_dead_lettered(
+        self, db_session: AsyncSession, test_agency: Agency, session_factory
+    ):
+        await _subscriber(db_session, test_agency, "user", min_severity=1)
+        alert = await _alert(db_session)
+        service = FlakyService(session_factory, failures=1)
+        redis = FakeStreamRedis()
+        dispatcher = NotificationDispatcher(
+            service, redis, concurrency={"email": 1, "sms": 1, "call": 1, "push": 1},
+            rate_limits={}, record_flush_interval_ms=20, claim_idle_ms=60000, max_deliveries=2,
+        )
+        await dispatcher.start()
+        try:
+            async with session_factory() as db:
+                jobs = service._build_jobs(alert, await service._eligible_recipients(db, alert))
+            await dispatcher.enqueue(jobs)
+            async with asyncio.timeout(5):
+                while service.attempts < 1:
+                    await asyncio.sleep(0.01)
+            (entry_id,) = redis.pending
+
+            # The failed entry stays pending and is delivered again
+            assert await dispatcher.recover_pending("email") == 1
+            async with asyncio.timeout(5):
+                while entry_id not in redis.acked:
+                    await asyncio.sleep(0.01)
+            assert await _delivery_count(db_session) == 1
+
+            # A job that keeps failing is dead-lettered after max_deliveries
+            service.failures = 10
+            await dispatcher.enqueue(jobs)
+            async with asyncio.timeout(5):
+                while service.attempts < 3:
+                    await asyncio.sleep(0.01)
+            (entry_id,) = redis.pending
+            for _ in range(2):
+                await dispatcher.recover_pending("email")
+                await asyncio.sleep(0.05)
+        finally:
+            await dispatcher.stop()
+
+        assert redis.pending == {}
+        (_, dead), = redis.streams[notification_dispatcher.DEAD_LETTER_STREAM]
+        assert dead[b"original_id"] == entry_id
+        assert dead[b"reason"] == b"max deliveries exceeded"
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=50, burst=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        for _ in range(6):
+            await bucket.acquire()
+
+        # One immediate token, then five more at 50/s
+        assert loop.time() - started >= 0.09
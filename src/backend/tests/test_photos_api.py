@@ -52,6 +52,14 @@ class TestPhotosAPI:
             b'\x00\x00\x00\x00IEND\xaeB`\x82'  # IEND
         )
 
+    def create_decodable_image(self) -> bytes:
+        """Create a PNG that Pillow can render renditions from."""
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", (640, 480), (200, 30, 30)).save(buffer, "PNG")
+        return buffer.getvalue()
+
     @pytest.mark.asyncio
     async def test_list_photos_empty(self, client, admin_user, test_agency):
         """Test listing photos for building with no photos."""
@@ -370,6 +378,40 @@ class TestPhotosAPI:
         # Just check the field exists
         assert "thumbnail_url" in response.json()
 
+    @pytest.mark.asyncio
+    async def test_photo_variants_are_served_and_deleted(self, client, admin_user, test_agency):
+        """Renditions are recorded, negotiated by Accept, and removed with the photo."""
+        token = await self.get_admin_token(client)
+        auth = {"Authorization": f"Bearer {token}"}
+        building_id = await self.create_test_building(client, token)
+
+        upload = await client.post(
+            f"/api/v1/buildings/{building_id}/photos/upload",
+            headers=auth,
+            files={"file": ("test.png", BytesIO(self.create_decodable_image()), "image/png")},
+            data={"title": "Variant Photo"},
+        )
+        photo = upload.json()
+        preview = photo["image_variants"]["preview"]
+        assert preview["webp"] == f"{photo['file_url']}?variant=preview&format=webp"
+
+        negotiated = await client.get(
+            f"{photo['file_url']}?variant=preview", headers={**auth, "Accept": "image/webp,*/*"}
+        )
+        assert negotiated.status_code == 200
+        assert negotiated.headers["content-type"] == "image/webp"
+        assert "Accept" in negotiated.headers["vary"]
+        fallback = await client.get(f"{photo['file_url']}?variant=preview", headers=auth)
+        assert fallback.headers["content-type"] == "image/jpeg"
+        explicit = await client.get(preview["jpg"], headers=auth)
+        assert explicit.headers["content-type"] == "image/jpeg"
+        unknown = await client.get(f"{photo['file_url']}?variant=huge", headers=auth)
+        assert unknown.status_code == 400
+
+        await client.delete(f"/api/v1/buildings/photos/{photo['id']}", headers=auth)
+        for url in (photo["file_url"], photo["thumbnail_url"], preview["webp"]):
+            assert (await client.get(url, headers=auth)).status_code == 404
+
     @pytest.mark.asyncio
     async def test_multiple_photos_same_building(self, client, admin_user, test_agency):
         """Test uploading multiple photos to the same building."""
@@ -0,0 +1,298 @@
+"""Tests for the authenticated-principal cache."""
+
+import json
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import inspect
+from sqlalchemy.orm.exc import DetachedInstanceError
+
+from app.models.user import User, UserRole
+from app.services.principal_cache import (
+    INVALIDATE_CHANNEL,
+    PUT_IF_GENERATION_SCRIPT,
+    Principal,
+    PrincipalCache,
+    principal_cache,
+)
+
+
+class FakeRedis:
+    """Minimal GET/SET/DELETE/PUBLISH store with counters and the put script."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, "0")) + 1)
+        return int(self.values[key])
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def eval(self, script, numkeys, key, user_gen_key, all_gen_key, value, user_gen, all_gen, ex):
+        assert script == PUT_IF_GENERATION_SCRIPT
+        if (self.values.get(user_gen_key, "0"), self.values.get(all_gen_key, "0")) != (user_gen, all_gen):
+            return 0
+        self.values[key] = value
+        return 1
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.values):
+            if key.startswith(prefix):
+                yield key
+
+
+class BrokenRedis:
+    """Redis client whose every call fails."""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+        return fail
+
+
+def _principal(**overrides) -> Principal:
+    fields = {
+        "id": str(uuid.uuid4()),
+        "email": "cached@example.com",
+        "full_name": "Cached User",
+        "role": UserRole.DISPATCHER.value,
+        "is_active": True,
+        "is_verified": True,
+        "mfa_enabled": False,
+        "token_version": 0,
+    }
+    fields.update(overrides)
+    return Principal(**fields)
+
+
+class TestPrincipalCache:
+    """Tests for PrincipalCache lookups and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_populates_local_lru(self):
+        """A principal cached by another worker is read from Redis once."""
+        redis = FakeRedis()
+        principal = _principal()
+        await PrincipalCache(redis).put(principal)
+
+        cache = PrincipalCache(redis)
+        assert await cache.get(principal.id) == principal
+        redis.values.clear()
+        assert await cache.get(principal.id) == principal
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_oldest(self):
+        """The local LRU is bounded by max_entries."""
+        cache = PrincipalCache(BrokenRedis(), max_entries=2)
+        first, second, third = _principal(), _principal(), _principal()
+        for p in (first, second, third):
+            await cache.put(p)
+
+        assert await cache.get(first.id) is None
+        assert await cache.get(third.id) == third
+
+    @pytest.mark.asyncio
+    async def test_local_ttl(self):
+        """Expired local entries are not served."""
+        cache = PrincipalCache(BrokenRedis(), local_ttl_seconds=0)
+        principal = _principal()
+        await cache.put(principal)
+
+        assert await cache.get(principal.id) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_deletes_and_publishes(self):
+        """Invalidation evicts locally, in Redis, and notifies other workers."""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis)
+        principal = _principal()
+        await cache.put(principal)
+
+        await cache.invalidate(principal.id)
+
+        assert await cache.get(principal.id) is None
+        assert cache.cache_key(principal.id) not in redis.values
+        assert redis.published == [(INVALIDATE_CHANNEL, principal.id)]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_all(self):
+        """Role changes clear every cached principal."""
+        redis = FakeRedis()
+        cache = PrincipalCache(redis)
+        await cache.put(_principal())
+        await cache.put(_principal())
+
+        await cache.invalidate_all()
+
+        assert not [key for key in redis.values if key.startswith("auth:principal:")]
+        assert redis.published == [(INVALIDATE_CHANNEL, "*")]
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_local(self):
+        """Redis errors never fail authentication."""
+        cache = PrincipalCache(BrokenRedis())
+        principal = _principal()
+        await cache.put(principal)
+
+        assert await cache.get(principal.id) == principal
+        assert await cache.get(str(uuid.uuid4())) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("all_users", [False, True])
+    async def test_put_after_concurrent_invalidation_is_dropped(self, all_users):
+        """A principal loaded before another worker's change is not cached after it."""
+        redis = FakeRedis()
+        loading, changing = PrincipalCache(redis), PrincipalCache(redis)
+        stale = _principal()
+
+        generation = await loading.generation(stale.id)  # request starts loading the user
+        if all_users:
+            await changing.invalidate_all()  # another worker edits a role and commits
+        else:
+            await changing.invalidate(stale.id)  # another worker deactivates the user
+        await loading.put(stale, generation)
+
+        assert await loading.get(stale.id) is None
+        assert await PrincipalCache(redis).get(stale.id) is None
+
+        fresh = _principal(id=stale.id, is_active=False)
+        await loading.put(fresh, await loading.generation(fresh.id))
+        assert await PrincipalCache(redis).get(fresh.id) == fresh
+
+    @pytest.mark.asyncio
+    async def test_put_after_local_eviction_is_dropped(self):
+        """An eviction received while loading keeps the loaded principal out of this worker."""
+        cache = PrincipalCache(BrokenRedis())
+        stale = _principal()
+
+        generation = await cache.generation(stale.id)
+        cache.evict_local(stale.id)
+        await cache.put(stale, generation)
+
+        assert await cache.get(stale.id) is None
+
+    def test_pubsub_message_evicts_local(self):
+        """Evictions received from other workers drop local entries."""
+        cache = PrincipalCache(FakeRedis())
+        principal = _principal()
+        cache._store_local(principal)
+
+        cache.evict_local(principal.id)
+
+        assert principal.id not in cache._local
+
+
+class TestPrincipalToUser:
+    """Tests for rebuilding a User from a cached principal."""
+
+    def test_detached_user_has_cached_fields_only(self):
+        """Cached fields are readable; secrets are expired and fail loudly."""
+        principal = _principal(agency_id=str(uuid.uuid4()))
+        user = principal.to_user()
+
+        assert inspect(user).detached
+        assert str(user.id) == principal.id
+        assert user.role == UserRole.DISPATCHER
+        assert str(user.agency_id) == principal.agency_id
+        with pytest.raises(DetachedInstanceError):
+            _ = user.hashed_password
+
+    def test_custom_role_permissions(self):
+        """has_permission uses the cached custom role."""
+        principal = _principal(
+            role_id=str(uuid.uuid4()),
+            role_name="night_shift",
+            role_display_name="Night Shift",
+            role_permissions=["channels:*"],
+        )
+        user = principal.to_user()
+
+        assert user.has_permission("channels:broadcast")
+        assert not user.has_permission("system:admin")
+        assert user.role_name == "night_shift"
+
+    def test_round_trips_through_json(self):
+        """Principals survive the Redis JSON encoding."""
+        principal = _principal()
+        assert Principal(**json.loads(json.dumps(principal.__dict__))) == principal
+
+
+class TestPrincipalCacheAPI:
+    """End-to-end behaviour through get_current_user."""
+
+    async def _login(self, client: AsyncClient, email: str, password: str) -> str:
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": email, "password": password}
+        )
+        return response.json()["access_token"]
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self, client: AsyncClient, test_user: User):
+        """The principal is cached after the first authenticated request."""
+        token = await self._login(client, "test@example.com", "TestPassword123!")
+        headers = {"Authorization": f"Bearer {token}"}
+
+        first = await client.get("/api/v1/auth/me", headers=headers)
+        assert await principal_cache.get(test_user.id) is not None
+        second = await client.get("/api/v1/auth/me", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+
+    @pytest.mark.asyncio
+    async def test_password_change_revokes_old_tokens(self, client: AsyncClient, test_user: User):
+        """Changing the password evicts the principal and old tokens stop working."""
+        token = await self._login(client, "test@example.com", "TestPassword123!")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+        response = await client.post(
+            "/api/v1/auth/change-password",
+            headers=headers,
+            json={"current_password": "TestPassword123!", "new_password": "NewPassword456!"},
+        )
+        assert response.status_code == 200
+
+        assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+        new_token = await self._login(client, "test@example.com", "NewPassword456!")
+        me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {new_token}"})
+        assert me.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_deactivation_takes_effect_immediately(
+        self, client: AsyncClient, admin_user: User, test_user: User
+    ):
+        """A deactivated user's cached principal is evicted."""
+        user_token = await self._login(client, "test@example.com", "TestPassword123!")
+        admin_token = await self._login(client, "admin@example.com", "AdminPassword123!")
+        user_headers = {"Authorization": f"Bearer {user_token}"}
+        assert (await client.get("/api/v1/auth/me", headers=user_headers)).status_code == 200
+
+        response = await client.post(
+            f"/api/v1/users/{test_user.id}/deactivate",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+
+        assert (await client.get("/api/v1/auth/me", headers=user_headers)).status_code == 401
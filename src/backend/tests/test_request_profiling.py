@@ -0,0 +1,108 @@
+"""Tests for per-request SQL statistics, N+1 warnings and request profiles."""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.core import profiling
+from app.core.profiling import RequestProfilingMiddleware, instrument_engine
+
+
+def _sample(name: str, handler: str) -> float:
+    return REGISTRY.get_sample_value(name, {"handler": handler}) or 0.0
+
+
+@pytest.fixture
+def app(db_engine, monkeypatch):
+    monkeypatch.setattr(profiling.settings, "n_plus_one_threshold", 10)
+    instrument_engine(db_engine)
+    app = FastAPI()
+
+    @app.get("/profiled/items/{count}")
+    async def items(count: int):
+        # One lookup per item, the shape of an N+1
+        async with db_engine.connect() as conn:
+            for n in range(count):
+                await conn.execute(text("SELECT :n"), {"n": n})
+        return {"count": count}
+
+    app.add_middleware(RequestProfilingMiddleware)
+    return app
+
+
+async def _get(app, path: str, **kwargs):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path, **kwargs)
+
+
+class TestQueryStatistics:
+    """Statements are counted per request and repeats flagged."""
+
+    @pytest.mark.asyncio
+    async def test_queries_are_counted_per_route(self, app):
+        handler = "/profiled/items/{count}"
+        requests = _sample("eriop_request_db_queries_count", handler)
+        queries = _sample("eriop_request_db_queries_sum", handler)
+
+        response = await _get(app, "/profiled/items/3")
+
+        assert response.status_code == 200
+        assert 'desc="3 queries"' in response.headers["server-timing"]
+        assert _sample("eriop_request_db_queries_count", handler) == requests + 1
+        assert _sample("eriop_request_db_queries_sum", handler) == queries + 3
+
+    @pytest.mark.asyncio
+    async def test_repeated_statement_is_flagged(self, app):
+        handler = "/profiled/items/{count}"
+        flagged = _sample("eriop_request_repeated_queries_total", handler)
+
+        await _get(app, "/profiled/items/3")
+        assert _sample("eriop_request_repeated_queries_total", handler) == flagged
+
+        await _get(app, "/profiled/items/12")
+        assert _sample("eriop_request_repeated_queries_total", handler) == flagged + 1
+
+
+class TestRequestProfiles:
+    """Profiles are written on request, or when a sampled request is slow."""
+
+    @pytest.mark.asyncio
+    async def test_profile_header_writes_profile(self, app, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling.settings, "request_profile_dir", str(tmp_path))
+        monkeypatch.setattr(profiling.settings, "request_profile_secret", "s3cret")
+
+        await _get(app, "/profiled/items/2", headers={"X-Profile": "s3cret"})
+
+        (profile,) = tmp_path.iterdir()
+        assert profile.name.endswith("-GET-profiled_items_count.html")
+        assert "pyinstrument" in profile.read_text()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("secret, header", [("", "1"), ("", ""), ("s3cret", "1"), ("s3cret", "guess")])
+    async def test_profile_header_requires_secret(self, app, tmp_path, monkeypatch, secret, header):
+        monkeypatch.setattr(profiling.settings, "request_profile_dir", str(tmp_path))
+        monkeypatch.setattr(profiling.settings, "request_profile_secret", secret)
+
+        await _get(app, "/profiled/items/2", headers={"X-Profile": header})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_profile_dir_keeps_newest_files(self, tmp_path):
+        for n in range(5):
+            profiling._write_profile(tmp_path / f"{1000 + n}-GET-x.html", "<html/>", max_files=3)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "1002-GET-x.html", "1003-GET-x.html", "1004-GET-x.html"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_fast_sampled_request_is_discarded(self, app, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling.settings, "request_profile_dir", str(tmp_path))
+        monkeypatch.setattr(profiling.settings, "request_profile_sample_rate", 1.0)
+        monkeypatch.setattr(profiling.settings, "request_profile_slow_ms", 60_000)
+
+        await _get(app, "/profiled/items/2")
+
+        assert list(tmp_path.iterdir()) == []
@@ -3,9 +3,14 @@
 import pytest
 from datetime import timedelta
 
+from app.core import security
 from app.core.security import (
+    PasswordHasherBusyError,
     verify_password,
+    verify_password_async,
     get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -111,3 +116,35 @@ class TestJWTTokens:
         )
         payload = verify_token(token, token_type="access")
         assert payload is None
+
+
+class TestPasswordHashingPool:
+    """Tests for hashing off the event loop with admission control."""
+
+    @pytest.mark.asyncio
+    async def test_async_hash_and_verify(self):
+        """Async variants produce and check ordinary bcrypt hashes."""
+        hashed = await get_password_hash_async("TestPassword123!")
+        assert verify_password("TestPassword123!", hashed) is True
+        assert await verify_password_async("TestPassword123!", hashed) is True
+        assert await verify_password_async("WrongPassword456!", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_backlog_full(self, monkeypatch):
+        """Requests beyond the pending limit fail fast instead of queueing."""
+        monkeypatch.setattr(security.settings, "password_hash_max_pending", 0)
+        with pytest.raises(PasswordHasherBusyError):
+            await verify_password_async("TestPassword123!", get_password_hash("TestPassword123!"))
+        assert security._hash_pending == 0
+
+    def test_needs_rehash_below_configured_cost(self, monkeypatch):
+        """Hashes with a lower cost than configured are flagged for upgrade."""
+        hashed = get_password_hash("TestPassword123!")
+        assert password_needs_rehash(hashed) is False
+
+        monkeypatch.setattr(security.settings, "bcrypt_rounds", security.settings.bcrypt_rounds + 1)
+        assert password_needs_rehash(hashed) is True
+
+    def test_needs_rehash_ignores_unknown_formats(self):
+        """Non-bcrypt hashes are left alone."""
+        assert password_needs_rehash("not-a-bcrypt-hash") is False
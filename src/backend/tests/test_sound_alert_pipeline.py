@@ -0,0 +1,236 @@
+"""Tests for the sound alert pipeline's device cache and event batching."""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.axis.events import AudioEventType, AxisAudioEvent
+from app.models.agency import Agency
+from app.models.alert import Alert
+from app.models.building import Building, BuildingType
+from app.models.device import DeviceType
+from app.services import sound_alert_pipeline
+from app.services.alert_dedup import AlertDeduplicator
+from app.services.device_identity_cache import DeviceIdentityCache, device_identity_cache
+from app.services.device_service import DeviceService
+from app.services.sound_alert_pipeline import SoundAlertPipeline
+
+
+class FakeRedis:
+    """In-memory SET NX / GET / DELETE (expiry is not simulated)."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def _event(device_id: str = "ACCC8E000001", event_type=AudioEventType.GUNSHOT, confidence=0.9):
+    return AxisAudioEvent(
+        device_id=device_id,
+        device_name="Lobby camera",
+        event_type=event_type,
+        confidence=confidence,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    """Record broadcasts instead of sending them."""
+    events = {"alerts": [], "devices": []}
+
+    async def alert_created(data):
+        events["alerts"].append(data)
+
+    async def device_alert(data):
+        events["devices"].append(data)
+
+    monkeypatch.setattr(sound_alert_pipeline, "emit_alert_created", alert_created)
+    monkeypatch.setattr(sound_alert_pipeline, "emit_device_alert", device_alert)
+    monkeypatch.setattr(sound_alert_pipeline, "alert_deduplicator", AlertDeduplicator(FakeRedis()))
+    device_identity_cache.clear()
+    yield events
+    device_identity_cache.clear()
+
+
+@pytest.fixture
+async def building(db_session: AsyncSession, test_agency: Agency) -> Building:
+    building = Building(
+        id=uuid.uuid4(),
+        agency_id=test_agency.id,
+        name="Test Building",
+        street_name="Test Street",
+        city="Montreal",
+        province_state="Quebec",
+        latitude=45.5017,
+        longitude=-73.5673,
+        building_type=BuildingType.COMMERCIAL,
+        full_address="100 Test Street, Montreal, Quebec",
+    )
+    db_session.add(building)
+    await db_session.commit()
+    return building
+
+
+async def _create_camera(db_session: AsyncSession, building: Building, serial: str, ip: str):
+    return await DeviceService(db_session).create_device(
+        name=f"Camera {serial}",
+        device_type=DeviceType.CAMERA,
+        building_id=building.id,
+        serial_number=serial,
+        ip_address=ip,
+    )
+
+
+async def _alert_count(db_session: AsyncSession) -> int:
+    return (await db_session.execute(select(func.count()).select_from(Alert))).scalar_one()
+
+
+class TestDeviceIdentityCache:
+    """Tests for the Axis identifier -> device cache."""
+
+    def test_negative_entries_expire_sooner(self):
+        cache = DeviceIdentityCache(ttl_seconds=300, negative_ttl_seconds=0)
+        device_id = uuid.uuid4()
+        cache.put("serial-1", device_id)
+        cache.put("serial-2", None)
+
+        assert cache.get("serial-1") == (True, device_id)
+        assert cache.get("serial-2") == (False, None)
+
+    def test_invalidate_drops_entries_for_device(self):
+        cache = DeviceIdentityCache()
+        device_id = uuid.uuid4()
+        cache.put("serial-1", device_id)
+        cache.put("10.0.0.1", device_id)
+        cache.put("serial-2", uuid.uuid4())
+
+        cache.invalidate(set(), {device_id})
+
+        assert cache.get("serial-1") == (False, None)
+        assert cache.get("10.0.0.1") == (False, None)
+        assert cache.get("serial-2")[0]
+
+    @pytest.mark.asyncio
+    async def test_device_update_invalidates(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        """Changing a serial through DeviceService evicts the old mapping."""
+        device = await _create_camera(db_session, building, "ACCC8E000001", "10.0.0.1")
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=0)
+        await pipeline.handle_audio_event(_event("ACCC8E000001"))
+        assert device_identity_cache.get("ACCC8E000001") == (True, device.id)
+
+        await DeviceService(db_session).update_device(device.id, serial_number="ACCC8E000099")
+
+        assert device_identity_cache.get("ACCC8E000001") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_new_device_replaces_negative_entry(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        """An event from an unregistered camera does not hide it once registered."""
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=0)
+        await pipeline.handle_audio_event(_event("ACCC8E000002"))
+        assert pipeline.get_stats()["device_not_found"] == 1
+
+        device = await _create_camera(db_session, building, "ACCC8E000002", "10.0.0.2")
+        data = await pipeline.handle_audio_event(_event("ACCC8E000002", AudioEventType.EXPLOSION))
+
+        assert data["device_id"] == str(device.id)
+
+
+class TestSoundAlertBatching:
+    """Tests for processing a window of events together."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_events_share_one_alert_and_broadcast(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        """Repeats within a window fold into one alert, broadcast once."""
+        await _create_camera(db_session, building, "ACCC8E000001", "10.0.0.1")
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=50)
+        commits = []
+        original = pipeline._process_batch
+
+        async def record(events):
+            commits.append(len(events))
+            return await original(events)
+
+        pipeline._process_batch = record
+
+        results = await asyncio.gather(*[
+            pipeline.handle_audio_event(_event("ACCC8E000001")) for _ in range(5)
+        ])
+
+        assert commits == [5]
+        assert len({r["id"] for r in results}) == 1
+        assert results[0]["occurrence_count"] == 5
+        assert len(emitted["alerts"]) == 1
+        assert len(emitted["devices"]) == 1
+        assert await _alert_count(db_session) == 1
+        assert pipeline.get_stats()["alerts_created"] == 1
+
+    @pytest.mark.asyncio
+    async def test_distinct_devices_in_one_window(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        """Each device gets its own alert; the IP address also identifies a camera."""
+        first = await _create_camera(db_session, building, "ACCC8E000001", "10.0.0.1")
+        second = await _create_camera(db_session, building, "ACCC8E000002", "10.0.0.2")
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=50)
+
+        results = await asyncio.gather(
+            pipeline.handle_audio_event(_event("ACCC8E000001")),
+            pipeline.handle_audio_event(_event("10.0.0.2")),
+            pipeline.handle_audio_event(_event("unknown-camera")),
+        )
+
+        assert [r["device_id"] for r in results] == [str(first.id), str(second.id), None]
+        assert len(emitted["alerts"]) == 3
+        assert await _alert_count(db_session) == 3
+
+    @pytest.mark.asyncio
+    async def test_repeat_in_later_window_updates_existing_alert(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        await _create_camera(db_session, building, "ACCC8E000001", "10.0.0.1")
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=10)
+
+        first = await pipeline.handle_audio_event(_event("ACCC8E000001", confidence=0.8))
+        second = await pipeline.handle_audio_event(_event("ACCC8E000001", confidence=0.95))
+
+        assert first["id"] == second["id"]
+        assert second["occurrence_count"] == 2
+        assert second["confidence"] == 0.95
+        assert await _alert_count(db_session) == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_processes_pending_events(
+        self, db_session: AsyncSession, building: Building, session_factory, emitted
+    ):
+        await _create_camera(db_session, building, "ACCC8E000001", "10.0.0.1")
+        pipeline = SoundAlertPipeline(session_factory, batch_window_ms=10_000)
+
+        task = asyncio.create_task(pipeline.handle_audio_event(_event("ACCC8E000001")))
+        await asyncio.sleep(0)
+        await pipeline.stop()
+
+        assert (await task)["occurrence_count"] == 1
+        assert await _alert_count(db_session) == 1
@@ -0,0 +1,211 @@
+"""Tests for the telemetry shadow (latest-value) service."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from prometheus_client import REGISTRY
+
+from app.services.telemetry_shadow_service import TelemetryShadowService
+from app.services.telemetry_worker_service import TelemetryWorkerService
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        results = [
+            getattr(self._redis, name)(*args, **kwargs)
+            for name, args, kwargs in self._commands
+        ]
+        self._commands = []
+        return results
+
+
+class FakeRedis:
+    """Minimal in-memory hash/list store returning bytes like the real client."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.lists: dict[str, list[bytes]] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {k.encode(): v.encode() for k, v in mapping.items()}
+        )
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def lpush(self, key, *values):
+        lst = self.lists.setdefault(key, [])
+        for v in values:
+            lst.insert(0, v.encode())
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:end + 1]
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:end + 1]
+
+
+def _item(device_id: str, ts: str, **metrics) -> dict:
+    return {"device_id": device_id, "server_timestamp": ts, "metrics": metrics}
+
+
+class TestCollapseBatch:
+    """Tests for in-memory batch reduction."""
+
+    def test_latest_value_wins_regardless_of_order(self):
+        """Newest timestamp is kept even if it arrives first."""
+        latest, history = TelemetryShadowService.collapse_batch([
+            _item("d1", "2026-01-01T00:00:02+00:00", temp=22.0),
+            _item("d1", "2026-01-01T00:00:01+00:00", temp=21.0),
+        ])
+
+        assert latest["d1"]["temp"] == {"value": 22.0, "time": "2026-01-01T00:00:02+00:00"}
+        assert [p["value"] for p in history[("d1", "temp")]] == [21.0, 22.0]
+
+    def test_skips_items_without_device_or_timestamp(self):
+        """Malformed items are ignored."""
+        latest, history = TelemetryShadowService.collapse_batch([
+            {"metrics": {"temp": 1}},
+            {"device_id": "d1", "metrics": {"temp": 1}},
+            _item("d2", "2026-01-01T00:00:00+00:00"),
+        ])
+
+        assert latest == {}
+        assert history == {}
+
+
+class TestTelemetryShadowService:
+    """Tests for reading and writing the shadow store."""
+
+    @pytest.fixture
+    def service(self):
+        return TelemetryShadowService(FakeRedis(), history_size=3)
+
+    @pytest.mark.asyncio
+    async def test_update_and_read_device_shadow(self, service):
+        """Latest values are readable per device after a batch update."""
+        updated = await service.update_batch([
+            _item("d1", "2026-01-01T00:00:00+00:00", temp=20.5, door_open=False),
+            _item("d1", "2026-01-01T00:00:05+00:00", temp=21.5),
+        ])
+
+        assert updated == 2
+        shadow = await service.get_device_shadow("d1")
+        assert shadow == {
+            "temp": {"value": 21.5, "time": "2026-01-01T00:00:05+00:00"},
+            "door_open": {"value": False, "time": "2026-01-01T00:00:00+00:00"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_history_is_capped_and_newest_first(self, service):
+        """History keeps only the most recent history_size points."""
+        for second in range(5):
+            await service.update_batch([
+                _item("d1", f"2026-01-01T00:00:0{second}+00:00", temp=float(second)),
+            ])
+
+        shadow = await service.get_device_shadow("d1", include_history=True)
+        assert [p["value"] for p in shadow["temp"]["history"]] == [4.0, 3.0, 2.0]
+
+    @pytest.mark.asyncio
+    async def test_get_shadows_omits_unknown_devices(self, service):
+        """Bulk read returns only devices that have reported telemetry."""
+        await service.update_batch([
+            _item("d1", "2026-01-01T00:00:00+00:00", temp=1),
+            _item("d2", "2026-01-01T00:00:00+00:00", humidity=40),
+        ])
+
+        shadows = await service.get_shadows(["d1", "d2", "d3"])
+        assert set(shadows) == {"d1", "d2"}
+        assert shadows["d2"]["humidity"]["value"] == 40
+
+    @pytest.mark.asyncio
+    async def test_empty_inputs(self, service):
+        """Empty batches and device lists are no-ops."""
+        assert await service.update_batch([]) == 0
+        assert await service.get_shadows([]) == {}
+
+
+class TestWorkerShadowIntegration:
+    """Tests for shadow updates from TelemetryWorkerService."""
+
+    @pytest.mark.asyncio
+    async def test_flush_batch_updates_shadow(self):
+        """A successful flush pushes the batch into the shadow."""
+        mock_session = AsyncMock()
+        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session.__aexit__ = AsyncMock(return_value=None)
+        session_factory = MagicMock(return_value=mock_session)
+
+        shadow = AsyncMock(spec=TelemetryShadowService)
+        worker = TelemetryWorkerService(
+            redis_client=AsyncMock(),
+            session_factory=session_factory,
+            shadow_service=shadow,
+        )
+        worker._emit_telemetry_events = AsyncMock()
+
+        payload = _item(
+            "6f1c2a4e-9c1b-4f7e-8a55-0a7f4b2d9e11", "2026-01-01T00:00:00+00:00", temp=1.0
+        )
+        await worker._flush_batch([(b"1-0", payload)], worker_id=0)
+
+        shadow.update_batch.assert_awaited_once_with([payload])
+
+    @pytest.mark.asyncio
+    async def test_flush_batch_counts_rows_written(self):
+        """Each metric of a flushed batch counts as one written row."""
+        mock_session = AsyncMock()
+        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session.__aexit__ = AsyncMock(return_value=None)
+        worker = TelemetryWorkerService(
+            redis_client=AsyncMock(),
+            session_factory=MagicMock(return_value=mock_session),
+        )
+        worker._emit_telemetry_events = AsyncMock()
+        written = REGISTRY.get_sample_value("eriop_telemetry_rows_written_total") or 0.0
+
+        payload = _item(
+            "6f1c2a4e-9c1b-4f7e-8a55-0a7f4b2d9e11", "2026-01-01T00:00:00+00:00", temp=1.0, humidity=40.0
+        )
+        await worker._flush_batch([(b"1-0", payload)], worker_id=0)
+
+        assert REGISTRY.get_sample_value("eriop_telemetry_rows_written_total") == written + 2
+
+    @pytest.mark.asyncio
+    async def test_shadow_failure_does_not_fail_flush(self):
+        """Shadow errors are logged and telemetry is still emitted."""
+        mock_session = AsyncMock()
+        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session.__aexit__ = AsyncMock(return_value=None)
+
+        shadow = AsyncMock(spec=TelemetryShadowService)
+        shadow.update_batch.side_effect = RuntimeError("redis down")
+        worker = TelemetryWorkerService(
+            redis_client=AsyncMock(),
+            session_factory=MagicMock(return_value=mock_session),
+            shadow_service=shadow,
+        )
+        worker._emit_telemetry_events = AsyncMock()
+
+        payload = _item(
+            "6f1c2a4e-9c1b-4f7e-8a55-0a7f4b2d9e11", "2026-01-01T00:00:00+00:00", temp=1.0
+        )
+        await worker._flush_batch([(b"1-0", payload)], worker_id=0)
+
+        worker._emit_telemetry_events.assert_awaited_once()
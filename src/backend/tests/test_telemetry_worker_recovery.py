@@ -0,0 +1,241 @@
+"""Tests for telemetry pending-entry recovery, lag sampling and worker scaling."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services import telemetry_worker_service
+from app.services.telemetry_worker_service import (
+    DEAD_LETTER_STREAM,
+    GROUP_NAME,
+    STREAM_NAME,
+    TelemetryWorkerService,
+    _stream_id,
+)
+
+
+class FakeStreamRedis:
+    """One consumer group over in-memory streams, with a pending entries list."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[bytes, dict]]] = {}
+        self.delivered = 0
+        # entry id -> [consumer, delivered at (ms), times delivered]
+        self.pending: dict[bytes, list] = {}
+        self.consumers: dict[str, float] = {}
+        self._seq = 0
+
+    async def xgroup_create(self, name, group, id="0", mkstream=False):
+        self.streams.setdefault(name, [])
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self._seq += 1
+        entry_id = f"{int(time.time() * 1000)}-{self._seq}".encode()
+        self.streams.setdefault(name, []).append((entry_id, dict(fields)))
+        return entry_id
+
+    async def xlen(self, name):
+        return len(self.streams.get(name, []))
+
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        entries = self.streams[STREAM_NAME][self.delivered:self.delivered + count]
+        self.delivered += len(entries)
+        self.consumers[consumername] = time.time()
+        for entry_id, _ in entries:
+            self.pending[entry_id] = [consumername, time.time() * 1000, 1]
+        if not entries:
+            await asyncio.sleep(0.01)  # BLOCK
+            return []
+        return [(STREAM_NAME.encode(), entries)]
+
+    async def xack(self, name, group, *ids):
+        for entry_id in ids:
+            self.pending.pop(entry_id, None)
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        now = time.time() * 1000
+        claimed = []
+        for entry_id, fields in self.streams[name]:
+            info = self.pending.get(entry_id)
+            if info and now - info[1] >= min_idle_time:
+                self.pending[entry_id] = [consumername, now, info[2] + 1]
+                claimed.append((entry_id, fields))
+        return [b"0-0", claimed, []]
+
+    async def xpending_range(self, name, groupname, min, max, count):
+        return [
+            {"message_id": entry_id, "consumer": info[0].encode(), "times_delivered": info[2]}
+            for entry_id, info in sorted(self.pending.items(), key=lambda item: _stream_id(item[0]))
+            if _stream_id(min) <= _stream_id(entry_id) <= _stream_id(max)
+        ][:count]
+
+    async def xpending(self, name, groupname):
+        ids = sorted(self.pending)
+        return {"pending": len(ids), "min": ids[0] if ids else None, "max": ids[-1] if ids else None}
+
+    async def xinfo_groups(self, name):
+        lag = len(self.streams[STREAM_NAME]) - self.delivered
+        return [{"name": GROUP_NAME.encode(), "pending": len(self.pending), "lag": lag}]
+
+    async def xinfo_consumers(self, name, groupname):
+        return [
+            {
+                "name": consumer.encode(),
+                "pending": sum(1 for info in self.pending.values() if info[0] == consumer),
+                "idle": int((time.time() - seen) * 1000),
+            }
+            for consumer, seen in self.consumers.items()
+        ]
+
+    async def xgroup_delconsumer(self, name, groupname, consumername):
+        self.consumers.pop(consumername, None)
+
+
+class ScriptedWorker(TelemetryWorkerService):
+    """Flushes succeed or fail on demand instead of writing to the database."""
+
+    def __init__(self, redis, **kwargs):
+        super().__init__(redis_client=redis, session_factory=None, **kwargs)
+        self.fail_flushes = False
+        self.poison: set[str] = set()
+        self.flushed: list[dict] = []
+
+    async def _flush_batch(self, batch, worker_id):
+        if self.fail_flushes or any(payload["device_id"] in self.poison for _, payload in batch):
+            return False
+        self.flushed.extend(payload for _, payload in batch)
+        await self.redis.xack(STREAM_NAME, GROUP_NAME, *[msg_id for msg_id, _ in batch])
+        return True
+
+
+async def _publish(redis: FakeStreamRedis, device_id: str) -> bytes:
+    payload = {"device_id": device_id, "server_timestamp": "2026-01-01T00:00:00+00:00", "metrics": {"t": 1}}
+    return await redis.xadd(STREAM_NAME, {b"payload": json.dumps(payload).encode()})
+
+
+async def _deliver(redis: FakeStreamRedis, worker: ScriptedWorker) -> None:
+    """One read-and-flush round of a normal consumer."""
+    messages = await redis.xreadgroup(GROUP_NAME, "other-host-1-0", {STREAM_NAME: ">"}, count=100)
+    for _, entries in messages:
+        await worker._flush_batch(await worker._parse_entries(entries), worker_id=0)
+
+
+@pytest.fixture
+def redis():
+    return FakeStreamRedis()
+
+
+class TestPendingRecovery:
+    """Entries left pending are retried, and poison entries dead-lettered."""
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_claimed_and_retried(self, redis):
+        worker = ScriptedWorker(redis, claim_idle_ms=0)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        await _publish(redis, "a")
+        await _publish(redis, "b")
+        worker.fail_flushes = True
+        await _deliver(redis, worker)
+        assert len(redis.pending) == 2
+
+        worker.fail_flushes = False
+        assert await worker.recover_pending() == 2
+
+        assert redis.pending == {}
+        assert [p["device_id"] for p in worker.flushed] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_poison_entry_is_dead_lettered_without_blocking_others(self, redis):
+        worker = ScriptedWorker(redis, claim_idle_ms=0, max_deliveries=3)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        poison_id = await _publish(redis, "poison")
+        await _publish(redis, "good")
+        worker.poison = {"poison"}
+        await _deliver(redis, worker)
+
+        await worker.recover_pending()
+        assert [p["device_id"] for p in worker.flushed] == ["good"]
+
+        for _ in range(3):
+            await worker.recover_pending()
+
+        assert redis.pending == {}
+        (dead_id, dead), = redis.streams[DEAD_LETTER_STREAM]
+        assert dead["original_id"] == poison_id
+        assert dead["reason"] == "max deliveries exceeded"
+
+    @pytest.mark.asyncio
+    async def test_delivery_counts_ignore_other_pending_entries(self, redis):
+        worker = ScriptedWorker(redis, claim_idle_ms=0)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        ids = [await _publish(redis, name) for name in ("a", "busy", "b")]
+        for entry_id in ids:
+            redis.pending[entry_id] = ["other-host-1-0", time.time() * 1000, 4]
+        claimed = [(ids[0], {}), (ids[2], {})]
+
+        # The middle entry is another consumer's and must not take a slot
+        assert await worker._delivery_counts(claimed) == {ids[0]: 4, ids[2]: 4}
+
+    @pytest.mark.asyncio
+    async def test_unparseable_entry_is_dead_lettered_on_read(self, redis):
+        worker = ScriptedWorker(redis)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        await redis.xadd(STREAM_NAME, {b"payload": b"{not json"})
+        await _publish(redis, "a")
+
+        await _deliver(redis, worker)
+
+        assert redis.pending == {}
+        assert len(redis.streams[DEAD_LETTER_STREAM]) == 1
+        assert [p["device_id"] for p in worker.flushed] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_stale_consumers_are_removed(self, redis, monkeypatch):
+        monkeypatch.setattr(telemetry_worker_service, "STALE_CONSUMER_IDLE_MS", 0)
+        worker = ScriptedWorker(redis)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        await _publish(redis, "a")
+        await _deliver(redis, worker)
+        redis.consumers[f"{worker.consumer_prefix}-0"] = time.time()
+
+        await worker._remove_stale_consumers()
+
+        assert list(redis.consumers) == [f"{worker.consumer_prefix}-0"]
+
+
+class TestLagAndScaling:
+    """Lag is exported and drives the number of worker tasks."""
+
+    @pytest.mark.asyncio
+    async def test_sample_lag_exports_metrics(self, redis):
+        worker = ScriptedWorker(redis)
+        await redis.xgroup_create(STREAM_NAME, GROUP_NAME)
+        for device in ("a", "b", "c"):
+            await _publish(redis, device)
+        await redis.xreadgroup(GROUP_NAME, "c1", {STREAM_NAME: ">"}, count=1)
+
+        assert await worker.sample_lag() == 2
+
+        assert REGISTRY.get_sample_value("eriop_telemetry_stream_length") == 3
+        assert REGISTRY.get_sample_value("eriop_telemetry_pending_entries") == 1
+        assert REGISTRY.get_sample_value("eriop_telemetry_consumer_lag") == 2
+        assert REGISTRY.get_sample_value("eriop_telemetry_oldest_pending_seconds") < 60
+
+    @pytest.mark.asyncio
+    async def test_workers_scale_within_bounds(self, redis):
+        worker = ScriptedWorker(redis, num_workers=1, max_workers=3, scale_up_lag=100)
+        await worker.start()
+        try:
+            for _ in range(5):
+                await worker._scale(500)
+            assert worker.worker_count == 3
+
+            for _ in range(telemetry_worker_service.SCALE_DOWN_SAMPLES * 5):
+                await worker._scale(0)
+            assert worker.worker_count == 1
+        finally:
+            await worker.stop()
+        assert worker.worker_count == 0
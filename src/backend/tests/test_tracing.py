@@ -0,0 +1,86 @@
+"""Tests for trace propagation from MQTT receipt to the telemetry batch flush."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.core.tracing import inject_context, links_from, tracer
+from app.services.telemetry_worker_service import TelemetryWorkerService
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tracer_provider():
+    """Record spans in memory (the global provider can only be set once)."""
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(_exporter))
+    trace.set_tracer_provider(provider)
+    yield provider
+
+
+@pytest.fixture
+def spans():
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def _received(device_id: str) -> dict:
+    """A stream payload as buffered by the MQTT telemetry handler."""
+    with tracer.start_as_current_span("telemetry.buffer"):
+        return {
+            "device_id": device_id,
+            "metrics": {"temp": 21.5},
+            "server_timestamp": "2026-01-01T00:00:00+00:00",
+            "trace_context": inject_context(),
+        }
+
+
+class TestContextPropagation:
+    """Span context carried through the stream payload."""
+
+    def test_inject_context_without_span_is_empty(self):
+        assert inject_context() == {}
+
+    def test_links_point_at_producer_spans(self, spans):
+        carriers = [_received("a")["trace_context"], None, {}, {"traceparent": "garbage"}]
+
+        links = links_from(carriers)
+
+        (producer,) = spans.get_finished_spans()
+        assert [link.context.span_id for link in links] == [producer.context.span_id]
+
+
+class TestFlushSpans:
+    """Spans recorded around a telemetry batch flush."""
+
+    @pytest.mark.asyncio
+    async def test_flush_span_links_each_message(self, spans):
+        mock_session = AsyncMock()
+        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session.__aexit__ = AsyncMock(return_value=None)
+        worker = TelemetryWorkerService(
+            redis_client=AsyncMock(),
+            session_factory=MagicMock(return_value=mock_session),
+        )
+        worker._emit_telemetry_events = AsyncMock()
+        batch = [
+            (b"1-0", _received("6f1c2a4e-9c1b-4f7e-8a55-0a7f4b2d9e11")),
+            (b"1-1", _received("0b5e3f1d-7a2c-4e8b-9d64-3c1f2a5b6e70")),
+        ]
+        producers = {span.context.span_id for span in spans.get_finished_spans()}
+
+        assert await worker._flush_batch(batch, worker_id=0) is True
+
+        by_name = {span.name: span for span in spans.get_finished_spans()}
+        flush = by_name["telemetry.flush"]
+        assert {link.context.span_id for link in flush.links} == producers
+        assert flush.attributes["messaging.batch.message_count"] == 2
+        assert flush.attributes["eriop.written"] is True
+        assert by_name["telemetry.insert"].parent.span_id == flush.context.span_id
+        assert by_name["telemetry.insert"].attributes["eriop.rows"] == 2
+        assert by_name["socketio.emit"].parent.span_id == flush.context.span_id
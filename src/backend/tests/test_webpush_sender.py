@@ -0,0 +1,216 @@
+"""Tests for the async Web Push sender and batched push notifications."""
+
+import asyncio
+import base64
+import os
+import uuid
+
+import pytest
+from aiohttp import web
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid, b64urlencode
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.services import push_notifications
+from app.services.delivery.webpush_sender import PushTarget, WebPushSender
+from app.services.push_notifications import (
+    NotificationPayload,
+    NotificationStatus,
+    PushNotificationService,
+    PushSubscription,
+)
+
+
+def _vapid_private_key() -> str:
+    vapid = Vapid()
+    vapid.generate_keys()
+    return b64urlencode(vapid.private_key.private_numbers().private_value.to_bytes(32, "big"))
+
+
+def _browser_keys() -> tuple[str, str]:
+    """A (p256dh, auth) pair as a browser would register it."""
+    public = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    encode = lambda raw: base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    return encode(public), encode(os.urandom(16))
+
+
+class FakePushService:
+    """Loopback push service: ``/push/gone-*`` answers 410, anything else 201."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: list[tuple[str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner: web.AppRunner | None = None
+        self.origin = ""
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/push/{token}", self._push)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.origin = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    def target(self, token: str, subscription_id=None) -> PushTarget:
+        p256dh, auth = _browser_keys()
+        return PushTarget(f"{self.origin}/push/{token}", p256dh, auth, subscription_id=subscription_id)
+
+    async def _push(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await request.read()
+            await asyncio.sleep(self.latency)
+            token = request.match_info["token"]
+            self.requests.append((token, request.headers["Authorization"]))
+            return web.Response(status=410 if token.startswith("gone") else 201)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+async def push_service():
+    service = FakePushService(latency=0.02)
+    await service.start()
+    yield service
+    await service.stop()
+
+
+@pytest.fixture
+async def sender():
+    sender = WebPushSender(_vapid_private_key(), "mailto:alerts@example.com", max_concurrency=4)
+    yield sender
+    await sender.close()
+
+
+class TestWebPushSender:
+    """Tests for WebPushSender."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_are_bounded(self, push_service: FakePushService, sender: WebPushSender):
+        targets = [push_service.target(f"sub{i}") for i in range(12)]
+
+        results = await sender.send_many((target, '{"title": "Test"}') for target in targets)
+
+        assert [r.target for r in results] == targets
+        assert all(r.success and r.status == 201 for r in results)
+        assert 1 < push_service.max_in_flight <= 4
+
+    @pytest.mark.asyncio
+    async def test_vapid_headers_are_signed_once_per_origin(
+        self, push_service: FakePushService, sender: WebPushSender
+    ):
+        await sender.send_many((push_service.target(f"sub{i}"), "{}") for i in range(3))
+
+        assert len({auth for _, auth in push_service.requests}) == 1
+        assert sender.vapid_headers("https://fcm.googleapis.com/fcm/send/abc") != sender.vapid_headers(
+            f"{push_service.origin}/push/other"
+        )
+
+    @pytest.mark.asyncio
+    async def test_gone_subscription_is_expired(self, push_service: FakePushService, sender: WebPushSender):
+        result = await sender.send(push_service.target("gone-1"), "{}")
+
+        assert not result.success
+        assert result.expired
+
+    @pytest.mark.asyncio
+    async def test_unreachable_service_is_a_failure(self, sender: WebPushSender):
+        p256dh, auth = _browser_keys()
+
+        result = await sender.send(PushTarget("http://127.0.0.1:9/push/x", p256dh, auth), "{}")
+
+        assert not result.success
+        assert not result.expired
+        assert result.error
+
+
+class TestBatchedPushNotifications:
+    """Tests for PushNotificationService.send_to_multiple_users."""
+
+    @pytest.mark.asyncio
+    async def test_batch_send_updates_statuses_and_prunes_gone_subscriptions(
+        self,
+        db_session: AsyncSession,
+        db_engine,
+        test_user: User,
+        push_service: FakePushService,
+        sender: WebPushSender,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(push_notifications, "get_webpush_sender", lambda: sender)
+        subscribed = [uuid.uuid4() for _ in range(5)]
+        for i, user_id in enumerate(subscribed):
+            for token in (f"ok-{i}", f"gone-{i}" if i == 0 else f"ok-{i}b"):
+                target = push_service.target(token)
+                db_session.add(PushSubscription(
+                    user_id=user_id, endpoint=target.endpoint,
+                    p256dh_key=target.p256dh, auth_key=target.auth,
+                ))
+        only_gone = uuid.uuid4()
+        target = push_service.target("gone-only")
+        db_session.add(PushSubscription(
+            user_id=only_gone, endpoint=target.endpoint, p256dh_key=target.p256dh, auth_key=target.auth,
+        ))
+        await db_session.commit()
+
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0].upper())
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            notifications = await PushNotificationService(db_session).send_to_multiple_users(
+                [*subscribed, only_gone, test_user.id],
+                NotificationPayload(title="Drill", body="Evacuation drill at 10:00"),
+            )
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", count)
+
+        assert [n.status for n in notifications] == [NotificationStatus.SENT.value] * 5 + [
+            NotificationStatus.FAILED.value, NotificationStatus.FAILED.value,
+        ]
+        assert notifications[-1].error_message == "No active subscriptions"
+        assert "410" in notifications[-2].error_message
+        assert len(push_service.requests) == 11
+        assert push_service.max_in_flight > 1
+        # One query for all subscriptions, no per-user round trips
+        assert statements.count("SELECT") == 1
+        assert statements.count("INSERT") == 1
+        # Notification statuses and pruned subscriptions
+        assert statements.count("UPDATE") == 2
+
+        result = await db_session.execute(
+            select(PushSubscription.endpoint).where(PushSubscription.is_active == False)
+        )
+        assert sorted(e.rsplit("/", 1)[1] for e in result.scalars()) == ["gone-0", "gone-only"]
+
+    @pytest.mark.asyncio
+    async def test_without_vapid_keys_sends_are_skipped(
+        self, db_session: AsyncSession, test_user: User, monkeypatch
+    ):
+        monkeypatch.setattr(push_notifications, "get_webpush_sender", lambda: None)
+        p256dh, auth = _browser_keys()
+        db_session.add(PushSubscription(
+            user_id=test_user.id, endpoint="https://push.example.com/1", p256dh_key=p256dh, auth_key=auth,
+        ))
+        await db_session.commit()
+
+        notification = await PushNotificationService(db_session).send_notification(
+            test_user.id, NotificationPayload(title="Test", body="Body")
+        )
+
+        assert notification.status == NotificationStatus.SENT.value
+        assert notification.sent_at is not None
@@ -123,20 +123,11 @@ export function BIMImport({
     abortControllerRef.current = new AbortController();
 
     try {
-      // Simulate progress for parsing phase
-      const progressInterval = setInterval(() => {
-        setUploadProgress((prev) => {
-          if (prev >= 90) {
-            clearInterval(progressInterval);
-            return prev;
-          }
-          return prev + 10;
-        });
-      }, 300);
-
-      const result = await buildingsApi.importBIM(buildingId, selectedFile);
-
-      clearInterval(progressInterval);
+      // Parsing runs server-side as a job; mirror its reported progress
+      const result = await buildingsApi.importBIM(buildingId, selectedFile, (job) => {
+        setUploadProgress(job.progress);
+      });
+
       setUploadProgress(100);
 
       if (result.success && result.bim_data) {
@@ -48,6 +48,7 @@ import type {
   AlertHistoryPoint,
   BuildingAlertCount,
   BIMImportResult,
+  BIMImportJob,
   BuildingDocument,
   DocumentCreateRequest,
   DocumentUpdateRequest,
@@ -552,14 +553,41 @@ export const buildingsApi = {
     return response.data;
   },
 
-  importBIM: async (buildingId: string, file: File): Promise<BIMImportResult> => {
+  importBIM: async (
+    buildingId: string,
+    file: File,
+    onProgress?: (job: BIMImportJob) => void,
+  ): Promise<BIMImportResult> => {
     const formData = new FormData();
     formData.append('file', file);
-    const response = await api.post<BIMImportResult>(
+    const response = await api.post<BIMImportJob>(
       `/buildings/${buildingId}/import-bim`,
       formData,
       { headers: { 'Content-Type': 'multipart/form-data' } }
     );
+
+    // Parsing runs as a background job; poll until it finishes
+    let job = response.data;
+    while (job.status === 'queued' || job.status === 'running') {
+      onProgress?.(job);
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const status = await api.get<BIMImportJob>(`/buildings/${buildingId}/import-bim/${job.job_id}`);
+      job = status.data;
+    }
+    onProgress?.(job);
+
+    if (job.status === 'failed' || !job.result) {
+      return { success: false, message: job.error || 'BIM import failed' };
+    }
+    return {
+      success: true,
+      message: `BIM data imported successfully from ${job.filename}`,
+      ...job.result,
+    };
+  },
+
+  getBIMImportJob: async (buildingId: string, jobId: string): Promise<BIMImportJob> => {
+    const response = await api.get<BIMImportJob>(`/buildings/${buildingId}/import-bim/${jobId}`);
     return response.data;
   },
 
@@ -37,6 +37,16 @@ export interface Message {
   created_at: string;
 }
 
+export interface MessageSearchResult extends Message {
+  highlight: string;
+  rank?: number | null;
+}
+
+export interface MessageSearchPage {
+  items: MessageSearchResult[];
+  next_cursor: string | null;
+}
+
 export interface UnreadCount {
   total: number;
   by_channel: Record<string, number>;
@@ -69,7 +79,7 @@ interface MessageState {
   deleteMessage: (messageId: string) => Promise<void>;
   markAsRead: (channelId: string, messageId?: string) => Promise<void>;
   fetchUnreadCount: () => Promise<void>;
-  searchMessages: (query: string, channelId?: string) => Promise<Message[]>;
+  searchMessages: (query: string, channelId?: string, cursor?: string) => Promise<MessageSearchPage>;
   addReaction: (messageId: string, emoji: string) => Promise<void>;
   removeReaction: (messageId: string, emoji: string) => Promise<void>;
 
@@ -216,15 +226,16 @@ export const useMessageStore = create<MessageState>((set, get) => ({
     }
   },
 
-  searchMessages: async (query: string, channelId?: string) => {
+  searchMessages: async (query: string, channelId?: string, cursor?: string) => {
     try {
       const params = new URLSearchParams({ query });
       if (channelId) params.set('channel_id', channelId);
-      const response = await api.get<Message[]>(`/messages/search?${params}`);
+      if (cursor) params.set('cursor', cursor);
+      const response = await api.get<MessageSearchPage>(`/messages/search?${params}`);
       return response.data;
     } catch (error: any) {
       set({ error: error.response?.data?.detail || 'Failed to search messages' });
-      return [];
+      return { items: [], next_cursor: null };
     }
   },
 
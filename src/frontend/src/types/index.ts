@@ -1115,9 +1115,33 @@ export interface BIMImportResult {
   message?: string;
   bim_data?: BIMData;
   floors_created?: number;
+  floors_updated?: number;
   locations_found?: number;
 }
 
+export type BIMImportJobStatus = 'queued' | 'running' | 'completed' | 'failed';
+
+export interface BIMImportJob {
+  job_id: string;
+  building_id: string;
+  filename: string;
+  status: BIMImportJobStatus;
+  stage: string;
+  progress: number;
+  error?: string | null;
+  cached: boolean;
+  result?: {
+    building_id: string;
+    bim_data: BIMData;
+    floors_created: number;
+    floors_updated: number;
+    locations_found: number;
+    ifc_schema?: string | null;
+  } | null;
+  created_at: string;
+  updated_at: string;
+}
+
 // ============================================================================
 // Document Management Types (Sprint 6)
 // ============================================================================